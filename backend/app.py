@@ -6,7 +6,7 @@ Versão sem middleware complexo para testes e migração
 """
 
 import os
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from functools import wraps
 from typing import Dict, Any, Optional
 
@@ -16,6 +16,23 @@ from flask_sqlalchemy import SQLAlchemy
 
 from config import config
 from models import db, User, AutomationSession, AutomationLog, UserStats
+from services.linkedin_service import browser_pool, job_queue, oauth_service, FEED_PLAN_ACTIONS
+from services.job_queue import JobAlreadyActiveError, JobQueueFullError
+from services.storage_state import storage_state_store
+from services import request_filter
+from services.log_writer import automation_log_writer
+from services.page_readiness import page_readiness
+from services.interaction_index import interaction_index
+from services.playwright_driver import playwright_driver
+from services.scheduler import automation_scheduler
+from services.async_runtime import automation_runtime
+from services.session_monitor import session_monitor
+from services.action_timing import action_timing_stats, summarize_timings
+from services.feed_cursor import feed_cursor_stats
+from services.memory_watchdog import memory_watchdog
+from services.token_refresher import token_refresher
+from services.auth_cache import auth_cache, UserSnapshot
+from services.usage_counter import usage_counter
 
 
 def create_app(config_name: Optional[str] = None) -> Flask:
@@ -29,12 +46,20 @@ def create_app(config_name: Optional[str] = None) -> Flask:
     # Inicializar extensões básicas
     db.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'])
+    job_queue.init_app(app)
+    automation_log_writer.init_app(app)
+    token_refresher.init_app(app)
+    interaction_index.init_app(app)
     
     # Criar tabelas do banco de dados
     with app.app_context():
         db.create_all()
         print("Database tables created successfully")
     
+    # Tokens OAuth renovados antes de vencer, fora das requisições
+    if not app.config.get('TESTING'):
+        token_refresher.start()
+    
     return app
 
 
@@ -51,7 +76,7 @@ def require_auth(f):
             return jsonify({'error': 'Token de autenticação necessário'}), 401
         
         token = auth_header.split(' ')[1]
-        user = User.verify_auth_token(token)
+        user = auth_cache.verify(token)
         if not user:
             return jsonify({'error': 'Token inválido ou expirado'}), 401
         
@@ -61,20 +86,20 @@ def require_auth(f):
     return decorated_function
 
 
-def get_current_user() -> Optional[User]:
-    """Obter usuário atual da sessão ou token JWT."""
+def get_current_user() -> Optional[UserSnapshot]:
+    """Obter usuário atual da sessão ou token JWT (verificado uma vez por requisição)."""
     # Tentar obter do token JWT
     auth_header = request.headers.get('Authorization')
     if auth_header and auth_header.startswith('Bearer '):
         token = auth_header.split(' ')[1]
-        user = User.verify_auth_token(token)
+        user = auth_cache.verify(token)
         if user:
             return user
     
     # Tentar obter da sessão
     user_id = session.get('user_id')
     if user_id:
-        return User.query.get(user_id)
+        return auth_cache.get_user(user_id)
     
     return None
 
@@ -178,7 +203,13 @@ def manual_login():
 @app.route('/api/auth/logout', methods=['POST'])
 def logout():
     """Fazer logout."""
+    user = get_current_user()
     session.clear()
+    
+    # Liberar o contexto aquecido do usuário sem bloquear a requisição
+    if user and automation_runtime.is_running:
+        automation_runtime.submit(browser_pool.evict(user.id))
+    
     return jsonify({
         'success': True,
         'message': 'Logout realizado com sucesso'
@@ -198,14 +229,30 @@ def execute_automation(action: str):
         target_count = data.get('target_count', 1)
         
         # Validar ação
-        valid_actions = ['like', 'connect', 'comment']
+        valid_actions = ['like', 'connect', 'comment', 'feed_plan']
         if action not in valid_actions:
             return jsonify({
                 'success': False,
                 'message': f'Ação "{action}" não é válida. Ações disponíveis: {valid_actions}'
             }), 400
         
-        # Verificar se há automação em execução
+        # Plano de feed: metas por ação executadas em uma única passagem
+        plan = None
+        if action == 'feed_plan':
+            plan = data.get('plan') or {}
+            if (not isinstance(plan, dict) or not plan
+                    or any(a not in FEED_PLAN_ACTIONS for a in plan)
+                    or any(not isinstance(c, int) or c < 1 for c in plan.values())):
+                return jsonify({
+                    'success': False,
+                    'message': f'Plano inválido. Informe metas inteiras positivas para: {list(FEED_PLAN_ACTIONS)}'
+                }), 400
+            target_count = sum(plan.values())
+        
+        # Sessões órfãs (worker sem heartbeat) são retomadas ou encerradas antes da checagem
+        session_monitor.reap(user.id)
+        
+        # Verificar se há automação em execução (jobs na fila são checados no enqueue)
         running_session = AutomationSession.query.filter_by(
             user_id=user.id,
             status='running'
@@ -217,27 +264,35 @@ def execute_automation(action: str):
                 'message': 'Já existe uma automação em execução'
             }), 409
         
-        # Simular execução de automação
-        result = {
-            'success': True,
-            'count': min(target_count, 3),
-            'target': target_count,
-            'message': f'Automação de {action} executada com sucesso'
-        }
-        
-        # Criar sessão de automação
-        session_obj = AutomationSession(
-            user_id=user.id,
-            action_type=action,
-            target_count=target_count,
-            actual_count=result['count'],
-            status='completed'
-        )
+        # Limites diários (token buckets do escalonador)
+        for limited_action in (plan or {action: 1}):
+            if not automation_scheduler.check(user.id, limited_action):
+                return jsonify({
+                    'success': False,
+                    'message': f'Limite diário de {limited_action} atingido'
+                }), 429
         
-        db.session.add(session_obj)
-        db.session.commit()
+        # Enfileirar automação para os workers assíncronos
+        try:
+            job = job_queue.enqueue(user.id, action, target_count, plan=plan, exclusive=True)
+        except JobAlreadyActiveError:
+            return jsonify({
+                'success': False,
+                'message': 'Já existe uma automação em execução'
+            }), 409
+        except JobQueueFullError:
+            return jsonify({
+                'success': False,
+                'message': 'Fila de automação cheia, tente novamente em instantes'
+            }), 503
         
-        return jsonify(result)
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'message': f'Automação de {action} enfileirada',
+            'job': job.to_dict()
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -246,6 +301,73 @@ def execute_automation(action: str):
         }), 500
 
 
+@app.route('/api/automation/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_automation_job(job_id: str):
+    """Consultar status e progresso de um job de automação."""
+    job = job_queue.get_job(job_id)
+    if not job or job.user_id != request.current_user.id:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    
+    return jsonify({'job': job.to_dict()})
+
+
+@app.route('/api/automation/metrics')
+def automation_metrics():
+    """Métricas dos recursos de automação."""
+    return jsonify({
+        'runtime': automation_runtime.get_stats(),
+        'browser_pool': browser_pool.get_stats(),
+        'playwright': playwright_driver.get_stats(),
+        'jobs': job_queue.get_stats(),
+        'scheduler': automation_scheduler.get_stats(),
+        'storage_state': storage_state_store.get_stats(),
+        'network': request_filter.get_global_stats(),
+        'log_writer': automation_log_writer.get_stats(),
+        'readiness': page_readiness.get_stats(),
+        'interactions': interaction_index.get_stats(),
+        'sessions': session_monitor.get_stats(),
+        'timings': action_timing_stats.get_stats(),
+        'feed_cursor': feed_cursor_stats.get_stats(),
+        'memory': memory_watchdog.get_stats(),
+        'oauth': oauth_service.get_stats(),
+        'tokens': token_refresher.get_stats(include_failures=False),  # sem ids e erros por usuário
+        'auth': auth_cache.get_stats(),
+        'usage': usage_counter.get_stats(),
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    })
+
+
+@app.route('/api/automation/timings')
+@require_auth
+def automation_timings():
+    """Percentis de tempo por tipo de ação e por fase (pausas separadas da latência)."""
+    user = request.current_user
+    days = min(max(request.args.get('days', 7, type=int), 1), 90)
+    limit = min(max(request.args.get('limit', 5000, type=int), 1), 50000)
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    
+    query = db.session.query(
+        AutomationLog.action, AutomationLog.execution_time_ms, AutomationLog.details
+    ).filter(
+        AutomationLog.user_id == user.id,
+        AutomationLog.success.is_(True),
+        AutomationLog.execution_time_ms.isnot(None),
+        AutomationLog.created_at >= since
+    )
+    action = request.args.get('action')
+    if action:
+        query = query.filter(AutomationLog.action == action)
+    
+    rows = query.order_by(AutomationLog.created_at.desc()).limit(limit).all()
+    return jsonify({
+        'days': days,
+        'samples': len(rows),
+        'actions': summarize_timings(rows),
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    })
+
+
 # ==================== TRATAMENTO DE ERROS ====================
 
 @app.errorhandler(404)
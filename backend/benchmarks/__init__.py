@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Benchmarks
+Site falso do LinkedIn e harness de desempenho da automação
+"""
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Site Falso do LinkedIn
+Reproduz o DOM de login, feed, mynetwork e caixa de comentário usado pelos
+seletores da automação, com rolagem infinita e modais, para benchmarks locais
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from html import escape
+from typing import Any, Dict, Optional
+
+from flask import Flask, jsonify, make_response, redirect, request
+from werkzeug.serving import make_server
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE_NAME = 'li_at'  # mesmo cookie verificado por services.storage_state
+
+# Base dos URNs gerados (mesmo formato dos posts reais)
+ACTIVITY_URN_BASE = 7000000000000000000
+
+POST_TEXTS = [
+    'Compartilhando aprendizados do último trimestre com o time.',
+    'Cinco lições sobre liderança que aprendi na prática.',
+    'Estamos contratando! Vagas abertas para engenharia.',
+    'Reflexões sobre produtividade e trabalho remoto.',
+    'Acabamos de lançar uma nova versão do nosso produto.'
+]
+
+PAGE_STYLE = """
+<style>
+  body { font-family: sans-serif; margin: 0; }
+  .feed-shared-update-v2 { min-height: 320px; border-bottom: 1px solid #ddd; padding: 16px; }
+  .discover-entity-card { display: inline-block; width: 200px; height: 260px; margin: 8px; }
+  .artdeco-modal-overlay { position: fixed; inset: 0; background: rgba(0, 0, 0, .4); }
+  .artdeco-modal { background: #fff; margin: 20% auto; padding: 16px; width: 320px; }
+  .artdeco-toast { position: fixed; bottom: 16px; left: 16px; background: #fff; padding: 8px; }
+</style>
+"""
+
+# Rolagem infinita: carrega a próxima página perto do fim do documento e
+# marca o contêiner com data-exhausted quando o servidor não tem mais itens
+INFINITE_SCROLL_SCRIPT = """
+<script>
+(() => {
+  const container = document.querySelector('[data-page-url]');
+  let nextPage = 1, loading = false;
+
+  async function loadMore() {
+    if (loading || container.dataset.exhausted === 'true') return;
+    loading = true;
+    try {
+      const response = await fetch(container.dataset.pageUrl + '?page=' + nextPage);
+      const html = await response.text();
+      if (html.trim()) {
+        container.insertAdjacentHTML('beforeend', html);
+        nextPage++;
+      } else {
+        container.dataset.exhausted = 'true';
+      }
+    } finally {
+      loading = false;
+    }
+  }
+
+  function nearBottom() {
+    return window.innerHeight + window.scrollY >= document.body.scrollHeight - 1200;
+  }
+
+  window.addEventListener('scroll', () => { if (nearBottom()) loadMore(); }, { passive: true });
+  if (nearBottom()) loadMore();
+})();
+</script>
+"""
+
+FEED_SCRIPT = """
+<script>
+(() => {
+  function post(path, body) {
+    return fetch(path, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body)
+    });
+  }
+
+  function closeCommentBox() {
+    document.querySelectorAll('.comments-comment-box').forEach(box => box.remove());
+  }
+
+  document.addEventListener('click', event => {
+    const like = event.target.closest('button.react-button');
+    if (like && like.getAttribute('aria-pressed') !== 'true') {
+      like.setAttribute('aria-pressed', 'true');
+      like.classList.add('active');
+      post('/_fake/like', { urn: like.closest('[data-urn]').dataset.urn });
+      return;
+    }
+
+    const comment = event.target.closest('button.comment-button');
+    if (comment) {
+      // Uma caixa aberta por vez, como no feed real
+      closeCommentBox();
+      const urn = comment.closest('[data-urn]').dataset.urn;
+      comment.closest('.feed-shared-social-actions').insertAdjacentHTML('afterend',
+        '<div class="comments-comment-box" data-for-urn="' + urn + '">' +
+        '<div class="comments-comment-box__editor" contenteditable="true"></div>' +
+        '<button type="button" data-test-id="comment-submit">Publicar</button></div>');
+      return;
+    }
+
+    const submit = event.target.closest('button[data-test-id="comment-submit"]');
+    if (submit) {
+      const box = submit.closest('.comments-comment-box');
+      const text = box.querySelector('[contenteditable]').textContent.trim();
+      if (!text) return;
+      const urn = box.dataset.forUrn;
+      post('/_fake/comment', { urn: urn, text: text });
+      document.querySelector('[data-urn="' + urn + '"] .comments-list')
+        .insertAdjacentHTML('beforeend', '<p class="comment"></p>');
+      document.querySelector('[data-urn="' + urn + '"] .comments-list p:last-child').textContent = text;
+      closeCommentBox();
+    }
+  });
+})();
+</script>
+"""
+
+NETWORK_SCRIPT = """
+<script>
+(() => {
+  let pendingButton = null;
+
+  function removeAll(selector) {
+    document.querySelectorAll(selector).forEach(el => el.remove());
+  }
+
+  document.addEventListener('click', event => {
+    const connect = event.target.closest('button.connect-button');
+    if (connect && !connect.disabled) {
+      // Modal de personalização do convite
+      pendingButton = connect;
+      document.body.insertAdjacentHTML('beforeend',
+        '<div class="artdeco-modal-overlay"><div class="artdeco-modal" role="dialog">' +
+        '<p>Adicionar nota ao convite?</p>' +
+        '<button type="button" class="send-invite" aria-label="Enviar sem nota">Enviar</button>' +
+        '<button type="button" class="dismiss-modal" aria-label="Fechar modal">&times;</button>' +
+        '</div></div>');
+      return;
+    }
+
+    if (event.target.closest('button.send-invite') && pendingButton) {
+      const profile = pendingButton.closest('li').querySelector('a[href*="/in/"]').getAttribute('href');
+      fetch('/_fake/invite', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ profile: profile })
+      });
+      pendingButton.disabled = true;
+      pendingButton.textContent = 'Pendente';
+      pendingButton = null;
+      removeAll('.artdeco-modal-overlay');
+      // Aviso de confirmação com botão de fechar
+      document.body.insertAdjacentHTML('beforeend',
+        '<div class="artdeco-toast" role="alert"><span>Convite enviado</span>' +
+        '<button type="button" class="dismiss-toast" aria-label="Fechar aviso">&times;</button></div>');
+      return;
+    }
+
+    if (event.target.closest('button.dismiss-modal')) {
+      pendingButton = null;
+      removeAll('.artdeco-modal-overlay');
+    }
+    if (event.target.closest('button.dismiss-toast')) {
+      removeAll('.artdeco-toast');
+    }
+  });
+})();
+</script>
+"""
+
+
+def _page(title: str, body: str, scripts: str = '') -> str:
+    return (
+        f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f'<title>{escape(title)}</title>{PAGE_STYLE}</head>'
+        f'<body>{body}{scripts}</body></html>'
+    )
+
+
+def _post_html(index: int) -> str:
+    urn = f'urn:li:activity:{ACTIVITY_URN_BASE + index}'
+    text = POST_TEXTS[index % len(POST_TEXTS)]
+    return (
+        f'<div class="feed-shared-update-v2" data-urn="{urn}">'
+        f'<span class="update-components-actor__name">Membro {index}</span>'
+        f'<p class="update-components-text">{escape(text)}</p>'
+        f'<div class="feed-shared-social-actions">'
+        f'<button type="button" class="react-button" aria-pressed="false" '
+        f'aria-label="Reagir com curtir ao post de Membro {index}">Gostei</button>'
+        f'<button type="button" class="comment-button" '
+        f'aria-label="comentar no post de Membro {index}">Comentar</button>'
+        f'</div><div class="comments-list"></div></div>'
+    )
+
+
+def _card_html(index: int) -> str:
+    return (
+        f'<li class="discover-entity-card">'
+        f'<a href="/in/fake-member-{index}/?miniProfileUrn=urn%3Ali%3Afs_miniProfile%3A{index}">'
+        f'Pessoa {index}</a>'
+        f'<p>Engenharia de Software</p>'
+        f'<button type="button" class="connect-button" '
+        f'aria-label="Convidar Pessoa {index} para se Conectar">Conectar</button>'
+        f'</li>'
+    )
+
+
+class FakeLinkedInSite:
+    """Site falso servido em thread própria, com contadores das ações recebidas"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, posts_per_page: int = 10,
+                 cards_per_page: int = 12, max_pages: int = 50):
+        self.host = host
+        self.port = port
+        self.posts_per_page = posts_per_page
+        self.cards_per_page = cards_per_page
+        self.max_pages = max_pages  # páginas até o fim da rolagem infinita
+
+        self.app = self._create_app()
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Contadores do site
+        self.metrics = defaultdict(int)
+        self.interactions = defaultdict(set)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self) -> str:
+        """Servir o site em thread própria e retornar a URL base"""
+        if self._thread is not None:
+            return self.base_url
+
+        self._server = make_server(self.host, self.port, self.app, threaded=True)
+        self.port = self._server.server_port
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name='fake-linkedin', daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Fake LinkedIn site listening on {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        """Parar o servidor"""
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    # ==================== APLICAÇÃO ====================
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.metrics[key] += amount
+
+    def _record(self, action: str, target: Optional[str]):
+        with self._lock:
+            self.metrics[action] += 1
+            if target in self.interactions[action]:
+                self.metrics[f'{action}_duplicates'] += 1
+            self.interactions[action].add(target)
+
+    def _page_items(self, page: int, per_page: int, render) -> str:
+        if page >= self.max_pages:
+            return ''
+        start = page * per_page
+        return ''.join(render(index) for index in range(start, start + per_page))
+
+    def _create_app(self) -> Flask:
+        app = Flask(__name__)
+
+        def logged_in() -> bool:
+            return bool(request.cookies.get(SESSION_COOKIE_NAME))
+
+        @app.route('/login', methods=['GET'])
+        def login_page():
+            self._count('login_pages')
+            # Preenche e envia sozinho, simulando o login manual do usuário
+            body = (
+                '<form class="login__form" method="post" action="/login">'
+                '<input type="text" name="session_key" value="benchmark@snaplinked.local">'
+                '<input type="password" name="session_password" value="benchmark">'
+                '<button type="submit" data-litms-control-urn="login-submit">Entrar</button>'
+                '</form>'
+                '<script>setTimeout(() => document.querySelector("form").submit(), 300);</script>'
+            )
+            return _page('Entrar | LinkedIn', body)
+
+        @app.route('/login', methods=['POST'])
+        def login_submit():
+            self._count('logins')
+            response = redirect('/feed/')
+            response.set_cookie(SESSION_COOKIE_NAME, f'fake-{request.form.get("session_key", "")}',
+                                httponly=True, samesite='Lax')
+            return response
+
+        @app.route('/feed/')
+        def feed():
+            if not logged_in():
+                return redirect('/login')
+            self._count('feed_pages')
+            body = (
+                '<main id="main"><div class="scaffold-finite-scroll" data-test-id="feed-container" '
+                'data-page-url="/feed/updates">'
+                f'{self._page_items(0, self.posts_per_page, _post_html)}'
+                '</div></main>'
+            )
+            return _page('Feed | LinkedIn', body, INFINITE_SCROLL_SCRIPT + FEED_SCRIPT)
+
+        @app.route('/feed/updates')
+        def feed_updates():
+            if not logged_in():
+                return '', 401
+            self._count('feed_fragments')
+            page = request.args.get('page', 0, type=int)
+            return self._page_items(page, self.posts_per_page, _post_html)
+
+        @app.route('/mynetwork/')
+        def mynetwork():
+            if not logged_in():
+                return redirect('/login')
+            self._count('network_pages')
+            body = (
+                '<main id="main"><ul class="mynetwork-grid" data-page-url="/mynetwork/cards">'
+                f'{self._page_items(0, self.cards_per_page, _card_html)}'
+                '</ul></main>'
+            )
+            return _page('Minha rede | LinkedIn', body, INFINITE_SCROLL_SCRIPT + NETWORK_SCRIPT)
+
+        @app.route('/mynetwork/cards')
+        def mynetwork_cards():
+            if not logged_in():
+                return '', 401
+            self._count('network_fragments')
+            page = request.args.get('page', 0, type=int)
+            return self._page_items(page, self.cards_per_page, _card_html)
+
+        @app.route('/_fake/like', methods=['POST'])
+        def fake_like():
+            self._record('likes', (request.get_json(silent=True) or {}).get('urn'))
+            return '', 204
+
+        @app.route('/_fake/comment', methods=['POST'])
+        def fake_comment():
+            self._record('comments', (request.get_json(silent=True) or {}).get('urn'))
+            return '', 204
+
+        @app.route('/_fake/invite', methods=['POST'])
+        def fake_invite():
+            self._record('invites', (request.get_json(silent=True) or {}).get('profile'))
+            return '', 204
+
+        @app.route('/_fake/stats')
+        def fake_stats():
+            return jsonify(self.get_stats())
+
+        @app.route('/favicon.ico')
+        def favicon():
+            return make_response('', 204)
+
+        return app
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter contadores de páginas servidas e ações recebidas"""
+        with self._lock:
+            return dict(self.metrics)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Site falso do LinkedIn para benchmarks locais')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-pages', type=int, default=50)
+    args = parser.parse_args()
+
+    site = FakeLinkedInSite(host=args.host, port=args.port, max_pages=args.max_pages)
+    print(f"🧪 Site falso do LinkedIn em {site.base_url}")
+    site.app.run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - API OAuth Falsa do LinkedIn
+Reproduz accessToken, revoke, /people/~ e /emailAddress com latência e
+injeção de erros configuráveis, para testes de carga do login
+"""
+
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+OAUTH_PREFIX = '/oauth/v2'
+API_PREFIX = '/v2'
+
+# Tokens emitidos pela API falsa (mesmo formato opaco dos reais)
+TOKEN_TTL_SECONDS = 5184000  # 60 dias, como o LinkedIn
+
+INVALID_TOKEN = {'serviceErrorCode': 65600, 'message': 'Invalid access token', 'status': 401}
+
+Reply = Tuple[int, Optional[Dict[str, Any]]]
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Fila de conexões maior que a padrão (5): picos de login não esperam SYN"""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class FakeLinkedInApi:
+    """API falsa servida em thread própria, com contadores por endpoint
+
+    Usa http.server com HTTP/1.1 em vez do servidor do werkzeug, que fecha a
+    conexão a cada resposta: assim o teste de carga mede o keep-alive do
+    pool do cliente como seria contra o LinkedIn. Cada requisição espera
+    `latency_ms` ± `jitter_ms` e falha com `error_status` com probabilidade
+    `error_rate` antes de ser processada (como uma falha de gateway).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0,
+                 jitter_ms: float = 0, error_rate: float = 0, error_status: int = 503):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self._server: Optional[ApiServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, str] = {}
+
+        # Contadores da API
+        self.metrics = defaultdict(int)
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def oauth_url(self) -> str:
+        return f'{self.base_url}{OAUTH_PREFIX}'
+
+    @property
+    def api_url(self) -> str:
+        return f'{self.base_url}{API_PREFIX}'
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self) -> str:
+        """Servir a API em thread própria e retornar a URL base"""
+        if self._thread is not None:
+            return self.base_url
+
+        self._server = ApiServer((self.host, self.port), self._handler_class())
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name='fake-linkedin-api', daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Fake LinkedIn API listening on {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        """Parar o servidor"""
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._thread.join(timeout=5)
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+    # ==================== ENDPOINTS ====================
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.metrics[key] += amount
+
+    def _issue_token(self, member: str) -> Dict[str, Any]:
+        access_token = f'AQ{secrets.token_urlsafe(48)}'
+        with self._lock:
+            self._tokens[access_token] = member
+        return {
+            'access_token': access_token,
+            'expires_in': TOKEN_TTL_SECONDS,
+            'refresh_token': f'AQR{secrets.token_urlsafe(48)}',
+            'refresh_token_expires_in': TOKEN_TTL_SECONDS * 6
+        }
+
+    def _member(self, authorization: str) -> Optional[str]:
+        """Membro dono do token Bearer da requisição"""
+        if not authorization.startswith('Bearer '):
+            return None
+        with self._lock:
+            return self._tokens.get(authorization[len('Bearer '):])
+
+    def access_token(self, form: Dict[str, str]) -> Reply:
+        grant_type = form.get('grant_type')
+        if grant_type == 'authorization_code' and form.get('code'):
+            self._count('codes_exchanged')
+            # O membro vem do código: cada login gera um usuário distinto
+            return 200, self._issue_token(f'member-{form["code"][-12:]}')
+        if grant_type == 'refresh_token' and form.get('refresh_token'):
+            self._count('tokens_refreshed')
+            return 200, self._issue_token(f'member-{form["refresh_token"][-12:]}')
+        return 400, {'error': 'invalid_request'}
+
+    def revoke(self, form: Dict[str, str]) -> Reply:
+        with self._lock:
+            self._tokens.pop(form.get('token', ''), None)
+        self._count('tokens_revoked')
+        return 200, None
+
+    def profile(self, authorization: str) -> Reply:
+        member = self._member(authorization)
+        if member is None:
+            return 401, INVALID_TOKEN
+        self._count('profiles')
+        return 200, {
+            'id': member,
+            'firstName': {'localized': {'en_US': 'Usuário'}},
+            'lastName': {'localized': {'en_US': member[-6:]}}
+        }
+
+    def email_address(self, authorization: str) -> Reply:
+        member = self._member(authorization)
+        if member is None:
+            return 401, INVALID_TOKEN
+        self._count('emails')
+        return 200, {'elements': [{'handle~': {'emailAddress': f'{member}@snaplinked.local'}, 'handle': 'urn'}]}
+
+    def _injected_failure(self) -> Optional[Reply]:
+        """Latência simulada e, com a probabilidade configurada, erro de gateway"""
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            self._count('injected_errors')
+            return self.error_status, {'message': 'Injected failure', 'status': self.error_status}
+        return None
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                api._count('connections')
+
+            def _reply(self, reply: Reply):
+                status, body = reply
+                payload = json.dumps(body).encode('utf-8') if body is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                api._count('requests')
+                path = urlparse(self.path).path
+                authorization = self.headers.get('Authorization', '')
+                reply = api._injected_failure()
+                if reply is None:
+                    if path == f'{API_PREFIX}/people/~':
+                        reply = api.profile(authorization)
+                    elif path == f'{API_PREFIX}/emailAddress':
+                        reply = api.email_address(authorization)
+                    elif path == '/_fake/stats':
+                        reply = 200, api.get_stats()
+                    else:
+                        reply = 404, {'message': 'Not found'}
+                self._reply(reply)
+
+            def do_POST(self):
+                api._count('requests')
+                path = urlparse(self.path).path
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length).decode('utf-8')
+                form = {key: values[0] for key, values in parse_qs(body).items()}
+                reply = api._injected_failure()
+                if reply is None:
+                    if path == f'{OAUTH_PREFIX}/accessToken':
+                        reply = api.access_token(form)
+                    elif path == f'{OAUTH_PREFIX}/revoke':
+                        reply = api.revoke(form)
+                    else:
+                        reply = 404, {'message': 'Not found'}
+                self._reply(reply)
+
+        return Handler
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter requisições recebidas por endpoint, erros injetados e conexões aceitas"""
+        with self._lock:
+            return {**self.metrics, 'tokens_active': len(self._tokens)}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='API OAuth falsa do LinkedIn para testes de carga')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+
+    api = FakeLinkedInApi(host=args.host, port=args.port, latency_ms=args.latency_ms,
+                          jitter_ms=args.jitter_ms, error_rate=args.error_rate, error_status=args.error_status)
+    api.start()
+    print(f"🧪 API OAuth falsa do LinkedIn em {api.base_url}")
+    print(f"   LINKEDIN_OAUTH_URL={api.oauth_url}")
+    print(f"   LINKEDIN_API_URL={api.api_url}")
+    try:
+        api._thread.join()
+    except KeyboardInterrupt:
+        api.stop()
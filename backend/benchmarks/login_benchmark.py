@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Teste de Carga do Login OAuth
+Executa o caminho do callback OAuth (troca do código e perfil/email) do
+LinkedInOAuthService real contra a API falsa e mede logins por segundo,
+latência de cauda e reaproveitamento de conexões
+
+Uso (a partir de backend/):
+    python -m benchmarks.login_benchmark --logins 500 --concurrency 20 --latency-ms 80
+    python -m benchmarks.login_benchmark --logins 500 --concurrency 20 --error-rate 0.05 --json
+"""
+
+import argparse
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Adicionar o diretório backend ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_linkedin_api import FakeLinkedInApi
+from services.http_client import PooledHttpClient
+from services.linkedin_service import LinkedInOAuthService
+from services.metrics import summarize
+from services.profile_cache import ProfileCache
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Teste de carga do login OAuth contra a API falsa do LinkedIn')
+    parser.add_argument('--logins', type=int, default=200, help='logins a executar')
+    parser.add_argument('--concurrency', type=int, default=10, help='callbacks OAuth simultâneos')
+    parser.add_argument('--latency-ms', type=float, default=50, help='latência da API falsa por requisição')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='variação da latência')
+    parser.add_argument('--error-rate', type=float, default=0, help='fração de requisições com erro injetado')
+    parser.add_argument('--error-status', type=int, default=503, help='status do erro injetado')
+    parser.add_argument('--pool-size', type=int, default=None, help='conexões keep-alive por host (padrão: 2x a concorrência)')
+    parser.add_argument('--retries', type=int, default=None, help='retentativas do cliente HTTP')
+    parser.add_argument('--backoff', type=float, default=0.05, help='backoff base das retentativas em segundos')
+    parser.add_argument('--port', type=int, default=0, help='porta da API falsa (0 = livre)')
+    parser.add_argument('--json', action='store_true', help='imprimir relatório em JSON')
+    return parser.parse_args(argv)
+
+
+def login(service: LinkedInOAuthService) -> Dict[str, Any]:
+    """Um login completo como no callback: código -> token -> perfil e email"""
+    code = secrets.token_urlsafe(24)
+    started = time.monotonic()
+    token = service.exchange_code_for_token(code)
+    profile = service.get_user_profile(token['access_token']) if token else None
+    return {
+        'seconds': time.monotonic() - started,
+        'success': profile is not None,
+        'stage': 'profile' if token else 'token'
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeLinkedInApi(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          error_rate=args.error_rate, error_status=args.error_status)
+    api.start()
+
+    # Perfil e email saem juntos: até duas conexões por login em andamento na API
+    http = PooledHttpClient(pool_size=args.pool_size or args.concurrency * 2, retries=args.retries,
+                            backoff=args.backoff, parallelism=args.concurrency)
+    # Cache desligado: cada login é de um token novo, como em um pico real de logins
+    service = LinkedInOAuthService(http=http, cache=ProfileCache(ttl=0),
+                                   base_url=api.oauth_url, api_url=api.api_url)
+
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+
+    def worker(_):
+        result = login(service)
+        with lock:
+            results.append(result)
+
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix='login-load') as executor:
+            list(executor.map(worker, range(args.logins)))
+        elapsed = time.monotonic() - started
+        # Antes de fechar: os contadores de requisições vivem nos pools do urllib3
+        client = http.get_stats()
+    finally:
+        http.close()
+        api.stop()
+
+    succeeded = [r['seconds'] for r in results if r['success']]
+    failures = {}
+    for result in results:
+        if not result['success']:
+            failures[result['stage']] = failures.get(result['stage'], 0) + 1
+
+    return {
+        'logins': args.logins,
+        'concurrency': args.concurrency,
+        'api_latency_ms': args.latency_ms,
+        'error_rate': args.error_rate,
+        'elapsed_seconds': round(elapsed, 3),
+        'succeeded': len(succeeded),
+        'failed': failures,
+        'logins_per_second': round(len(succeeded) / elapsed, 2) if elapsed else 0,
+        'login_seconds': summarize(succeeded),
+        'pool': client['pool'],
+        'endpoints': client['endpoints'],
+        'api': api.get_stats()
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    latency = report['login_seconds']
+    print(f"⚡ Teste de carga do login OAuth: {report['logins']} logins, "
+          f"{report['concurrency']} simultâneos, API a {report['api_latency_ms']}ms, "
+          f"erros injetados {report['error_rate']:.0%}")
+    print("-" * 60)
+    print(f"⏱️ Tempo total: {report['elapsed_seconds']}s")
+    print(f"✅ Logins: {report['succeeded']} ({report['logins_per_second']}/s)")
+    if report['failed']:
+        print(f"❌ Falhas por etapa: {report['failed']}")
+    if latency['count']:
+        print(f"📊 Latência (ms): p50 {latency['p50'] * 1000:.0f} | p95 {latency['p95'] * 1000:.0f} | "
+              f"p99 {latency['p99'] * 1000:.0f} | max {latency['max'] * 1000:.0f}")
+    pool = report['pool']
+    print(f"🔌 Conexões abertas: {pool['connections_opened']} "
+          f"({pool['requests_per_connection']} requisições por conexão)")
+    retries = {name: stats.get('retries', 0) for name, stats in report['endpoints'].items() if stats.get('retries')}
+    if retries:
+        print(f"🔁 Retentativas: {retries}")
+    print(f"🌐 API falsa: {report['api']}")
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    result = run_benchmark(arguments)
+    if arguments.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_report(result)
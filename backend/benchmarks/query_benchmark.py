@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Benchmark das Consultas por Período
+Gera um histórico sintético de sessões e compara o filtro antigo
+(func.date(created_at) por linha) com as janelas semiabertas de
+models.time_window, por dia, semana e mês: latência e plano de execução
+
+Uso (a partir de backend/):
+    python -m benchmarks.query_benchmark --users 50 --sessions-per-user 4000
+    python -m benchmarks.query_benchmark --users 10 --sessions-per-user 20000 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Adicionar o diretório backend ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func, insert
+
+from services.metrics import summarize
+
+ACTIONS = ('like', 'connect', 'comment')
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark das consultas por período sobre um histórico sintético')
+    parser.add_argument('--users', type=int, default=50, help='usuários no histórico')
+    parser.add_argument('--sessions-per-user', type=int, default=2000, help='sessões por usuário')
+    parser.add_argument('--days', type=int, default=365, help='dias de histórico')
+    parser.add_argument('--queries', type=int, default=200, help='consultas medidas por período e variante')
+    parser.add_argument('--seed', type=int, default=7, help='semente do histórico sintético')
+    parser.add_argument('--json', action='store_true', help='imprimir relatório em JSON')
+    return parser.parse_args(argv)
+
+
+def seed_history(db, users: int, sessions_per_user: int, days: int) -> int:
+    """Inserir usuários e sessões espalhadas pelos últimos `days` dias"""
+    from models import AutomationSession, User
+
+    now = datetime.now(timezone.utc)
+    db.session.execute(insert(User.__table__), [
+        {'email': f'bench-{index}@snaplinked.local', 'name': f'Usuário {index}',
+         'created_at': now, 'updated_at': now}
+        for index in range(users)
+    ])
+    user_ids = [user_id for (user_id,) in db.session.query(User.id)]
+
+    span = days * 86400
+    batch = []
+    for user_id in user_ids:
+        for _ in range(sessions_per_user):
+            created_at = now - timedelta(seconds=random.uniform(0, span))
+            count = random.randint(1, 10)
+            batch.append({
+                'user_id': user_id, 'action_type': random.choice(ACTIONS), 'target_count': count,
+                'actual_count': count, 'status': 'completed' if random.random() < 0.9 else 'failed',
+                'created_at': created_at, 'updated_at': created_at
+            })
+            if len(batch) >= 10000:
+                db.session.execute(insert(AutomationSession.__table__), batch)
+                batch = []
+    if batch:
+        db.session.execute(insert(AutomationSession.__table__), batch)
+    db.session.commit()
+    return len(user_ids)
+
+
+def legacy_usage_query(db, user_id: int, period: str, day):
+    """Filtro anterior: func.date() aplicado a cada sessão do usuário"""
+    from models import AutomationSession, time_window
+
+    start, end = (bound.date() for bound in time_window(period, day, 'UTC'))
+    return db.session.query(
+        AutomationSession.action_type,
+        func.sum(AutomationSession.actual_count),
+        func.count(AutomationSession.id)
+    ).filter(
+        AutomationSession.user_id == user_id,
+        func.date(AutomationSession.created_at) >= start,
+        func.date(AutomationSession.created_at) < end,
+        AutomationSession.status == 'completed'
+    ).group_by(AutomationSession.action_type)
+
+
+def window_usage_query(db, user_id: int, period: str, day):
+    """Filtro atual: faixa semiaberta em created_at"""
+    from models import AutomationSession, in_window, time_window
+
+    return db.session.query(
+        AutomationSession.action_type,
+        func.sum(AutomationSession.actual_count),
+        func.count(AutomationSession.id)
+    ).filter(
+        AutomationSession.user_id == user_id,
+        in_window(AutomationSession.created_at, time_window(period, day, 'UTC')),
+        AutomationSession.status == 'completed'
+    ).group_by(AutomationSession.action_type)
+
+
+def explain(db, query) -> List[str]:
+    """Plano da consulta (SQLite: EXPLAIN QUERY PLAN) com os parâmetros já convertidos"""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    engine = db.session.get_bind()
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        query.all()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    statement, parameters = captured[-1]
+    prefix = 'EXPLAIN QUERY PLAN ' if engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def is_range_scan(plan: List[str]) -> bool:
+    """Plano usa faixa em created_at dentro do índice (user_id, created_at)"""
+    return any('created_at>' in line and 'created_at<' in line for line in plan)
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    from app import create_app
+    from models import db
+
+    random.seed(args.seed)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        started = time.monotonic()
+        users = seed_history(db, args.users, args.sessions_per_user, args.days)
+        seed_seconds = time.monotonic() - started
+
+        today = datetime.now(timezone.utc).date()
+        samples = [
+            (random.randint(1, users), today - timedelta(days=random.randint(0, args.days - 1)))
+            for _ in range(args.queries)
+        ]
+
+        periods = {}
+        for period in ('day', 'week', 'month'):
+            timings = {'legacy': [], 'window': []}
+            mismatches = 0
+            for user_id, day in samples:
+                results = {}
+                for variant, build in (('legacy', legacy_usage_query), ('window', window_usage_query)):
+                    query = build(db, user_id, period, day)
+                    started = time.perf_counter()
+                    results[variant] = sorted(query.all())
+                    timings[variant].append(time.perf_counter() - started)
+                mismatches += results['legacy'] != results['window']
+
+            user_id, day = samples[0]
+            legacy_plan = explain(db, legacy_usage_query(db, user_id, period, day))
+            window_plan = explain(db, window_usage_query(db, user_id, period, day))
+            legacy = summarize(timings['legacy'])
+            window = summarize(timings['window'])
+            periods[period] = {
+                'legacy_seconds': legacy,
+                'window_seconds': window,
+                'speedup_p50': round(legacy['p50'] / window['p50'], 2) if window['p50'] else 0,
+                'mismatches': mismatches,
+                'legacy_plan': legacy_plan,
+                'window_plan': window_plan,
+                'legacy_range_scan': is_range_scan(legacy_plan),
+                'window_range_scan': is_range_scan(window_plan)
+            }
+        db.session.remove()
+
+    return {
+        'users': users,
+        'sessions': users * args.sessions_per_user,
+        'days': args.days,
+        'queries': args.queries,
+        'seed_seconds': round(seed_seconds, 3),
+        'periods': periods
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"🗄️ Consultas por período: {report['sessions']} sessões de {report['users']} usuários "
+          f"em {report['days']} dias, {report['queries']} consultas por período")
+    print("-" * 60)
+    for period, result in report['periods'].items():
+        legacy = result['legacy_seconds']
+        window = result['window_seconds']
+        print(f"📅 {period}: func.date p50 {legacy['p50'] * 1000:.2f}ms p99 {legacy['p99'] * 1000:.2f}ms | "
+              f"janela p50 {window['p50'] * 1000:.2f}ms p99 {window['p99'] * 1000:.2f}ms "
+              f"({result['speedup_p50']}x)")
+        print(f"   🔍 func.date: {'; '.join(result['legacy_plan'])}")
+        print(f"   🔍 janela:    {'; '.join(result['window_plan'])}")
+        if result['mismatches']:
+            print(f"   ❌ Resultados divergentes: {result['mismatches']}")
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    result = run_benchmark(arguments)
+    if arguments.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_report(result)
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Benchmark da Automação
+Executa o serviço real (fila de jobs, pool, escritor de logs) contra o site
+falso e mede ações por minuto, chamadas de protocolo, escritas no banco e
+memória por contexto
+
+Uso (a partir de backend/):
+    python -m benchmarks.run_benchmark --action like --count 20 --contexts 4 --no-delays
+    python -m benchmarks.run_benchmark --action like --count 10 --scale 1,5,10,20 --browsers 1
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+# Adicionar o diretório backend ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_linkedin import FakeLinkedInSite
+
+try:
+    import psutil
+except ImportError:  # RSS dos processos do navegador é opcional
+    psutil = None
+
+BENCHMARK_ACTIONS = ('like', 'comment', 'connect', 'feed_plan')
+
+# Desligado nas tarefas do próprio harness (amostragem de memória via CDP)
+_counting = contextvars.ContextVar('snaplinked_benchmark_counting', default=True)
+
+
+class ProtocolCallCounter:
+    """Conta mensagens enviadas do Python ao driver Playwright
+
+    Cada mensagem (click, evaluate, goto, wait_for...) vira um ou mais comandos
+    CDP no navegador; é o custo de ida e volta que o serviço controla.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.by_method = defaultdict(int)
+        self._original = None
+
+    def install(self):
+        from playwright._impl._connection import Connection
+
+        if self._original is not None:
+            return
+        original = Connection._send_message_to_server
+        counter = self
+
+        def send_message_to_server(connection, channel_owner, method, *args, **kwargs):
+            if _counting.get():
+                counter.calls += 1
+                counter.by_method[method] += 1
+            return original(connection, channel_owner, method, *args, **kwargs)
+
+        Connection._send_message_to_server = send_message_to_server
+        self._original = original
+
+    def uninstall(self):
+        from playwright._impl._connection import Connection
+
+        if self._original is not None:
+            Connection._send_message_to_server = self._original
+            self._original = None
+
+    def reset(self):
+        self.calls = 0
+        self.by_method.clear()
+
+
+class DatabaseWriteCounter:
+    """Conta comandos de escrita e commits no engine do SQLAlchemy"""
+
+    WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE')
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.commits = 0
+        self._lock = threading.Lock()
+
+    def install(self, engine):
+        from sqlalchemy import event
+
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+        event.listen(engine, 'commit', self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:6].upper() in self.WRITE_PREFIXES:
+            with self._lock:
+                self.statements += 1
+                self.rows += len(parameters) if executemany else 1
+
+    def _on_commit(self, conn):
+        with self._lock:
+            self.commits += 1
+
+    def reset(self):
+        with self._lock:
+            self.statements = 0
+            self.rows = 0
+            self.commits = 0
+
+
+class MemorySampler:
+    """Amostra heap JS (CDP Performance.getMetrics) e RSS do navegador por contexto"""
+
+    def __init__(self, driver, interval: float = 1.0):
+        self.driver = driver
+        self.interval = interval
+        self.heap_per_context: List[float] = []
+        self.rss_per_context: List[float] = []
+        self.rss_total: List[float] = []
+        self._stopped = threading.Event()
+
+    async def run(self):
+        _counting.set(False)
+        while not self._stopped.is_set():
+            try:
+                await self.sample()
+            except Exception:
+                # Contexto fechado durante a amostra: tentar no próximo ciclo
+                pass
+            await asyncio.sleep(self.interval)
+
+    async def sample(self):
+        contexts = self.driver.live_contexts()
+        if not contexts:
+            return
+
+        for context in contexts:
+            heap = 0.0
+            for page in context.pages:
+                session = await context.new_cdp_session(page)
+                try:
+                    await session.send('Performance.enable')
+                    metrics = await session.send('Performance.getMetrics')
+                    heap += next(
+                        (m['value'] for m in metrics['metrics'] if m['name'] == 'JSHeapUsedSize'), 0.0
+                    )
+                finally:
+                    await session.detach()
+            self.heap_per_context.append(heap)
+
+        if psutil is not None:
+            # Driver Node e processos do Chromium são filhos deste processo
+            rss = 0
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.rss_total.append(rss)
+            self.rss_per_context.append(rss / len(contexts))
+
+    def stop(self):
+        self._stopped.set()
+
+    def reset(self):
+        self.heap_per_context.clear()
+        self.rss_per_context.clear()
+        self.rss_total.clear()
+
+
+def _mib(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {
+        'avg': round(sum(values) / len(values) / 2 ** 20, 2),
+        'max': round(max(values) / 2 ** 20, 2)
+    }
+
+
+def _context_counts(value: str) -> List[int]:
+    counts = sorted({int(part) for part in value.split(',') if part.strip()})
+    if not counts or counts[0] < 1:
+        raise argparse.ArgumentTypeError('use uma lista de inteiros positivos, ex.: 1,5,10')
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark da automação SnapLinked contra o site falso')
+    parser.add_argument('--action', choices=BENCHMARK_ACTIONS, default='like')
+    parser.add_argument('--count', type=int, default=10, help='ações por contexto')
+    parser.add_argument('--contexts', type=int, default=1, help='usuários/contextos simultâneos')
+    parser.add_argument('--scale', type=_context_counts, default=None,
+                        help='rodadas com cada quantidade de contextos (ex.: 1,5,10,20) para medir ações/hora')
+    parser.add_argument('--browsers', type=int, default=1, help='processos Chromium no pool')
+    parser.add_argument('--contexts-per-browser', type=int, default=None, help='limite de contextos por navegador')
+    parser.add_argument('--no-delays', action='store_true', help='desativar pausas humanas (AUTOMATION_DELAY_SCALE=0)')
+    parser.add_argument('--delay-scale', type=float, default=None, help='multiplicador das pausas humanas')
+    parser.add_argument('--no-warmup', action='store_true', help='medir também lançamento do navegador e login')
+    parser.add_argument('--port', type=int, default=0, help='porta do site falso (0 = livre)')
+    parser.add_argument('--max-pages', type=int, default=50, help='páginas da rolagem infinita do site falso')
+    parser.add_argument('--database-url', default=None, help='banco usado pelo benchmark (padrão: SQLite temporário)')
+    parser.add_argument('--timeout', type=float, default=600, help='tempo máximo por rodada em segundos')
+    parser.add_argument('--json', action='store_true', help='imprimir relatório em JSON')
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace, base_url: str) -> Optional[str]:
+    """Apontar a configuração para o site falso antes de importar os serviços"""
+    os.environ['LINKEDIN_WEB_URL'] = base_url
+    if args.no_delays:
+        os.environ['AUTOMATION_DELAY_SCALE'] = '0'
+    elif args.delay_scale is not None:
+        os.environ['AUTOMATION_DELAY_SCALE'] = str(args.delay_scale)
+
+    users = max(args.scale or [args.contexts])
+    os.environ['AUTOMATION_WORKERS'] = str(users)
+    os.environ['AUTOMATION_MAX_ACTIVE_CONTEXTS'] = str(users)
+    os.environ['BROWSER_POOL_SIZE'] = str(args.browsers)
+    os.environ['BROWSER_POOL_MAX_CONTEXTS'] = str(max(users, args.browsers))
+    os.environ['BROWSER_POOL_CONTEXTS_PER_BROWSER'] = str(
+        args.contexts_per_browser or -(-users // args.browsers)
+    )
+
+    database_path = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        fd, database_path = tempfile.mkstemp(prefix='snaplinked-benchmark-', suffix='.db')
+        os.close(fd)
+        os.environ['DATABASE_URL'] = f'sqlite:///{database_path}'
+    return database_path
+
+
+def run_round(job_queue, user_ids: List[int], action: str, count: int, timeout: float) -> Dict[str, Any]:
+    """Enfileirar um job por usuário e aguardar todos terminarem"""
+    plan = {'like': count, 'comment': count} if action == 'feed_plan' else None
+    started = time.monotonic()
+    jobs = [job_queue.enqueue(user_id, action, count * 2 if plan else count, plan=plan) for user_id in user_ids]
+
+    deadline = started + timeout
+    while not all(job.is_finished for job in jobs):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'Benchmark round did not finish in {timeout}s')
+        time.sleep(0.1)
+
+    return {
+        'elapsed_seconds': time.monotonic() - started,
+        'actions': sum((job.result or {}).get('count', 0) for job in jobs),
+        'jobs': [job.to_dict() for job in jobs]
+    }
+
+
+def _round_report(contexts: int, measured: Dict[str, Any], protocol: ProtocolCallCounter,
+                  writes: DatabaseWriteCounter, sampler: MemorySampler) -> Dict[str, Any]:
+    """Métricas de uma rodada medida"""
+    actions = measured['actions']
+    minutes = measured['elapsed_seconds'] / 60
+    return {
+        'contexts': contexts,
+        'elapsed_seconds': round(measured['elapsed_seconds'], 3),
+        'actions': actions,
+        'actions_per_minute': round(actions / minutes, 2) if minutes else None,
+        'actions_per_hour': round(actions / minutes * 60, 1) if minutes else None,
+        'protocol_calls': protocol.calls,
+        'protocol_calls_per_action': round(protocol.calls / actions, 2) if actions else None,
+        'protocol_calls_by_method': dict(sorted(protocol.by_method.items(), key=lambda i: -i[1])),
+        'db_write_statements': writes.statements,
+        'db_rows_written': writes.rows,
+        'db_commits': writes.commits,
+        'db_writes_per_action': round(writes.statements / actions, 2) if actions else None,
+        'db_commits_per_action': round(writes.commits / actions, 2) if actions else None,
+        'js_heap_per_context_mib': _mib(sampler.heap_per_context),
+        'rss_per_context_mib': _mib(sampler.rss_per_context),
+        'browser_rss_mib': _mib(sampler.rss_total),
+        'jobs': [
+            {'status': job['status'], 'done': job['progress']['done'], 'error': job['error_message']}
+            for job in measured['jobs']
+        ]
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Subir o site falso, executar as rodadas e montar o relatório"""
+    site = FakeLinkedInSite(port=args.port, max_pages=args.max_pages)
+    base_url = site.start()
+    database_path = configure_environment(args, base_url)
+
+    # Importados só agora: Config lê as variáveis de ambiente na importação
+    from flask import Flask
+    from config import config
+    from models import db, User
+    from services.async_runtime import automation_runtime
+    from services.linkedin_service import job_queue
+    from services.log_writer import automation_log_writer
+    from services.memory_watchdog import memory_watchdog
+    from services.playwright_driver import playwright_driver
+
+    app = Flask(__name__)
+    app.config.from_object(config['development'])
+    db.init_app(app)
+    job_queue.init_app(app)
+    automation_log_writer.init_app(app)
+
+    protocol = ProtocolCallCounter()
+    writes = DatabaseWriteCounter()
+    sampler = MemorySampler(playwright_driver)
+
+    try:
+        with app.app_context():
+            db.create_all()
+            writes.install(db.engine)
+            user_ids = []
+            for index in range(max(args.scale or [args.contexts])):
+                user = User(email=f'benchmark-{index}@snaplinked.local', name=f'Benchmark {index}')
+                # Limites folgados: o benchmark mede o serviço, não o escalonador
+                user.daily_limit_likes = user.daily_limit_comments = user.daily_limit_connections = 100000
+                db.session.add(user)
+                db.session.flush()
+                user_ids.append(user.id)
+            db.session.commit()
+
+        protocol.install()
+        automation_runtime.submit(sampler.run())
+
+        warmup = None
+        if not args.no_warmup:
+            # Lança o navegador, faz login e aquece os contextos fora da medição
+            warmup = run_round(job_queue, user_ids, args.action, 1, args.timeout)
+            protocol.reset()
+            writes.reset()
+            sampler.reset()
+
+        # Cada rodada usa os primeiros N usuários: contextos aquecidos no mesmo pool
+        rounds = []
+        for contexts in args.scale or [args.contexts]:
+            protocol.reset()
+            writes.reset()
+            sampler.reset()
+            measured = run_round(job_queue, user_ids[:contexts], args.action, args.count, args.timeout)
+            rounds.append(_round_report(contexts, measured, protocol, writes, sampler))
+
+        report = {
+            'action': args.action,
+            'count_per_context': args.count,
+            'browsers': args.browsers,
+            'contexts_per_browser': int(os.environ['BROWSER_POOL_CONTEXTS_PER_BROWSER']),
+            'delay_scale': float(os.environ.get('AUTOMATION_DELAY_SCALE', 1.0)),
+            'warmup_seconds': round(warmup['elapsed_seconds'], 3) if warmup else None,
+            **rounds[-1],
+            'site': site.get_stats(),
+            'memory_watchdog': memory_watchdog.get_stats()
+        }
+        if args.scale:
+            baseline = rounds[0]['actions_per_hour'] or 0
+            report['scaling'] = [
+                {
+                    'contexts': r['contexts'],
+                    'elapsed_seconds': r['elapsed_seconds'],
+                    'actions': r['actions'],
+                    'actions_per_hour': r['actions_per_hour'],
+                    'actions_per_hour_per_context': round(r['actions_per_hour'] / r['contexts'], 1)
+                    if r['actions_per_hour'] else None,
+                    'speedup': round(r['actions_per_hour'] / baseline, 2)
+                    if baseline and r['actions_per_hour'] else None,
+                    'browser_rss_mib': r['browser_rss_mib']
+                }
+                for r in rounds
+            ]
+        return report
+
+    finally:
+        sampler.stop()
+        protocol.uninstall()
+        job_queue.shutdown()
+        automation_runtime.shutdown()
+        automation_log_writer.shutdown()
+        site.stop()
+        if database_path:
+            os.remove(database_path)
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"⚡ Benchmark SnapLinked: {report['action']} x{report['count_per_context']} "
+          f"em {report['contexts']} contexto(s), delay_scale={report['delay_scale']}")
+    print("-" * 60)
+    print(f"⏱️ Tempo medido: {report['elapsed_seconds']}s (aquecimento: {report['warmup_seconds']}s)")
+    print(f"✅ Ações: {report['actions']} ({report['actions_per_minute']}/min)")
+    print(f"🔌 Chamadas de protocolo por ação: {report['protocol_calls_per_action']}")
+    print(f"💾 Escritas no banco por ação: {report['db_writes_per_action']} "
+          f"({report['db_commits_per_action']} commits)")
+    print(f"🧠 Heap JS por contexto (MiB): {report['js_heap_per_context_mib']}")
+    print(f"🧠 RSS por contexto (MiB): {report['rss_per_context_mib']}")
+    print(f"🌐 Site falso: {report['site']}")
+    for job in report['jobs']:
+        if job['status'] != 'completed':
+            print(f"❌ Job {job['status']}: {job['error']}")
+    if report.get('scaling'):
+        print("-" * 60)
+        print(f"📈 Escala em {report['browsers']} navegador(es), até {report['contexts_per_browser']} contextos cada")
+        for row in report['scaling']:
+            print(f"   {row['contexts']:>3} contexto(s): {row['actions_per_hour']} ações/h "
+                  f"({row['actions_per_hour_per_context']}/h por contexto, {row['speedup']}x), "
+                  f"RSS {row['browser_rss_mib']}")
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    result = run_benchmark(arguments)
+    if arguments.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_report(result)
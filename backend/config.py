@@ -18,15 +18,40 @@ class Config:
     
     # Segurança
     SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+    AUTH_CACHE_TTL = float(os.environ.get('AUTH_CACHE_TTL', 60))  # segundos (limitado ao exp do token); 0 desativa
+    AUTH_CACHE_SIZE = int(os.environ.get('AUTH_CACHE_SIZE', 10000))  # tokens e usuários em cache
+    USAGE_CACHE_TTL = float(os.environ.get('USAGE_CACHE_TTL', 30))  # segundos (uso de outros processos); 0 desativa
+    USAGE_CACHE_SIZE = int(os.environ.get('USAGE_CACHE_SIZE', 10000))  # contadores (usuário, dia, ação) em cache
     
     # Banco de dados
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///snaplinked.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    STATS_TIMEZONE = os.environ.get('STATS_TIMEZONE', 'UTC')  # fuso de dias, semanas e meses (limites e estatísticas)
     
     # LinkedIn API
     LINKEDIN_CLIENT_ID = os.environ.get('LINKEDIN_CLIENT_ID')
     LINKEDIN_CLIENT_SECRET = os.environ.get('LINKEDIN_CLIENT_SECRET')
     LINKEDIN_REDIRECT_URI = os.environ.get('LINKEDIN_REDIRECT_URI') or 'http://localhost:5000/auth/linkedin/callback'
+    LINKEDIN_WEB_URL = (os.environ.get('LINKEDIN_WEB_URL') or 'https://www.linkedin.com').rstrip('/')  # site usado pela automação
+    LINKEDIN_OAUTH_URL = (os.environ.get('LINKEDIN_OAUTH_URL') or 'https://www.linkedin.com/oauth/v2').rstrip('/')
+    LINKEDIN_API_URL = (os.environ.get('LINKEDIN_API_URL') or 'https://api.linkedin.com/v2').rstrip('/')
+    
+    # Cliente HTTP da API do LinkedIn (OAuth e perfil)
+    LINKEDIN_HTTP_POOL_SIZE = int(os.environ.get('LINKEDIN_HTTP_POOL_SIZE', 20))  # conexões keep-alive por host
+    LINKEDIN_HTTP_RETRIES = int(os.environ.get('LINKEDIN_HTTP_RETRIES', 3))
+    LINKEDIN_HTTP_BACKOFF = float(os.environ.get('LINKEDIN_HTTP_BACKOFF', 0.5))  # segundos, dobra a cada tentativa
+    LINKEDIN_HTTP_TIMEOUT = float(os.environ.get('LINKEDIN_HTTP_TIMEOUT', 15))  # segundos
+    LINKEDIN_HTTP_RETRY_AFTER_MAX = float(os.environ.get('LINKEDIN_HTTP_RETRY_AFTER_MAX', LINKEDIN_HTTP_TIMEOUT))  # maior espera entre tentativas (Retry-After e backoff)
+    LINKEDIN_PROFILE_CACHE_TTL = float(os.environ.get('LINKEDIN_PROFILE_CACHE_TTL', 300))  # segundos; 0 desativa
+    LINKEDIN_PROFILE_CACHE_SIZE = int(os.environ.get('LINKEDIN_PROFILE_CACHE_SIZE', 10000))  # entradas (perfil e email)
+    
+    # Renovação proativa dos tokens OAuth
+    TOKEN_REFRESH_INTERVAL = float(os.environ.get('TOKEN_REFRESH_INTERVAL', 60))  # segundos entre lotes; 0 desativa
+    TOKEN_REFRESH_WINDOW = float(os.environ.get('TOKEN_REFRESH_WINDOW', 1800))  # renovar tokens que vencem em até N segundos
+    TOKEN_REFRESH_BATCH_SIZE = int(os.environ.get('TOKEN_REFRESH_BATCH_SIZE', 50))
+    TOKEN_REFRESH_CONCURRENCY = int(os.environ.get('TOKEN_REFRESH_CONCURRENCY', 4))
+    TOKEN_REFRESH_JITTER = float(os.environ.get('TOKEN_REFRESH_JITTER', 10))  # segundos para espalhar o lote
+    TOKEN_REFRESH_MAX_BACKOFF = float(os.environ.get('TOKEN_REFRESH_MAX_BACKOFF', 3600))  # segundos entre tentativas após falhas
     
     # Configurações da aplicação
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
@@ -36,6 +61,60 @@ class Config:
     # Configurações de automação
     AUTOMATION_DELAY = int(os.environ.get('AUTOMATION_DELAY', 2))  # segundos entre ações
     MAX_ACTIONS_PER_SESSION = int(os.environ.get('MAX_ACTIONS_PER_SESSION', 50))
+    AUTOMATION_DELAY_SCALE = float(os.environ.get('AUTOMATION_DELAY_SCALE', 1.0))  # multiplicador das pausas humanas (0 desativa)
+    
+    # Pool de navegadores
+    BROWSER_POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE', 2))  # processos Chromium aquecidos
+    BROWSER_POOL_MAX_CONTEXTS = int(os.environ.get('BROWSER_POOL_MAX_CONTEXTS', 40))
+    BROWSER_POOL_CONTEXTS_PER_BROWSER = int(os.environ.get('BROWSER_POOL_CONTEXTS_PER_BROWSER', 20))  # contextos por processo Chromium
+    BROWSER_POOL_IDLE_TIMEOUT = int(os.environ.get('BROWSER_POOL_IDLE_TIMEOUT', 600))  # segundos
+    BROWSER_POOL_LEASE_TIMEOUT = int(os.environ.get('BROWSER_POOL_LEASE_TIMEOUT', 60))  # segundos
+    
+    # Interceptação de requisições nos contextos de automação
+    REQUEST_INTERCEPTION_ENABLED = os.environ.get('REQUEST_INTERCEPTION_ENABLED', 'True').lower() == 'true'
+    REQUEST_INTERCEPTION_PROFILE = os.environ.get('REQUEST_INTERCEPTION_PROFILE', 'automation')  # automation, minimal, off
+    REQUEST_BLOCK_RESOURCE_TYPES = [t.strip() for t in os.environ.get('REQUEST_BLOCK_RESOURCE_TYPES', '').split(',') if t.strip()]
+    REQUEST_BLOCK_URL_PATTERNS = [p.strip() for p in os.environ.get('REQUEST_BLOCK_URL_PATTERNS', '').split(',') if p.strip()]
+    
+    # Sessões persistidas do navegador (storage_state criptografado)
+    STORAGE_STATE_KEY = os.environ.get('STORAGE_STATE_KEY')  # padrão: derivada da SECRET_KEY
+    STORAGE_STATE_MAX_AGE_HOURS = int(os.environ.get('STORAGE_STATE_MAX_AGE_HOURS', 168))
+    
+    # Escrita em lote de AutomationLog
+    AUTOMATION_LOG_BATCH_SIZE = int(os.environ.get('AUTOMATION_LOG_BATCH_SIZE', 100))
+    AUTOMATION_LOG_FLUSH_INTERVAL = float(os.environ.get('AUTOMATION_LOG_FLUSH_INTERVAL', 2.0))  # segundos
+    
+    # Fila de jobs de automação
+    AUTOMATION_WORKERS = int(os.environ.get('AUTOMATION_WORKERS', 0))  # 0 = um worker por vaga de contexto ativo
+    AUTOMATION_MAX_QUEUED_JOBS = int(os.environ.get('AUTOMATION_MAX_QUEUED_JOBS', 500))
+    AUTOMATION_JOB_HISTORY = int(os.environ.get('AUTOMATION_JOB_HISTORY', 1000))
+    AUTOMATION_MAX_ACTIVE_CONTEXTS = int(os.environ.get('AUTOMATION_MAX_ACTIVE_CONTEXTS', 20))  # teto global de contextos em uso
+    ASYNC_RUNTIME_LAG_INTERVAL = float(os.environ.get('ASYNC_RUNTIME_LAG_INTERVAL', 0.5))  # segundos entre medições de atraso do loop
+    
+    # Heartbeat, checkpoints e reaper de sessões órfãs
+    AUTOMATION_HEARTBEAT_INTERVAL = float(os.environ.get('AUTOMATION_HEARTBEAT_INTERVAL', 10))  # segundos
+    AUTOMATION_SESSION_STALE_AFTER = float(os.environ.get('AUTOMATION_SESSION_STALE_AFTER', 120))  # segundos sem heartbeat
+    AUTOMATION_SESSION_MAX_RESUMES = int(os.environ.get('AUTOMATION_SESSION_MAX_RESUMES', 2))
+    
+    # Prontidão de página (espera por elemento acionável em vez de networkidle)
+    PAGE_READY_TIMEOUT_MS = int(os.environ.get('PAGE_READY_TIMEOUT_MS', 15000))
+    
+    # Cursor adaptativo do feed (rolagem infinita)
+    FEED_CURSOR_WAIT_MS = int(os.environ.get('FEED_CURSOR_WAIT_MS', 2000))  # espera base por conteúdo novo após rolar
+    FEED_CURSOR_PATIENCE = int(os.environ.get('FEED_CURSOR_PATIENCE', 3))  # rolagens vazias no fim antes de recarregar
+    
+    # Watchdog de memória do Chromium (reciclagem de páginas e contextos)
+    MEMORY_WATCHDOG_INTERVAL = float(os.environ.get('MEMORY_WATCHDOG_INTERVAL', 30))  # segundos entre amostras por página (0 desativa)
+    MEMORY_MAX_JS_HEAP_MB = float(os.environ.get('MEMORY_MAX_JS_HEAP_MB', 300))
+    MEMORY_MAX_DOM_NODES = int(os.environ.get('MEMORY_MAX_DOM_NODES', 100000))
+    MEMORY_MAX_RSS_MB_PER_CONTEXT = float(os.environ.get('MEMORY_MAX_RSS_MB_PER_CONTEXT', 600))  # RSS dos renderers; 0 desativa; requer psutil
+    MEMORY_RECYCLE_COOLDOWN = float(os.environ.get('MEMORY_RECYCLE_COOLDOWN', 120))  # segundos sem reciclar outro contexto por RSS
+    
+    # Índice de interações (filtro de Bloom por usuário na frente da tabela)
+    INTERACTION_FILTER_CAPACITY = int(os.environ.get('INTERACTION_FILTER_CAPACITY', 100000))
+    INTERACTION_FILTER_ERROR_RATE = float(os.environ.get('INTERACTION_FILTER_ERROR_RATE', 0.01))
+    INTERACTION_FILTER_MAX_USERS = int(os.environ.get('INTERACTION_FILTER_MAX_USERS', 1000))
+    INTERACTION_FILTER_LOAD_WORKERS = int(os.environ.get('INTERACTION_FILTER_LOAD_WORKERS', 2))  # threads que montam filtros, fora da thread de banco
     
     # Configurações de segurança
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
@@ -13,7 +13,7 @@ from datetime import datetime, timezone
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
-from models import db, User, UserStats, AutomationSession, AutomationLog
+from models import db, User, UserStats, AutomationSession, AutomationLog, backfill_daily_usage
 
 
 def init_database():
@@ -167,11 +167,28 @@ def show_stats():
                     print(f"    👍 {stats.total_likes} curtidas, 🤝 {stats.total_connections} conexões, 💬 {stats.total_comments} comentários")
 
 
+def backfill_usage():
+    """Preencher contadores de uso diário a partir das sessões concluídas"""
+    app = create_app()
+    
+    with app.app_context():
+        print("🔢 Recalculando contadores de uso diário...")
+        db.create_all()
+        
+        try:
+            rows = backfill_daily_usage()
+            db.session.commit()
+            print(f"✅ {rows} contadores (usuário, dia, ação) gravados!")
+        except Exception as e:
+            print(f"❌ Erro ao preencher contadores: {str(e)}")
+            db.session.rollback()
+
+
 if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='Gerenciar banco de dados SnapLinked')
-    parser.add_argument('action', choices=['init', 'reset', 'stats'], 
+    parser.add_argument('action', choices=['init', 'reset', 'stats', 'backfill-usage'], 
                        help='Ação a ser executada')
     
     args = parser.parse_args()
@@ -182,3 +199,5 @@ if __name__ == '__main__':
         reset_database()
     elif args.action == 'stats':
         show_stats()
+    elif args.action == 'backfill-usage':
+        backfill_usage()
@@ -5,9 +5,10 @@ SnapLinked v3.0 - Modelos de Dados Otimizados
 Definições das entidades do banco de dados com otimizações de performance
 """
 
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func, Index, text
+from sqlalchemy import and_, func, Index, text
 from sqlalchemy.orm import validates, relationship, backref
 from sqlalchemy.ext.hybrid import hybrid_property
 import bcrypt
@@ -93,6 +94,13 @@ class User(db.Model, TimestampMixin):
         cascade='all, delete-orphan'
     )
     
+    browser_state = relationship(
+        'BrowserStorageState',
+        backref=backref('user', lazy='select'),
+        uselist=False,  # One-to-one
+        cascade='all, delete-orphan'
+    )
+    
     def __repr__(self):
         return f'<User {self.email}>'
     
@@ -179,40 +187,30 @@ class User(db.Model, TimestampMixin):
         return self.token_expires_at > datetime.now(timezone.utc)
     
     def get_daily_usage(self, date=None):
-        """Obter uso diário de automações"""
-        if not date:
-            date = datetime.now(timezone.utc).date()
-        
-        # Query otimizada com índices
-        sessions = self.automation_sessions.filter(
-            func.date(AutomationSession.created_at) == date,
-            AutomationSession.status == 'completed'
-        ).all()
+        """Obter uso diário de automações (contadores de DailyUsage)"""
+        # Import tardio: o cache de uso importa os modelos
+        from services.usage_counter import usage_counter
         
-        usage = {
-            'likes': sum(s.actual_count for s in sessions if s.action_type == 'like'),
-            'connections': sum(s.actual_count for s in sessions if s.action_type == 'connect'),
-            'comments': sum(s.actual_count for s in sessions if s.action_type == 'comment')
-        }
-        
-        return usage
+        counts = usage_counter.get_usage(self.id, date)
+        return {key: counts[action] for action, key in USAGE_KEYS.items()}
     
     def can_perform_action(self, action_type, count=1):
         """Verificar se pode realizar ação baseado nos limites diários"""
+        from services.usage_counter import usage_counter
+        
         if not self.automation_enabled:
             return False
         
-        usage = self.get_daily_usage()
         limits = {
             'like': self.daily_limit_likes,
             'connect': self.daily_limit_connections,
             'comment': self.daily_limit_comments
         }
+        if action_type not in limits:
+            return False
         
-        current_usage = usage.get(action_type + 's', 0)  # likes, connections, comments
-        limit = limits.get(action_type, 0)
-        
-        return current_usage + count <= limit
+        current_usage = usage_counter.get(self.id, action_type)
+        return current_usage + count <= limits[action_type]
 
 
 class AutomationSession(db.Model, TimestampMixin):
@@ -225,6 +223,7 @@ class AutomationSession(db.Model, TimestampMixin):
         Index('idx_session_action_type', 'action_type'),
         Index('idx_session_created_at', 'created_at'),
         Index('idx_session_user_date', 'user_id', 'created_at'),
+        Index('idx_session_status_heartbeat', 'status', 'heartbeat_at'),
     )
     
     id = db.Column(db.Integer, primary_key=True)
@@ -239,10 +238,12 @@ class AutomationSession(db.Model, TimestampMixin):
     status = db.Column(db.String(20), default='pending', nullable=False, index=True)  # pending, running, completed, failed, cancelled
     started_at = db.Column(db.DateTime, nullable=True, index=True)
     completed_at = db.Column(db.DateTime, nullable=True, index=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # último sinal de vida do worker
     
     # Metadados
     error_message = db.Column(db.Text, nullable=True)
     session_metadata = db.Column(db.JSON, nullable=True)  # Dados adicionais da sessão
+    checkpoint = db.Column(db.JSON, nullable=True)  # progresso gravado periodicamente (retomada)
     
     # Relacionamentos
     logs = relationship(
@@ -283,10 +284,12 @@ class AutomationSession(db.Model, TimestampMixin):
             'status': self.status,
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'error_message': self.error_message,
             'session_metadata': self.session_metadata,
+            'checkpoint': self.checkpoint,
             'duration_seconds': self.duration_seconds,
             'success_rate': self.success_rate
         }
@@ -311,6 +314,7 @@ class AutomationSession(db.Model, TimestampMixin):
         """Iniciar sessão"""
         self.status = 'running'
         self.started_at = datetime.now(timezone.utc)
+        self.heartbeat_at = self.started_at
         self.updated_at = datetime.now(timezone.utc)
     
     def complete_session(self, actual_count=None):
@@ -479,8 +483,252 @@ class UserStats(db.Model, TimestampMixin):
         return self.stats_this_month or {}
 
 
+class BrowserStorageState(db.Model, TimestampMixin):
+    """Snapshot criptografado do storage_state do Playwright por usuário"""
+    
+    __tablename__ = 'browser_storage_states'
+    
+    __table_args__ = (
+        Index('idx_storage_state_expires_at', 'expires_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True, index=True)
+    
+    # Cookies + localStorage criptografados (Fernet)
+    encrypted_state = db.Column(db.Text, nullable=False)
+    
+    # Validade
+    expires_at = db.Column(db.DateTime, nullable=True)  # Expiração do cookie de sessão
+    last_validated_at = db.Column(db.DateTime, nullable=True)
+    restore_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<BrowserStorageState for user {self.user_id}>'
+    
+    def to_dict(self):
+        """Converter para dicionário (sem o conteúdo criptografado)"""
+        return {
+            'user_id': self.user_id,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'last_validated_at': self.last_validated_at.isoformat() if self.last_validated_at else None,
+            'restore_count': self.restore_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class InteractionRecord(db.Model, TimestampMixin):
+    """Alvo (post ou perfil) já trabalhado por um usuário em uma ação"""
+    
+    __tablename__ = 'interaction_index'
+    
+    __table_args__ = (
+        Index('idx_interaction_user_action_target', 'user_id', 'action', 'target_urn', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    action = db.Column(db.String(20), nullable=False)
+    target_urn = db.Column(db.String(255), nullable=False)  # URN do post ou URL do perfil
+    
+    def __repr__(self):
+        return f'<InteractionRecord {self.user_id}: {self.action} {self.target_urn}>'
+
+
+class DailyUsage(db.Model, TimestampMixin):
+    """Ações concluídas por usuário, dia (fuso STATS_TIMEZONE) e tipo de ação"""
+    
+    __tablename__ = 'daily_usage'
+    
+    __table_args__ = (
+        Index('idx_daily_usage_user_day_action', 'user_id', 'day', 'action', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)  # dia de criação da sessão (fuso STATS_TIMEZONE)
+    action = db.Column(db.String(20), nullable=False)  # like, connect, comment
+    count = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<DailyUsage {self.user_id} {self.day}: {self.action}={self.count}>'
+
+
+# Chave de cada ação no dicionário de User.get_daily_usage
+USAGE_KEYS = {
+    'like': 'likes',
+    'connect': 'connections',
+    'comment': 'comments'
+}
+
+
 # Funções utilitárias para queries otimizadas
 
+# ==================== JANELAS DE TEMPO ====================
+
+TIME_PERIODS = ('day', 'week', 'month')
+
+
+def _zone(tz=None):
+    """Fuso informado (nome ou tzinfo) ou o das estatísticas"""
+    tz = tz or Config.STATS_TIMEZONE
+    return ZoneInfo(tz) if isinstance(tz, str) else tz
+
+
+def local_day(moment=None, tz=None):
+    """Dia do calendário, no fuso das estatísticas, de um instante (ingênuo = UTC)"""
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(_zone(tz)).date()
+
+
+def _utc_midnight(day, zone):
+    """Meia-noite local do dia em UTC sem fuso, como gravam as colunas DateTime"""
+    return datetime.combine(day, time.min, tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def time_window(period='day', at=None, tz=None):
+    """Intervalo semiaberto [início, fim) do dia, semana (a partir de segunda) ou mês
+    
+    `at` é um dia do calendário local ou um instante (padrão: agora). Os limites
+    voltam em UTC, de modo que o filtro é uma faixa no índice de created_at em
+    vez de func.date() aplicado a cada linha; dias com horário de verão têm 23
+    ou 25 horas.
+    """
+    if period not in TIME_PERIODS:
+        raise ValueError(f'Period must be one of: {TIME_PERIODS}')
+    
+    zone = _zone(tz)
+    day = at if isinstance(at, date) and not isinstance(at, datetime) else local_day(at, zone)
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+    elif period == 'month':
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = day
+        end = day + timedelta(days=1)
+    return _utc_midnight(start, zone), _utc_midnight(end, zone)
+
+
+def in_window(column, window):
+    """Filtro indexável `início <= coluna < fim`"""
+    start, end = window
+    return and_(column >= start, column < end)
+
+
+# ==================== USO DIÁRIO ====================
+
+def _usage_upsert(replace=False):
+    """INSERT ... ON CONFLICT no índice único de DailyUsage (SQLite e PostgreSQL)"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    
+    stmt = insert(DailyUsage)
+    count = stmt.excluded.count if replace else DailyUsage.count + stmt.excluded.count
+    return stmt.on_conflict_do_update(
+        index_elements=['user_id', 'day', 'action'],
+        set_={'count': count, 'updated_at': stmt.excluded.updated_at}
+    )
+
+
+def increment_daily_usage(user_id: int, day, action: str, amount: int):
+    """Somar ações ao contador do dia em um único comando (sem commit)"""
+    if amount <= 0:
+        return
+    now = datetime.now(timezone.utc)
+    db.session.execute(_usage_upsert(), [{
+        'user_id': user_id, 'day': day, 'action': action, 'count': amount,
+        'created_at': now, 'updated_at': now
+    }])
+
+
+def get_daily_usage_counts(user_id: int, day):
+    """Contadores do dia por ação, lidos pelo índice único (ações sem uso valem 0)"""
+    counts = dict.fromkeys(USAGE_KEYS, 0)
+    counts.update(db.session.query(DailyUsage.action, DailyUsage.count).filter(
+        DailyUsage.user_id == user_id,
+        DailyUsage.day == day
+    ))
+    return counts
+
+
+def backfill_daily_usage(tz=None):
+    """Recalcular os contadores a partir das sessões concluídas (sem commit)
+    
+    Idempotente: cada contador recebe o total das sessões, não soma a ele. O
+    dia é calculado em Python no fuso das estatísticas, pois func.date()
+    agruparia pelo dia UTC.
+    """
+    zone = _zone(tz)
+    sessions = db.session.query(
+        AutomationSession.user_id,
+        AutomationSession.created_at,
+        AutomationSession.action_type,
+        AutomationSession.actual_count
+    ).filter(
+        AutomationSession.status == 'completed'
+    ).execution_options(yield_per=10000)
+    
+    totals = {}
+    for user_id, created_at, action, count in sessions:
+        key = (user_id, local_day(created_at, zone), action)
+        totals[key] = totals.get(key, 0) + (count or 0)
+    
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            'user_id': user_id,
+            'day': day,
+            'action': action,
+            'count': total,
+            'created_at': now,
+            'updated_at': now
+        }
+        for (user_id, day, action), total in totals.items()
+    ]
+    if rows:
+        db.session.execute(_usage_upsert(replace=True), rows)
+    return len(rows)
+
+
+def insert_missing_interactions(rows):
+    """Inserir interações ainda não registradas (sem commit)"""
+    pending = {(r['user_id'], r['action'], r['target_urn']) for r in rows}
+    if not pending:
+        return 0
+    
+    # Agrupar por usuário/ação para consultar os existentes pelo índice único
+    groups = {}
+    for user_id, action, target_urn in pending:
+        groups.setdefault((user_id, action), set()).add(target_urn)
+    
+    now = datetime.now(timezone.utc)
+    new_rows = []
+    for (user_id, action), urns in groups.items():
+        existing = {
+            urn for (urn,) in db.session.query(InteractionRecord.target_urn).filter(
+                InteractionRecord.user_id == user_id,
+                InteractionRecord.action == action,
+                InteractionRecord.target_urn.in_(urns)
+            )
+        }
+        new_rows.extend(
+            {'user_id': user_id, 'action': action, 'target_urn': urn, 'created_at': now, 'updated_at': now}
+            for urn in urns - existing
+        )
+    
+    if new_rows:
+        db.session.execute(db.insert(InteractionRecord), new_rows)
+    return len(new_rows)
+
+
 def get_user_with_stats(user_id: int):
     """Obter usuário com estatísticas em uma query"""
     return db.session.query(User).options(
@@ -495,19 +743,19 @@ def get_recent_sessions(user_id: int, limit: int = 10):
         .limit(limit).all()
 
 
-def get_daily_usage_stats(user_id: int, date=None):
-    """Obter estatísticas de uso diário otimizada"""
-    if not date:
-        date = datetime.now(timezone.utc).date()
+def get_usage_stats(user_id: int, period='day', at=None, tz=None):
+    """Obter estatísticas de uso do dia, semana ou mês
     
-    # Query otimizada com agregação
+    Faixa em idx_session_user_date (user_id, created_at) em vez de varrer
+    todas as sessões do usuário.
+    """
     result = db.session.query(
         AutomationSession.action_type,
         func.sum(AutomationSession.actual_count).label('total_count'),
         func.count(AutomationSession.id).label('session_count')
     ).filter(
         AutomationSession.user_id == user_id,
-        func.date(AutomationSession.created_at) == date,
+        in_window(AutomationSession.created_at, time_window(period, at, tz)),
         AutomationSession.status == 'completed'
     ).group_by(AutomationSession.action_type).all()
     
@@ -530,6 +778,11 @@ def get_daily_usage_stats(user_id: int, date=None):
     return stats
 
 
+def get_daily_usage_stats(user_id: int, date=None):
+    """Obter estatísticas de uso diário otimizada"""
+    return get_usage_stats(user_id, 'day', date)
+
+
 def cleanup_old_logs(days_to_keep: int = 30):
     """Limpar logs antigos para manter performance"""
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
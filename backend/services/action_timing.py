@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Tempo por Fase das Ações
+Cronometra cada ação da automação por fase e agrega percentis por tipo de
+ação, separando pausas intencionais da latência real
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable
+
+from services.metrics import summarize
+
+# Fases de uma ação, na ordem em que acontecem
+PHASES = ('find', 'scroll', 'pre_click_delay', 'click', 'modal', 'post_action_delay')
+
+
+class ActionTimer:
+    """Tempo de uma ação dividido em fases, com as pausas humanas à parte"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = defaultdict(float)  # ms por fase
+        self.delay_ms = 0.0  # pausas intencionais, em qualquer fase
+
+    @contextmanager
+    def phase(self, name: str):
+        """Somar o tempo do bloco à fase"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] += (time.monotonic() - started) * 1000
+
+    def add_delay(self, ms: float):
+        """Registrar pausa intencional (já contada na fase em que ocorreu)"""
+        self.delay_ms += ms
+
+    def share_of(self, shared: 'ActionTimer', parts: int) -> 'ActionTimer':
+        """Incorporar a fração de fases compartilhadas (ex.: post com várias ações)"""
+        parts = max(parts, 1)
+        for name, ms in shared.phases.items():
+            self.phases[name] += ms / parts
+        self.delay_ms += shared.delay_ms / parts
+        return self
+
+    @property
+    def total_ms(self) -> int:
+        return int(round(sum(self.phases.values())))
+
+    def to_details(self) -> Dict[str, Any]:
+        """Decomposição gravada em AutomationLog.details"""
+        total = sum(self.phases.values())
+        return {
+            'phases_ms': {name: int(round(self.phases.get(name, 0.0))) for name in PHASES},
+            'delay_ms': int(round(self.delay_ms)),
+            'latency_ms': int(round(max(total - self.delay_ms, 0.0)))
+        }
+
+
+def summarize_timings(rows: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    """Percentis por tipo de ação a partir de (action, execution_time_ms, details)"""
+    totals = defaultdict(list)
+    delays = defaultdict(list)
+    latencies = defaultdict(list)
+    phases = defaultdict(lambda: defaultdict(list))
+
+    for action, execution_time_ms, details in rows:
+        if execution_time_ms is None:
+            continue
+        totals[action].append(execution_time_ms)
+        timing = (details or {}).get('timing') or {}
+        if 'delay_ms' in timing:
+            delays[action].append(timing['delay_ms'])
+            latencies[action].append(timing['latency_ms'])
+        for name, ms in (timing.get('phases_ms') or {}).items():
+            phases[action][name].append(ms)
+
+    return {
+        action: {
+            'total_ms': summarize(values),
+            'delay_ms': summarize(delays[action]),
+            'latency_ms': summarize(latencies[action]),
+            'phases_ms': {name: summarize(phases[action][name]) for name in PHASES if phases[action][name]}
+        }
+        for action, values in totals.items()
+    }
+
+
+class ActionTimingStats:
+    """Amostras recentes do processo, por ação e fase, para o endpoint de métricas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = deque(maxlen=1000)
+
+    def record(self, action: str, timer: ActionTimer):
+        with self._lock:
+            self.rows.append((action, timer.total_ms, {'timing': timer.to_details()}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter percentis das ações recentes"""
+        with self._lock:
+            rows = list(self.rows)
+        return summarize_timings(rows)
+
+
+# Instância global das amostras de tempo
+action_timing_stats = ActionTimingStats()
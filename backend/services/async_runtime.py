@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Runtime Assíncrono
+Event loop de longa duração em thread própria, dono de todos os objetos do
+Playwright, com API thread-safe para as rotas WSGI
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional
+
+from config import Config
+from services.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """Thread com event loop persistente entre requisições
+
+    Navegadores, contextos e workers vivem neste loop; as rotas Flask apenas
+    agendam corrotinas e, quando precisam do resultado, aguardam o Future.
+    """
+
+    def __init__(self, name: str = 'automation-loop', lag_interval: Optional[float] = None):
+        self.name = name
+        self.lag_interval = lag_interval or Config.ASYNC_RUNTIME_LAG_INTERVAL
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+        self._pending = 0
+        self._atexit_registered = False
+
+        # Métricas do runtime
+        self.metrics = defaultdict(int)
+        self.lag_samples = deque(maxlen=1000)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Loop do runtime (iniciado sob demanda)"""
+        self.start()
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def in_runtime_thread(self) -> bool:
+        """Verificar se o chamador já está no loop do runtime"""
+        return threading.current_thread() is self._thread
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Iniciar a thread do event loop uma única vez"""
+        with self._lock:
+            if self.is_running:
+                return
+
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+
+            # Reinícios do runtime não acumulam registros no atexit
+            if not self._atexit_registered:
+                atexit.register(self.shutdown)
+                self._atexit_registered = True
+
+        logger.info(f"Async runtime '{self.name}' started")
+
+    def _run(self, ready: threading.Event):
+        """Executar o event loop até o shutdown"""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        lag_task = self._loop.create_task(self._monitor_lag())
+        ready.set()
+        self._loop.run_forever()
+
+        # Hooks liberam recursos presos ao loop (ex.: navegadores e driver)
+        lag_task.cancel()
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                self._loop.run_until_complete(hook())
+            except Exception as e:
+                logger.error(f"Error in async runtime shutdown hook: {str(e)}")
+
+        pending = asyncio.all_tasks(self._loop)
+        for task in pending:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self._loop.close()
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[None]]):
+        """Registrar corrotina executada no loop antes de encerrá-lo"""
+        self._shutdown_hooks.append(hook)
+
+    def shutdown(self, timeout: float = 10):
+        """Executar hooks, cancelar tarefas e parar a thread"""
+        with self._lock:
+            if not self.is_running:
+                return
+            thread, loop = self._thread, self._loop
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=timeout)
+        self._thread = None
+        self._loop = None
+        logger.info(f"Async runtime '{self.name}' stopped")
+
+    async def _monitor_lag(self):
+        """Medir atraso do loop: quanto um sleep passa do esperado"""
+        while True:
+            expected = time.monotonic() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag_samples.append(max(0.0, time.monotonic() - expected))
+
+    # ==================== SUBMISSÃO ====================
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Agendar corrotina no loop a partir de qualquer thread"""
+        loop = self.loop
+        with self._lock:
+            self._pending += 1
+            self.metrics['submitted'] += 1
+        try:
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: concurrent.futures.Future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                self.metrics['cancelled'] += 1
+            elif future.exception() is not None:
+                self.metrics['failed'] += 1
+            else:
+                self.metrics['completed'] += 1
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Executar corrotina no loop e aguardar o resultado (para rotas WSGI)"""
+        if self.in_runtime_thread():
+            raise RuntimeError('AsyncRuntime.run cannot block inside its own loop')
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self.metrics['timeouts'] += 1
+            raise
+
+    def call_soon(self, callback: Callable[..., Any], *args):
+        """Agendar função síncrona no loop"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter atraso do loop e tarefas pendentes"""
+        tasks = 0
+        if self._loop is not None:
+            try:
+                tasks = len(asyncio.all_tasks(self._loop))
+            except RuntimeError:
+                # Conjunto de tarefas alterado durante a leitura em outra thread
+                tasks = None
+
+        return {
+            'running': self.is_running,
+            'pending_submissions': self._pending,
+            'tasks': tasks,
+            'submitted': self.metrics['submitted'],
+            'completed': self.metrics['completed'],
+            'failed': self.metrics['failed'],
+            'timeouts': self.metrics['timeouts'],
+            'loop_lag_seconds': summarize(self.lag_samples)
+        }
+
+
+# Runtime global das automações
+automation_runtime = AsyncRuntime()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Cache de Autenticação
+Tokens JWT já verificados mapeados para um snapshot leve do usuário, com
+validade limitada pelo `exp` do token e invalidação quando a linha do
+usuário muda
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+import jwt
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import Config
+from models import db, User
+
+logger = logging.getLogger(__name__)
+
+
+class UserSnapshot:
+    """Cópia imutável dos campos do usuário usados pelas rotas autenticadas"""
+
+    __slots__ = ('id', 'email', 'name', 'is_active', '_data')
+
+    def __init__(self, user: User):
+        self.id = user.id
+        self.email = user.email
+        self.name = user.name
+        self.is_active = user.is_active
+        self._data = user.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mesmo formato de User.to_dict() sem dados sensíveis"""
+        return dict(self._data)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.email}>'
+
+
+class AuthCache:
+    """LRU de tokens verificados e de snapshots por usuário, seguro entre threads
+
+    Um acerto dispensa jwt.decode e a consulta do usuário. Cada entrada vale
+    até o menor entre `ttl` e o `exp` do token. Alterações na linha do
+    usuário feitas por este processo (ORM ou invalidate_user) descartam as
+    entradas assim que o commit acontece; alterações feitas por outros
+    processos aparecem em no máximo `ttl` segundos. Dentro de uma requisição, o resultado fica no
+    próprio request e a verificação acontece uma única vez.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = Config.AUTH_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.AUTH_CACHE_SIZE
+
+        self._entries: 'OrderedDict[Tuple[str, Any], Tuple[float, UserSnapshot]]' = OrderedDict()
+        self._by_user: Dict[int, Set[Tuple[str, Any]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+        # Invalidações numeradas: leitura iniciada antes de uma invalidação do
+        # mesmo usuário não volta ao cache (poderia ter visto a linha antiga).
+        # Registros mais velhos que `ttl` são podados: uma leitura tão lenta
+        # fica sujeita ao mesmo atraso de `ttl` das alterações de outros processos
+        self._epoch = 0
+        self._invalidated_at: 'OrderedDict[int, Tuple[int, float]]' = OrderedDict()
+
+        # Métricas do cache
+        self.metrics = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    # ==================== CONSULTA ====================
+
+    def verify(self, token: str) -> Optional[UserSnapshot]:
+        """Verificar token JWT e obter o snapshot do usuário ativo"""
+        key = ('token', hashlib.sha256(token.encode('utf-8')).hexdigest())
+        memo = self._request_memo()
+        if key in memo:
+            return memo[key]
+
+        snapshot = self._get(key)
+        if snapshot is None:
+            epoch = self._epoch
+            snapshot, expires_in = self._load_token(token)
+            if snapshot is not None:
+                self._put(key, snapshot, expires_in, epoch)
+
+        memo[key] = snapshot
+        return snapshot
+
+    def get_user(self, user_id: int) -> Optional[UserSnapshot]:
+        """Obter snapshot do usuário da sessão Flask"""
+        key = ('user', user_id)
+        memo = self._request_memo()
+        if key in memo:
+            return memo[key]
+
+        snapshot = self._get(key)
+        if snapshot is None:
+            epoch = self._epoch
+            self.metrics['user_loads'] += 1
+            user = db.session.get(User, user_id)
+            snapshot = UserSnapshot(user) if user else None
+            if snapshot is not None:
+                self._put(key, snapshot, self.ttl, epoch)
+
+        memo[key] = snapshot
+        return snapshot
+
+    def _load_token(self, token: str) -> Tuple[Optional[UserSnapshot], float]:
+        """Verificação completa: assinatura, expiração e usuário ativo"""
+        self.metrics['token_verifications'] += 1
+        try:
+            payload = jwt.decode(token, Config.SECRET_KEY, algorithms=['HS256'])
+        except jwt.InvalidTokenError:
+            self.metrics['invalid_tokens'] += 1
+            return None, 0
+
+        user = db.session.get(User, payload.get('user_id'))
+        if not user or not user.is_active:
+            return None, 0
+        return UserSnapshot(user), payload['exp'] - time.time()
+
+    def _request_memo(self) -> Dict[Tuple[str, Any], Optional[UserSnapshot]]:
+        """Resultados já obtidos nesta requisição (ou dicionário descartável fora dela)"""
+        if not has_request_context():
+            return {}
+        memo = getattr(request, '_auth_cache_memo', None)
+        if memo is None:
+            memo = request._auth_cache_memo = {}
+        return memo
+
+    # ==================== ENTRADAS ====================
+
+    def _get(self, key: Tuple[str, Any]) -> Optional[UserSnapshot]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._drop(key)
+                self.metrics['expired'] += 1
+                entry = None
+            if entry is None:
+                self.metrics['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.metrics['hits'] += 1
+            return entry[1]
+
+    def _put(self, key: Tuple[str, Any], snapshot: UserSnapshot, expires_in: float, epoch: int):
+        ttl = min(self.ttl, expires_in)
+        if not self.enabled or ttl <= 0:
+            return
+
+        with self._lock:
+            if self._invalidated_at.get(snapshot.id, (-1, 0))[0] >= epoch:
+                self.metrics['stale_loads'] += 1
+                return
+            self._entries[key] = (time.monotonic() + ttl, snapshot)
+            self._entries.move_to_end(key)
+            self._by_user[snapshot.id].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.metrics['evicted'] += 1
+
+    def _drop(self, key: Tuple[str, Any]):
+        """Remover entrada e seu registro no índice por usuário (com o lock)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[1].id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[1].id]
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Descartar tokens e snapshot de um usuário alterado ou removido"""
+        with self._lock:
+            now = time.monotonic()
+            self._invalidated_at[user_id] = (self._epoch, now)
+            self._invalidated_at.move_to_end(user_id)
+            self._epoch += 1
+            while self._invalidated_at:
+                oldest = next(iter(self._invalidated_at.values()))
+                if oldest[1] > now - self.ttl:
+                    break
+                self._invalidated_at.popitem(last=False)
+            keys = list(self._by_user.pop(user_id, ()))
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self.metrics['invalidated'] += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """Esvaziar o cache"""
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter tamanho, acertos, verificações completas e invalidações"""
+        with self._lock:
+            hits = self.metrics['hits']
+            misses = self.metrics['misses']
+            return {
+                'enabled': self.enabled,
+                'ttl': self.ttl,
+                'max_entries': self.max_entries,
+                'size': len(self._entries),
+                'users': len(self._by_user),
+                'invalidations_tracked': len(self._invalidated_at),
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0,
+                'token_verifications': self.metrics['token_verifications'],
+                'invalid_tokens': self.metrics['invalid_tokens'],
+                'user_loads': self.metrics['user_loads'],
+                'expired': self.metrics['expired'],
+                'evicted': self.metrics['evicted'],
+                'invalidated': self.metrics['invalidated'],
+                'stale_loads': self.metrics['stale_loads']
+            }
+
+
+# Instância global do cache
+auth_cache = AuthCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    """Guardar usuários alterados ou removidos pelo ORM até o commit"""
+    changed = {obj.id for obj in session.dirty | session.deleted if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault('auth_cache_users', set()).update(changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_users(session):
+    """Linha do usuário alterada (ex.: is_active): snapshot deixa de valer após o commit
+
+    Invalidar no flush deixaria outra thread reler a linha ainda não
+    commitada como antiga e recolocá-la no cache por `ttl` segundos.
+    """
+    for user_id in session.info.pop('auth_cache_users', ()):
+        auth_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('auth_cache_users', None)
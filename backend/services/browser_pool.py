@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Pool de Navegadores
+Mantém processos Chromium aquecidos com contextos isolados alugados por usuário,
+vários por navegador, até o limite de contextos por processo
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page
+from config import Config
+from services.log_writer import automation_log_writer
+from services.memory_watchdog import memory_watchdog
+from services.metrics import summarize
+from services.playwright_driver import PlaywrightDriverManager, playwright_driver
+
+logger = logging.getLogger(__name__)
+
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Argumentos de lançamento do Chromium compartilhados por todos os navegadores
+BROWSER_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-plugins',
+    # Imagens, mídia e fontes são bloqueadas por services.request_filter
+    '--disable-javascript-harmony-shipping',
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-ipc-flooding-protection',
+    f'--user-agent={USER_AGENT}'
+]
+
+# Configurações de privacidade aplicadas a cada contexto
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1366, 'height': 768},
+    'user_agent': USER_AGENT,
+    'locale': 'pt-BR',
+    'timezone_id': 'America/Sao_Paulo',
+    'permissions': ['notifications'],
+    'extra_http_headers': {
+        'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'DNT': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Upgrade-Insecure-Requests': '1'
+    }
+}
+
+PAGE_TIMEOUT_MS = 30000
+
+
+class PoolTimeoutError(Exception):
+    """Nenhum contexto ficou disponível dentro do tempo de espera"""
+
+
+class PooledContext:
+    """Contexto isolado de um usuário hospedado em um navegador do pool"""
+
+    def __init__(self, user_id: int, browser_index: int):
+        self.user_id = user_id
+        self.browser_index = browser_index
+        self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
+        self.page: Optional[Page] = None
+        self.in_use = False
+        self.lease_count = 0
+        self.restored_state = False  # Contexto criado a partir de storage_state persistido
+        self.request_filter = None  # RequestFilter instalado no contexto
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+    @property
+    def is_open(self) -> bool:
+        """Verificar se o contexto ainda está utilizável"""
+        return (
+            self.context is not None
+            and self.browser is not None
+            and self.browser.is_connected()
+        )
+
+    def idle_seconds(self, now: Optional[float] = None) -> float:
+        """Tempo ocioso desde a última devolução"""
+        return (now or time.monotonic()) - self.last_used_at
+
+
+class BrowserPool:
+    """Pool de navegadores Chromium com contextos alugados por usuário"""
+
+    def __init__(self, size: Optional[int] = None, max_contexts: Optional[int] = None,
+                 contexts_per_browser: Optional[int] = None, idle_timeout: Optional[float] = None,
+                 lease_timeout: Optional[float] = None,
+                 launch_args: Optional[List[str]] = None,
+                 context_options: Optional[Dict[str, Any]] = None,
+                 driver: Optional[PlaywrightDriverManager] = None):
+        self.size = size or Config.BROWSER_POOL_SIZE
+        self.max_contexts = max_contexts or Config.BROWSER_POOL_MAX_CONTEXTS
+        self.contexts_per_browser = contexts_per_browser or Config.BROWSER_POOL_CONTEXTS_PER_BROWSER
+        self.idle_timeout = idle_timeout if idle_timeout is not None else Config.BROWSER_POOL_IDLE_TIMEOUT
+        self.lease_timeout = lease_timeout if lease_timeout is not None else Config.BROWSER_POOL_LEASE_TIMEOUT
+        self.launch_args = launch_args or BROWSER_LAUNCH_ARGS
+        self.context_options = context_options or CONTEXT_OPTIONS
+        self.driver = driver or playwright_driver
+
+        self.browsers: List[Optional[Browser]] = []
+        self.contexts: Dict[int, PooledContext] = {}
+
+        self._condition: Optional[asyncio.Condition] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._started = False
+        self._waiting = 0
+
+        # Métricas do pool
+        self.metrics = defaultdict(int)
+        self.lease_waits = deque(maxlen=1000)
+
+    # ==================== CICLO DE VIDA ====================
+
+    async def start(self):
+        """Iniciar driver e manter os navegadores aquecidos"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._started:
+                return
+
+            self._condition = asyncio.Condition()
+            await self._start_driver()
+            self.browsers = [None] * self.size
+            for index in range(self.size):
+                await self._ensure_browser(index)
+
+            if self.idle_timeout > 0:
+                self._reaper_task = asyncio.create_task(self._reap_loop())
+
+            self._started = True
+            logger.info(
+                f"Browser pool started with {self.size} browsers "
+                f"({self.contexts_per_browser} contexts each, capacity {self.capacity})"
+            )
+
+    async def close(self):
+        """Fechar todos os contextos e navegadores do pool"""
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+
+        for pooled in list(self.contexts.values()):
+            await self._close_context(pooled)
+        self.contexts.clear()
+
+        for browser in self.browsers:
+            if browser is not None:
+                try:
+                    await browser.close()
+                except Exception as e:
+                    logger.warning(f"Error closing pooled browser: {str(e)}")
+        self.browsers = []
+
+        # O driver é compartilhado: encerrado por quem desliga a aplicação
+        self._started = False
+        logger.info("Browser pool closed")
+
+    async def _start_driver(self):
+        """Garantir o driver Playwright compartilhado"""
+        await self.driver.start()
+
+    async def _launch_browser(self) -> Browser:
+        """Lançar um novo processo Chromium no driver compartilhado"""
+        return await self.driver.launch_browser(owner='pool', headless=True, args=self.launch_args)
+
+    async def _ensure_browser(self, index: int) -> Browser:
+        """Garantir que o navegador do slot está conectado, relançando se necessário"""
+        browser = self.browsers[index]
+        if browser is None or not browser.is_connected():
+            if browser is not None:
+                self.metrics['browser_relaunches'] += 1
+                logger.warning(f"Pooled browser {index} disconnected, relaunching")
+            browser = await self._launch_browser()
+            self.browsers[index] = browser
+            self.metrics['browser_launches'] += 1
+        return browser
+
+    # ==================== ALUGUEL DE CONTEXTOS ====================
+
+    @property
+    def capacity(self) -> int:
+        """Contextos simultâneos que o pool comporta"""
+        return min(self.max_contexts, self.size * self.contexts_per_browser)
+
+    async def acquire(self, user_id: int, timeout: Optional[float] = None,
+                      state_loader: Optional[Callable[[int], Any]] = None) -> PooledContext:
+        """Alugar o contexto do usuário, reutilizando-o se já estiver aquecido
+
+        state_loader só é consultado quando um novo contexto precisa ser criado;
+        pode ser assíncrono ou síncrono (este roda na thread de banco).
+        """
+        if not self._started:
+            await self.start()
+
+        timeout = self.lease_timeout if timeout is None else timeout
+        wait_started = time.monotonic()
+        deadline = wait_started + timeout
+        victim = None
+
+        async with self._condition:
+            while True:
+                pooled = self.contexts.get(user_id)
+
+                if pooled is not None and not pooled.in_use:
+                    if pooled.is_open:
+                        self.metrics['hits'] += 1
+                    else:
+                        # Navegador caiu: recriar o contexto no mesmo slot
+                        self.metrics['misses'] += 1
+                        pooled.context = None
+                    break
+
+                if pooled is None:
+                    browser_index = self._pick_browser_index()
+                    if browser_index is None:
+                        # Pool ou navegadores cheios: despejar o ocioso mais antigo
+                        victim = self._pick_idle_victim()
+                        if victim is not None:
+                            del self.contexts[victim.user_id]
+                            self.metrics['evictions'] += 1
+                            browser_index = self._pick_browser_index()
+
+                    if browser_index is not None:
+                        pooled = PooledContext(user_id, browser_index)
+                        self.contexts[user_id] = pooled
+                        self.metrics['misses'] += 1
+                        break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.metrics['lease_timeouts'] += 1
+                    raise PoolTimeoutError(f'No browser context available for user {user_id}')
+
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(self._condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._waiting -= 1
+
+            pooled.in_use = True
+            pooled.lease_count += 1
+
+        self.lease_waits.append(time.monotonic() - wait_started)
+        self.metrics['leases'] += 1
+
+        if victim is not None:
+            await self._close_context(victim)
+
+        if pooled.context is None:
+            try:
+                storage_state = await self._load_state(state_loader, user_id) if state_loader else None
+                await self._open_context(pooled, storage_state)
+            except Exception:
+                async with self._condition:
+                    self.contexts.pop(user_id, None)
+                    self._condition.notify_all()
+                raise
+
+        return pooled
+
+    @staticmethod
+    async def _load_state(state_loader: Callable[[int], Any], user_id: int) -> Optional[Dict]:
+        """Ler storage_state sem travar o loop enquanto outros aluguéis esperam
+
+        Loaders síncronos costumam consultar o banco, então rodam na thread de
+        banco do automation_log_writer; os assíncronos são aguardados no loop.
+        """
+        if inspect.iscoroutinefunction(state_loader):
+            return await state_loader(user_id)
+        storage_state = await automation_log_writer.run_in_db_thread(lambda: state_loader(user_id))
+        if inspect.isawaitable(storage_state):
+            storage_state = await storage_state
+        return storage_state
+
+    async def release(self, pooled: PooledContext, discard: bool = False):
+        """Devolver contexto ao pool, opcionalmente descartando-o"""
+        async with self._condition:
+            pooled.in_use = False
+            pooled.last_used_at = time.monotonic()
+            if discard or not pooled.is_open:
+                if self.contexts.get(pooled.user_id) is pooled:
+                    del self.contexts[pooled.user_id]
+            else:
+                pooled = None
+            self._condition.notify_all()
+
+        if pooled is not None:
+            await self._close_context(pooled)
+
+    @asynccontextmanager
+    async def lease(self, user_id: int, timeout: Optional[float] = None,
+                    state_loader: Optional[Callable[[int], Optional[Dict]]] = None):
+        """Context manager que aluga e devolve o contexto do usuário"""
+        pooled = await self.acquire(user_id, timeout=timeout, state_loader=state_loader)
+        try:
+            yield pooled
+        finally:
+            await self.release(pooled)
+
+    async def evict(self, user_id: int) -> bool:
+        """Fechar o contexto aquecido do usuário (ex.: logout), se estiver ocioso"""
+        if not self._started:
+            return False
+
+        async with self._condition:
+            pooled = self.contexts.get(user_id)
+            if pooled is None or pooled.in_use:
+                return False
+            del self.contexts[user_id]
+            self._condition.notify_all()
+
+        await self._close_context(pooled)
+        self.metrics['evictions'] += 1
+        return True
+
+    def _browser_load(self) -> List[int]:
+        """Contextos hospedados em cada navegador"""
+        load = [0] * self.size
+        for pooled in self.contexts.values():
+            load[pooled.browser_index] += 1
+        return load
+
+    def _pick_browser_index(self) -> Optional[int]:
+        """Escolher o navegador com menos contextos (None se não houver vaga)"""
+        if len(self.contexts) >= self.max_contexts:
+            return None
+        load = self._browser_load()
+        index = load.index(min(load))
+        return index if load[index] < self.contexts_per_browser else None
+
+    def _pick_idle_victim(self) -> Optional[PooledContext]:
+        """Escolher o contexto ocioso há mais tempo para despejo"""
+        idle = [p for p in self.contexts.values() if not p.in_use]
+        if not idle:
+            return None
+        return min(idle, key=lambda p: p.last_used_at)
+
+    async def _open_context(self, pooled: PooledContext, storage_state: Optional[Dict] = None):
+        """Criar contexto e página para o usuário"""
+        browser = await self._ensure_browser(pooled.browser_index)
+        options = dict(self.context_options)
+        if storage_state:
+            options['storage_state'] = storage_state
+        context = await self.driver.new_context(browser, owner='pool', **options)
+        page = await context.new_page()
+        page.set_default_timeout(PAGE_TIMEOUT_MS)
+        page.set_default_navigation_timeout(PAGE_TIMEOUT_MS)
+
+        pooled.browser = browser
+        pooled.context = context
+        pooled.page = page
+        pooled.restored_state = bool(storage_state)
+        self.metrics['contexts_created'] += 1
+        if storage_state:
+            self.metrics['contexts_restored'] += 1
+
+    async def recycle(self, pooled: PooledContext):
+        """Recriar o contexto alugado com o mesmo storage_state (libera memória do renderer)"""
+        storage_state = await pooled.context.storage_state()
+        request_filter = pooled.request_filter
+        await self._close_context(pooled)
+        await self._open_context(pooled, storage_state)
+        if request_filter is not None:
+            # Mesmo filtro: contadores de economia da sessão continuam
+            await request_filter.attach(pooled.context)
+            pooled.request_filter = request_filter
+        self.metrics['contexts_recycled'] += 1
+
+    async def _close_context(self, pooled: PooledContext):
+        """Fechar contexto sem propagar erros"""
+        if pooled.context is None:
+            return
+        try:
+            if pooled.page is not None:
+                await memory_watchdog.forget(pooled.page)
+            await pooled.context.close()
+        except Exception as e:
+            logger.warning(f"Error closing context for user {pooled.user_id}: {str(e)}")
+        finally:
+            pooled.context = None
+            pooled.page = None
+            pooled.request_filter = None
+            self.metrics['contexts_closed'] += 1
+
+    # ==================== RECLAMAÇÃO DE OCIOSOS ====================
+
+    async def reap_idle(self) -> int:
+        """Fechar contextos ociosos além do idle_timeout"""
+        now = time.monotonic()
+        async with self._condition:
+            expired = [
+                p for p in self.contexts.values()
+                if not p.in_use and p.idle_seconds(now) >= self.idle_timeout
+            ]
+            for pooled in expired:
+                del self.contexts[pooled.user_id]
+            if expired:
+                self._condition.notify_all()
+
+        for pooled in expired:
+            await self._close_context(pooled)
+
+        self.metrics['reaped'] += len(expired)
+        if expired:
+            logger.info(f"Reaped {len(expired)} idle browser contexts")
+        return len(expired)
+
+    async def _reap_loop(self):
+        """Laço periódico de reclamação"""
+        interval = max(5.0, self.idle_timeout / 2)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.error(f"Error reaping idle contexts: {str(e)}")
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter estatísticas do pool"""
+        contexts = list(self.contexts.values())
+        in_use = sum(1 for p in contexts if p.in_use)
+        hits = self.metrics['hits']
+        misses = self.metrics['misses']
+
+        return {
+            'started': self._started,
+            'browsers': sum(1 for b in self.browsers if b is not None and b.is_connected()),
+            'max_contexts': self.max_contexts,
+            'contexts_per_browser': self.contexts_per_browser,
+            'capacity': self.capacity,
+            'contexts_by_browser': self._browser_load(),
+            'contexts_total': len(contexts),
+            'contexts_in_use': in_use,
+            'contexts_idle': len(contexts) - in_use,
+            'waiting': self._waiting,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / (hits + misses)) * 100 if hits + misses else 0,
+            'contexts_restored': self.metrics['contexts_restored'],
+            'contexts_recycled': self.metrics['contexts_recycled'],
+            'evictions': self.metrics['evictions'],
+            'reaped': self.metrics['reaped'],
+            'lease_timeouts': self.metrics['lease_timeouts'],
+            'browser_launches': self.metrics['browser_launches'],
+            'browser_relaunches': self.metrics['browser_relaunches'],
+            'lease_wait_seconds': summarize(self.lease_waits)
+        }
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Scanner de DOM
+Rastreia botões candidatos dentro da página com MutationObserver e entrega
+alvos com identificadores estáveis em uma única chamada evaluate
+"""
+
+import json
+import logging
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+from playwright.async_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+# Seletores base por tipo de ação; o estado (pressionado, desabilitado) é
+# verificado no momento da consulta, dentro da página
+CANDIDATE_SELECTORS = {
+    'like': 'button[aria-label*="curtir"], button[aria-label*="like"], [data-test-id="like-button"]',
+    'comment': 'button[aria-label*="comentar"], button[aria-label*="comment"]',
+    'connect': 'button[aria-label*="Conectar"], button[data-test-id="connect-button"]'
+}
+
+# Contêineres usados para extrair o URN do post ou o perfil do cartão
+POST_CONTAINER_SELECTOR = '[data-urn], [data-id^="urn:li:activity"]'
+PROFILE_CARD_SELECTOR = 'li, .discover-entity-card, [data-test-id="profile-card"]'
+
+TARGET_ATTRIBUTE = 'data-snaplinked-id'
+
+SCANNER_SCRIPT = """
+(() => {
+  if (window.__snaplinkedScanner) return;
+
+  const SELECTORS = %(selectors)s;
+  const POST_SELECTOR = %(post_selector)s;
+  const CARD_SELECTOR = %(card_selector)s;
+  const ATTRIBUTE = %(attribute)s;
+  const KINDS = Object.keys(SELECTORS);
+
+  const state = { seq: 0, scans: 0, processed: new Set(), candidates: {} };
+  KINDS.forEach(kind => { state.candidates[kind] = new Map(); });
+
+  function targetUrn(kind, el) {
+    if (kind === 'connect') {
+      const card = el.closest(CARD_SELECTOR);
+      const link = card && card.querySelector('a[href*="/in/"]');
+      return link ? link.getAttribute('href').split('?')[0] : null;
+    }
+    const post = el.closest(POST_SELECTOR);
+    return post ? (post.getAttribute('data-urn') || post.getAttribute('data-id')) : null;
+  }
+
+  function register(kind, el) {
+    if (el.hasAttribute(ATTRIBUTE)) return;
+    const id = kind + '-' + (++state.seq);
+    el.setAttribute(ATTRIBUTE, id);
+    state.candidates[kind].set(id, { el: el, urn: targetUrn(kind, el) });
+  }
+
+  function scan(root) {
+    state.scans++;
+    for (const kind of KINDS) {
+      const selector = SELECTORS[kind];
+      if (root.matches && root.matches(selector)) register(kind, root);
+      if (root.querySelectorAll) root.querySelectorAll(selector).forEach(el => register(kind, el));
+    }
+  }
+
+  function isActionable(kind, el) {
+    if (!el.isConnected || el.disabled) return false;
+    if (kind === 'like') {
+      return el.getAttribute('aria-pressed') !== 'true' && !el.classList.contains('active');
+    }
+    return true;
+  }
+
+  const observer = new MutationObserver(mutations => {
+    for (const mutation of mutations) {
+      if (mutation.type === 'attributes') {
+        if (mutation.target.nodeType === 1) scan(mutation.target);
+        continue;
+      }
+      for (const node of mutation.addedNodes) {
+        if (node.nodeType === 1) scan(node);
+      }
+    }
+  });
+  observer.observe(document, {
+    childList: true, subtree: true, attributes: true, attributeFilter: ['aria-label', 'data-test-id']
+  });
+  if (document.documentElement) scan(document);
+
+  window.__snaplinkedScanner = {
+    next(kind, limit, processed) {
+      (processed || []).forEach(id => state.processed.add(id));
+      const map = state.candidates[kind];
+      const result = [];
+      if (!map) return result;
+      for (const [id, entry] of map) {
+        if (!entry.el.isConnected) { map.delete(id); continue; }
+        if (state.processed.has(id) || !isActionable(kind, entry.el)) continue;
+        const rect = entry.el.getBoundingClientRect();
+        result.push({ id: id, urn: entry.urn, top: Math.round(rect.top + window.scrollY) });
+        if (result.length >= limit) break;
+      }
+      return result;
+    },
+    nextPosts(kinds, limit, processed) {
+      (processed || []).forEach(id => state.processed.add(id));
+      const posts = new Map();
+      for (const kind of kinds) {
+        const map = state.candidates[kind];
+        if (!map) continue;
+        for (const [id, entry] of map) {
+          if (!entry.el.isConnected) { map.delete(id); continue; }
+          if (state.processed.has(id) || !isActionable(kind, entry.el)) continue;
+          const key = entry.urn || id;
+          let post = posts.get(key);
+          if (!post) {
+            const rect = entry.el.getBoundingClientRect();
+            post = { urn: entry.urn, top: Math.round(rect.top + window.scrollY), targets: {} };
+            posts.set(key, post);
+          }
+          if (!post.targets[kind]) post.targets[kind] = id;
+        }
+      }
+      return Array.from(posts.values()).sort((a, b) => a.top - b.top).slice(0, limit);
+    },
+    progress() {
+      const root = document.scrollingElement || document.documentElement;
+      return {
+        seq: state.seq,
+        height: root.scrollHeight,
+        atBottom: window.scrollY + window.innerHeight >= root.scrollHeight - 2
+      };
+    },
+    scroll(distance) {
+      const before = this.progress();
+      window.scrollBy(0, distance);
+      return before;
+    },
+    stats() {
+      const tracked = {};
+      KINDS.forEach(kind => { tracked[kind] = state.candidates[kind].size; });
+      return { scans: state.scans, processed: state.processed.size, tracked: tracked };
+    }
+  };
+})();
+""" % {
+    'selectors': json.dumps(CANDIDATE_SELECTORS),
+    'post_selector': json.dumps(POST_CONTAINER_SELECTOR),
+    'card_selector': json.dumps(PROFILE_CARD_SELECTOR),
+    'attribute': json.dumps(TARGET_ATTRIBUTE)
+}
+
+NEXT_TARGETS_SCRIPT = '([kind, limit, processed]) => window.__snaplinkedScanner.next(kind, limit, processed)'
+NEXT_POSTS_SCRIPT = '([kinds, limit, processed]) => window.__snaplinkedScanner.nextPosts(kinds, limit, processed)'
+SCROLL_SCRIPT = '(distance) => window.__snaplinkedScanner.scroll(distance)'
+PROGRESS_SCRIPT = '() => window.__snaplinkedScanner.progress()'
+# Verdadeiro assim que surgem candidatos novos ou o documento cresce
+GROWTH_SCRIPT = """([seq, height]) => {
+  const p = window.__snaplinkedScanner && window.__snaplinkedScanner.progress();
+  return !!p && (p.seq > seq || p.height > height);
+}"""
+
+
+class DomScanner:
+    """Scanner injetado uma vez por página que entrega alvos ainda não processados"""
+
+    _instances: 'weakref.WeakKeyDictionary[Page, DomScanner]' = weakref.WeakKeyDictionary()
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.evaluate_calls = 0
+        self._pending_processed: List[str] = []
+
+    @classmethod
+    async def for_page(cls, page: Page) -> 'DomScanner':
+        """Obter scanner da página, injetando o script na primeira vez"""
+        scanner = cls._instances.get(page)
+        if scanner is None:
+            scanner = cls(page)
+            await scanner.install()
+            cls._instances[page] = scanner
+        return scanner
+
+    async def install(self):
+        """Registrar script para navegações futuras e ativá-lo no documento atual"""
+        await self.page.add_init_script(SCANNER_SCRIPT)
+        await self.page.evaluate(SCANNER_SCRIPT)
+        self.evaluate_calls += 1
+
+    async def next_targets(self, kind: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Obter os próximos alvos não processados com uma única chamada"""
+        return await self._query(NEXT_TARGETS_SCRIPT, kind, limit)
+
+    async def next_posts(self, kinds: Iterable[str], limit: int = 3) -> List[Dict[str, Any]]:
+        """Obter próximos posts com os alvos de cada ação agrupados por URN"""
+        return await self._query(NEXT_POSTS_SCRIPT, list(kinds), limit)
+
+    async def scroll(self, distance: int) -> Dict[str, Any]:
+        """Rolar a página e retornar o progresso (candidatos e altura) de antes da rolagem"""
+        return await self._evaluate(SCROLL_SCRIPT, distance)
+
+    async def progress(self) -> Dict[str, Any]:
+        """Candidatos já registrados, altura do documento e se está no fim"""
+        return await self._evaluate(PROGRESS_SCRIPT)
+
+    async def wait_for_growth(self, before: Dict[str, Any], timeout_ms: float) -> Dict[str, Any]:
+        """Aguardar novos candidatos ou crescimento do documento (até timeout) e medir"""
+        self.evaluate_calls += 1
+        try:
+            await self.page.wait_for_function(
+                GROWTH_SCRIPT, arg=[before['seq'], before['height']], timeout=timeout_ms
+            )
+        except PlaywrightTimeoutError:
+            # Nada carregou: o chamador decide se a página esgotou
+            pass
+        return await self.progress()
+
+    async def _query(self, script: str, kinds: Any, limit: int) -> List[Dict[str, Any]]:
+        """Consultar o scanner enviando junto os alvos processados pendentes"""
+        processed, self._pending_processed = self._pending_processed, []
+        return await self._evaluate(script, [kinds, limit, processed])
+
+    async def _evaluate(self, script: str, arg: Any = None) -> Any:
+        """Chamar o scanner, reinjetando-o uma vez se o documento for novo"""
+        self.evaluate_calls += 1
+        try:
+            return await self.page.evaluate(script, arg)
+        except Exception:
+            # Documento novo ainda sem scanner: reinjetar e tentar uma vez
+            await self.page.evaluate(SCANNER_SCRIPT)
+            self.evaluate_calls += 2
+            return await self.page.evaluate(script, arg)
+
+    def mark_processed(self, target_ids: Iterable[str]):
+        """Marcar alvos como processados (enviado junto da próxima consulta)"""
+        self._pending_processed.extend(target_ids)
+
+    def locator(self, target_id: str) -> Locator:
+        """Localizador do alvo pelo identificador estável, sem ElementHandle"""
+        return self.page.locator(f'[{TARGET_ATTRIBUTE}="{target_id}"]')
+
+    async def get_stats(self) -> Optional[Dict[str, Any]]:
+        """Estatísticas do scanner dentro da página"""
+        try:
+            stats = await self.page.evaluate('() => window.__snaplinkedScanner && window.__snaplinkedScanner.stats()')
+        except Exception as e:
+            logger.debug(f"Could not read scanner stats: {str(e)}")
+            return None
+        if stats is not None:
+            stats['evaluate_calls'] = self.evaluate_calls
+        return stats
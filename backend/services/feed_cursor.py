@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Cursor Adaptativo do Feed
+Rolagem que mede candidatos novos por scroll, ajusta distância e espera,
+detecta o fim da página e recorre a recarga ou fonte alternativa
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import Config
+from services.action_timing import ActionTimer
+from services.dom_scanner import DomScanner
+from services.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+# Limites da distância de rolagem em pixels
+MIN_SCROLL_DISTANCE = 400
+MAX_SCROLL_DISTANCE = 3200
+
+# Candidatos novos por rolagem considerados suficientes
+TARGET_GAIN = 3
+
+
+class FeedCursorStats:
+    """Rendimento das rolagens e desfechos dos cursores do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics = defaultdict(int)
+        self.gains = deque(maxlen=1000)
+        self.wait_seconds = deque(maxlen=1000)
+
+    def record_scroll(self, gained: int, waited: float):
+        with self._lock:
+            self.metrics['scrolls'] += 1
+            self.metrics['productive' if gained > 0 else 'empty'] += 1
+            self.gains.append(gained)
+            self.wait_seconds.append(waited)
+
+    def increment(self, key: str):
+        with self._lock:
+            self.metrics[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter rendimento por rolagem, recargas e feeds esgotados"""
+        with self._lock:
+            return {
+                'scrolls': self.metrics['scrolls'],
+                'productive_scrolls': self.metrics['productive'],
+                'empty_scrolls': self.metrics['empty'],
+                'reloads': self.metrics['reloads'],
+                'fallbacks': self.metrics['fallbacks'],
+                'exhausted': self.metrics['exhausted'],
+                'candidates_per_scroll': summarize(self.gains),
+                'wait_seconds': summarize(self.wait_seconds)
+            }
+
+
+class FeedCursor:
+    """Avança uma página de rolagem infinita enquanto ela ainda rende candidatos
+
+    Cada rolagem espera só até surgirem candidatos novos (ou o documento
+    crescer). Rolagens vazias aumentam distância e espera; `patience`
+    rolagens vazias seguidas no fim da página contam como esgotamento e
+    levam à próxima fonte (recarga da mesma URL ou feed alternativo).
+    """
+
+    def __init__(self, scanner: DomScanner, action: str, sources: List[str],
+                 pause: Callable[..., Awaitable[None]], navigate: Callable[[str], Awaitable[Any]],
+                 distance: int = 800, patience: Optional[int] = None, wait_ms: Optional[float] = None):
+        self.scanner = scanner
+        self.action = action
+        self.sources = sources  # sources[0] é a página já aberta
+        self.pause = pause  # pausa humana do serviço (min, max, timer)
+        self.navigate = navigate  # abre a URL e aguarda a prontidão da ação
+        self.patience = patience or Config.FEED_CURSOR_PATIENCE
+        self.base_wait_ms = wait_ms or Config.FEED_CURSOR_WAIT_MS
+        self.base_distance = distance
+
+        self.distance = distance
+        self.wait_ms = self.base_wait_ms
+        self.source_index = 0
+        self.dry_scrolls = 0
+        self.exhausted = False
+
+        # Resumo da sessão, gravado no metadata
+        self.scrolls = 0
+        self.candidates_seen = 0
+        self.reloads = 0
+
+    async def advance(self, timer: Optional[ActionTimer] = None) -> bool:
+        """Rolar e aguardar conteúdo novo; False quando todas as fontes esgotaram"""
+        if self.exhausted:
+            return False
+
+        before = await self.scanner.scroll(int(self.distance))
+        started = time.monotonic()
+        after = await self.scanner.wait_for_growth(before, self.wait_ms)
+        waited = time.monotonic() - started
+
+        gained = max(after['seq'] - before['seq'], 0)
+        grew = after['height'] > before['height']
+        self.scrolls += 1
+        self.candidates_seen += gained
+        feed_cursor_stats.record_scroll(gained, waited)
+
+        if gained > 0:
+            self.dry_scrolls = 0
+            self.wait_ms = self.base_wait_ms
+            if gained >= TARGET_GAIN * 2:
+                self.distance = max(MIN_SCROLL_DISTANCE, self.distance * 0.75)
+            elif gained < TARGET_GAIN:
+                self.distance = min(MAX_SCROLL_DISTANCE, self.distance * 1.25)
+            # Pausa humana curta: o carregamento já foi aguardado
+            await self.pause(1, 2, timer)
+            return True
+
+        # Rolagem vazia: ir mais longe e esperar mais na próxima
+        self.distance = min(MAX_SCROLL_DISTANCE, self.distance * 1.5)
+        self.wait_ms = min(self.base_wait_ms * 4, self.wait_ms * 1.5)
+        if after['atBottom'] and not grew:
+            self.dry_scrolls += 1
+            if self.dry_scrolls >= self.patience:
+                return await self._next_source()
+        return True
+
+    async def _next_source(self) -> bool:
+        """Recarregar ou trocar de fonte; marca esgotamento quando não há mais"""
+        self.source_index += 1
+        if self.source_index >= len(self.sources):
+            self.exhausted = True
+            feed_cursor_stats.increment('exhausted')
+            logger.info(f"Feed exhausted for '{self.action}' after {self.scrolls} scrolls")
+            return False
+
+        url = self.sources[self.source_index]
+        reload = url in self.sources[:self.source_index]
+        feed_cursor_stats.increment('reloads' if reload else 'fallbacks')
+        self.reloads += 1
+        logger.info(f"Feed stalled for '{self.action}', {'reloading' if reload else 'switching to'} {url}")
+
+        self.dry_scrolls = 0
+        self.distance = self.base_distance
+        self.wait_ms = self.base_wait_ms
+        await self.navigate(url)
+        return True
+
+    def get_state(self) -> Dict[str, Any]:
+        """Resumo do cursor para o metadata da sessão"""
+        return {
+            'scrolls': self.scrolls,
+            'candidates_seen': self.candidates_seen,
+            'reloads': self.reloads,
+            'source': self.sources[min(self.source_index, len(self.sources) - 1)],
+            'exhausted': self.exhausted
+        }
+
+
+# Instância global das métricas dos cursores
+feed_cursor_stats = FeedCursorStats()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Cliente HTTP com Pool
+Sessão requests com conexões keep-alive, retentativas limitadas com backoff
+em 429/5xx e métricas de latência por endpoint
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from config import Config
+from services.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'SnapLinked/3.0'
+
+# Respostas que valem nova tentativa (limite de taxa e falhas do servidor)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _counting_pool_classes(on_connect: Callable[[], None]) -> Dict[str, type]:
+    """Pools do urllib3 que contam conexões TCP abertas
+
+    O urllib3 reaproveita o mesmo objeto de conexão quando o servidor fecha o
+    socket, então num_connections não vê reconexões; contar no connect() sim.
+    """
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self):
+            super().connect()
+            on_connect()
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            super().connect()
+            on_connect()
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+
+class PooledHttpClient:
+    """Sessão HTTP compartilhada com pool de conexões seguro entre threads
+
+    Cada prefixo de URL recebe seu próprio adaptador, com a política de
+    retentativa adequada: requisições idempotentes repetem em 429/5xx; as
+    não idempotentes (ex.: troca de código OAuth, de uso único) só repetem
+    quando o servidor garante que não processou (falha de conexão ou 429).
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, retries: Optional[int] = None,
+                 backoff: Optional[float] = None, timeout: Optional[float] = None,
+                 parallelism: Optional[int] = None, retry_after_max: Optional[float] = None):
+        self.pool_size = pool_size or Config.LINKEDIN_HTTP_POOL_SIZE
+        self.retries = Config.LINKEDIN_HTTP_RETRIES if retries is None else retries
+        self.backoff = Config.LINKEDIN_HTTP_BACKOFF if backoff is None else backoff
+        self.timeout = timeout or Config.LINKEDIN_HTTP_TIMEOUT
+        self.retry_after_max = (Config.LINKEDIN_HTTP_RETRY_AFTER_MAX if retry_after_max is None
+                                else retry_after_max)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=parallelism or self.pool_size, thread_name_prefix='linkedin-http'
+        )
+        self._lock = threading.Lock()
+        self._pool_classes = _counting_pool_classes(self._on_connect)
+
+        # Métricas do pool e por endpoint
+        self.connections_opened = 0
+        self.metrics = defaultdict(lambda: defaultdict(int))
+        self.latencies = defaultdict(lambda: deque(maxlen=1000))
+
+    def mount(self, prefix: str, idempotent: bool = True):
+        """Registrar adaptador com pool e política de retentativa para um prefixo"""
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=self.retries if idempotent else 0,
+            status=self.retries,
+            backoff_factor=self.backoff,
+            backoff_max=self.retry_after_max,
+            status_forcelist=RETRY_STATUSES if idempotent else (429,),
+            allowed_methods=None,  # a política por prefixo decide o que é seguro repetir
+            respect_retry_after_header=True,
+            retry_after_max=self.retry_after_max,  # sem teto o urllib3 aceita até 6 h de Retry-After
+            raise_on_status=False  # última resposta volta ao chamador, que trata o status
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        adapter.poolmanager.pool_classes_by_scheme = self._pool_classes
+        self.session.mount(prefix, adapter)
+        self._adapters[prefix] = adapter
+
+    # ==================== REQUISIÇÕES ====================
+
+    def request(self, endpoint: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Executar requisição pela sessão compartilhada e medir latência"""
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._record(endpoint, 'errors', time.monotonic() - started)
+            raise
+
+        retries = response.raw.retries
+        attempts = len(retries.history) if retries is not None else 0
+        self._record(endpoint, f'status_{response.status_code}', time.monotonic() - started, attempts)
+        return response
+
+    def get(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        return self.request(endpoint, 'GET', url, **kwargs)
+
+    def post(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        return self.request(endpoint, 'POST', url, **kwargs)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Executar chamada em paralelo (ex.: perfil e email ao mesmo tempo)"""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def record_latency(self, endpoint: str, seconds: float):
+        """Registrar latência de uma operação composta (ex.: login completo)"""
+        with self._lock:
+            self.metrics[endpoint]['calls'] += 1
+            self.latencies[endpoint].append(seconds)
+
+    def _record(self, endpoint: str, outcome: str, seconds: float, retries: int = 0):
+        with self._lock:
+            counters = self.metrics[endpoint]
+            counters['calls'] += 1
+            counters[outcome] += 1
+            counters['retries'] += retries
+            self.latencies[endpoint].append(seconds)
+
+    def _on_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def close(self):
+        """Fechar conexões do pool"""
+        self.session.close()
+        self._executor.shutdown(wait=False)
+
+    # ==================== MÉTRICAS ====================
+
+    def _pool_stats(self, adapters: Iterable[HTTPAdapter]) -> Dict[str, int]:
+        """Conexões TCP abertas e requisições servidas pelos pools do urllib3"""
+        pooled = requests_served = pools = 0
+        for adapter in adapters:
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                pools += 1
+                pooled += pool.num_connections
+                requests_served += pool.num_requests
+        with self._lock:
+            opened = self.connections_opened
+        return {
+            'hosts': pools,
+            'pooled_connections': pooled,
+            'connections_opened': opened,
+            'requests': requests_served,
+            'requests_per_connection': round(requests_served / opened, 2) if opened else 0
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter uso do pool e latência por endpoint"""
+        with self._lock:
+            endpoints = {
+                endpoint: {**dict(counters), 'latency_seconds': summarize(self.latencies[endpoint])}
+                for endpoint, counters in self.metrics.items()
+            }
+        return {
+            'pool_size': self.pool_size,
+            'retries': self.retries,
+            'retry_after_max': self.retry_after_max,
+            'pool': self._pool_stats(self._adapters.values()),
+            'endpoints': endpoints
+        }
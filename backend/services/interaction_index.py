@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Índice de Interações
+Filtro de Bloom por usuário na frente da tabela interaction_index para pular
+posts e perfis já trabalhados em sessões anteriores
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Set
+
+from config import Config
+from models import db, InteractionRecord
+from services.log_writer import automation_log_writer
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas por vez ao carregar o histórico de um usuário
+LOAD_BATCH_SIZE = 10000
+
+# Interações recentes que podem ainda não ter sido gravadas pelo escritor em lote
+RECENT_KEYS_LIMIT = 10000
+
+
+class BloomFilter:
+    """Filtro de Bloom compacto (bytearray + hashing duplo sobre blake2b)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / self.capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        """Adicionar chave ao filtro"""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    @property
+    def is_saturated(self) -> bool:
+        """Verificar se o filtro passou da capacidade planejada"""
+        return self.count > self.capacity
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memória ocupada pelo vetor de bits"""
+        return len(self.bits)
+
+
+def _key(action: str, target_urn: str) -> str:
+    """Chave do filtro: a mesma URN pode ser curtida e comentada"""
+    return f'{action}:{target_urn}'
+
+
+class InteractionIndex:
+    """Índice de alvos já trabalhados por usuário, consultado antes de clicar
+
+    Negativos do filtro são definitivos e não tocam o banco; positivos são
+    confirmados na tabela pelo índice único (user_id, action, target_urn).
+    Os filtros são montados em threads próprias: o histórico de um usuário
+    com milhões de alvos não segura a thread de banco do escritor de logs.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, error_rate: Optional[float] = None,
+                 max_users: Optional[int] = None, load_workers: Optional[int] = None):
+        self.capacity = capacity or Config.INTERACTION_FILTER_CAPACITY
+        self.error_rate = error_rate or Config.INTERACTION_FILTER_ERROR_RATE
+        self.max_users = max_users or Config.INTERACTION_FILTER_MAX_USERS
+        self.load_workers = load_workers or Config.INTERACTION_FILTER_LOAD_WORKERS
+
+        self.app = None
+        self._filters: 'OrderedDict[int, BloomFilter]' = OrderedDict()
+        self._loading: Dict[int, Future] = {}  # uma carga por usuário, compartilhada
+        self._recent: 'OrderedDict[tuple, None]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Métricas do índice
+        self.metrics = defaultdict(int)
+
+    def init_app(self, app):
+        """Associar aplicação Flask usada pelas threads de carga"""
+        self.app = app
+
+    # ==================== FILTRO POR USUÁRIO ====================
+
+    async def _get_filter(self, user_id: int) -> BloomFilter:
+        """Obter filtro do usuário, carregando o histórico na primeira consulta"""
+        with self._lock:
+            bloom = self._filters.get(user_id)
+            if bloom is not None and not bloom.is_saturated:
+                self._filters.move_to_end(user_id)
+                return bloom
+
+            future = self._loading.get(user_id)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.load_workers,
+                                                        thread_name_prefix='interaction-load')
+                future = self._executor.submit(self._load_in_app_context, user_id)
+                self._loading[user_id] = future
+
+        try:
+            bloom = await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                installing = self._loading.get(user_id) is future
+                if installing:
+                    del self._loading[user_id]
+
+        if installing:
+            with self._lock:
+                # Interações registradas durante a carga ainda não estavam no banco
+                for (recent_user, action, target_urn) in self._recent:
+                    if recent_user == user_id:
+                        bloom.add(_key(action, target_urn))
+                self._filters[user_id] = bloom
+                self._filters.move_to_end(user_id)
+                while len(self._filters) > self.max_users:
+                    self._filters.popitem(last=False)
+        return bloom
+
+    def _load_in_app_context(self, user_id: int) -> BloomFilter:
+        if self.app is None:
+            return self._load(user_id)
+        with self.app.app_context():
+            return self._load(user_id)
+
+    def _load(self, user_id: int) -> BloomFilter:
+        """Construir filtro a partir da tabela (roda numa thread de carga)"""
+        total = db.session.query(db.func.count(InteractionRecord.id)).filter(
+            InteractionRecord.user_id == user_id
+        ).scalar() or 0
+
+        # Folga para crescer durante a sessão sem saturar o filtro
+        bloom = BloomFilter(max(self.capacity, total * 2), self.error_rate)
+        query = db.session.query(InteractionRecord.action, InteractionRecord.target_urn).filter(
+            InteractionRecord.user_id == user_id
+        ).execution_options(yield_per=LOAD_BATCH_SIZE)
+        for action, target_urn in query:
+            bloom.add(_key(action, target_urn))
+
+        self.metrics['filters_loaded'] += 1
+        self.metrics['rows_loaded'] += total
+        logger.info(f"Interaction filter loaded for user {user_id} ({total} targets)")
+        return bloom
+
+    # ==================== CONSULTA E REGISTRO ====================
+
+    async def filter_known(self, user_id: int, action: str, target_urns: Iterable[str]) -> Set[str]:
+        """Retornar as URNs já trabalhadas pelo usuário nesta ação"""
+        urns = {urn for urn in target_urns if urn}
+        if not urns:
+            return set()
+
+        bloom = await self._get_filter(user_id)
+        self.metrics['checks'] += len(urns)
+
+        candidates = {urn for urn in urns if _key(action, urn) in bloom}
+        if not candidates:
+            return set()
+
+        # Registradas agora há pouco podem ainda estar no buffer do escritor
+        with self._lock:
+            known = {urn for urn in candidates if (user_id, action, urn) in self._recent}
+        unconfirmed = candidates - known
+
+        if unconfirmed:
+            def confirm():
+                return {
+                    urn for (urn,) in db.session.query(InteractionRecord.target_urn).filter(
+                        InteractionRecord.user_id == user_id,
+                        InteractionRecord.action == action,
+                        InteractionRecord.target_urn.in_(unconfirmed)
+                    )
+                }
+
+            confirmed = await automation_log_writer.run_in_db_thread(confirm)
+            self.metrics['false_positives'] += len(unconfirmed - confirmed)
+            known |= confirmed
+
+        self.metrics['known'] += len(known)
+        return known
+
+    def record(self, user_id: int, action: str, target_urn: Optional[str]):
+        """Marcar alvo como trabalhado na memória (a gravação vai no lote do escritor)"""
+        if not target_urn:
+            return
+
+        with self._lock:
+            bloom = self._filters.get(user_id)
+            if bloom is not None:
+                bloom.add(_key(action, target_urn))
+            self._recent[(user_id, action, target_urn)] = None
+            while len(self._recent) > RECENT_KEYS_LIMIT:
+                self._recent.popitem(last=False)
+
+        self.metrics['recorded'] += 1
+
+    def forget_user(self, user_id: int):
+        """Descartar filtro em memória do usuário"""
+        with self._lock:
+            self._filters.pop(user_id, None)
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter estatísticas do índice"""
+        with self._lock:
+            filters = list(self._filters.values())
+        return {
+            'users_cached': len(filters),
+            'filter_bytes': sum(f.memory_bytes for f in filters),
+            'targets_in_memory': sum(f.count for f in filters),
+            'filters_loaded': self.metrics['filters_loaded'],
+            'rows_loaded': self.metrics['rows_loaded'],
+            'checks': self.metrics['checks'],
+            'known': self.metrics['known'],
+            'false_positives': self.metrics['false_positives'],
+            'recorded': self.metrics['recorded']
+        }
+
+
+# Instância global do índice
+interaction_index = InteractionIndex()
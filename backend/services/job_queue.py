@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Fila de Jobs de Automação
+Fila assíncrona com pool de workers para executar automações fora da requisição
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import Config
+from services.metrics import summarize
+from services.async_runtime import AsyncRuntime, automation_runtime
+from services.scheduler import FairQueue
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Fila de jobs atingiu a capacidade máxima"""
+
+
+class JobAlreadyActiveError(Exception):
+    """Usuário já possui job enfileirado ou em execução"""
+
+    def __init__(self, job: 'AutomationJob'):
+        super().__init__(f'User {job.user_id} already has an active automation job')
+        self.job = job
+
+
+# Mensagem dos jobs interrompidos quando a fila é parada
+SHUTDOWN_MESSAGE = 'Automação interrompida pelo desligamento do servidor'
+
+
+class AutomationJob:
+    """Job de automação enfileirado para um usuário"""
+
+    def __init__(self, user_id: int, action: str, target_count: int,
+                 plan: Optional[Dict[str, int]] = None, resume_session_id: Optional[int] = None,
+                 resume_sessions: Optional[Dict[str, int]] = None):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.action = action
+        self.target_count = target_count
+        self.plan = plan  # metas por ação no modo 'feed_plan'
+        self.resume_session_id = resume_session_id  # sessão órfã retomada do checkpoint
+        self.resume_sessions = resume_sessions  # no 'feed_plan': sessão órfã de cada ação
+
+        self.status = 'queued'  # queued, running, completed, failed
+        self.progress = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error_message: Optional[str] = None
+
+        self.enqueued_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._enqueued_monotonic = time.monotonic()
+        self._started_monotonic: Optional[float] = None
+
+    @property
+    def is_finished(self) -> bool:
+        """Verificar se o job terminou"""
+        return self.status in ('completed', 'failed')
+
+    def update_progress(self, done: int, target: Optional[int] = None):
+        """Atualizar progresso reportado pelo serviço de automação"""
+        self.progress = done
+        if target is not None:
+            self.target_count = target
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converter para dicionário"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'action': self.action,
+            'plan': self.plan,
+            'resume_session_id': self.resume_session_id,
+            'resume_sessions': self.resume_sessions,
+            'status': self.status,
+            'progress': {
+                'done': self.progress,
+                'target': self.target_count,
+                'percent': (self.progress / self.target_count) * 100 if self.target_count else 0
+            },
+            'result': self.result,
+            'error_message': self.error_message,
+            'enqueued_at': self.enqueued_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class JobQueue:
+    """Fila de jobs servida por workers assíncronos no runtime de automação"""
+
+    def __init__(self, handler: Callable[[AutomationJob], Awaitable[Dict[str, Any]]],
+                 workers: Optional[int] = None, max_queued: Optional[int] = None,
+                 history_limit: Optional[int] = None,
+                 on_stop: Optional[Callable[[], Awaitable[None]]] = None,
+                 runtime: Optional[AsyncRuntime] = None):
+        self.handler = handler
+        self.on_stop = on_stop  # Liberação de recursos presos ao loop (ex.: navegadores)
+        self.runtime = runtime or automation_runtime
+        # Workers são corrotinas no mesmo loop: por padrão, um por vaga de contexto
+        # ativo, para que as pausas humanas de uma sessão sobreponham as das outras
+        self.worker_count = workers or Config.AUTOMATION_WORKERS or Config.AUTOMATION_MAX_ACTIVE_CONTEXTS
+        self.max_queued = max_queued or Config.AUTOMATION_MAX_QUEUED_JOBS
+        self.history_limit = history_limit or Config.AUTOMATION_JOB_HISTORY
+
+        self.app = None
+        self.jobs: 'OrderedDict[str, AutomationJob]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Ciclo de vida separado: o loop não pode disputar o lock dos jobs
+        # enquanto start() aguarda a criação dos workers
+        self._lifecycle_lock = threading.Lock()
+
+        self._queue: Optional[FairQueue] = None
+        self._workers = []
+        self._started = False
+        self._queued = 0
+        self._busy = 0
+
+        # Métricas da fila
+        self.metrics = defaultdict(int)
+        self.wait_times = deque(maxlen=1000)
+        self.run_times = deque(maxlen=1000)
+
+    def init_app(self, app):
+        """Associar aplicação Flask usada pelos workers"""
+        self.app = app
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Criar os workers no loop do runtime"""
+        with self._lifecycle_lock:
+            if self._started and self.runtime.is_running:
+                return
+
+            # O semáforo da fila anterior pertence ao loop antigo: jobs ainda
+            # aguardando worker são reenfileirados na nova fila
+            with self._lock:
+                pending = [job for job in self.jobs.values() if job.status == 'queued']
+                self._queued = len(pending)
+            self.runtime.run(self._start_workers(pending))
+            self._started = True
+
+        if pending:
+            logger.info(f"Requeued {len(pending)} automation jobs after restart")
+
+        logger.info(f"Automation job queue started with {self.worker_count} workers")
+
+    async def _start_workers(self, pending: List[AutomationJob]):
+        """Criar fila e workers (roda no loop do runtime)"""
+        self._queue = FairQueue()  # Alterna entre usuários
+        for job in pending:
+            self._queue.put_nowait(job)
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.worker_count)
+        ]
+
+    async def _stop_workers(self):
+        """Cancelar workers e liberar recursos presos ao loop"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Jobs que nunca chegaram a um worker não rodarão mais
+        with self._lock:
+            pending = [job for job in self.jobs.values() if job.status == 'queued']
+            self._queued = 0
+        for job in pending:
+            self._fail_interrupted(job)
+
+        if self.on_stop is not None:
+            try:
+                await self.on_stop()
+            except Exception as e:
+                logger.error(f"Error releasing automation resources: {str(e)}")
+
+    def shutdown(self, timeout: float = 10):
+        """Parar os workers (o runtime segue ativo para outros usuários)"""
+        with self._lifecycle_lock:
+            if not self._started:
+                return
+            self._started = False
+
+        if self.runtime.is_running:
+            try:
+                self.runtime.run(self._stop_workers(), timeout=timeout)
+            except Exception as e:
+                logger.error(f"Error stopping automation job queue: {str(e)}")
+        logger.info("Automation job queue stopped")
+
+    # ==================== ENFILEIRAMENTO ====================
+
+    def enqueue(self, user_id: int, action: str, target_count: int,
+                plan: Optional[Dict[str, int]] = None,
+                resume_session_id: Optional[int] = None,
+                resume_sessions: Optional[Dict[str, int]] = None,
+                exclusive: bool = False) -> AutomationJob:
+        """Enfileirar job e retornar imediatamente
+
+        Com ``exclusive``, recusa o job se o usuário já tiver outro ativo; a
+        checagem e a inserção ocorrem sob o mesmo lock, então requisições
+        concorrentes do mesmo usuário não enfileiram dois jobs.
+        """
+        self.start()
+
+        with self._lock:
+            active = self._active_job(user_id) if exclusive else None
+            if active is not None:
+                raise JobAlreadyActiveError(active)
+            if self.queue_depth >= self.max_queued:
+                self.metrics['rejected'] += 1
+                raise JobQueueFullError('Automation job queue is full')
+
+            job = AutomationJob(user_id, action, target_count, plan=plan,
+                                resume_session_id=resume_session_id, resume_sessions=resume_sessions)
+            self.jobs[job.id] = job
+            self._trim_history()
+            self._queued += 1
+            self.metrics['enqueued'] += 1
+
+        self.runtime.call_soon(self._queue.put_nowait, job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[AutomationJob]:
+        """Obter job pelo id"""
+        return self.jobs.get(job_id)
+
+    def get_active_job(self, user_id: int) -> Optional[AutomationJob]:
+        """Obter job enfileirado ou em execução do usuário"""
+        with self._lock:
+            return self._active_job(user_id)
+
+    def _active_job(self, user_id: int) -> Optional[AutomationJob]:
+        """Buscar job ativo do usuário (chamador segura o lock)"""
+        for job in self.jobs.values():
+            if job.user_id == user_id and not job.is_finished:
+                return job
+        return None
+
+    @property
+    def queue_depth(self) -> int:
+        """Quantidade de jobs aguardando worker"""
+        return self._queued
+
+    def _trim_history(self):
+        """Descartar jobs finalizados mais antigos além do limite"""
+        overflow = len(self.jobs) - self.history_limit
+        if overflow <= 0:
+            return
+
+        for job_id in [j.id for j in self.jobs.values() if j.is_finished][:overflow]:
+            del self.jobs[job_id]
+
+    # ==================== WORKERS ====================
+
+    async def _worker(self, index: int):
+        """Consumir jobs da fila indefinidamente"""
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: AutomationJob):
+        """Executar um job dentro do contexto da aplicação"""
+        job.status = 'running'
+        job.started_at = datetime.now(timezone.utc)
+        job._started_monotonic = time.monotonic()
+        self.wait_times.append(job._started_monotonic - job._enqueued_monotonic)
+        with self._lock:
+            self._queued -= 1
+            self._busy += 1
+
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    result = await self.handler(job)
+            else:
+                result = await self.handler(job)
+
+            job.result = result
+            job.status = 'completed' if result and result.get('success') else 'failed'
+            if job.status == 'failed' and result:
+                job.error_message = result.get('message')
+
+        except asyncio.CancelledError:
+            # Fila parada ou runtime encerrado: o job não fica 'running' para sempre
+            logger.warning(f"Automation job {job.id} interrupted by shutdown")
+            job.status = 'failed'
+            job.error_message = SHUTDOWN_MESSAGE
+            raise
+
+        except Exception as e:
+            logger.error(f"Automation job {job.id} failed: {str(e)}")
+            job.status = 'failed'
+            job.error_message = str(e)
+
+        finally:
+            with self._lock:
+                self._busy -= 1
+            job.finished_at = datetime.now(timezone.utc)
+            self.run_times.append(time.monotonic() - job._started_monotonic)
+            self.metrics[job.status] += 1
+
+    def _fail_interrupted(self, job: AutomationJob):
+        """Finalizar como falho um job que não chegou a rodar"""
+        job.status = 'failed'
+        job.error_message = SHUTDOWN_MESSAGE
+        job.finished_at = datetime.now(timezone.utc)
+        self.metrics['failed'] += 1
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter estatísticas da fila de jobs"""
+        return {
+            'running': self._started and self.runtime.is_running,
+            'workers': self.worker_count,
+            'workers_busy': self._busy,
+            'queue_depth': self.queue_depth,
+            'users_queued': len(self._queue.depth_by_user()) if self._queue else 0,
+            'max_queued': self.max_queued,
+            'enqueued': self.metrics['enqueued'],
+            'completed': self.metrics['completed'],
+            'failed': self.metrics['failed'],
+            'rejected': self.metrics['rejected'],
+            'wait_seconds': summarize(self.wait_times),
+            'run_seconds': summarize(self.run_times)
+        }
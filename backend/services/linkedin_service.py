@@ -6,23 +6,52 @@ Integração com LinkedIn via OAuth e automação via Playwright com segurança
 """
 
 import asyncio
-import json
 import logging
 import secrets
 import time
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
-from urllib.parse import urlencode, parse_qs, urlparse
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
 import requests
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+from playwright.async_api import Browser, Page, BrowserContext, Locator
 from config import Config
-from models import db, User, AutomationSession, AutomationLog, UserStats
+from services.browser_pool import (
+    BrowserPool, PooledContext, BROWSER_LAUNCH_ARGS, CONTEXT_OPTIONS, PAGE_TIMEOUT_MS
+)
+from services.job_queue import JobQueue, AutomationJob, JobQueueFullError
+from services.storage_state import storage_state_store, SESSION_COOKIE_NAME
+from services.request_filter import RequestFilter, attach_request_filter
+from services.log_writer import automation_log_writer
+from services.dom_scanner import DomScanner
+from services.feed_cursor import FeedCursor
+from services.memory_watchdog import memory_watchdog
+from services.page_readiness import page_readiness
+from services.interaction_index import interaction_index
+from services.playwright_driver import playwright_driver
+from services.scheduler import automation_scheduler
+from services.async_runtime import automation_runtime
+from services.session_monitor import session_monitor
+from services.action_timing import ActionTimer, action_timing_stats
+from services.http_client import PooledHttpClient
+from services.profile_cache import ProfileCache, profile_cache, MISSING
+from services.token_refresher import token_refresher
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LINKEDIN_WEB_URL = Config.LINKEDIN_WEB_URL
+LINKEDIN_FEED_URL = f'{LINKEDIN_WEB_URL}/feed/'
+LINKEDIN_LOGIN_URL = f'{LINKEDIN_WEB_URL}/login'
+LINKEDIN_NETWORK_URL = f'{LINKEDIN_WEB_URL}/mynetwork/'
+
+# Fontes do cursor quando a página esgota: recarga e, no feed, a ordenação por recentes
+FEED_SOURCES = [LINKEDIN_FEED_URL, LINKEDIN_FEED_URL, f'{LINKEDIN_FEED_URL}?sortBy=RECENT']
+NETWORK_SOURCES = [LINKEDIN_NETWORK_URL, LINKEDIN_NETWORK_URL]
+
+# Ações que podem ser combinadas em uma única passagem pelo feed
+FEED_PLAN_ACTIONS = ('like', 'comment')
+
 
 class SecureRandomGenerator:
     """Gerador de números aleatórios seguro para automação"""
@@ -60,12 +89,20 @@ class SecureRandomGenerator:
 class LinkedInOAuthService:
     """Serviço de autenticação OAuth do LinkedIn com segurança aprimorada"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[PooledHttpClient] = None, cache: Optional[ProfileCache] = None,
+                 base_url: Optional[str] = None, api_url: Optional[str] = None):
         self.client_id = Config.LINKEDIN_CLIENT_ID
         self.client_secret = Config.LINKEDIN_CLIENT_SECRET
         self.redirect_uri = Config.LINKEDIN_REDIRECT_URI
-        self.base_url = 'https://www.linkedin.com/oauth/v2'
-        self.api_url = 'https://api.linkedin.com/v2'
+        self.base_url = (base_url or Config.LINKEDIN_OAUTH_URL).rstrip('/')
+        self.api_url = (api_url or Config.LINKEDIN_API_URL).rstrip('/')
+        
+        # Conexões keep-alive reutilizadas; o código OAuth é de uso único e só
+        # é reenviado quando o servidor não chegou a processá-lo
+        self.http = http or PooledHttpClient()
+        self.http.mount(self.base_url, idempotent=False)
+        self.http.mount(self.api_url)
+        self.cache = cache or profile_cache
         
         # Validar configurações
         if not all([self.client_id, self.client_secret, self.redirect_uri]):
@@ -100,14 +137,11 @@ class LinkedInOAuthService:
                 'client_secret': self.client_secret
             }
             
-            response = requests.post(
+            response = self.http.post(
+                'access_token',
                 f"{self.base_url}/accessToken",
                 data=data,
-                headers={
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                    'User-Agent': 'SnapLinked/3.0'
-                },
-                timeout=30
+                headers={'Content-Type': 'application/x-www-form-urlencoded'}
             )
             
             if response.status_code == 200:
@@ -129,50 +163,138 @@ class LinkedInOAuthService:
             logger.error(f"Unexpected error in token exchange: {str(e)}")
             return None
     
-    def get_user_profile(self, access_token: str) -> Optional[Dict]:
-        """Obter perfil do usuário com validação de token"""
-        if not access_token or len(access_token) < 10:
-            logger.error("Invalid access token provided")
+    def refresh_access_token(self, refresh_token: str, access_token: Optional[str] = None) -> Optional[Dict]:
+        """Renovar token de acesso, descartando o perfil em cache do token antigo
+
+        O cache só é descartado quando o LinkedIn devolve um token novo; numa
+        falha o token antigo continua valendo e o perfil guardado também.
+        """
+        if not refresh_token or len(refresh_token) < 10:
+            logger.error("Invalid refresh token provided")
             return None
         
         try:
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'User-Agent': 'SnapLinked/3.0'
+            data = {
+                'grant_type': 'refresh_token',
+                'refresh_token': refresh_token,
+                'client_id': self.client_id,
+                'client_secret': self.client_secret
             }
             
-            # Obter informações básicas do perfil
-            profile_response = requests.get(
-                f"{self.api_url}/people/~",
-                headers=headers,
-                timeout=30
+            response = self.http.post(
+                'refresh_token',
+                f"{self.base_url}/accessToken",
+                data=data,
+                headers={'Content-Type': 'application/x-www-form-urlencoded'}
             )
             
-            if profile_response.status_code != 200:
-                logger.error(f"Profile request failed: {profile_response.status_code}")
+            if response.status_code == 200:
+                token_data = response.json()
+                if 'access_token' in token_data:
+                    if access_token:
+                        self.cache.invalidate(access_token, 'refreshed')
+                    return token_data
+                logger.error("Invalid token response format")
                 return None
             
-            profile_data = profile_response.json()
+            logger.error(f"Token refresh failed: {response.status_code} - {response.text}")
+            return None
             
-            # Obter email
-            email_response = requests.get(
-                f"{self.api_url}/emailAddress?q=members&projection=(elements*(handle~))",
-                headers=headers,
-                timeout=30
+        except requests.RequestException as e:
+            logger.error(f"Network error during token refresh: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error in token refresh: {str(e)}")
+            return None
+    
+    def revoke_token(self, access_token: str) -> bool:
+        """Revogar token de acesso no LinkedIn e descartar o perfil em cache"""
+        if not access_token:
+            return False
+        
+        self.cache.invalidate(access_token, 'revoked')
+        
+        try:
+            response = self.http.post(
+                'revoke_token',
+                f"{self.base_url}/revoke",
+                data={
+                    'client_id': self.client_id,
+                    'client_secret': self.client_secret,
+                    'token': access_token
+                },
+                headers={'Content-Type': 'application/x-www-form-urlencoded'}
             )
+            if response.status_code != 200:
+                logger.error(f"Token revocation failed: {response.status_code}")
+                return False
+            return True
+            
+        except requests.RequestException as e:
+            logger.error(f"Network error during token revocation: {str(e)}")
+            return False
+    
+    def get_user_profile(self, access_token: str) -> Optional[Dict]:
+        """Obter perfil do usuário com validação de token (servido do cache quando possível)"""
+        if not access_token or len(access_token) < 10:
+            logger.error("Invalid access token provided")
+            return None
+        
+        profile = self.cache.get(access_token, 'profile')
+        email = self.cache.get(access_token, 'email')
+        if profile is not MISSING and email is not MISSING:
+            return {**profile, 'email': email}
+        
+        started = time.monotonic()
+        email_future = None
+        try:
+            headers = {'Authorization': f'Bearer {access_token}'}
+            
+            # Email em paralelo com o perfil: a latência é a da chamada mais lenta
+            if email is MISSING:
+                email_future = self.http.submit(
+                    self.http.get,
+                    'email',
+                    f"{self.api_url}/emailAddress?q=members&projection=(elements*(handle~))",
+                    headers=headers
+                )
+            
+            # Obter informações básicas do perfil
+            if profile is MISSING:
+                profile_response = self.http.get('profile', f"{self.api_url}/people/~", headers=headers)
+                
+                if profile_response.status_code != 200:
+                    logger.error(f"Profile request failed: {profile_response.status_code}")
+                    return None
+                
+                profile_data = profile_response.json()
+                profile = {
+                    'id': profile_data.get('id'),
+                    'name': f"{profile_data.get('firstName', {}).get('localized', {}).get('en_US', '')} {profile_data.get('lastName', {}).get('localized', {}).get('en_US', '')}".strip(),
+                    'profile_picture': profile_data.get('profilePicture', {}).get('displayImage~', {}).get('elements', [{}])[-1].get('identifiers', [{}])[0].get('identifier')
+                }
+                self.cache.put(access_token, 'profile', profile)
             
-            email_data = {}
-            if email_response.status_code == 200:
-                email_data = email_response.json()
+            # Email é opcional: falha na chamada não impede o login nem é guardada
+            if email_future is not None:
+                email = None
+                try:
+                    email_response = email_future.result()
+                    if email_response.status_code == 200:
+                        email = self._extract_email(email_response.json())
+                        self.cache.put(access_token, 'email', email)
+                except requests.RequestException as e:
+                    logger.warning(f"Network error getting user email: {str(e)}")
             
             # Combinar dados
             user_data = {
-                'id': profile_data.get('id'),
-                'name': f"{profile_data.get('firstName', {}).get('localized', {}).get('en_US', '')} {profile_data.get('lastName', {}).get('localized', {}).get('en_US', '')}".strip(),
-                'email': self._extract_email(email_data),
-                'profile_picture': profile_data.get('profilePicture', {}).get('displayImage~', {}).get('elements', [{}])[-1].get('identifiers', [{}])[0].get('identifier')
+                'id': profile['id'],
+                'name': profile['name'],
+                'email': email,
+                'profile_picture': profile['profile_picture']
             }
             
+            self.http.record_latency('user_profile', time.monotonic() - started)
             return user_data
             
         except requests.RequestException as e:
@@ -181,6 +303,14 @@ class LinkedInOAuthService:
         except Exception as e:
             logger.error(f"Unexpected error getting user profile: {str(e)}")
             return None
+        finally:
+            if email_future is not None:
+                # Perfil falhou antes de precisar do email: não esperar por ele
+                email_future.cancel()
+    
+    def get_stats(self) -> Dict[str, any]:
+        """Obter uso do pool de conexões, latência das chamadas e cache de perfis"""
+        return {**self.http.get_stats(), 'profile_cache': self.cache.get_stats()}
     
     def _extract_email(self, email_data: Dict) -> Optional[str]:
         """Extrair email dos dados da API"""
@@ -197,13 +327,21 @@ class LinkedInOAuthService:
 class LinkedInAutomationService:
     """Serviço de automação do LinkedIn com segurança aprimorada"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None, delay_scale: Optional[float] = None):
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self.pool = pool
+        self.lease: Optional[PooledContext] = None
+        self.request_filter: Optional[RequestFilter] = None
         self.is_logged_in = False
         self.current_user_id = None
         self.secure_random = SecureRandomGenerator()
+        self.progress_callback: Optional[Callable[[int, int], None]] = None
+        self.delay_scale = Config.AUTOMATION_DELAY_SCALE if delay_scale is None else delay_scale
+        self.resume_session_id: Optional[int] = None  # sessão órfã a continuar do checkpoint
+        self.resume_sessions: Dict[str, int] = {}  # no plano de feed: sessão órfã de cada ação
+        self._session_ids: List[int] = []
         
         # Comentários seguros para posts
         self.safe_comments = [
@@ -217,54 +355,45 @@ class LinkedInAutomationService:
             "Inspirador! ✨"
         ]
     
-    async def initialize_browser(self) -> bool:
+    async def initialize_browser(self, user_id: Optional[int] = None) -> bool:
         """Inicializar navegador com configurações seguras"""
         try:
-            playwright = await async_playwright().start()
+            if self.pool is not None:
+                # Alugar contexto aquecido do pool compartilhado
+                self.lease = await self.pool.acquire(user_id, state_loader=self._load_storage_state)
+                if self.lease.request_filter is None:
+                    self.lease.request_filter = await attach_request_filter(self.lease.context)
+                self.request_filter = self.lease.request_filter
+                self.browser = self.lease.browser
+                self.context = self.lease.context
+                self.page = self.lease.page
+                logger.info(f"Browser context leased from pool for user {user_id}")
+                return True
             
-            # Configurações de segurança do navegador
-            self.browser = await playwright.chromium.launch(
+            # Navegador dedicado sobre o driver Playwright compartilhado do processo
+            self.browser = await playwright_driver.launch_browser(
+                owner='service',
                 headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--disable-extensions',
-                    '--disable-plugins',
-                    '--disable-images',  # Economizar banda
-                    '--disable-javascript-harmony-shipping',
-                    '--disable-background-timer-throttling',
-                    '--disable-renderer-backgrounding',
-                    '--disable-backgrounding-occluded-windows',
-                    '--disable-ipc-flooding-protection',
-                    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                ]
+                args=BROWSER_LAUNCH_ARGS
             )
             
-            # Criar contexto com configurações de privacidade
-            self.context = await self.browser.new_context(
-                viewport={'width': 1366, 'height': 768},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='pt-BR',
-                timezone_id='America/Sao_Paulo',
-                permissions=['notifications'],
-                extra_http_headers={
-                    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'DNT': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-            )
+            # Criar contexto com configurações de privacidade, restaurando sessão persistida
+            storage_state = await self._load_storage_state(user_id) if user_id else None
+            if storage_state:
+                self.context = await playwright_driver.new_context(
+                    self.browser, owner='service', **CONTEXT_OPTIONS, storage_state=storage_state
+                )
+            else:
+                self.context = await playwright_driver.new_context(self.browser, owner='service', **CONTEXT_OPTIONS)
+            
+            # Bloquear imagens, mídia, fontes e rastreadores
+            self.request_filter = await attach_request_filter(self.context)
             
             self.page = await self.context.new_page()
             
             # Configurar timeouts
-            self.page.set_default_timeout(30000)
-            self.page.set_default_navigation_timeout(30000)
+            self.page.set_default_timeout(PAGE_TIMEOUT_MS)
+            self.page.set_default_navigation_timeout(PAGE_TIMEOUT_MS)
             
             logger.info("Browser initialized successfully")
             return True
@@ -274,32 +403,53 @@ class LinkedInAutomationService:
             await self.cleanup()
             return False
     
+    async def _load_storage_state(self, user_id: int) -> Optional[Dict]:
+        """Ler sessão persistida na thread de banco, sem travar as demais sessões do loop"""
+        return await automation_log_writer.run_in_db_thread(lambda: storage_state_store.load(user_id))
+    
+    async def _pause(self, min_val: float, max_val: float, timer: Optional[ActionTimer] = None):
+        """Pausa humana aleatória, escalada por delay_scale (0 desativa)"""
+        if self.delay_scale > 0:
+            seconds = self.secure_random.uniform(min_val, max_val) * self.delay_scale
+            await asyncio.sleep(seconds)
+            if timer is not None:
+                timer.add_delay(seconds * 1000)
+    
+    def _report_progress(self, done: int, target: int):
+        """Notificar progresso ao chamador (ex.: job da fila)"""
+        if self.progress_callback:
+            try:
+                self.progress_callback(done, target)
+            except Exception as e:
+                logger.warning(f"Error reporting progress: {str(e)}")
+    
     async def login_manual(self, user_id: int) -> bool:
         """Login manual no LinkedIn com validação"""
         try:
-            if not self.browser:
-                if not await self.initialize_browser():
+            if not self.page:
+                if not await self.initialize_browser(user_id):
                     return False
             
             self.current_user_id = user_id
             
-            # Navegar para LinkedIn
-            await self.page.goto('https://www.linkedin.com/login', wait_until='networkidle')
+            # Reutilizar sessão persistida sem passar pela página de login
+            if await self._restore_session(user_id):
+                return True
             
-            # Aguardar elementos de login
-            await self.page.wait_for_selector('input[name="session_key"]', timeout=10000)
-            await self.page.wait_for_selector('input[name="session_password"]', timeout=10000)
+            # Navegar para LinkedIn e aguardar formulário de login
+            await page_readiness.navigate(self.page, LINKEDIN_LOGIN_URL, 'login')
             
             logger.info(f"LinkedIn login page loaded for user {user_id}")
             
             # Aguardar login manual (simulado - em produção seria real)
-            await asyncio.sleep(self.secure_random.uniform(2, 4))
+            await self._pause(2, 4)
             
             # Verificar se login foi bem-sucedido
             try:
                 await self.page.wait_for_url('**/feed/**', timeout=30000)
                 self.is_logged_in = True
                 logger.info(f"Manual login successful for user {user_id}")
+                await self._persist_session(user_id)
                 return True
             except Exception:
                 # Tentar verificar por outros indicadores
@@ -307,6 +457,7 @@ class LinkedInAutomationService:
                 if feed_elements:
                     self.is_logged_in = True
                     logger.info(f"Manual login successful for user {user_id} (alternative check)")
+                    await self._persist_session(user_id)
                     return True
                 
                 logger.warning(f"Manual login may have failed for user {user_id}")
@@ -316,110 +467,261 @@ class LinkedInAutomationService:
             logger.error(f"Error in manual login: {str(e)}")
             return False
     
+    async def _restore_session(self, user_id: int) -> bool:
+        """Validar sessão restaurada com uma sondagem leve em vez do fluxo de login"""
+        cookies = await self.context.cookies(LINKEDIN_WEB_URL)
+        if not any(c.get('name') == SESSION_COOKIE_NAME for c in cookies):
+            return False
+        
+        try:
+            # Requisição sem redirecionamento: 200 indica sessão aceita, 30x leva ao login
+            response = await self.context.request.get(
+                LINKEDIN_FEED_URL, max_redirects=0, timeout=10000
+            )
+            is_valid = response.status == 200
+            await response.dispose()
+        except Exception as e:
+            logger.warning(f"Session probe failed for user {user_id}: {str(e)}")
+            is_valid = False
+        
+        if not is_valid:
+            await automation_log_writer.run_in_db_thread(lambda: storage_state_store.invalidate(user_id))
+            await self.context.clear_cookies()
+            return False
+        
+        await automation_log_writer.run_in_db_thread(lambda: storage_state_store.mark_valid(user_id))
+        self.is_logged_in = True
+        logger.info(f"Restored LinkedIn session for user {user_id}")
+        return True
+    
+    async def _open_session(self, user_id: int, action: str, target_count: int) -> Tuple[int, int]:
+        """Criar sessão (ou continuar a retomada) com heartbeat; retorna (id, ações já feitas)"""
+        session_id = self.resume_sessions.pop(action, None)
+        if session_id is None:
+            session_id, self.resume_session_id = self.resume_session_id, None
+        if session_id is not None:
+            checkpoint = await automation_log_writer.resume_session(session_id)
+            if checkpoint is not None:
+                session_monitor.track(session_id, checkpoint['count'], checkpoint['resumes'])
+                self._session_ids.append(session_id)
+                logger.info(f"Resuming automation session {session_id} from checkpoint ({checkpoint['count']} done)")
+                return session_id, checkpoint['count']
+        
+        session_id = await automation_log_writer.create_session(user_id, action, target_count)
+        session_monitor.track(session_id)
+        self._session_ids.append(session_id)
+        return session_id, 0
+    
+    def _log_action(self, session_id: int, user_id: int, action: str, target_element: str,
+                    target_urn: Optional[str], timer: ActionTimer, details: Dict[str, any]) -> Dict[str, any]:
+        """Enfileirar log de ação bem-sucedida assim que ela termina, com o tempo por fase
+
+        A pausa após a ação ainda não aconteceu: _complete_timing() soma o tempo
+        dela ao log depois, sem atrasar o registro (e o checkpoint) da ação.
+        """
+        return automation_log_writer.add(
+            session_id=session_id,
+            user_id=user_id,
+            action=action,
+            target_element=target_element,
+            success=True,
+            target_urn=target_urn,
+            details={**details, 'timing': timer.to_details()},
+            execution_time_ms=timer.total_ms
+        )
+    
+    def _complete_timing(self, action: str, row: Dict[str, any], timer: ActionTimer):
+        """Gravar no log e nas métricas o tempo final, com a pausa após a ação"""
+        action_timing_stats.record(action, timer)
+        automation_log_writer.update_log(row, {**row['details'], 'timing': timer.to_details()}, timer.total_ms)
+    
+    def _checkpoint(self, session_id: int, count: int, **state):
+        """Registrar progresso gravado no próximo heartbeat"""
+        session_monitor.update(session_id, count, **state)
+    
+    def _network_snapshot(self) -> Dict[str, int]:
+        """Capturar contadores de interceptação no início da sessão"""
+        return self.request_filter.snapshot() if self.request_filter else {}
+    
+    def _network_usage(self, start: Dict[str, int]) -> Dict[str, int]:
+        """Requisições e bytes evitados desde o início da sessão"""
+        return self.request_filter.usage_since(start) if self.request_filter else {}
+    
+    async def _prepare_page(self, url: str, action: str, force: bool = False) -> Dict[str, float]:
+        """Navegar (se necessário) e aguardar a condição de prontidão da ação"""
+        if force or not self.page.url.startswith(url):
+            return await page_readiness.navigate(self.page, url, action)
+        return await page_readiness.wait_ready(self.page, action)
+    
+    async def _watch_memory(self, action: str) -> bool:
+        """Reciclar página ou contexto acima dos limites de memória; True se a página mudou"""
+        if self.context is None:
+            return False
+        kind = await memory_watchdog.check(self.page)
+        if kind is None:
+            return False
+        
+        url = self.page.url
+        await memory_watchdog.forget(self.page)
+        if kind == 'context':
+            # Contexto novo com cookies e localStorage atuais
+            if self.lease is not None:
+                await self.pool.recycle(self.lease)
+                self.context, self.page = self.lease.context, self.lease.page
+            else:
+                storage_state = await self.context.storage_state()
+                await self.context.close()
+                self.context = await playwright_driver.new_context(
+                    self.browser, owner='service', **CONTEXT_OPTIONS, storage_state=storage_state
+                )
+                if self.request_filter is not None:
+                    await self.request_filter.attach(self.context)
+                self.page = await self.context.new_page()
+        else:
+            # Página nova no mesmo contexto; a antiga leva o DOM e o heap acumulados
+            old_page, self.page = self.page, await self.context.new_page()
+            await old_page.close()
+            if self.lease is not None:
+                self.lease.page = self.page
+        
+        self.page.set_default_timeout(PAGE_TIMEOUT_MS)
+        self.page.set_default_navigation_timeout(PAGE_TIMEOUT_MS)
+        memory_watchdog.record_recycle(kind)
+        await self._prepare_page(url, action, force=True)
+        return True
+    
+    def _feed_cursor(self, scanner: DomScanner, action: str, sources: List[str],
+                     distance: int = 800) -> FeedCursor:
+        """Cursor de rolagem da página atual, com recarga pelas fontes alternativas"""
+        return FeedCursor(
+            scanner, action, sources, self._pause,
+            navigate=lambda url: self._prepare_page(url, action, force=True),
+            distance=distance
+        )
+    
+    async def _persist_session(self, user_id: int):
+        """Persistir cookies e localStorage após login bem-sucedido"""
+        try:
+            state = await self.context.storage_state()
+            await automation_log_writer.run_in_db_thread(lambda: storage_state_store.save(user_id, state))
+        except Exception as e:
+            logger.warning(f"Could not persist storage state for user {user_id}: {str(e)}")
+    
     async def like_posts(self, user_id: int, target_count: int = 3) -> Dict[str, any]:
         """Curtir posts com validação e segurança"""
         if not self.is_logged_in:
             return {'success': False, 'message': 'Usuário não está logado'}
         
+        session_id = None
+        liked_count = 0
+        throttled = False
+        
         try:
-            # Criar sessão de automação
-            session = AutomationSession(
-                user_id=user_id,
-                action_type='like',
-                target_count=target_count,
-                status='running'
-            )
-            db.session.add(session)
-            db.session.commit()
-            
-            # Navegar para feed se necessário
-            if not self.page.url.endswith('/feed/'):
-                await self.page.goto('https://www.linkedin.com/feed/', wait_until='networkidle')
+            await automation_scheduler.ensure_user(user_id)
+            # Criar sessão de automação (gravada na thread de banco)
+            session_id, liked_count = await self._open_session(user_id, 'like', target_count)
+            network_start = self._network_snapshot()
             
-            # Aguardar carregamento do feed
-            await self.page.wait_for_selector('[data-test-id="like-button"], button[aria-label*="curtir"], button[aria-label*="like"]', timeout=15000)
+            # Navegar para feed se necessário e aguardar o primeiro botão ou o feed
+            page_timings = await self._prepare_page(LINKEDIN_FEED_URL, 'like')
             
-            liked_count = 0
+            scanner = await DomScanner.for_page(self.page)
+            cursor = self._feed_cursor(scanner, 'like', FEED_SOURCES)
             attempts = 0
             max_attempts = target_count * 3  # Máximo de tentativas
+            timer = None
+            exhausted = False
             
             while liked_count < target_count and attempts < max_attempts:
                 attempts += 1
                 
                 try:
-                    # Buscar botões de curtir não clicados
-                    like_buttons = await self.page.query_selector_all(
-                        'button[aria-label*="curtir"]:not([aria-pressed="true"]), '
-                        'button[aria-label*="like"]:not([aria-pressed="true"]), '
-                        '[data-test-id="like-button"]:not(.active)'
-                    )
+                    if await self._watch_memory(cursor.action):
+                        scanner = cursor.scanner = await DomScanner.for_page(self.page)
                     
-                    if not like_buttons:
-                        # Scroll para carregar mais posts
-                        await self.page.evaluate('window.scrollBy(0, 800)')
-                        await asyncio.sleep(self.secure_random.uniform(2, 3))
+                    timer = timer or ActionTimer()
+                    with timer.phase('find'):
+                        # Próximos botões de curtir ainda não processados nem já curtidos
+                        targets = await self._next_fresh_targets(scanner, user_id, 'like', limit=3)
+                        
+                        if not targets:
+                            # Rolagem adaptativa; False quando todas as fontes do feed esgotaram
+                            exhausted = not await cursor.advance(timer)
+                    if exhausted:
+                        break
+                    if not targets:
                         continue
                     
                     # Selecionar botão aleatório
-                    button_index = self.secure_random.randint(0, min(len(like_buttons) - 1, 2))
-                    button = like_buttons[button_index]
-                    
-                    # Scroll para o botão
-                    await button.scroll_into_view_if_needed()
-                    await asyncio.sleep(self.secure_random.uniform(1, 2))
+                    button_index = self.secure_random.randint(0, len(targets) - 1)
+                    target = targets[button_index]
+                    scanner.mark_processed([target['id']])
                     
-                    # Clicar no botão
-                    await button.click()
+                    # Limite diário como token bucket: parar quando esgotar
+                    if not automation_scheduler.try_acquire(user_id, 'like'):
+                        throttled = True
+                        break
+                    try:
+                        await self._click_like(scanner.locator(target['id']), timer)
+                    except Exception:
+                        automation_scheduler.release(user_id, 'like')
+                        raise
                     liked_count += 1
-                    
-                    # Log da ação
-                    log_entry = AutomationLog(
-                        session_id=session.id,
-                        user_id=user_id,
-                        action='like',
-                        target_element='post',
-                        success=True,
-                        details={'post_index': attempts, 'button_index': button_index}
-                    )
-                    db.session.add(log_entry)
+                    interaction_index.record(user_id, 'like', target['urn'])
                     
                     logger.info(f"Post liked successfully ({liked_count}/{target_count})")
+                    self._report_progress(liked_count, target_count)
                     
-                    # Delay entre ações para parecer humano
-                    await asyncio.sleep(self.secure_random.uniform(2, 4))
+                    # Log da ação antes da pausa: uma queda durante ela não perde a curtida
+                    row = self._log_action(session_id, user_id, 'like', 'post', target['urn'], timer, {
+                        'post_index': attempts,
+                        'button_index': button_index,
+                        'target_id': target['id'],
+                        'urn': target['urn']
+                    })
+                    self._checkpoint(session_id, liked_count, last_target=target['urn'])
+                    
+                    try:
+                        # Delay entre ações para parecer humano (parte do tempo da ação)
+                        with timer.phase('post_action_delay'):
+                            await self._pause(2, 4, timer)
+                    finally:
+                        self._complete_timing('like', row, timer)
+                        timer = None
                     
                 except Exception as e:
                     logger.warning(f"Error liking post: {str(e)}")
+                    timer = None
                     # Continuar tentando outros posts
                     continue
             
-            # Atualizar sessão
-            session.actual_count = liked_count
-            session.status = 'completed' if liked_count > 0 else 'failed'
-            session.completed_at = datetime.now(timezone.utc)
-            
-            # Atualizar estatísticas do usuário
-            stats = UserStats.query.filter_by(user_id=user_id).first()
-            if stats:
-                stats.total_likes += liked_count
-                stats.updated_at = datetime.now(timezone.utc)
-            
-            db.session.commit()
+            # Finalizar sessão e estatísticas após gravar os logs pendentes
+            await automation_log_writer.finish_session(
+                session_id,
+                liked_count,
+                metadata={
+                    'network': self._network_usage(network_start),
+                    'page': page_timings,
+                    'feed_cursor': cursor.get_state()
+                }
+            )
             
             return {
                 'success': liked_count > 0,
                 'count': liked_count,
                 'target': target_count,
+                'throttled': throttled,
+                'exhausted': exhausted,
                 'message': f'Curtiu {liked_count} de {target_count} posts solicitados'
+                           + (' (limite diário atingido)' if throttled else '')
+                           + (' (feed esgotado)' if exhausted else '')
             }
             
         except Exception as e:
             logger.error(f"Error in like_posts: {str(e)}")
             # Marcar sessão como falha
-            if 'session' in locals():
-                session.status = 'failed'
-                session.error_message = str(e)
-                db.session.commit()
+            if session_id is not None:
+                await automation_log_writer.finish_session(session_id, liked_count, error_message=str(e))
             
             return {
                 'success': False,
@@ -432,126 +734,146 @@ class LinkedInAutomationService:
         if not self.is_logged_in:
             return {'success': False, 'message': 'Usuário não está logado'}
         
+        session_id = None
+        connected_count = 0
+        throttled = False
+        
         try:
-            # Criar sessão de automação
-            session = AutomationSession(
-                user_id=user_id,
-                action_type='connect',
-                target_count=target_count,
-                status='running'
-            )
-            db.session.add(session)
-            db.session.commit()
+            await automation_scheduler.ensure_user(user_id)
+            # Criar sessão de automação (gravada na thread de banco)
+            session_id, connected_count = await self._open_session(user_id, 'connect', target_count)
+            network_start = self._network_snapshot()
             
-            # Navegar para página de pessoas sugeridas
-            await self.page.goto('https://www.linkedin.com/mynetwork/', wait_until='networkidle')
+            # Navegar para página de pessoas sugeridas e aguardar botões de conectar
+            page_timings = await self._prepare_page(LINKEDIN_NETWORK_URL, 'connect', force=True)
             
-            # Aguardar carregamento
-            await self.page.wait_for_selector('button[aria-label*="Conectar"], button[data-test-id="connect-button"]', timeout=15000)
-            
-            connected_count = 0
+            scanner = await DomScanner.for_page(self.page)
+            cursor = self._feed_cursor(scanner, 'connect', NETWORK_SOURCES, distance=600)
             attempts = 0
             max_attempts = target_count * 3
+            timer = None
+            exhausted = False
             
             while connected_count < target_count and attempts < max_attempts:
                 attempts += 1
                 
                 try:
-                    # Buscar botões de conectar
-                    connect_buttons = await self.page.query_selector_all(
-                        'button[aria-label*="Conectar"]:not(:disabled), '
-                        'button[data-test-id="connect-button"]:not(:disabled)'
-                    )
+                    if await self._watch_memory(cursor.action):
+                        scanner = cursor.scanner = await DomScanner.for_page(self.page)
                     
-                    if not connect_buttons:
-                        # Scroll para carregar mais sugestões
-                        await self.page.evaluate('window.scrollBy(0, 600)')
-                        await asyncio.sleep(self.secure_random.uniform(2, 3))
+                    timer = timer or ActionTimer()
+                    with timer.phase('find'):
+                        # Próximos botões de conectar ainda não processados nem já convidados
+                        targets = await self._next_fresh_targets(scanner, user_id, 'connect', limit=2)
+                        
+                        if not targets:
+                            # Rolagem adaptativa; False quando as sugestões esgotaram
+                            exhausted = not await cursor.advance(timer)
+                    if exhausted:
+                        break
+                    if not targets:
                         continue
                     
                     # Selecionar botão aleatório
-                    button_index = self.secure_random.randint(0, min(len(connect_buttons) - 1, 1))
-                    button = connect_buttons[button_index]
-                    
-                    # Scroll para o botão
-                    await button.scroll_into_view_if_needed()
-                    await asyncio.sleep(self.secure_random.uniform(1, 2))
+                    button_index = self.secure_random.randint(0, len(targets) - 1)
+                    target = targets[button_index]
+                    scanner.mark_processed([target['id']])
+                    button = scanner.locator(target['id'])
                     
-                    # Clicar no botão
-                    await button.click()
-                    
-                    # Verificar se apareceu modal de personalização
+                    # Limite diário como token bucket: parar quando esgotar
+                    if not automation_scheduler.try_acquire(user_id, 'connect'):
+                        throttled = True
+                        break
                     try:
-                        send_button = await self.page.wait_for_selector(
-                            'button[aria-label*="Enviar"], button[data-test-id="send-invite"]',
-                            timeout=3000
-                        )
-                        if send_button:
-                            await send_button.click()
+                        # Scroll para o botão
+                        with timer.phase('scroll'):
+                            await button.scroll_into_view_if_needed()
+                        with timer.phase('pre_click_delay'):
+                            await self._pause(1, 2, timer)
+                        
+                        # Clicar no botão
+                        with timer.phase('click'):
+                            await button.click()
                     except Exception:
-                        # Modal pode não aparecer, continuar
-                        pass
+                        automation_scheduler.release(user_id, 'connect')
+                        raise
                     
-                    # Verificar se apareceu modal de "fechar"
-                    try:
-                        close_button = await self.page.wait_for_selector(
-                            'button[aria-label*="Fechar"], button[data-test-id="close"]',
-                            timeout=2000
-                        )
-                        if close_button:
-                            await close_button.click()
-                    except Exception:
-                        # Ignorar se não houver modal
-                        pass
+                    with timer.phase('modal'):
+                        # Verificar se apareceu modal de personalização
+                        try:
+                            send_button = self.page.locator(
+                                'button[aria-label*="Enviar"], button[data-test-id="send-invite"]'
+                            ).first
+                            await send_button.click(timeout=3000)
+                        except Exception:
+                            # Modal pode não aparecer, continuar
+                            pass
+                        
+                        # Verificar se apareceu modal de "fechar"
+                        try:
+                            close_button = self.page.locator(
+                                'button[aria-label*="Fechar"], button[data-test-id="close"]'
+                            ).first
+                            await close_button.click(timeout=2000)
+                        except Exception:
+                            # Ignorar se não houver modal
+                            pass
                     
                     connected_count += 1
-                    
-                    # Log da ação
-                    log_entry = AutomationLog(
-                        session_id=session.id,
-                        user_id=user_id,
-                        action='connect',
-                        target_element='profile',
-                        success=True,
-                        details={'attempt': attempts, 'button_index': button_index}
-                    )
-                    db.session.add(log_entry)
+                    interaction_index.record(user_id, 'connect', target['urn'])
                     
                     logger.info(f"Connection sent successfully ({connected_count}/{target_count})")
+                    self._report_progress(connected_count, target_count)
+                    
+                    # Log da ação antes da pausa
+                    row = self._log_action(session_id, user_id, 'connect', 'profile', target['urn'], timer, {
+                        'attempt': attempts,
+                        'button_index': button_index,
+                        'target_id': target['id'],
+                        'profile': target['urn']
+                    })
+                    self._checkpoint(session_id, connected_count, last_target=target['urn'])
                     
-                    # Delay entre ações
-                    await asyncio.sleep(self.secure_random.uniform(3, 5))
+                    try:
+                        # Delay entre ações
+                        with timer.phase('post_action_delay'):
+                            await self._pause(3, 5, timer)
+                    finally:
+                        self._complete_timing('connect', row, timer)
+                        timer = None
                     
                 except Exception as e:
                     logger.warning(f"Error sending connection: {str(e)}")
+                    timer = None
                     continue
             
-            # Atualizar sessão
-            session.actual_count = connected_count
-            session.status = 'completed' if connected_count > 0 else 'failed'
-            session.completed_at = datetime.now(timezone.utc)
-            
-            # Atualizar estatísticas
-            stats = UserStats.query.filter_by(user_id=user_id).first()
-            if stats:
-                stats.total_connections += connected_count
-                stats.updated_at = datetime.now(timezone.utc)
-            
-            db.session.commit()
+            # Finalizar sessão e estatísticas após gravar os logs pendentes
+            await automation_log_writer.finish_session(
+                session_id,
+                connected_count,
+                metadata={
+                    'network': self._network_usage(network_start),
+                    'page': page_timings,
+                    'feed_cursor': cursor.get_state()
+                }
+            )
             
             return {
                 'success': connected_count > 0,
                 'count': connected_count,
                 'target': target_count,
+                'throttled': throttled,
+                'exhausted': exhausted,
                 'message': f'Enviou {connected_count} de {target_count} solicitações de conexão'
+                           + (' (limite diário atingido)' if throttled else '')
+                           + (' (sugestões esgotadas)' if exhausted else '')
             }
             
         except Exception as e:
             logger.error(f"Error in send_connections: {str(e)}")
-            if 'session' in locals():
-                session.status = 'failed'
-                session.error_message = str(e)
-                db.session.commit()
+            # Marcar sessão como falha
+            if session_id is not None:
+                await automation_log_writer.finish_session(session_id, connected_count, error_message=str(e))
             
             return {
                 'success': False,
@@ -559,128 +881,360 @@ class LinkedInAutomationService:
                 'message': f'Erro na automação: {str(e)}'
             }
     
+    async def _next_fresh_targets(self, scanner: DomScanner, user_id: int,
+                                  kind: str, limit: int) -> List[Dict[str, any]]:
+        """Próximos alvos do scanner, pulando os já trabalhados em sessões anteriores"""
+        while True:
+            targets = await scanner.next_targets(kind, limit=limit)
+            if not targets:
+                return []
+            
+            known = await interaction_index.filter_known(user_id, kind, (t['urn'] for t in targets))
+            if not known:
+                return targets
+            
+            # Alvos conhecidos saem do scanner sem clique; consultar de novo
+            scanner.mark_processed(t['id'] for t in targets if t['urn'] in known)
+            fresh = [t for t in targets if t['urn'] not in known]
+            if fresh:
+                return fresh
+    
+    async def _next_fresh_posts(self, scanner: DomScanner, user_id: int,
+                                kinds: List[str], limit: int) -> List[Dict[str, any]]:
+        """Próximos posts do scanner sem as ações já feitas em cada um"""
+        while True:
+            posts = await scanner.next_posts(kinds, limit=limit)
+            if not posts:
+                return []
+            
+            for kind in kinds:
+                urns = [p['urn'] for p in posts if kind in p['targets']]
+                known = await interaction_index.filter_known(user_id, kind, urns)
+                for post in posts:
+                    if post['urn'] in known and kind in post['targets']:
+                        scanner.mark_processed([post['targets'].pop(kind)])
+            
+            fresh = [p for p in posts if p['targets']]
+            if fresh:
+                return fresh
+    
+    async def _click_like(self, button: Locator, timer: ActionTimer):
+        """Rolar até o botão de curtir e clicar"""
+        with timer.phase('scroll'):
+            await button.scroll_into_view_if_needed()
+        with timer.phase('pre_click_delay'):
+            await self._pause(1, 2, timer)
+        with timer.phase('click'):
+            await button.click()
+    
+    async def _write_comment(self, button: Locator, timer: ActionTimer) -> str:
+        """Abrir caixa de comentário do post, escrever e enviar; retorna o texto"""
+        with timer.phase('scroll'):
+            await button.scroll_into_view_if_needed()
+        with timer.phase('pre_click_delay'):
+            await self._pause(1, 2, timer)
+        
+        # Clicar no botão de comentar
+        with timer.phase('click'):
+            await button.click()
+        
+        with timer.phase('modal'):
+            # Aguardar caixa de comentário aparecer
+            comment_box = self.page.locator(
+                'div[contenteditable="true"], textarea[placeholder*="comentário"]'
+            ).first
+            await comment_box.wait_for(state='visible', timeout=5000)
+            
+            # Escrever comentário
+            comment_text = self.secure_random.choice(self.safe_comments)
+            await comment_box.fill(comment_text)
+            
+            # Aguardar um pouco antes de enviar
+            await self._pause(1, 2, timer)
+            
+            # Buscar e clicar no botão de enviar
+            send_button = self.page.locator(
+                'button[data-test-id="comment-submit"], button[type="submit"]'
+            ).first
+            await send_button.click(timeout=3000)
+        return comment_text
+    
     async def comment_posts(self, user_id: int, target_count: int = 1) -> Dict[str, any]:
         """Comentar em posts com validação"""
         if not self.is_logged_in:
             return {'success': False, 'message': 'Usuário não está logado'}
         
+        session_id = None
+        commented_count = 0
+        throttled = False
+        
         try:
-            # Criar sessão de automação
-            session = AutomationSession(
-                user_id=user_id,
-                action_type='comment',
-                target_count=target_count,
-                status='running'
-            )
-            db.session.add(session)
-            db.session.commit()
+            await automation_scheduler.ensure_user(user_id)
+            # Criar sessão de automação (gravada na thread de banco)
+            session_id, commented_count = await self._open_session(user_id, 'comment', target_count)
+            network_start = self._network_snapshot()
             
-            # Navegar para feed
-            if not self.page.url.endswith('/feed/'):
-                await self.page.goto('https://www.linkedin.com/feed/', wait_until='networkidle')
+            # Navegar para feed se necessário e aguardar o primeiro botão ou o feed
+            page_timings = await self._prepare_page(LINKEDIN_FEED_URL, 'comment')
             
-            # Aguardar carregamento
-            await self.page.wait_for_selector('button[aria-label*="comentar"], button[aria-label*="comment"]', timeout=15000)
-            
-            commented_count = 0
+            scanner = await DomScanner.for_page(self.page)
+            cursor = self._feed_cursor(scanner, 'comment', FEED_SOURCES)
             attempts = 0
             max_attempts = target_count * 5
+            timer = None
+            exhausted = False
             
             while commented_count < target_count and attempts < max_attempts:
                 attempts += 1
                 
                 try:
-                    # Buscar botões de comentar
-                    comment_buttons = await self.page.query_selector_all(
-                        'button[aria-label*="comentar"], button[aria-label*="comment"]'
-                    )
+                    if await self._watch_memory(cursor.action):
+                        scanner = cursor.scanner = await DomScanner.for_page(self.page)
                     
-                    if not comment_buttons:
-                        await self.page.evaluate('window.scrollBy(0, 800)')
-                        await asyncio.sleep(self.secure_random.uniform(2, 3))
+                    timer = timer or ActionTimer()
+                    with timer.phase('find'):
+                        # Próximos botões de comentar ainda não processados nem já comentados
+                        targets = await self._next_fresh_targets(scanner, user_id, 'comment', limit=3)
+                        
+                        if not targets:
+                            exhausted = not await cursor.advance(timer)
+                    if exhausted:
+                        break
+                    if not targets:
                         continue
                     
                     # Selecionar botão aleatório
-                    button_index = self.secure_random.randint(0, min(len(comment_buttons) - 1, 2))
-                    button = comment_buttons[button_index]
+                    button_index = self.secure_random.randint(0, len(targets) - 1)
+                    target = targets[button_index]
+                    scanner.mark_processed([target['id']])
                     
-                    # Scroll para o botão
-                    await button.scroll_into_view_if_needed()
-                    await asyncio.sleep(self.secure_random.uniform(1, 2))
+                    # Limite diário como token bucket: parar quando esgotar
+                    if not automation_scheduler.try_acquire(user_id, 'comment'):
+                        throttled = True
+                        break
+                    try:
+                        comment_text = await self._write_comment(scanner.locator(target['id']), timer)
+                    except Exception:
+                        automation_scheduler.release(user_id, 'comment')
+                        raise
+                    commented_count += 1
+                    interaction_index.record(user_id, 'comment', target['urn'])
                     
-                    # Clicar no botão de comentar
-                    await button.click()
+                    logger.info(f"Comment posted successfully ({commented_count}/{target_count})")
+                    self._report_progress(commented_count, target_count)
                     
-                    # Aguardar caixa de comentário aparecer
-                    comment_box = await self.page.wait_for_selector(
-                        'div[contenteditable="true"], textarea[placeholder*="comentário"]',
-                        timeout=5000
-                    )
+                    # Log da ação antes da pausa
+                    row = self._log_action(session_id, user_id, 'comment', 'post', target['urn'], timer, {
+                        'comment': comment_text,
+                        'attempt': attempts,
+                        'target_id': target['id'],
+                        'urn': target['urn']
+                    })
+                    self._checkpoint(session_id, commented_count, last_target=target['urn'])
                     
-                    if comment_box:
-                        # Escrever comentário
-                        comment_text = self.secure_random.choice(self.safe_comments)
-                        await comment_box.fill(comment_text)
-                        
-                        # Aguardar um pouco antes de enviar
-                        await asyncio.sleep(self.secure_random.uniform(1, 2))
-                        
-                        # Buscar e clicar no botão de enviar
-                        send_button = await self.page.wait_for_selector(
-                            'button[data-test-id="comment-submit"], button[type="submit"]',
-                            timeout=3000
-                        )
-                        
-                        if send_button:
-                            await send_button.click()
-                            commented_count += 1
-                            
-                            # Log da ação
-                            log_entry = AutomationLog(
-                                session_id=session.id,
-                                user_id=user_id,
-                                action='comment',
-                                target_element='post',
-                                success=True,
-                                details={'comment': comment_text, 'attempt': attempts}
-                            )
-                            db.session.add(log_entry)
-                            
-                            logger.info(f"Comment posted successfully ({commented_count}/{target_count})")
-                            
-                            # Delay entre ações
-                            await asyncio.sleep(self.secure_random.uniform(4, 6))
+                    try:
+                        # Delay entre ações
+                        with timer.phase('post_action_delay'):
+                            await self._pause(4, 6, timer)
+                    finally:
+                        self._complete_timing('comment', row, timer)
+                        timer = None
                     
                 except Exception as e:
                     logger.warning(f"Error commenting on post: {str(e)}")
+                    timer = None
                     continue
             
-            # Atualizar sessão
-            session.actual_count = commented_count
-            session.status = 'completed' if commented_count > 0 else 'failed'
-            session.completed_at = datetime.now(timezone.utc)
-            
-            # Atualizar estatísticas
-            stats = UserStats.query.filter_by(user_id=user_id).first()
-            if stats:
-                stats.total_comments += commented_count
-                stats.updated_at = datetime.now(timezone.utc)
-            
-            db.session.commit()
+            # Finalizar sessão e estatísticas após gravar os logs pendentes
+            await automation_log_writer.finish_session(
+                session_id,
+                commented_count,
+                metadata={
+                    'network': self._network_usage(network_start),
+                    'page': page_timings,
+                    'feed_cursor': cursor.get_state()
+                }
+            )
             
             return {
                 'success': commented_count > 0,
                 'count': commented_count,
                 'target': target_count,
+                'throttled': throttled,
+                'exhausted': exhausted,
                 'message': f'Comentou em {commented_count} de {target_count} posts'
+                           + (' (limite diário atingido)' if throttled else '')
+                           + (' (feed esgotado)' if exhausted else '')
             }
             
         except Exception as e:
             logger.error(f"Error in comment_posts: {str(e)}")
-            if 'session' in locals():
-                session.status = 'failed'
-                session.error_message = str(e)
-                db.session.commit()
+            # Marcar sessão como falha
+            if session_id is not None:
+                await automation_log_writer.finish_session(session_id, commented_count, error_message=str(e))
+            
+            return {
+                'success': False,
+                'count': 0,
+                'message': f'Erro na automação: {str(e)}'
+            }
+    
+    async def run_feed_plan(self, user_id: int, plan: Dict[str, int]) -> Dict[str, any]:
+        """Executar várias ações do feed em uma única passagem, post a post"""
+        if not self.is_logged_in:
+            return {'success': False, 'message': 'Usuário não está logado'}
+        
+        plan = {action: count for action, count in plan.items() if action in FEED_PLAN_ACTIONS and count > 0}
+        if not plan:
+            return {'success': False, 'count': 0, 'message': 'Plano de feed sem ações válidas'}
+        
+        total_target = sum(plan.values())
+        counts = {action: 0 for action in plan}
+        throttled = set()
+        session_ids: Dict[str, int] = {}
+        
+        try:
+            await automation_scheduler.ensure_user(user_id)
+            # Uma sessão por tipo de ação, ligadas pelo metadata 'feed_plan'
+            for action, count in plan.items():
+                session_ids[action], counts[action] = await self._open_session(user_id, action, count)
+            # Plano no checkpoint: sessão órfã é retomada com o plano inteiro, não só a sua ação
+            for action, session_id in session_ids.items():
+                self._checkpoint(session_id, counts[action], feed_plan={'plan': plan, 'sessions': session_ids})
+            network_start = self._network_snapshot()
+            
+            # Uma única navegação para todas as ações do plano
+            page_timings = await self._prepare_page(LINKEDIN_FEED_URL, next(iter(plan)))
+            
+            scanner = await DomScanner.for_page(self.page)
+            cursor = self._feed_cursor(scanner, next(iter(plan)), FEED_SOURCES)
+            attempts = 0
+            max_attempts = total_target * 3
+            posts_visited = 0
+            post_timer = None
+            exhausted = False
+            
+            while sum(counts.values()) < total_target and attempts < max_attempts:
+                attempts += 1
+                remaining = [
+                    action for action in plan
+                    if counts[action] < plan[action] and action not in throttled
+                ]
+                if not remaining:
+                    break
+                
+                try:
+                    if await self._watch_memory(cursor.action):
+                        scanner = cursor.scanner = await DomScanner.for_page(self.page)
+                    
+                    # Fases do post (busca e delay final) são divididas entre suas ações
+                    post_timer = post_timer or ActionTimer()
+                    with post_timer.phase('find'):
+                        # Próximos posts com os botões de cada ação pendente ainda não trabalhados
+                        posts = await self._next_fresh_posts(scanner, user_id, remaining, limit=3)
+                        
+                        if not posts:
+                            exhausted = not await cursor.advance(post_timer)
+                except Exception as e:
+                    logger.warning(f"Error finding posts in feed plan: {str(e)}")
+                    post_timer = None
+                    # Continuar tentando na próxima iteração
+                    continue
+                if exhausted:
+                    break
+                if not posts:
+                    continue
+                
+                post = posts[self.secure_random.randint(0, len(posts) - 1)]
+                scanner.mark_processed(post['targets'].values())
+                posts_visited += 1
+                done = []
+                
+                # Aplicar ao post todas as ações pendentes que ele oferece
+                for action in remaining:
+                    target_id = post['targets'].get(action)
+                    if target_id is None:
+                        continue
+                    
+                    # Limite diário esgotado encerra só esta ação do plano
+                    if not automation_scheduler.try_acquire(user_id, action):
+                        throttled.add(action)
+                        continue
+                    
+                    try:
+                        timer = ActionTimer()
+                        details = {'attempt': attempts, 'target_id': target_id, 'urn': post['urn']}
+                        try:
+                            if action == 'like':
+                                await self._click_like(scanner.locator(target_id), timer)
+                            else:
+                                details['comment'] = await self._write_comment(scanner.locator(target_id), timer)
+                        except Exception:
+                            automation_scheduler.release(user_id, action)
+                            raise
+                        counts[action] += 1
+                        interaction_index.record(user_id, action, post['urn'])
+                        done.append((action, timer, details))
+                        
+                        logger.info(f"Feed plan {action} done ({counts[action]}/{plan[action]})")
+                        self._report_progress(sum(counts.values()), total_target)
+                        
+                    except Exception as e:
+                        logger.warning(f"Error applying {action} in feed plan: {str(e)}")
+                
+                # Logs do post antes da pausa, com a fração da busca compartilhada
+                logged = []
+                for action, timer, details in done:
+                    timer.share_of(post_timer, len(done))
+                    logged.append((action, timer, self._log_action(
+                        session_ids[action], user_id, action, 'post', post['urn'], timer, details
+                    )))
+                    self._checkpoint(session_ids[action], counts[action], last_target=post['urn'])
+                post_timer = None
+                
+                delay_timer = ActionTimer()
+                try:
+                    # Delay entre posts
+                    with delay_timer.phase('post_action_delay'):
+                        await self._pause(2, 4, delay_timer)
+                finally:
+                    for action, timer, row in logged:
+                        self._complete_timing(action, row, timer.share_of(delay_timer, len(logged)))
+            
+            # Finalizar cada sessão com o resumo compartilhado da passagem
+            feed_plan = {
+                'sessions': session_ids,
+                'plan': plan,
+                'posts_visited': posts_visited,
+                'feed_cursor': cursor.get_state()
+            }
+            network = self._network_usage(network_start)
+            for action, session_id in session_ids.items():
+                await automation_log_writer.finish_session(
+                    session_id,
+                    counts[action],
+                    metadata={'network': network, 'page': page_timings, 'feed_plan': feed_plan}
+                )
+            
+            total = sum(counts.values())
+            return {
+                'success': total > 0,
+                'count': total,
+                'target': total_target,
+                'counts': counts,
+                'sessions': session_ids,
+                'throttled': sorted(throttled),
+                'exhausted': exhausted,
+                'message': f'Executou {total} de {total_target} ações em uma passagem pelo feed'
+                           + (' (limite diário atingido)' if throttled else '')
+                           + (' (feed esgotado)' if exhausted else '')
+            }
+            
+        except Exception as e:
+            logger.error(f"Error in run_feed_plan: {str(e)}")
+            # Marcar sessões como falha
+            for action, session_id in session_ids.items():
+                await automation_log_writer.finish_session(session_id, counts[action], error_message=str(e))
             
             return {
                 'success': False,
@@ -690,17 +1244,28 @@ class LinkedInAutomationService:
     
     async def cleanup(self):
         """Limpar recursos do navegador"""
+        # Sessões não finalizadas param de dar sinal de vida e vão para o reaper
+        for session_id in self._session_ids:
+            session_monitor.untrack(session_id)
+        self._session_ids = []
+        
         try:
-            if self.page:
-                await self.page.close()
-            if self.context:
-                await self.context.close()
-            if self.browser:
-                await self.browser.close()
+            if self.lease is not None:
+                # Devolver contexto ao pool mantendo-o aquecido
+                await self.pool.release(self.lease)
+                self.lease = None
+            else:
+                if self.page:
+                    await self.page.close()
+                if self.context:
+                    await self.context.close()
+                if self.browser:
+                    await self.browser.close()
             
             self.page = None
             self.context = None
             self.browser = None
+            self.request_filter = None
             self.is_logged_in = False
             self.current_user_id = None
             
@@ -713,6 +1278,83 @@ class LinkedInAutomationService:
 # Instâncias globais dos serviços
 oauth_service = LinkedInOAuthService()
 automation_service = LinkedInAutomationService()
+browser_pool = BrowserPool()
+
+
+def create_pooled_automation_service() -> LinkedInAutomationService:
+    """Criar serviço de automação por usuário apoiado no pool compartilhado"""
+    return LinkedInAutomationService(pool=browser_pool)
+
+
+# Métodos do serviço por tipo de ação
+AUTOMATION_ACTIONS = {
+    'like': 'like_posts',
+    'connect': 'send_connections',
+    'comment': 'comment_posts'
+}
+
+
+async def run_automation_job(job: AutomationJob) -> Dict[str, any]:
+    """Executar job de automação em um contexto alugado do pool"""
+    service = create_pooled_automation_service()
+    service.progress_callback = job.update_progress
+    service.resume_session_id = job.resume_session_id
+    service.resume_sessions = dict(job.resume_sessions or {})
+    session_monitor.start()
+    
+    # Teto global de contextos de navegador em uso simultâneo
+    async with automation_scheduler.context_slot():
+        try:
+            if not await service.login_manual(job.user_id):
+                return {
+                    'success': False,
+                    'count': 0,
+                    'message': 'Não foi possível autenticar no LinkedIn'
+                }
+            
+            if job.action == 'feed_plan':
+                return await service.run_feed_plan(job.user_id, job.plan)
+            
+            action_method = getattr(service, AUTOMATION_ACTIONS[job.action])
+            return await action_method(job.user_id, job.target_count)
+        
+        finally:
+            await service.cleanup()
+
+
+async def shutdown_automation_browsers():
+    """Fechar o pool e o driver Playwright no loop do runtime"""
+    await browser_pool.close()
+    await playwright_driver.stop()
+
+
+def resume_automation_session(claim: Dict[str, any]) -> bool:
+    """Reenfileirar sessão órfã reivindicada pelo reaper para continuar do checkpoint"""
+    feed_plan = claim.get('feed_plan')
+    try:
+        if feed_plan:
+            # Sessões do plano voltam juntas, numa nova passagem pelo feed
+            job_queue.enqueue(
+                claim['user_id'], 'feed_plan', sum(feed_plan['plan'].values()),
+                plan=feed_plan['plan'], resume_sessions=feed_plan['sessions']
+            )
+        else:
+            job_queue.enqueue(
+                claim['user_id'], claim['action'], claim['target_count'],
+                resume_session_id=claim['session_id']
+            )
+    except JobQueueFullError:
+        return False
+    return True
+
+
+# Navegadores e driver pertencem ao loop do runtime: fechados no seu shutdown
+automation_runtime.add_shutdown_hook(shutdown_automation_browsers)
+
+job_queue = JobQueue(handler=run_automation_job)
+session_monitor.set_resume_handler(resume_automation_session)
+token_refresher.set_refresh_handler(oauth_service.refresh_access_token)
+
 
 # Alias para compatibilidade
 LinkedInService = LinkedInAutomationService
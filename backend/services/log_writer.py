@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Escritor de Logs de Automação
+Agrupa AutomationLog em memória e grava em lote fora do event loop
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, insert, update
+from config import Config
+from models import db, AutomationSession, AutomationLog, UserStats, insert_missing_interactions, local_day
+from services.metrics import summarize
+from services.usage_counter import usage_counter
+
+logger = logging.getLogger(__name__)
+
+# Campo de UserStats incrementado por tipo de ação
+STATS_FIELDS = {
+    'like': 'total_likes',
+    'connect': 'total_connections',
+    'comment': 'total_comments'
+}
+
+
+class AutomationLogWriter:
+    """Buffer de AutomationLog com flush em lote por tamanho ou tempo
+
+    Todas as escritas rodam em uma única thread de banco, o que tira o I/O do
+    event loop e serializa os commits (evitando disputa pelo lock do SQLite).
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.batch_size = batch_size or Config.AUTOMATION_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.AUTOMATION_LOG_FLUSH_INTERVAL
+
+        self.app = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._interactions: List[Dict[str, Any]] = []
+        self._updates: List[Dict[str, Any]] = []  # logs já gravados a completar no próximo lote
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._timer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._flush_scheduled = False
+
+        # Métricas do escritor
+        self.metrics = defaultdict(int)
+        self.batch_sizes = deque(maxlen=1000)
+        self.flush_times = deque(maxlen=1000)
+
+    def init_app(self, app):
+        """Associar aplicação Flask usada pela thread de banco"""
+        self.app = app
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Iniciar thread de banco e o flush periódico"""
+        with self._lock:
+            if self._executor is not None:
+                return
+
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='automation-db')
+            self._timer = threading.Thread(target=self._periodic_flush, name='automation-log-flush', daemon=True)
+            self._timer.start()
+
+        atexit.register(self.shutdown)
+
+    def shutdown(self):
+        """Gravar o que restou no buffer e parar as threads"""
+        if self._executor is None:
+            return
+
+        self._stop.set()
+        try:
+            try:
+                self._executor.submit(self._flush).result()
+            except RuntimeError:
+                # Na saída do interpretador o executor já foi encerrado: gravar aqui
+                self._flush()
+        except Exception as e:
+            logger.error(f"Error flushing automation logs on shutdown: {str(e)}")
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _periodic_flush(self):
+        """Flush por tempo enquanto houver dados no buffer"""
+        while not self._stop.wait(self.flush_interval):
+            if self._buffer or self._updates:
+                self._schedule_flush()
+
+    # ==================== ESCRITA ====================
+
+    def add(self, session_id: int, user_id: int, action: str, success: bool,
+            target_element: Optional[str] = None, details: Optional[Dict] = None,
+            error_message: Optional[str] = None, execution_time_ms: Optional[int] = None,
+            target_urn: Optional[str] = None) -> Dict[str, Any]:
+        """Adicionar log ao buffer sem bloquear o event loop
+
+        Com target_urn, a interação bem-sucedida também vai para o índice de
+        interações no mesmo lote. Retorna a linha, para update_log().
+        """
+        now = datetime.now(timezone.utc)
+        row = {
+            'session_id': session_id,
+            'user_id': user_id,
+            'action': action,
+            'success': success,
+            'target_element': target_element,
+            'details': details,
+            'error_message': error_message,
+            'execution_time_ms': execution_time_ms,
+            'created_at': now,
+            'updated_at': now
+        }
+
+        self.start()
+        with self._lock:
+            self._buffer.append(row)
+            if target_urn and success:
+                self._interactions.append({'user_id': user_id, 'action': action, 'target_urn': target_urn})
+            self.metrics['buffered'] += 1
+            should_flush = len(self._buffer) >= self.batch_size
+
+        if should_flush:
+            self._schedule_flush()
+        return row
+
+    def update_log(self, row: Dict[str, Any], details: Optional[Dict], execution_time_ms: Optional[int]):
+        """Completar log já enfileirado (ex.: tempo da pausa após a ação)
+
+        Se o lote da linha ainda não saiu, altera o buffer; senão o UPDATE vai
+        no próximo lote, que a thread de banco grava depois do INSERT.
+        """
+        with self._lock:
+            if any(pending is row for pending in self._buffer):
+                row['details'] = details
+                row['execution_time_ms'] = execution_time_ms
+                return
+            self._updates.append({
+                'b_session_id': row['session_id'],
+                'b_created_at': row['created_at'],
+                'b_details': details,
+                'b_execution_time_ms': execution_time_ms
+            })
+            self.metrics['updates'] += 1
+
+    def _schedule_flush(self):
+        """Agendar flush na thread de banco (no máximo um pendente)"""
+        with self._lock:
+            if self._flush_scheduled or self._executor is None:
+                return
+            self._flush_scheduled = True
+        self._executor.submit(self._flush)
+
+    def _flush(self) -> int:
+        """Gravar o buffer com um único INSERT em lote (roda na thread de banco)"""
+        with self._lock:
+            self._flush_scheduled = False
+            rows, self._buffer = self._buffer, []
+            interactions, self._interactions = self._interactions, []
+            updates, self._updates = self._updates, []
+
+        if not rows and not updates:
+            return 0
+
+        started = time.monotonic()
+        try:
+            self._run_in_app_context(lambda: self._bulk_insert(rows, interactions, updates))
+        except Exception as e:
+            # Devolver ao buffer para nova tentativa no próximo flush
+            with self._lock:
+                self._buffer[:0] = rows
+                self._interactions[:0] = interactions
+                self._updates[:0] = updates
+            self.metrics['flush_errors'] += 1
+            logger.error(f"Error flushing {len(rows)} automation logs: {str(e)}")
+            raise
+
+        self.metrics['flushed'] += len(rows)
+        self.metrics['batches'] += 1
+        self.batch_sizes.append(len(rows))
+        self.flush_times.append(time.monotonic() - started)
+        return len(rows)
+
+    @staticmethod
+    def _bulk_insert(rows: List[Dict[str, Any]], interactions: List[Dict[str, Any]] = (),
+                     updates: List[Dict[str, Any]] = ()):
+        """INSERT executemany sem instanciar objetos ORM, seguido dos UPDATEs pendentes"""
+        try:
+            if rows:
+                db.session.execute(insert(AutomationLog), rows)
+            if interactions:
+                insert_missing_interactions(interactions)
+            if updates:
+                table = AutomationLog.__table__
+                db.session.execute(
+                    update(table)
+                    .where(table.c.session_id == bindparam('b_session_id'),
+                           table.c.created_at == bindparam('b_created_at'))
+                    .values(details=bindparam('b_details'), execution_time_ms=bindparam('b_execution_time_ms')),
+                    updates
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _run_in_app_context(self, fn: Callable[[], Any]) -> Any:
+        """Executar função com sessão de banco própria da thread"""
+        if self.app is None:
+            return fn()
+        with self.app.app_context():
+            return fn()
+
+    async def run_in_db_thread(self, fn: Callable[[], Any]) -> Any:
+        """Executar função na thread de banco e aguardar sem bloquear o loop"""
+        self.start()
+        return await asyncio.wrap_future(
+            self._executor.submit(self._run_in_app_context, fn)
+        )
+
+    async def flush(self) -> int:
+        """Forçar gravação do buffer e aguardar"""
+        self.start()
+        return await asyncio.wrap_future(self._executor.submit(self._flush))
+
+    # ==================== SESSÕES ====================
+
+    async def create_session(self, user_id: int, action_type: str, target_count: int) -> int:
+        """Criar AutomationSession em execução e retornar seu id"""
+        def create():
+            session = AutomationSession(
+                user_id=user_id,
+                action_type=action_type,
+                target_count=target_count
+            )
+            session.start_session()
+            db.session.add(session)
+            db.session.commit()
+            return session.id
+
+        return await self.run_in_db_thread(create)
+
+    async def finish_session(self, session_id: int, actual_count: int,
+                             error_message: Optional[str] = None,
+                             metadata: Optional[Dict[str, Any]] = None):
+        """Gravar logs pendentes e finalizar sessão e estatísticas"""
+        # Garante que nenhum log da sessão fique apenas em memória
+        try:
+            await self.flush()
+        except Exception:
+            # Linhas continuam no buffer e serão regravadas no próximo flush
+            pass
+
+        await self.run_in_db_thread(
+            lambda: self.finalize_session(session_id, actual_count, error_message, metadata)
+        )
+
+    @staticmethod
+    def finalize_session(session_id: int, actual_count: int,
+                         error_message: Optional[str] = None,
+                         metadata: Optional[Dict[str, Any]] = None):
+        """Finalizar sessão e somar estatísticas (precisa de contexto de aplicação)"""
+        session = db.session.get(AutomationSession, session_id)
+        if session is None:
+            return
+
+        # Uso diário conta uma vez, no dia em que a sessão foi criada
+        counted = None
+        if error_message or actual_count == 0:
+            session.fail_session(error_message)
+            session.actual_count = actual_count
+        else:
+            if session.status != 'completed':
+                counted = (session.user_id, local_day(session.created_at), session.action_type)
+                usage_counter.increment(*counted, actual_count)
+            session.complete_session(actual_count)
+
+        if metadata:
+            session.session_metadata = {**(session.session_metadata or {}), **metadata}
+
+        stats = UserStats.query.filter_by(user_id=session.user_id).first()
+        field = STATS_FIELDS.get(session.action_type)
+        if stats and field and actual_count:
+            setattr(stats, field, getattr(stats, field) + actual_count)
+            stats.updated_at = datetime.now(timezone.utc)
+
+        db.session.commit()
+        if counted:
+            usage_counter.invalidate(*counted)
+
+    async def resume_session(self, session_id: int) -> Optional[Dict[str, Any]]:
+        """Reassumir sessão reivindicada pelo reaper e retornar seu checkpoint"""
+        def resume():
+            session = db.session.get(AutomationSession, session_id)
+            if session is None or session.status != 'running':
+                return None
+            session.heartbeat_at = datetime.now(timezone.utc)
+            checkpoint = {'count': session.actual_count, 'resumes': 0, **(session.checkpoint or {})}
+            db.session.commit()
+            return checkpoint
+
+        return await self.run_in_db_thread(resume)
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter estatísticas do escritor"""
+        return {
+            'buffered': len(self._buffer),
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval,
+            'rows_flushed': self.metrics['flushed'],
+            'rows_updated': self.metrics['updates'],
+            'batches': self.metrics['batches'],
+            'flush_errors': self.metrics['flush_errors'],
+            'rows_per_batch': summarize(self.batch_sizes),
+            'flush_seconds': summarize(self.flush_times)
+        }
+
+
+# Instância global do escritor
+automation_log_writer = AutomationLogWriter()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Watchdog de Memória do Chromium
+Amostra heap JS e nós do DOM de cada página via CDP e o RSS dos processos
+renderer do Chromium, indicando quando reciclar página ou contexto
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional
+
+from playwright.async_api import CDPSession, Page
+from config import Config
+from services.metrics import summarize
+from services.playwright_driver import playwright_driver
+
+try:
+    import psutil
+except ImportError:  # Sem psutil o limite de RSS fica desativado
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+MIB = 2 ** 20
+
+# Métricas de Performance.getMetrics exportadas por página
+PAGE_METRICS = {
+    'JSHeapUsedSize': 'js_heap_bytes',
+    'JSHeapTotalSize': 'js_heap_total_bytes',
+    'Nodes': 'dom_nodes',
+    'JSEventListeners': 'event_listeners',
+    'Documents': 'documents'
+}
+
+
+class MemoryWatchdog:
+    """Decide, entre ações, se a página ou o contexto deve ser recriado
+
+    Cada página é amostrada no máximo uma vez por `interval`. Heap JS ou nós
+    do DOM acima do limite pedem uma página nova no mesmo contexto.
+
+    O RSS não é atribuível a um contexto (renderers podem ser compartilhados),
+    então a média de RSS dos renderers por contexto só diz que há memória
+    demais: apenas o contexto com o maior heap JS amostrado é recriado, com
+    o mesmo storage_state, e nenhum outro por `recycle_cooldown` segundos,
+    tempo para o RSS refletir a reciclagem. Processos do navegador, GPU e
+    utilitários ficam fora da soma: são custo fixo que reciclar não reduz.
+    """
+
+    def __init__(self, interval: Optional[float] = None, max_heap_mb: Optional[float] = None,
+                 max_dom_nodes: Optional[int] = None, max_rss_mb_per_context: Optional[float] = None,
+                 recycle_cooldown: Optional[float] = None):
+        self.interval = Config.MEMORY_WATCHDOG_INTERVAL if interval is None else interval
+        self.max_heap_mb = max_heap_mb or Config.MEMORY_MAX_JS_HEAP_MB
+        self.max_dom_nodes = max_dom_nodes or Config.MEMORY_MAX_DOM_NODES
+        self.max_rss_mb_per_context = (
+            Config.MEMORY_MAX_RSS_MB_PER_CONTEXT if max_rss_mb_per_context is None else max_rss_mb_per_context
+        )
+        self.recycle_cooldown = Config.MEMORY_RECYCLE_COOLDOWN if recycle_cooldown is None else recycle_cooldown
+
+        self._sessions: 'weakref.WeakKeyDictionary[Page, CDPSession]' = weakref.WeakKeyDictionary()
+        self._checked_at: 'weakref.WeakKeyDictionary[Page, float]' = weakref.WeakKeyDictionary()
+        self._heap_by_page: 'weakref.WeakKeyDictionary[Page, float]' = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._rss_cache = (0.0, None)
+        self._context_recycled_at = float('-inf')
+
+        # Métricas do watchdog
+        self.metrics = defaultdict(int)
+        self.recycles = defaultdict(int)
+        self.heap_mb = deque(maxlen=1000)
+        self.dom_nodes = deque(maxlen=1000)
+        self.rss_mb = deque(maxlen=1000)
+        self.last_sample: Dict[str, Any] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    # ==================== AMOSTRAGEM ====================
+
+    async def sample_page(self, page: Page) -> Dict[str, float]:
+        """Ler métricas de desempenho da página pelo CDP (sessão reaproveitada)"""
+        session = self._sessions.get(page)
+        if session is None:
+            session = await page.context.new_cdp_session(page)
+            await session.send('Performance.enable')
+            self._sessions[page] = session
+
+        result = await session.send('Performance.getMetrics')
+        values = {m['name']: m['value'] for m in result.get('metrics', [])}
+        return {key: values.get(name, 0) for name, key in PAGE_METRICS.items()}
+
+    def renderer_rss_mb(self) -> Optional[float]:
+        """RSS somado dos processos renderer do Chromium (filhos deste processo)"""
+        if psutil is None:
+            return None
+
+        sampled_at, rss = self._rss_cache
+        if rss is not None and time.monotonic() - sampled_at < max(self.interval, 1):
+            return rss
+
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                if '--type=renderer' in child.cmdline():
+                    total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        rss = total / MIB
+        self._rss_cache = (time.monotonic(), rss)
+        with self._lock:
+            self.rss_mb.append(rss)
+        return rss
+
+    def _largest_context(self):
+        """Contexto vivo cujas páginas somam o maior heap JS amostrado"""
+        totals = {}
+        for page, heap_mb in list(self._heap_by_page.items()):
+            if page.is_closed():
+                # Fechada sem forget() (despejo do pool, reaper, queda da sessão): não concorre
+                self._heap_by_page.pop(page, None)
+                self._checked_at.pop(page, None)
+                self._sessions.pop(page, None)
+                self.metrics['closed_pages_dropped'] += 1
+                continue
+            context = page.context
+            totals[context] = totals.get(context, 0) + heap_mb
+        return max(totals, key=totals.get) if totals else None
+
+    # ==================== DECISÃO ====================
+
+    async def check(self, page: Page) -> Optional[str]:
+        """Retornar 'context', 'page' ou None (amostra no máximo uma vez por intervalo)"""
+        if not self.enabled or page is None:
+            return None
+
+        now = time.monotonic()
+        if now - self._checked_at.get(page, 0.0) < self.interval:
+            return None
+        self._checked_at[page] = now
+
+        try:
+            sample = await self.sample_page(page)
+        except Exception as e:
+            # Página fechando ou navegador sem CDP: tentar no próximo intervalo
+            logger.debug(f"Could not sample page memory: {str(e)}")
+            self.metrics['sample_errors'] += 1
+            return None
+
+        heap_mb = sample['js_heap_bytes'] / MIB
+        self._heap_by_page[page] = heap_mb
+        with self._lock:
+            self.metrics['samples'] += 1
+            self.heap_mb.append(heap_mb)
+            self.dom_nodes.append(sample['dom_nodes'])
+            self.last_sample = sample
+
+        if self._rss_over_limit() and self._claim_context_recycle(page, now):
+            return 'context'
+
+        if heap_mb > self.max_heap_mb or sample['dom_nodes'] > self.max_dom_nodes:
+            logger.info(f"Page memory high (heap {heap_mb:.0f}MiB, {sample['dom_nodes']:.0f} nodes), recycling page")
+            return 'page'
+        return None
+
+    def _rss_over_limit(self) -> bool:
+        if not self.max_rss_mb_per_context:
+            return False
+        rss = self.renderer_rss_mb()
+        contexts = len(playwright_driver.live_contexts()) or 1
+        return rss is not None and rss / contexts > self.max_rss_mb_per_context
+
+    def _claim_context_recycle(self, page: Page, now: float) -> bool:
+        """Reciclar o contexto desta página só se for o maior e fora do intervalo de espera"""
+        with self._lock:
+            if now - self._context_recycled_at < self.recycle_cooldown:
+                self.metrics['rss_cooldown_skips'] += 1
+                return False
+            if self._largest_context() is not page.context:
+                self.metrics['rss_not_largest'] += 1
+                return False
+            self._context_recycled_at = now
+        logger.info("Renderer RSS per context exceeds limit, recycling the context with the largest JS heap")
+        return True
+
+    async def forget(self, page: Page):
+        """Soltar a sessão CDP de uma página que será fechada"""
+        session = self._sessions.pop(page, None)
+        self._checked_at.pop(page, None)
+        self._heap_by_page.pop(page, None)
+        if session is not None:
+            try:
+                await session.detach()
+            except Exception:
+                pass
+
+    def record_recycle(self, kind: str):
+        """Contabilizar página ou contexto recriado"""
+        with self._lock:
+            self.recycles[kind] += 1
+        if kind == 'context':
+            # Próxima decisão mede o RSS de novo
+            self._rss_cache = (0.0, None)
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter amostras de memória, limites e reciclagens"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'interval': self.interval,
+                'max_js_heap_mb': self.max_heap_mb,
+                'max_dom_nodes': self.max_dom_nodes,
+                'max_rss_mb_per_context': self.max_rss_mb_per_context,
+                'recycle_cooldown': self.recycle_cooldown,
+                'rss_available': psutil is not None,
+                'samples': self.metrics['samples'],
+                'sample_errors': self.metrics['sample_errors'],
+                'js_heap_mb': summarize(self.heap_mb),
+                'dom_nodes': summarize(self.dom_nodes),
+                'renderer_rss_mb': summarize(self.rss_mb),
+                'last_sample': dict(self.last_sample),
+                'pages_recycled': self.recycles['page'],
+                'contexts_recycled': self.recycles['context'],
+                'rss_cooldown_skips': self.metrics['rss_cooldown_skips'],
+                'rss_not_largest': self.metrics['rss_not_largest'],
+                'closed_pages_dropped': self.metrics['closed_pages_dropped']
+            }
+
+
+# Instância global do watchdog
+memory_watchdog = MemoryWatchdog()
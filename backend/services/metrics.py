@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Utilitários de Métricas
+Funções compartilhadas para resumir latências dos serviços
+"""
+
+from typing import Dict, Iterable, List
+
+
+def percentile(data: List[float], percentile: int) -> float:
+    """Calcular percentil com interpolação linear"""
+    if not data:
+        return 0.0
+
+    sorted_data = sorted(data)
+    index = (percentile / 100) * (len(sorted_data) - 1)
+
+    if float(index).is_integer():
+        return sorted_data[int(index)]
+
+    lower = sorted_data[int(index)]
+    upper = sorted_data[int(index) + 1]
+    return lower + (upper - lower) * (index - int(index))
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """Resumir uma série de amostras (contagem, média, p50, p95, p99, máx)"""
+    data = list(values)
+    if not data:
+        return {'count': 0, 'avg': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    return {
+        'count': len(data),
+        'avg': sum(data) / len(data),
+        'p50': percentile(data, 50),
+        'p95': percentile(data, 95),
+        'p99': percentile(data, 99),
+        'max': max(data)
+    }
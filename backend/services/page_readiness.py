@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Prontidão de Página
+Navegação com domcontentloaded e espera por condições específicas de cada ação
+"""
+
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional
+
+from playwright.async_api import Page
+from config import Config
+from services.dom_scanner import CANDIDATE_SELECTORS
+from services.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+# Contêiner do feed: basta para começar a rolar quando ainda não há botões
+FEED_CONTAINER_SELECTOR = '[data-test-id="feed-container"], .feed-container, .scaffold-finite-scroll'
+
+# Condição de prontidão por ação: primeiro elemento que permite agir
+READY_SELECTORS = {
+    'login': 'input[name="session_key"]',
+    'like': f'{CANDIDATE_SELECTORS["like"]}, {FEED_CONTAINER_SELECTOR}',
+    'comment': f'{CANDIDATE_SELECTORS["comment"]}, {FEED_CONTAINER_SELECTOR}',
+    'connect': CANDIDATE_SELECTORS['connect']
+}
+
+
+class PageReadiness:
+    """Navegação orientada a eventos com tempos de carga por tipo de ação"""
+
+    def __init__(self, timeout_ms: Optional[int] = None):
+        self.timeout_ms = timeout_ms or Config.PAGE_READY_TIMEOUT_MS
+
+        # Métricas por tipo de ação
+        self.metrics = defaultdict(lambda: defaultdict(int))
+        self.navigation_times = defaultdict(lambda: deque(maxlen=1000))
+        self.ready_times = defaultdict(lambda: deque(maxlen=1000))
+
+    async def navigate(self, page: Page, url: str, action: str) -> Dict[str, float]:
+        """Navegar até o DOM estar pronto e aguardar a condição da ação"""
+        started = time.monotonic()
+        await page.goto(url, wait_until='domcontentloaded')
+        navigation_seconds = time.monotonic() - started
+
+        self.metrics[action]['navigations'] += 1
+        self.navigation_times[action].append(navigation_seconds)
+
+        timings = await self.wait_ready(page, action)
+        timings['navigation_seconds'] = round(navigation_seconds, 3)
+        return timings
+
+    async def wait_ready(self, page: Page, action: str) -> Dict[str, float]:
+        """Aguardar o primeiro elemento acionável da ação (sem esperar a rede)"""
+        selector = READY_SELECTORS[action]
+        started = time.monotonic()
+        try:
+            await page.locator(selector).first.wait_for(state='attached', timeout=self.timeout_ms)
+        except Exception:
+            self.metrics[action]['timeouts'] += 1
+            logger.warning(f"Page not ready for '{action}' after {self.timeout_ms}ms")
+            raise
+
+        ready_seconds = time.monotonic() - started
+        self.metrics[action]['ready'] += 1
+        self.ready_times[action].append(ready_seconds)
+        return {'ready_seconds': round(ready_seconds, 3)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter tempos de navegação e prontidão por ação"""
+        return {
+            action: {
+                'navigations': counters['navigations'],
+                'ready': counters['ready'],
+                'timeouts': counters['timeouts'],
+                'navigation_seconds': summarize(self.navigation_times[action]),
+                'ready_seconds': summarize(self.ready_times[action])
+            }
+            for action, counters in self.metrics.items()
+        }
+
+
+# Instância global de prontidão
+page_readiness = PageReadiness()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Driver Playwright Compartilhado
+Um único driver Node por event loop, reutilizado por todos os lançamentos de
+navegador, com contagem de drivers, navegadores e contextos vivos
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+
+class PlaywrightDriverManager:
+    """Ciclo de vida do driver Playwright e contabilidade de vazamentos
+
+    Objetos do Playwright ficam presos ao event loop que iniciou o driver,
+    então há no máximo um driver por loop (na prática, o loop da fila de jobs).
+    """
+
+    def __init__(self):
+        self._drivers: Dict[asyncio.AbstractEventLoop, Playwright] = {}
+        self._locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+        self._browsers: Dict[Browser, str] = {}
+        self._contexts: Dict[BrowserContext, str] = {}
+
+        # Métricas do driver
+        self.metrics = defaultdict(int)
+
+    # ==================== DRIVER ====================
+
+    async def start(self) -> Playwright:
+        """Obter o driver do loop atual, iniciando-o uma única vez"""
+        loop = asyncio.get_running_loop()
+        driver = self._drivers.get(loop)
+        if driver is not None:
+            return driver
+
+        lock = self._locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            driver = self._drivers.get(loop)
+            if driver is None:
+                driver = await async_playwright().start()
+                self._drivers[loop] = driver
+                self.metrics['drivers_started'] += 1
+                logger.info("Playwright driver started")
+        return driver
+
+    async def stop(self):
+        """Fechar navegadores restantes e encerrar o driver do loop atual"""
+        loop = asyncio.get_running_loop()
+        driver = self._drivers.pop(loop, None)
+        self._locks.pop(loop, None)
+        if driver is None:
+            return
+
+        for browser, owner in list(self._browsers.items()):
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing {owner} browser on driver stop: {str(e)}")
+            self._forget_browser(browser)
+
+        try:
+            await driver.stop()
+        finally:
+            self.metrics['drivers_stopped'] += 1
+            logger.info("Playwright driver stopped")
+
+    # ==================== NAVEGADORES E CONTEXTOS ====================
+
+    async def launch_browser(self, owner: str = 'default', **options) -> Browser:
+        """Lançar Chromium no driver compartilhado e rastreá-lo até desconectar"""
+        driver = await self.start()
+        browser = await driver.chromium.launch(**options)
+        self._browsers[browser] = owner
+        self.metrics['browsers_launched'] += 1
+        browser.on('disconnected', lambda _: self._forget_browser(browser))
+        return browser
+
+    async def new_context(self, browser: Browser, owner: str = 'default', **options) -> BrowserContext:
+        """Criar contexto rastreado até ser fechado"""
+        context = await browser.new_context(**options)
+        self._contexts[context] = owner
+        self.metrics['contexts_created'] += 1
+        context.on('close', lambda _: self._forget_context(context))
+        return context
+
+    def live_contexts(self, owner: Optional[str] = None) -> List[BrowserContext]:
+        """Contextos ainda abertos (opcionalmente de um único dono)"""
+        return [context for context, o in self._contexts.items() if owner is None or o == owner]
+
+    def _forget_browser(self, browser: Browser):
+        if self._browsers.pop(browser, None) is not None:
+            self.metrics['browsers_closed'] += 1
+
+    def _forget_context(self, context: BrowserContext):
+        if self._contexts.pop(context, None) is not None:
+            self.metrics['contexts_closed'] += 1
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter contagem de drivers, navegadores e contextos vivos"""
+        browsers_by_owner = defaultdict(int)
+        for owner in self._browsers.values():
+            browsers_by_owner[owner] += 1
+        contexts_by_owner = defaultdict(int)
+        for owner in self._contexts.values():
+            contexts_by_owner[owner] += 1
+
+        return {
+            'drivers_live': len(self._drivers),
+            'drivers_started': self.metrics['drivers_started'],
+            'drivers_stopped': self.metrics['drivers_stopped'],
+            'browsers_live': len(self._browsers),
+            'browsers_launched': self.metrics['browsers_launched'],
+            'browsers_closed': self.metrics['browsers_closed'],
+            'browsers_by_owner': dict(browsers_by_owner),
+            'contexts_live': len(self._contexts),
+            'contexts_created': self.metrics['contexts_created'],
+            'contexts_closed': self.metrics['contexts_closed'],
+            'contexts_by_owner': dict(contexts_by_owner)
+        }
+
+
+# Instância global do driver
+playwright_driver = PlaywrightDriverManager()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Cache de Perfis do LinkedIn
+Cache TTL limitado para perfil e email obtidos pela API, indexado pelo hash
+do token de acesso e invalidado quando o token é renovado ou revogado
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Tipos de resultado guardados por token
+CACHE_KINDS = ('profile', 'email')
+
+# Distingue "não está no cache" de um email ausente (None) já consultado
+MISSING = object()
+
+
+def token_key(access_token: str) -> str:
+    """Hash do token: o token em si nunca fica em memória no cache"""
+    return hashlib.sha256(access_token.encode('utf-8')).hexdigest()
+
+
+class ProfileCache:
+    """Cache LRU com expiração por entrada, seguro entre threads
+
+    Perfil e email são guardados separadamente: uma falha só do email não
+    impede que o perfil seja servido do cache, e o email é buscado de novo
+    na próxima consulta.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = Config.LINKEDIN_PROFILE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.LINKEDIN_PROFILE_CACHE_SIZE
+
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Métricas do cache
+        self.metrics = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, access_token: str, kind: str) -> Any:
+        """Obter resultado válido do cache ou MISSING"""
+        if not self.enabled:
+            return MISSING
+
+        key = (token_key(access_token), kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.metrics['expired'] += 1
+                entry = None
+            if entry is None:
+                self.metrics[f'{kind}_misses'] += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.metrics[f'{kind}_hits'] += 1
+            return entry[1]
+
+    def put(self, access_token: str, kind: str, value: Any):
+        """Guardar resultado até o TTL, descartando os menos usados acima do limite"""
+        if not self.enabled:
+            return
+
+        key = (token_key(access_token), kind)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics['evicted'] += 1
+
+    def invalidate(self, access_token: str, reason: str = 'refreshed') -> int:
+        """Descartar perfil e email de um token renovado ou revogado"""
+        digest = token_key(access_token)
+        with self._lock:
+            removed = sum(self._entries.pop((digest, kind), None) is not None for kind in CACHE_KINDS)
+            self.metrics[f'invalidated_{reason}'] += 1
+        if removed:
+            logger.debug(f"Profile cache entries dropped for token ({reason})")
+        return removed
+
+    def clear(self):
+        """Esvaziar o cache"""
+        with self._lock:
+            self._entries.clear()
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter tamanho, acertos e falhas por tipo"""
+        with self._lock:
+            metrics = dict(self.metrics)
+            size = len(self._entries)
+
+        stats = {'enabled': self.enabled, 'ttl': self.ttl, 'max_entries': self.max_entries, 'size': size}
+        for kind in CACHE_KINDS:
+            hits = metrics.get(f'{kind}_hits', 0)
+            misses = metrics.get(f'{kind}_misses', 0)
+            stats[kind] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0
+            }
+        stats['expired'] = metrics.get('expired', 0)
+        stats['evicted'] = metrics.get('evicted', 0)
+        stats['invalidated'] = {
+            key[len('invalidated_'):]: value for key, value in metrics.items() if key.startswith('invalidated_')
+        }
+        return stats
+
+
+# Instância global do cache
+profile_cache = ProfileCache()
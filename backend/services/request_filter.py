@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Interceptação de Requisições
+Bloqueia recursos pesados e rastreadores nos contextos de automação
+"""
+
+import logging
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from playwright.async_api import BrowserContext, Route
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+# Tamanho médio estimado por tipo de recurso (bytes) para contabilizar economia
+ESTIMATED_RESOURCE_BYTES = {
+    'image': 45_000,
+    'media': 750_000,
+    'font': 35_000,
+    'stylesheet': 25_000,
+    'script': 60_000,
+    'xhr': 4_000,
+    'fetch': 4_000,
+    'ping': 500,
+    'other': 5_000
+}
+
+# Rastreadores e analytics irrelevantes para curtir, comentar e conectar
+DEFAULT_TRACKER_PATTERNS = [
+    'px.ads.linkedin.com',
+    'linkedin.com/li/track',
+    'linkedin.com/realtime/',
+    'lms-analytics',
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'connect.facebook.net',
+    'bat.bing.com',
+    'ads.linkedin.com'
+]
+
+# Perfis de interceptação disponíveis
+PROFILES = {
+    'automation': {
+        'block_resource_types': ['image', 'media', 'font'],
+        'block_url_patterns': [],
+        'stub_url_patterns': DEFAULT_TRACKER_PATTERNS
+    },
+    'minimal': {
+        'block_resource_types': ['image', 'media', 'font', 'stylesheet'],
+        'block_url_patterns': [],
+        'stub_url_patterns': DEFAULT_TRACKER_PATTERNS
+    },
+    'off': {
+        'block_resource_types': [],
+        'block_url_patterns': [],
+        'stub_url_patterns': []
+    }
+}
+
+
+# Contadores agregados de todos os contextos do processo
+_global_counters = defaultdict(int)
+
+
+def get_global_stats() -> Dict[str, int]:
+    """Obter economia agregada de todos os contextos"""
+    return dict(_global_counters)
+
+
+def _compile_patterns(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    """Compilar lista de substrings em uma única regex"""
+    patterns = [p for p in patterns if p]
+    if not patterns:
+        return None
+    return re.compile('|'.join(re.escape(p) for p in patterns))
+
+
+class InterceptionProfile:
+    """Regras de bloqueio e stub aplicadas a um contexto"""
+
+    def __init__(self, block_resource_types: Iterable[str] = (),
+                 block_url_patterns: Iterable[str] = (),
+                 stub_url_patterns: Iterable[str] = ()):
+        self.block_resource_types = frozenset(block_resource_types)
+        self.block_url_patterns = list(block_url_patterns)
+        self.stub_url_patterns = list(stub_url_patterns)
+        self._block_re = _compile_patterns(self.block_url_patterns)
+        self._stub_re = _compile_patterns(self.stub_url_patterns)
+
+    @property
+    def is_enabled(self) -> bool:
+        """Verificar se há alguma regra ativa"""
+        return bool(self.block_resource_types or self._block_re or self._stub_re)
+
+    @classmethod
+    def from_config(cls) -> 'InterceptionProfile':
+        """Montar perfil a partir da configuração"""
+        if not Config.REQUEST_INTERCEPTION_ENABLED:
+            return cls(**PROFILES['off'])
+
+        profile = dict(PROFILES.get(Config.REQUEST_INTERCEPTION_PROFILE, PROFILES['automation']))
+        if Config.REQUEST_BLOCK_RESOURCE_TYPES:
+            profile['block_resource_types'] = Config.REQUEST_BLOCK_RESOURCE_TYPES
+        profile['block_url_patterns'] = list(profile['block_url_patterns']) + Config.REQUEST_BLOCK_URL_PATTERNS
+        return cls(**profile)
+
+    def decide(self, url: str, resource_type: str) -> str:
+        """Decidir o destino da requisição: 'stub', 'abort' ou 'continue'"""
+        if self._stub_re is not None and self._stub_re.search(url):
+            return 'stub'
+        if resource_type in self.block_resource_types:
+            return 'abort'
+        if self._block_re is not None and self._block_re.search(url):
+            return 'abort'
+        return 'continue'
+
+
+class RequestFilter:
+    """Interceptador instalado em um BrowserContext com contadores de economia"""
+
+    def __init__(self, profile: InterceptionProfile):
+        self.profile = profile
+        self.counters = defaultdict(int)
+        self.blocked_by_type = defaultdict(int)
+
+    async def attach(self, context: BrowserContext):
+        """Registrar rota em todas as requisições do contexto"""
+        if self.profile.is_enabled:
+            await context.route('**/*', self._handle)
+
+    async def _handle(self, route: Route):
+        """Abortar, responder vazio ou deixar seguir"""
+        request = route.request
+        resource_type = request.resource_type
+        decision = self.profile.decide(request.url, resource_type)
+        self.counters['requests_seen'] += 1
+        _global_counters['requests_seen'] += 1
+
+        try:
+            if decision == 'continue':
+                await route.continue_()
+                return
+
+            estimated_bytes = ESTIMATED_RESOURCE_BYTES.get(resource_type, ESTIMATED_RESOURCE_BYTES['other'])
+            self.blocked_by_type[resource_type] += 1
+            self.counters['bytes_avoided'] += estimated_bytes
+            _global_counters['bytes_avoided'] += estimated_bytes
+
+            if decision == 'stub':
+                self.counters['requests_stubbed'] += 1
+                _global_counters['requests_stubbed'] += 1
+                if resource_type == 'script':
+                    await route.fulfill(status=200, content_type='application/javascript', body='')
+                else:
+                    await route.fulfill(status=204, body='')
+            else:
+                self.counters['requests_blocked'] += 1
+                _global_counters['requests_blocked'] += 1
+                await route.abort('blockedbyclient')
+
+        except Exception as e:
+            # Página pode ter navegado/fechado enquanto a rota estava pendente
+            logger.debug(f"Route handling skipped for {request.url}: {str(e)}")
+
+    def snapshot(self) -> Dict[str, int]:
+        """Capturar contadores atuais"""
+        return {
+            'requests_seen': self.counters['requests_seen'],
+            'requests_blocked': self.counters['requests_blocked'],
+            'requests_stubbed': self.counters['requests_stubbed'],
+            'bytes_avoided': self.counters['bytes_avoided']
+        }
+
+    def usage_since(self, start: Dict[str, int]) -> Dict[str, int]:
+        """Calcular economia desde um snapshot (ex.: início da sessão)"""
+        current = self.snapshot()
+        return {key: current[key] - start.get(key, 0) for key in current}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter estatísticas acumuladas do contexto"""
+        stats = self.snapshot()
+        stats['blocked_by_type'] = dict(self.blocked_by_type)
+        return stats
+
+
+async def attach_request_filter(context: BrowserContext,
+                                profile: Optional[InterceptionProfile] = None) -> RequestFilter:
+    """Criar e instalar o filtro de requisições em um contexto"""
+    request_filter = RequestFilter(profile or InterceptionProfile.from_config())
+    await request_filter.attach(context)
+    return request_filter
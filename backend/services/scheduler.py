@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Escalonador de Automações
+Fila justa entre usuários, token buckets a partir dos limites diários e teto
+global de contextos de navegador ativos
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from config import Config
+from models import db, User, local_day
+from services.log_writer import automation_log_writer
+from services.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+# Limite diário de cada ação e a chave correspondente em User.get_daily_usage
+ACTION_LIMITS = {
+    'like': ('daily_limit_likes', 'likes'),
+    'connect': ('daily_limit_connections', 'connections'),
+    'comment': ('daily_limit_comments', 'comments')
+}
+
+
+class TokenBucket:
+    """Balde de tokens com capacidade igual ao limite diário e recarga contínua opcional
+
+    Os baldes do escalonador não recarregam (refill 0): o saldo volta ao
+    limite quando o dia vira, nunca no meio do dia.
+    """
+
+    def __init__(self, capacity: int, tokens: Optional[float] = None,
+                 refill_per_second: Optional[float] = None):
+        self.capacity = capacity
+        self.tokens = float(capacity if tokens is None else min(max(tokens, 0), capacity))
+        self.refill_per_second = refill_per_second or 0
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: Optional[float] = None):
+        now = now or time.monotonic()
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    @property
+    def available(self) -> float:
+        """Tokens disponíveis agora"""
+        self._refill()
+        return self.tokens
+
+    def try_take(self, count: int = 1) -> bool:
+        """Consumir tokens se houver saldo suficiente"""
+        self._refill()
+        if self.tokens < count:
+            return False
+        self.tokens -= count
+        return True
+
+    def give_back(self, count: int = 1):
+        """Devolver tokens de uma ação que não chegou a ser executada"""
+        self.tokens = min(self.capacity, self.tokens + count)
+
+    def seconds_until(self, count: int = 1) -> float:
+        """Tempo estimado até haver `count` tokens"""
+        missing = count - self.available
+        if missing <= 0:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float('inf')
+        return missing / self.refill_per_second
+
+
+class FairQueue:
+    """Fila assíncrona que alterna entre usuários (round-robin)
+
+    Mesma interface usada da asyncio.Queue (put_nowait, get, task_done, qsize),
+    mas um usuário com muitos jobs não atrasa os demais.
+    """
+
+    def __init__(self):
+        self._pending: 'OrderedDict[int, deque]' = OrderedDict()
+        self._size = 0
+        self._items: Optional[asyncio.Semaphore] = None
+
+    def _available(self) -> asyncio.Semaphore:
+        # Criado sob demanda dentro do loop que consome a fila
+        if self._items is None:
+            self._items = asyncio.Semaphore(0)
+        return self._items
+
+    def put_nowait(self, job):
+        """Enfileirar job no fim da fila do seu usuário"""
+        self._pending.setdefault(job.user_id, deque()).append(job)
+        self._size += 1
+        self._available().release()
+
+    async def get(self):
+        """Obter o próximo job do próximo usuário da rotação"""
+        await self._available().acquire()
+
+        user_id, jobs = next(iter(self._pending.items()))
+        job = jobs.popleft()
+        self._size -= 1
+
+        # Usuário vai para o fim da rotação; sai dela se não tiver mais jobs
+        del self._pending[user_id]
+        if jobs:
+            self._pending[user_id] = jobs
+        return job
+
+    def task_done(self):
+        """Compatibilidade com asyncio.Queue"""
+
+    def qsize(self) -> int:
+        return self._size
+
+    def depth_by_user(self) -> Dict[int, int]:
+        """Jobs aguardando por usuário"""
+        return {user_id: len(jobs) for user_id, jobs in self._pending.items()}
+
+
+class AutomationScheduler:
+    """Limites diários como token buckets e teto global de contextos ativos
+
+    Os baldes valem para um dia de STATS_TIMEZONE: na virada do dia são
+    refeitos a partir dos contadores persistidos de uso diário. A cada
+    `reload_interval` segundos os limites e o uso são relidos do banco
+    (alterações de outros processos); alterações feitas por este processo
+    pelo ORM são aplicadas no commit.
+    """
+
+    def __init__(self, max_active_contexts: Optional[int] = None,
+                 reload_interval: Optional[float] = None):
+        self.max_active_contexts = max_active_contexts or Config.AUTOMATION_MAX_ACTIVE_CONTEXTS
+        self.reload_interval = Config.USAGE_CACHE_TTL if reload_interval is None else reload_interval
+
+        self.buckets: Dict[int, Dict[str, TokenBucket]] = {}
+        self.bucket_days: Dict[int, date] = {}
+        self.loaded_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._active = 0
+        self._waiting = 0
+
+        # Métricas do escalonador
+        self.metrics = defaultdict(int)
+        self.throttled_by_action = defaultdict(int)
+        self.slot_waits = deque(maxlen=1000)
+        self.utilization_samples = deque(maxlen=1000)
+
+    # ==================== TOKEN BUCKETS ====================
+
+    def today(self) -> date:
+        """Dia corrente dos limites (mesmo critério dos contadores de uso)"""
+        return local_day()
+
+    @staticmethod
+    def _limits(user: User) -> Dict[str, int]:
+        return {
+            action: getattr(user, limit_field) if user.automation_enabled else 0
+            for action, (limit_field, _) in ACTION_LIMITS.items()
+        }
+
+    def load_user(self, user: User):
+        """Criar ou refazer os baldes do usuário a partir dos limites e do uso do dia"""
+        day = self.today()
+        usage = user.get_daily_usage(day)
+        with self._lock:
+            if self.bucket_days.get(user.id) != day:
+                # Dia novo (ou primeira carga): só o uso persistido conta
+                self.buckets[user.id] = {}
+            buckets = self.buckets[user.id]
+            for action, limit in self._limits(user).items():
+                used = usage.get(ACTION_LIMITS[action][1], 0)
+                bucket = buckets.get(action)
+                if bucket is not None:
+                    # Mesmo dia: preservar o consumo deste processo ainda não persistido
+                    used = max(used, bucket.capacity - bucket.available)
+                buckets[action] = TokenBucket(limit, tokens=limit - used, refill_per_second=0)
+            self.bucket_days[user.id] = day
+            self.loaded_at[user.id] = time.monotonic()
+        self.metrics['users_loaded'] += 1
+
+    def needs_load(self, user_id: int) -> bool:
+        """Baldes ausentes, de outro dia ou mais velhos que `reload_interval`"""
+        with self._lock:
+            if user_id not in self.buckets or self.bucket_days.get(user_id) != self.today():
+                return True
+            return time.monotonic() - self.loaded_at.get(user_id, 0) >= self.reload_interval
+
+    async def ensure_user(self, user_id: int):
+        """Carregar ou refazer baldes do usuário na thread de banco, se preciso"""
+        if not self.needs_load(user_id):
+            return
+
+        def load():
+            user = db.session.get(User, user_id)
+            if user is not None:
+                self.load_user(user)
+
+        await automation_log_writer.run_in_db_thread(load)
+
+    def available(self, user_id: int, action: str) -> Optional[float]:
+        """Tokens disponíveis (None se o usuário ainda não foi carregado)"""
+        with self._lock:
+            bucket = self.buckets.get(user_id, {}).get(action)
+            return bucket.available if bucket is not None else None
+
+    def check(self, user_id: int, action: str, count: int = 1) -> bool:
+        """Verificar saldo antes de enfileirar (carrega o usuário do banco se preciso)
+
+        Recebe o id, não o usuário da requisição: a rota só tem o UserSnapshot do
+        cache de autenticação, sem limites nem uso diário.
+        """
+        if self.needs_load(user_id):
+            user = db.session.get(User, user_id)
+            if user is None:
+                return False
+            self.load_user(user)
+        return (self.available(user_id, action) or 0) >= count
+
+    def _roll_over(self, user_id: int):
+        """Virada do dia durante um job, sem banco: saldo volta ao limite (com o lock)"""
+        day = self.today()
+        if user_id in self.bucket_days and self.bucket_days[user_id] != day:
+            self.buckets[user_id] = {
+                action: TokenBucket(bucket.capacity, refill_per_second=0)
+                for action, bucket in self.buckets[user_id].items()
+            }
+            self.bucket_days[user_id] = day
+            self.loaded_at[user_id] = 0  # próxima checagem relê o uso persistido
+            self.metrics['day_rollovers'] += 1
+
+    def try_acquire(self, user_id: int, action: str, count: int = 1) -> bool:
+        """Consumir tokens para uma ação; False quando o limite diário esgotou"""
+        with self._lock:
+            self._roll_over(user_id)
+            bucket = self.buckets.get(user_id, {}).get(action)
+            if bucket is None:
+                # Usuário não carregado: não há limite conhecido para aplicar
+                self.metrics['untracked'] += count
+                return True
+            if bucket.try_take(count):
+                self.metrics['granted'] += count
+                return True
+
+        self.metrics['throttled'] += 1
+        self.throttled_by_action[action] += 1
+        return False
+
+    def release(self, user_id: int, action: str, count: int = 1):
+        """Devolver tokens de uma ação que falhou antes de acontecer"""
+        with self._lock:
+            bucket = self.buckets.get(user_id, {}).get(action)
+            if bucket is not None:
+                bucket.give_back(count)
+                self.metrics['refunded'] += count
+
+    def set_limits(self, user_id: int, limits: Dict[str, int]):
+        """Aplicar limites alterados aos baldes carregados, preservando o consumo do dia"""
+        with self._lock:
+            buckets = self.buckets.get(user_id)
+            if buckets is None:
+                return
+            for action, limit in limits.items():
+                bucket = buckets.get(action)
+                used = bucket.capacity - bucket.available if bucket is not None else 0
+                buckets[action] = TokenBucket(limit, tokens=limit - used, refill_per_second=0)
+            self.metrics['limits_updated'] += 1
+
+    def forget_user(self, user_id: int):
+        """Descartar baldes (ex.: usuário removido)"""
+        with self._lock:
+            self.buckets.pop(user_id, None)
+            self.bucket_days.pop(user_id, None)
+            self.loaded_at.pop(user_id, None)
+
+    # ==================== CONTEXTOS ATIVOS ====================
+
+    @asynccontextmanager
+    async def context_slot(self):
+        """Ocupar uma vaga do teto global de contextos de navegador ativos"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_active_contexts)
+
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self.slot_waits.append(time.monotonic() - started)
+
+        self._active += 1
+        self.utilization_samples.append(self._active / self.max_active_contexts)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._slots.release()
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter estatísticas de limitação e utilização"""
+        return {
+            'max_active_contexts': self.max_active_contexts,
+            'active_contexts': self._active,
+            'waiting_for_slot': self._waiting,
+            'utilization': (self._active / self.max_active_contexts) * 100,
+            'utilization_history': summarize(self.utilization_samples),
+            'slot_wait_seconds': summarize(self.slot_waits),
+            'users_tracked': len(self.buckets),
+            'tokens_granted': self.metrics['granted'],
+            'tokens_refunded': self.metrics['refunded'],
+            'day_rollovers': self.metrics['day_rollovers'],
+            'limits_updated': self.metrics['limits_updated'],
+            'throttled': self.metrics['throttled'],
+            'throttled_by_action': dict(self.throttled_by_action)
+        }
+
+
+# Instância global do escalonador
+automation_scheduler = AutomationScheduler()
+
+
+# Campos de User que mudam os baldes do escalonador
+LIMIT_FIELDS = ('automation_enabled',) + tuple(field for field, _ in ACTION_LIMITS.values())
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_limit_changes(session, flush_context):
+    """Guardar limites novos (ou usuários removidos) até o commit"""
+    pending = session.info.setdefault('scheduler_limits', {})
+    for obj in session.dirty:
+        if isinstance(obj, User) and any(inspect(obj).attrs[f].history.has_changes() for f in LIMIT_FIELDS):
+            pending[obj.id] = AutomationScheduler._limits(obj)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_limit_changes(session):
+    for user_id, limits in session.info.pop('scheduler_limits', {}).items():
+        if limits is None:
+            automation_scheduler.forget_user(user_id)
+        else:
+            automation_scheduler.set_limits(user_id, limits)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_limit_changes(session):
+    session.info.pop('scheduler_limits', None)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Monitor de Sessões
+Heartbeat e checkpoints periódicos das sessões em execução e reaper que
+retoma ou encerra sessões cujo worker morreu
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, bindparam, or_
+from config import Config
+from models import db, AutomationSession
+from services.async_runtime import automation_runtime
+from services.log_writer import automation_log_writer
+from services.metrics import summarize
+
+logger = logging.getLogger(__name__)
+
+REAPED_ERROR_MESSAGE = 'Sessão interrompida: worker parou de responder'
+
+
+class SessionMonitor:
+    """Sinal de vida das sessões deste processo e coleta das órfãs de qualquer processo
+
+    O progresso de cada sessão fica em memória e vai ao banco em um único
+    UPDATE por ciclo de heartbeat, depois do flush dos logs, para que o
+    checkpoint nunca fique à frente das ações gravadas.
+    """
+
+    def __init__(self, heartbeat_interval: Optional[float] = None, stale_after: Optional[float] = None,
+                 max_resumes: Optional[int] = None):
+        self.heartbeat_interval = heartbeat_interval or Config.AUTOMATION_HEARTBEAT_INTERVAL
+        self.stale_after = stale_after or Config.AUTOMATION_SESSION_STALE_AFTER
+        self.max_resumes = Config.AUTOMATION_SESSION_MAX_RESUMES if max_resumes is None else max_resumes
+        self.reap_interval = self.stale_after / 2
+
+        self._active: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._resume_handler: Optional[Callable[[Dict[str, Any]], bool]] = None
+        self._future: Optional[concurrent.futures.Future] = None
+
+        # Métricas do monitor
+        self.metrics = defaultdict(int)
+        self.beat_times = deque(maxlen=1000)
+
+    def set_resume_handler(self, handler: Callable[[Dict[str, Any]], bool]):
+        """Registrar quem reenfileira sessões reivindicadas (retorna False se não conseguir)"""
+        self._resume_handler = handler
+
+    # ==================== SESSÕES DESTE PROCESSO ====================
+
+    def track(self, session_id: int, count: int = 0, resumes: int = 0):
+        """Passar a enviar heartbeat da sessão"""
+        with self._lock:
+            self._active[session_id] = {'count': count, 'resumes': resumes, 'state': {}}
+
+    def update(self, session_id: int, count: int, **state):
+        """Registrar progresso; vai ao banco no próximo heartbeat"""
+        with self._lock:
+            entry = self._active.get(session_id)
+            if entry is not None:
+                entry['count'] = count
+                entry['state'].update(state)
+
+    def untrack(self, session_id: int):
+        """Parar o heartbeat (sessão finalizada ou abandonada pelo serviço)"""
+        with self._lock:
+            self._active.pop(session_id, None)
+
+    # ==================== HEARTBEAT ====================
+
+    def start(self):
+        """Iniciar heartbeat e reaper no runtime (uma única vez)"""
+        if self._future is not None and not self._future.done() and automation_runtime.is_running:
+            return
+        self._future = automation_runtime.submit(self._run())
+
+    async def _run(self):
+        last_reap = time.monotonic()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.beat()
+            except Exception as e:
+                logger.error(f"Error writing session heartbeats: {str(e)}")
+
+            if time.monotonic() - last_reap >= self.reap_interval:
+                last_reap = time.monotonic()
+                try:
+                    await automation_log_writer.run_in_db_thread(self.reap)
+                except Exception as e:
+                    logger.error(f"Error reaping stale sessions: {str(e)}")
+
+    async def beat(self) -> int:
+        """Gravar heartbeat e checkpoint de todas as sessões ativas"""
+        with self._lock:
+            snapshot = {
+                session_id: {**entry, 'state': dict(entry['state'])}
+                for session_id, entry in self._active.items()
+            }
+        if not snapshot:
+            return 0
+
+        try:
+            await automation_log_writer.flush()
+        except Exception:
+            # Logs seguem no buffer; o checkpoint só é gravado com eles
+            return 0
+
+        started = time.monotonic()
+        await automation_log_writer.run_in_db_thread(lambda: self._write_heartbeats(snapshot))
+        self.beat_times.append(time.monotonic() - started)
+        self.metrics['heartbeats'] += len(snapshot)
+        return len(snapshot)
+
+    @staticmethod
+    def _write_heartbeats(snapshot: Dict[int, Dict[str, Any]]):
+        now = datetime.now(timezone.utc)
+        table = AutomationSession.__table__
+        statement = table.update().where(
+            table.c.id == bindparam('session_id'),
+            table.c.status == 'running'
+        ).values(
+            heartbeat_at=bindparam('heartbeat_at'),
+            actual_count=bindparam('count'),
+            checkpoint=bindparam('checkpoint')
+        )
+        db.session.execute(statement, [
+            {
+                'session_id': session_id,
+                'heartbeat_at': now,
+                'count': entry['count'],
+                'checkpoint': {
+                    **entry['state'],
+                    'count': entry['count'],
+                    'resumes': entry['resumes'],
+                    'at': now.isoformat()
+                }
+            }
+            for session_id, entry in snapshot.items()
+        ])
+        db.session.commit()
+
+    # ==================== REAPER ====================
+
+    def reap(self, user_id: Optional[int] = None) -> Dict[str, int]:
+        """Retomar ou encerrar sessões 'running' sem heartbeat recente
+
+        Roda com contexto de aplicação (rota ou thread de banco). A reivindicação
+        é um compare-and-set no heartbeat, então só um processo fica com cada sessão.
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.stale_after)
+
+        query = AutomationSession.query.filter(
+            AutomationSession.status == 'running',
+            or_(
+                AutomationSession.heartbeat_at < cutoff,
+                and_(AutomationSession.heartbeat_at.is_(None), AutomationSession.started_at < cutoff)
+            )
+        )
+        if user_id is not None:
+            query = query.filter(AutomationSession.user_id == user_id)
+
+        with self._lock:
+            local = set(self._active)
+
+        summary = {'resumed': 0, 'completed': 0, 'failed': 0}
+        for session in query.all():
+            if session.id in local:
+                continue
+
+            session_id = session.id
+            checkpoint = dict(session.checkpoint or {})
+            done = checkpoint.get('count', session.actual_count or 0)
+            resumes = checkpoint.get('resumes', 0)
+            claim = {
+                'session_id': session_id,
+                'user_id': session.user_id,
+                'action': session.action_type,
+                'target_count': session.target_count,
+                'done': done
+            }
+
+            # Sessões de um plano de feed voltam juntas: só a de menor id ainda
+            # em execução é reivindicada e leva o plano das que seguem abertas
+            feed_plan = checkpoint.get('feed_plan')
+            siblings = {}
+            if feed_plan:
+                siblings = self._running_sessions(feed_plan['sessions'])
+                if session_id != min(siblings.values(), default=session_id):
+                    continue
+                claim['feed_plan'] = {
+                    'plan': {action: feed_plan['plan'][action] for action in siblings},
+                    'sessions': siblings
+                }
+
+            last_beat = (
+                AutomationSession.heartbeat_at == session.heartbeat_at
+                if session.heartbeat_at is not None else AutomationSession.heartbeat_at.is_(None)
+            )
+            claimed = AutomationSession.query.filter(
+                AutomationSession.id == session_id,
+                AutomationSession.status == 'running',
+                last_beat
+            ).update({
+                'heartbeat_at': now,
+                'checkpoint': {**checkpoint, 'count': done, 'resumes': resumes + 1, 'reaped_at': now.isoformat()}
+            }, synchronize_session=False)
+            db.session.commit()
+            if not claimed:
+                continue
+
+            self.metrics['reaped'] += 1
+            if done >= claim['target_count'] and not feed_plan:
+                automation_log_writer.finalize_session(session_id, done)
+                summary['completed'] += 1
+            elif resumes < self.max_resumes and self._dispatch(claim):
+                summary['resumed'] += 1
+            else:
+                automation_log_writer.finalize_session(session_id, done, error_message=REAPED_ERROR_MESSAGE)
+                # O plano acaba junto: as demais sessões não seriam retomadas sozinhas
+                for sibling_id in siblings.values():
+                    sibling = db.session.get(AutomationSession, sibling_id)
+                    if sibling_id != session_id and sibling is not None:
+                        sibling_done = (sibling.checkpoint or {}).get('count', sibling.actual_count or 0)
+                        automation_log_writer.finalize_session(sibling_id, sibling_done,
+                                                               error_message=REAPED_ERROR_MESSAGE)
+                summary['failed'] += 1
+
+        for outcome, count in summary.items():
+            self.metrics[outcome] += count
+        if any(summary.values()):
+            logger.warning(f"Reaped stale automation sessions: {summary}")
+        return summary
+
+    @staticmethod
+    def _running_sessions(sessions: Dict[str, int]) -> Dict[str, int]:
+        """Sessões do plano (ação -> id) que continuam em execução"""
+        actions = {session_id: action for action, session_id in sessions.items()}
+        running = db.session.query(AutomationSession.id).filter(
+            AutomationSession.id.in_(actions),
+            AutomationSession.status == 'running'
+        )
+        return {actions[session_id]: session_id for (session_id,) in running}
+
+    def _dispatch(self, claim: Dict[str, Any]) -> bool:
+        """Entregar sessão reivindicada ao handler de retomada"""
+        if self._resume_handler is None:
+            return False
+        try:
+            return bool(self._resume_handler(claim))
+        except Exception as e:
+            logger.error(f"Error resuming session {claim['session_id']}: {str(e)}")
+            return False
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter sessões acompanhadas e resultados do reaper"""
+        return {
+            'tracked_sessions': len(self._active),
+            'heartbeat_interval': self.heartbeat_interval,
+            'stale_after': self.stale_after,
+            'heartbeats': self.metrics['heartbeats'],
+            'heartbeat_seconds': summarize(self.beat_times),
+            'reaped': self.metrics['reaped'],
+            'resumed': self.metrics['resumed'],
+            'completed': self.metrics['completed'],
+            'failed': self.metrics['failed']
+        }
+
+
+# Instância global do monitor
+session_monitor = SessionMonitor()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Persistência de Sessão do Navegador
+Snapshots criptografados do storage_state do Playwright por usuário
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from config import Config
+from models import db, BrowserStorageState
+
+logger = logging.getLogger(__name__)
+
+# Cookie que identifica a sessão autenticada do LinkedIn
+SESSION_COOKIE_NAME = 'li_at'
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalizar datetime do banco (SQLite perde o fuso) para UTC"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class StorageStateStore:
+    """Armazenamento criptografado de storage_state com invalidação automática"""
+
+    def __init__(self, key: Optional[str] = None, max_age_hours: Optional[int] = None):
+        self.max_age = timedelta(hours=max_age_hours or Config.STORAGE_STATE_MAX_AGE_HOURS)
+        self._fernet = Fernet(self._derive_key(key or Config.STORAGE_STATE_KEY or Config.SECRET_KEY))
+        self.metrics = defaultdict(int)
+
+    @staticmethod
+    def _derive_key(secret: str) -> bytes:
+        """Derivar chave Fernet de 32 bytes a partir de um segredo arbitrário"""
+        digest = hashlib.sha256(secret.encode('utf-8')).digest()
+        return base64.urlsafe_b64encode(digest)
+
+    @staticmethod
+    def _session_expiry(state: Dict[str, Any]) -> Optional[datetime]:
+        """Obter expiração do cookie de sessão do LinkedIn"""
+        for cookie in state.get('cookies', []):
+            if cookie.get('name') == SESSION_COOKIE_NAME:
+                expires = cookie.get('expires', -1)
+                if expires and expires > 0:
+                    return datetime.fromtimestamp(expires, tz=timezone.utc)
+                return None
+        return None
+
+    @staticmethod
+    def has_session_cookie(state: Dict[str, Any]) -> bool:
+        """Verificar se o snapshot contém o cookie de sessão"""
+        return any(c.get('name') == SESSION_COOKIE_NAME for c in state.get('cookies', []))
+
+    def save(self, user_id: int, state: Dict[str, Any]) -> Optional[BrowserStorageState]:
+        """Criptografar e persistir storage_state após login bem-sucedido"""
+        if not self.has_session_cookie(state):
+            logger.warning(f"Storage state for user {user_id} has no session cookie, not persisting")
+            return None
+
+        encrypted = self._fernet.encrypt(json.dumps(state).encode('utf-8')).decode('ascii')
+        now = datetime.now(timezone.utc)
+
+        record = BrowserStorageState.query.filter_by(user_id=user_id).first()
+        if record is None:
+            record = BrowserStorageState(user_id=user_id, encrypted_state=encrypted)
+            db.session.add(record)
+        else:
+            record.encrypted_state = encrypted
+            record.restore_count = 0
+        record.expires_at = self._session_expiry(state)
+        record.last_validated_at = now
+        record.updated_at = now
+        db.session.commit()
+
+        self.metrics['saved'] += 1
+        logger.info(f"Browser storage state persisted for user {user_id}")
+        return record
+
+    def load(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Carregar storage_state válido, invalidando snapshots vencidos ou corrompidos"""
+        record = BrowserStorageState.query.filter_by(user_id=user_id).first()
+        if record is None:
+            self.metrics['misses'] += 1
+            return None
+
+        reason = self._stale_reason(record)
+        if reason is None:
+            try:
+                state = json.loads(self._fernet.decrypt(record.encrypted_state.encode('ascii')))
+            except (InvalidToken, ValueError):
+                state = None
+                reason = 'undecryptable'
+
+        if reason is not None:
+            self._delete(record, reason)
+            self.metrics['misses'] += 1
+            return None
+
+        record.restore_count += 1
+        db.session.commit()
+        self.metrics['hits'] += 1
+        return state
+
+    def mark_valid(self, user_id: int):
+        """Registrar que a sondagem confirmou a sessão restaurada"""
+        record = BrowserStorageState.query.filter_by(user_id=user_id).first()
+        if record is not None:
+            record.last_validated_at = datetime.now(timezone.utc)
+            db.session.commit()
+
+    def invalidate(self, user_id: int, reason: str = 'probe_failed'):
+        """Remover snapshot que não é mais aceito pelo LinkedIn"""
+        record = BrowserStorageState.query.filter_by(user_id=user_id).first()
+        if record is not None:
+            self._delete(record, reason)
+
+    def _stale_reason(self, record: BrowserStorageState) -> Optional[str]:
+        """Motivo pelo qual o snapshot está vencido, ou None se ainda é utilizável"""
+        now = datetime.now(timezone.utc)
+        expires_at = _as_utc(record.expires_at)
+        if expires_at is not None and expires_at <= now:
+            return 'cookie_expired'
+
+        validated_at = _as_utc(record.last_validated_at or record.updated_at)
+        if validated_at is not None and now - validated_at > self.max_age:
+            return 'max_age'
+
+        return None
+
+    def _delete(self, record: BrowserStorageState, reason: str):
+        """Apagar snapshot registrando o motivo"""
+        user_id = record.user_id
+        db.session.delete(record)
+        db.session.commit()
+        self.metrics[f'invalidated_{reason}'] += 1
+        logger.info(f"Browser storage state invalidated for user {user_id} ({reason})")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Obter estatísticas de reutilização de sessões"""
+        return dict(self.metrics)
+
+
+# Instância global do armazenamento
+storage_state_store = StorageStateStore()
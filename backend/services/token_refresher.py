@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Renovação Proativa de Tokens OAuth
+Thread em segundo plano que busca pelo índice de token_expires_at os tokens
+prestes a vencer e os renova em lotes com concorrência limitada e jitter
+"""
+
+import atexit
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam
+from config import Config
+from models import db, User
+from services.auth_cache import auth_cache
+from services.metrics import summarize
+from services.storage_state import _as_utc
+
+logger = logging.getLogger(__name__)
+
+# Falhas por usuário listadas nas métricas
+MAX_REPORTED_FAILURES = 20
+
+
+class TokenRefresher:
+    """Renova tokens antes de vencerem, fora do caminho das requisições
+
+    Cada ciclo lê no máximo `batch_size` usuários com token vencendo dentro de
+    `window`, em ordem de vencimento. As renovações do lote são espalhadas por
+    até `jitter` segundos e executadas por `concurrency` threads; o resultado
+    é gravado em um único UPDATE condicionado ao token antigo, para não
+    sobrescrever um login feito durante a renovação. Usuários que falham
+    esperam um backoff exponencial antes da próxima tentativa.
+    """
+
+    def __init__(self, interval: Optional[float] = None, window: Optional[float] = None,
+                 batch_size: Optional[int] = None, concurrency: Optional[int] = None,
+                 jitter: Optional[float] = None, max_backoff: Optional[float] = None):
+        self.interval = Config.TOKEN_REFRESH_INTERVAL if interval is None else interval
+        self.window = window or Config.TOKEN_REFRESH_WINDOW
+        self.batch_size = batch_size or Config.TOKEN_REFRESH_BATCH_SIZE
+        self.concurrency = concurrency or Config.TOKEN_REFRESH_CONCURRENCY
+        self.jitter = Config.TOKEN_REFRESH_JITTER if jitter is None else jitter
+        self.max_backoff = max_backoff or Config.TOKEN_REFRESH_MAX_BACKOFF
+
+        self.app = None
+        self._refresh_handler: Optional[Callable[[str, Optional[str]], Optional[Dict]]] = None
+        self._failures: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Métricas da renovação
+        self.metrics = defaultdict(int)
+        self.refresh_times = deque(maxlen=1000)
+        self.remaining_at_refresh = deque(maxlen=1000)
+        self.batch_times = deque(maxlen=1000)
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def init_app(self, app):
+        """Associar aplicação Flask usada pela thread de renovação"""
+        self.app = app
+
+    def set_refresh_handler(self, handler: Callable[[str, Optional[str]], Optional[Dict]]):
+        """Registrar quem renova o token (refresh_token, access_token antigo) -> resposta OAuth"""
+        self._refresh_handler = handler
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Iniciar a thread de renovação (uma única vez)"""
+        with self._lock:
+            if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._stop.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='token-refresh')
+            self._thread = threading.Thread(target=self._run, name='token-refresher', daemon=True)
+            self._thread.start()
+
+        atexit.register(self.shutdown)
+
+    def shutdown(self):
+        """Parar a thread ao fim do lote em andamento"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + self.jitter + 1)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _run(self):
+        # Primeiro ciclo também com jitter: processos iniciados juntos não renovam juntos
+        while not self._stop.wait(random.uniform(self.interval / 2, self.interval)):
+            try:
+                self._run_in_app_context(self._run_batch)
+            except Exception as e:
+                # Erro de um lote não encerra a thread: o próximo ciclo tenta de novo
+                self.metrics['errors'] += 1
+                logger.error(f"Error refreshing OAuth tokens: {str(e)}")
+
+    def _run_batch(self):
+        """Renovar um lote desfazendo a transação (no mesmo contexto) em caso de erro"""
+        try:
+            self.run_once()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _run_in_app_context(self, fn: Callable[[], Any]) -> Any:
+        if self.app is None:
+            return fn()
+        with self.app.app_context():
+            return fn()
+
+    # ==================== RENOVAÇÃO ====================
+
+    def due_tokens(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Usuários com token vencendo na janela, pelo índice de token_expires_at"""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            waiting = [user_id for user_id, failure in self._failures.items()
+                       if failure['retry_at'] > time.monotonic()]
+
+        query = db.session.query(
+            User.id, User.access_token, User.refresh_token, User.token_expires_at
+        ).filter(
+            User.token_expires_at <= now + timedelta(seconds=self.window),
+            User.refresh_token.isnot(None),
+            User.is_active.is_(True)
+        )
+        if waiting:
+            query = query.filter(User.id.notin_(waiting))
+
+        rows = query.order_by(User.token_expires_at).limit(self.batch_size).all()
+        return [
+            {'user_id': user_id, 'access_token': access, 'refresh_token': refresh, 'expires_at': expires_at}
+            for user_id, access, refresh, expires_at in rows
+        ]
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Renovar um lote de tokens vencendo (roda com contexto de aplicação)"""
+        if self._refresh_handler is None:
+            return {'refreshed': 0, 'failed': 0}
+
+        now = now or datetime.now(timezone.utc)
+        due = self.due_tokens(now)
+        if not due:
+            return {'refreshed': 0, 'failed': 0}
+
+        started = time.monotonic()
+        # Sessão liberada antes das chamadas HTTP: nenhuma transação fica aberta esperando o LinkedIn
+        db.session.remove()
+
+        # Início de cada renovação espalhado pela janela de jitter, na ordem de início
+        for entry in due:
+            entry['start_at'] = started + random.uniform(0, self.jitter)
+        due.sort(key=lambda entry: entry['start_at'])
+
+        executor = self._executor or ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            futures = [(entry, executor.submit(self._refresh, entry)) for entry in due]
+            results = [(entry, future.result()) for entry, future in futures]
+        finally:
+            if executor is not self._executor:
+                executor.shutdown(wait=True)
+
+        refreshed = [(entry, token) for entry, token in results if token is not None]
+        self._store(refreshed)
+
+        for entry, token in results:
+            if token is None and self._stop.is_set():
+                continue  # interrompida pelo shutdown, não é falha do usuário
+            if token is None:
+                self._record_failure(entry['user_id'], 'refresh_failed')
+            else:
+                with self._lock:
+                    self._failures.pop(entry['user_id'], None)
+                remaining = (_as_utc(entry['expires_at']) - now).total_seconds()
+                self.remaining_at_refresh.append(remaining)
+
+        summary = {'refreshed': len(refreshed), 'failed': 0 if self._stop.is_set() else len(results) - len(refreshed)}
+        self.metrics['batches'] += 1
+        self.metrics['refreshed'] += summary['refreshed']
+        self.metrics['failed'] += summary['failed']
+        self.batch_times.append(time.monotonic() - started)
+        logger.info(f"OAuth token refresh batch: {summary}")
+        return summary
+
+    def _refresh(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Renovar um token no seu instante de início do lote (roda no executor)"""
+        delay = entry['start_at'] - time.monotonic()
+        if delay > 0 and self._stop.wait(delay):
+            return None
+
+        started = time.monotonic()
+        try:
+            token = self._refresh_handler(entry['refresh_token'], entry['access_token'])
+        except Exception as e:
+            logger.error(f"Error refreshing token for user {entry['user_id']}: {str(e)}")
+            token = None
+        self.refresh_times.append(time.monotonic() - started)
+
+        if not token or not token.get('access_token'):
+            return None
+        return token
+
+    def _store(self, refreshed: List[tuple]):
+        """Gravar tokens renovados em um único UPDATE condicionado ao token antigo"""
+        if not refreshed:
+            return
+
+        now = datetime.now(timezone.utc)
+        table = User.__table__
+        statement = table.update().where(
+            table.c.id == bindparam('user_id'),
+            # NULL = NULL não casa: usuário só com refresh_token também é gravado
+            table.c.access_token.is_not_distinct_from(bindparam('old_access_token'))
+        ).values(
+            access_token=bindparam('new_access_token'),
+            refresh_token=bindparam('new_refresh_token'),
+            token_expires_at=bindparam('new_expires_at'),
+            updated_at=bindparam('updated_at')
+        )
+        try:
+            db.session.execute(statement, [
+                {
+                    'user_id': entry['user_id'],
+                    'old_access_token': entry['access_token'],
+                    'new_access_token': token['access_token'],
+                    # LinkedIn pode não devolver um refresh_token novo: manter o atual
+                    'new_refresh_token': token.get('refresh_token') or entry['refresh_token'],
+                    'new_expires_at': now + timedelta(seconds=int(token.get('expires_in', 0))),
+                    'updated_at': now
+                }
+                for entry, token in refreshed
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        # UPDATE em lote não passa pelos eventos do ORM
+        for entry, _ in refreshed:
+            auth_cache.invalidate_user(entry['user_id'])
+
+    def _record_failure(self, user_id: int, error: str):
+        """Contar falha do usuário e agendar nova tentativa com backoff exponencial"""
+        with self._lock:
+            failure = self._failures.setdefault(user_id, {'failures': 0})
+            failure['failures'] += 1
+            failure['last_error'] = error
+            failure['failed_at'] = datetime.now(timezone.utc).isoformat()
+            backoff = min(self.interval * 2 ** failure['failures'], self.max_backoff)
+            failure['retry_at'] = time.monotonic() + backoff
+        if failure['failures'] > 1:
+            logger.warning(f"Token refresh for user {user_id} failed {failure['failures']} times in a row")
+
+    def get_failures(self, user_id: int) -> int:
+        """Falhas consecutivas de renovação do usuário"""
+        with self._lock:
+            return self._failures.get(user_id, {}).get('failures', 0)
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self, include_failures: bool = True) -> Dict[str, Any]:
+        """Obter lotes, renovações, falhas por usuário e latência
+
+        include_failures=False omite a lista por usuário (ids e erros), para
+        métricas expostas sem autenticação.
+        """
+        with self._lock:
+            failing = sorted(self._failures.items(), key=lambda item: -item[1]['failures'])
+            failures = [
+                {'user_id': user_id, 'failures': failure['failures'],
+                 'last_error': failure['last_error'], 'failed_at': failure['failed_at']}
+                for user_id, failure in failing[:MAX_REPORTED_FAILURES]
+            ]
+        stats = {
+            'enabled': self.enabled,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'interval': self.interval,
+            'window': self.window,
+            'batch_size': self.batch_size,
+            'concurrency': self.concurrency,
+            'batches': self.metrics['batches'],
+            'refreshed': self.metrics['refreshed'],
+            'failed': self.metrics['failed'],
+            'errors': self.metrics['errors'],
+            'failing_users': len(failing),
+            'refresh_seconds': summarize(self.refresh_times),
+            'batch_seconds': summarize(self.batch_times),
+            'remaining_seconds_at_refresh': summarize(self.remaining_at_refresh)
+        }
+        if include_failures:
+            stats['failures'] = failures
+        return stats
+
+
+# Instância global da renovação
+token_refresher = TokenRefresher()
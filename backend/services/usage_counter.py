@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Contadores de Uso Diário
+Cache de leitura dos contadores de DailyUsage usado nas verificações de
+limite diário
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+from models import get_daily_usage_counts, increment_daily_usage, local_day
+
+logger = logging.getLogger(__name__)
+
+
+def today() -> date:
+    """Dia corrente no fuso das estatísticas (STATS_TIMEZONE)"""
+    return local_day()
+
+
+class UsageCounter:
+    """LRU de contadores (usuário, dia, ação) lidos do banco, seguro entre threads
+
+    Uma falta carrega todas as ações do dia do usuário em uma consulta pelo
+    índice único; um acerto não toca o banco. Incrementos feitos por este
+    processo descartam a entrada após o commit; os de outros processos
+    aparecem em no máximo `ttl` segundos.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = Config.USAGE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.USAGE_CACHE_SIZE
+
+        self._entries: 'OrderedDict[Tuple[int, date, str], Tuple[float, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Métricas do cache
+        self.metrics = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    # ==================== CONSULTA ====================
+
+    def get(self, user_id: int, action: str, day: Optional[date] = None) -> int:
+        """Ações concluídas pelo usuário no dia (precisa de contexto de aplicação)"""
+        day = day or today()
+        count = self._get((user_id, day, action))
+        if count is None:
+            count = self._load(user_id, day).get(action, 0)
+        return count
+
+    def get_usage(self, user_id: int, day: Optional[date] = None) -> Dict[str, int]:
+        """Contadores do dia por ação"""
+        day = day or today()
+        counts = {}
+        for action in ('like', 'connect', 'comment'):
+            count = self._get((user_id, day, action))
+            if count is None:
+                return self._load(user_id, day)
+            counts[action] = count
+        return counts
+
+    def _load(self, user_id: int, day: date) -> Dict[str, int]:
+        self.metrics['loads'] += 1
+        counts = get_daily_usage_counts(user_id, day)
+        if self.enabled:
+            with self._lock:
+                expires_at = time.monotonic() + self.ttl
+                for action, count in counts.items():
+                    key = (user_id, day, action)
+                    self._entries[key] = (expires_at, count)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.metrics['evicted'] += 1
+        return counts
+
+    def _get(self, key: Tuple[int, date, str]) -> Optional[int]:
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.metrics['expired'] += 1
+                entry = None
+            if entry is None:
+                self.metrics['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.metrics['hits'] += 1
+            return entry[1]
+
+    # ==================== ESCRITA ====================
+
+    def increment(self, user_id: int, day: date, action: str, amount: int):
+        """Somar ao contador do banco na transação corrente (sem commit)
+
+        Chame invalidate() depois do commit para a próxima leitura ver o total.
+        """
+        increment_daily_usage(user_id, day, action, amount)
+        self.metrics['increments'] += 1
+
+    def invalidate(self, user_id: int, day: date, action: str):
+        """Descartar contador alterado"""
+        with self._lock:
+            if self._entries.pop((user_id, day, action), None) is not None:
+                self.metrics['invalidated'] += 1
+
+    def clear(self):
+        """Esvaziar o cache"""
+        with self._lock:
+            self._entries.clear()
+
+    # ==================== MÉTRICAS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter tamanho, acertos, cargas do banco e incrementos"""
+        with self._lock:
+            hits = self.metrics['hits']
+            misses = self.metrics['misses']
+            return {
+                'enabled': self.enabled,
+                'ttl': self.ttl,
+                'max_entries': self.max_entries,
+                'size': len(self._entries),
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0,
+                'loads': self.metrics['loads'],
+                'increments': self.metrics['increments'],
+                'expired': self.metrics['expired'],
+                'evicted': self.metrics['evicted'],
+                'invalidated': self.metrics['invalidated']
+            }
+
+
+# Instância global dos contadores
+usage_counter = UsageCounter()
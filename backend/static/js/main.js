@@ -425,27 +425,26 @@ class SnapLinkedApp {
             // Mostrar overlay de progresso
             this.showAutomationOverlay(config);
             
-            // Executar automação
+            // Enfileirar automação
             const response = await this.apiCall(`/api/automation/${type}`, 'POST', {
                 target_count: config.count
             });
             
-            if (response.success) {
-                this.stats = response.stats || this.stats;
-                this.updateStats();
-                
-                const details = response.details || {};
-                const completed = details.completed_count || 0;
-                const errors = details.error_count || 0;
-                
-                let message = `✅ ${config.name} executada com sucesso! ${completed} ações realizadas.`;
-                if (errors > 0) {
-                    message += ` (${errors} erros)`;
-                }
+            if (!response.success || !response.job_id) {
+                throw new Error(response.message || 'Erro na automação');
+            }
+            
+            // Acompanhar job até a conclusão
+            const job = await this.waitForAutomationJob(response.job_id);
+            const result = job.result || {};
+            
+            if (job.status === 'completed') {
+                await this.checkAuthStatus();
                 
-                this.showAlert(message, 'success');
+                const completed = result.count || 0;
+                this.showAlert(`✅ ${config.name} executada com sucesso! ${completed} ações realizadas.`, 'success');
             } else {
-                throw new Error(response.message || 'Erro na automação');
+                throw new Error(job.error_message || result.message || 'Erro na automação');
             }
             
         } catch (error) {
@@ -505,6 +504,44 @@ class SnapLinkedApp {
         }, 800);
     }
     
+    async waitForAutomationJob(jobId, intervalMs = 2000, maxWaitMs = 30 * 60 * 1000) {
+        const progressBar = document.getElementById('progressBar');
+        const progressText = document.getElementById('progressText');
+        const deadline = Date.now() + maxWaitMs;
+        
+        while (true) {
+            // Respostas não-OK (ex.: 404 de job descartado) lançam erro no apiCall
+            const response = await this.apiCall(`/api/automation/jobs/${jobId}`);
+            const job = response && response.job;
+            
+            if (!job || !job.progress) {
+                throw new Error('Job de automação não encontrado');
+            }
+            
+            if (job.status === 'running' && this.progressInterval) {
+                // Progresso real substitui a simulação
+                clearInterval(this.progressInterval);
+                this.progressInterval = null;
+            }
+            
+            if (!this.progressInterval) {
+                const percent = Math.round(job.progress.percent);
+                if (progressBar) progressBar.style.width = percent + '%';
+                if (progressText) progressText.textContent = percent + '% concluído';
+            }
+            
+            if (job.status === 'completed' || job.status === 'failed') {
+                return job;
+            }
+            
+            if (Date.now() >= deadline) {
+                throw new Error('Tempo limite excedido aguardando a automação');
+            }
+            
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    }
+    
     hideAutomationOverlay() {
         if (this.progressInterval) {
             clearInterval(this.progressInterval);
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Tempo por Fase
+Testes do cronômetro de ações e da agregação de percentis
+"""
+
+import asyncio
+import time
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import linkedin_service
+from services.action_timing import ActionTimer, PHASES, summarize_timings
+from services.linkedin_service import LinkedInAutomationService
+
+
+class FakeLogWriter:
+    def __init__(self):
+        self.logs = []
+
+    def add(self, **kwargs):
+        self.logs.append(kwargs)
+        return kwargs
+
+    def update_log(self, row, details, execution_time_ms):
+        row.update(details=details, execution_time_ms=execution_time_ms)
+
+
+class FakeButton:
+    async def scroll_into_view_if_needed(self):
+        await asyncio.sleep(0.01)
+
+    async def click(self):
+        await asyncio.sleep(0.02)
+
+
+class TestActionTimer(unittest.TestCase):
+    """Testes para o ActionTimer"""
+
+    def test_phases_and_delays_are_separated(self):
+        """Testar que pausas entram na fase e também no total de pausas"""
+        timer = ActionTimer()
+        with timer.phase('find'):
+            time.sleep(0.01)
+        with timer.phase('post_action_delay'):
+            time.sleep(0.02)
+            timer.add_delay(20)
+
+        details = timer.to_details()
+
+        self.assertEqual(set(details['phases_ms']), set(PHASES))
+        self.assertGreaterEqual(details['phases_ms']['find'], 10)
+        self.assertEqual(details['phases_ms']['click'], 0)
+        self.assertEqual(details['delay_ms'], 20)
+        self.assertAlmostEqual(details['latency_ms'], timer.total_ms - 20, delta=1)
+
+    def test_shared_phases_are_split(self):
+        """Testar divisão das fases de um post entre suas ações"""
+        shared = ActionTimer()
+        shared.phases['find'] = 100.0
+        shared.add_delay(40)
+
+        timer = ActionTimer().share_of(shared, 2)
+
+        self.assertEqual(timer.phases['find'], 50.0)
+        self.assertEqual(timer.delay_ms, 20.0)
+
+    def test_summarize_timings_by_action(self):
+        """Testar percentis por tipo de ação e fase"""
+        rows = []
+        for ms in (100, 200, 300):
+            timer = ActionTimer()
+            timer.phases['click'] = ms
+            rows.append(('like', timer.total_ms, {'timing': timer.to_details()}))
+        rows.append(('comment', 500, None))
+        rows.append(('like', None, None))
+
+        summary = summarize_timings(rows)
+
+        self.assertEqual(summary['like']['total_ms']['count'], 3)
+        self.assertEqual(summary['like']['total_ms']['p50'], 200)
+        self.assertEqual(summary['like']['phases_ms']['click']['max'], 300)
+        self.assertEqual(summary['like']['latency_ms']['avg'], 200)
+        self.assertEqual(summary['comment']['total_ms']['count'], 1)
+        self.assertEqual(summary['comment']['phases_ms'], {})
+
+
+class TestServiceTiming(unittest.TestCase):
+    """Testes do tempo gravado pelo serviço de automação"""
+
+    def setUp(self):
+        self.writer = FakeLogWriter()
+        self._original = linkedin_service.automation_log_writer
+        linkedin_service.automation_log_writer = self.writer
+
+    def tearDown(self):
+        linkedin_service.automation_log_writer = self._original
+
+    def test_logged_action_has_execution_time_and_phases(self):
+        """Testar que o log da ação traz execution_time_ms e a decomposição"""
+        service = LinkedInAutomationService(delay_scale=0.01)
+        timer = ActionTimer()
+
+        asyncio.run(service._click_like(FakeButton(), timer))
+        service._log_action(1, 1, 'like', 'post', 'urn:li:activity:1', timer, {'urn': 'urn:li:activity:1'})
+
+        log = self.writer.logs[0]
+        timing = log['details']['timing']
+        self.assertEqual(log['execution_time_ms'], timer.total_ms)
+        self.assertGreaterEqual(timing['phases_ms']['scroll'], 10)
+        self.assertGreaterEqual(timing['phases_ms']['click'], 20)
+        self.assertGreaterEqual(timing['phases_ms']['pre_click_delay'], 10)
+        self.assertEqual(timing['delay_ms'], int(round(timer.delay_ms)))
+        self.assertGreater(timer.delay_ms, 0)
+        self.assertEqual(log['details']['urn'], 'urn:li:activity:1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Runtime Assíncrono
+Testes da ponte entre rotas síncronas e o event loop persistente
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.async_runtime import AsyncRuntime
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    """Testes para o AsyncRuntime"""
+
+    def setUp(self):
+        self.runtime = AsyncRuntime(name='test-runtime', lag_interval=0.01)
+
+    def tearDown(self):
+        self.runtime.shutdown()
+
+    def test_loop_persists_across_calls(self):
+        """Testar que chamadas sucessivas usam o mesmo loop e thread"""
+        async def current():
+            return asyncio.get_running_loop(), threading.current_thread().name
+
+        first = self.runtime.run(current())
+        second = self.runtime.run(current())
+
+        self.assertIs(first[0], second[0])
+        self.assertEqual(first[1], 'test-runtime')
+
+    def test_submit_from_many_threads(self):
+        """Testar submissão concorrente a partir de threads WSGI"""
+        results = []
+
+        async def double(value):
+            await asyncio.sleep(0)
+            return value * 2
+
+        def request(value):
+            results.append(self.runtime.submit(double(value)).result(timeout=2))
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), [i * 2 for i in range(10)])
+        stats = self.runtime.get_stats()
+        self.assertEqual(stats['completed'], 10)
+        self.assertEqual(stats['pending_submissions'], 0)
+
+    def test_reports_loop_lag(self):
+        """Testar medição de atraso quando o loop é bloqueado"""
+        async def block():
+            time.sleep(0.05)
+
+        self.runtime.run(block())
+        time.sleep(0.05)
+
+        lag = self.runtime.get_stats()['loop_lag_seconds']
+        self.assertGreater(lag['count'], 0)
+        self.assertGreaterEqual(lag['max'], 0.03)
+
+    def test_shutdown_hooks_run_on_loop(self):
+        """Testar que os hooks de shutdown rodam no loop do runtime"""
+        ran_on = []
+
+        async def hook():
+            ran_on.append(threading.current_thread().name)
+
+        self.runtime.add_shutdown_hook(hook)
+        self.runtime.start()
+        self.runtime.shutdown()
+
+        self.assertEqual(ran_on, ['test-runtime'])
+        self.assertFalse(self.runtime.is_running)
+
+
+if __name__ == '__main__':
+    unittest.main()
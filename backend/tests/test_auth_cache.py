@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Cache de Autenticação
+Testes de tokens verificados em cache, expiração pelo exp, invalidação e
+memoização por requisição
+"""
+
+import time
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from app import create_app
+from models import db, User
+from services import auth_cache as auth_cache_module
+from services.auth_cache import AuthCache, UserSnapshot
+
+
+class TestAuthCache(unittest.TestCase):
+    """Testes para o AuthCache"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.cache = AuthCache(ttl=60, max_entries=100)
+        self._original = auth_cache_module.auth_cache
+        auth_cache_module.auth_cache = app_module.auth_cache = self.cache
+
+        self.user = User(email='test@example.com', name='Usuário Teste')
+        db.session.add(self.user)
+        db.session.commit()
+        self.token = self.user.generate_auth_token()
+
+    def tearDown(self):
+        auth_cache_module.auth_cache = app_module.auth_cache = self._original
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def verify_in_request(self, token):
+        with self.app.test_request_context():
+            return self.cache.verify(token)
+
+    def test_verified_token_is_served_from_cache(self):
+        """Testar que o segundo uso do token não decodifica nem consulta o banco"""
+        first = self.verify_in_request(self.token)
+        second = self.verify_in_request(self.token)
+
+        self.assertIsInstance(second, UserSnapshot)
+        self.assertIs(first, second)
+        self.assertEqual(second.id, self.user.id)
+        self.assertEqual(second.to_dict()['email'], 'test@example.com')
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['token_verifications'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_invalid_token_is_rejected(self):
+        """Testar token inválido sem entrada no cache"""
+        self.assertIsNone(self.verify_in_request('invalid_token'))
+        self.assertEqual(self.cache.get_stats()['size'], 0)
+
+    def test_entry_does_not_outlive_token_exp(self):
+        """Testar que a validade da entrada é limitada pelo exp do token"""
+        short_token = self.user.generate_auth_token(expires_in=1)
+        self.assertIsNotNone(self.verify_in_request(short_token))
+
+        time.sleep(1.1)
+
+        self.assertIsNone(self.verify_in_request(short_token))
+        self.assertEqual(self.cache.get_stats()['expired'], 1)
+
+    def test_deactivated_user_is_invalidated(self):
+        """Testar que desativar o usuário descarta o token em cache"""
+        self.assertIsNotNone(self.verify_in_request(self.token))
+
+        self.user.is_active = False
+        db.session.commit()
+
+        self.assertIsNone(self.verify_in_request(self.token))
+        self.assertEqual(self.cache.get_stats()['invalidated'], 1)
+
+    def test_invalidation_waits_for_commit(self):
+        """Testar que o flush não invalida; o commit sim"""
+        self.verify_in_request(self.token)
+
+        self.user.is_active = False
+        db.session.flush()
+        self.assertEqual(self.cache.get_stats()['invalidated'], 0)
+
+        db.session.commit()
+        self.assertEqual(self.cache.get_stats()['invalidated'], 1)
+
+    def test_rolled_back_change_keeps_entry(self):
+        """Testar que alteração desfeita não invalida o cache"""
+        self.verify_in_request(self.token)
+
+        self.user.name = 'Nome Descartado'
+        db.session.flush()
+        db.session.rollback()
+
+        self.assertEqual(self.cache.get_stats()['invalidated'], 0)
+        self.assertEqual(self.verify_in_request(self.token).name, 'Usuário Teste')
+
+    def test_load_racing_invalidation_is_not_cached(self):
+        """Testar que leitura iniciada antes de uma invalidação não volta ao cache"""
+        class RacingCache(AuthCache):
+            def _load_token(self, token):
+                loaded = super()._load_token(token)
+                self.invalidate_user(loaded[0].id)  # commit de outra thread no meio da leitura
+                return loaded
+
+        self.cache = RacingCache(ttl=60)
+        self.verify_in_request(self.token)
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['size'], 0)
+        self.assertEqual(stats['stale_loads'], 1)
+
+    def test_old_invalidations_are_pruned(self):
+        """Testar que registros de invalidação não crescem com cada usuário alterado"""
+        self.cache = AuthCache(ttl=0.05)
+        for user_id in range(100, 110):
+            self.cache.invalidate_user(user_id)
+        self.assertEqual(self.cache.get_stats()['invalidations_tracked'], 10)
+
+        time.sleep(0.06)
+        self.cache.invalidate_user(200)
+        self.assertEqual(self.cache.get_stats()['invalidations_tracked'], 1)
+
+    def test_user_row_change_refreshes_snapshot(self):
+        """Testar snapshot atualizado após alteração da linha do usuário"""
+        self.verify_in_request(self.token)
+
+        self.user.name = 'Nome Novo'
+        db.session.commit()
+
+        self.assertEqual(self.verify_in_request(self.token).name, 'Nome Novo')
+
+    def test_least_recently_used_is_evicted(self):
+        """Testar limite de entradas do cache"""
+        self.cache.max_entries = 2
+        tokens = [self.user.generate_auth_token(expires_in=3600 + i) for i in range(3)]
+        for token in tokens:
+            self.verify_in_request(token)
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evicted'], 1)
+
+    def test_one_lookup_per_request(self):
+        """Testar que require_auth e get_current_user verificam o token uma vez"""
+        seen = []
+
+        @app_module.require_auth
+        def route():
+            seen.append(app_module.get_current_user())
+            seen.append(app_module.get_current_user())
+            return 'ok'
+
+        headers = {'Authorization': f'Bearer {self.token}'}
+        with self.app.test_request_context(headers=headers):
+            self.assertEqual(route(), 'ok')
+
+        self.assertEqual(seen[0].id, self.user.id)
+        self.assertIs(seen[0], seen[1])
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['token_verifications'], 1)
+        self.assertEqual(stats['hits'] + stats['misses'], 1)
+
+    def test_session_user_is_cached(self):
+        """Testar usuário da sessão Flask servido do cache entre requisições"""
+        for _ in range(2):
+            with self.app.test_request_context():
+                app_module.session['user_id'] = self.user.id
+                self.assertEqual(app_module.get_current_user().id, self.user.id)
+
+        self.assertEqual(self.cache.get_stats()['user_loads'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Pool de Navegadores
+Testes unitários do aluguel de contextos com navegadores simulados
+"""
+
+import asyncio
+import threading
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.browser_pool import BrowserPool, PoolTimeoutError
+from services.playwright_driver import PlaywrightDriverManager
+
+
+class FakePage:
+    def set_default_timeout(self, timeout):
+        pass
+
+    def set_default_navigation_timeout(self, timeout):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def new_page(self):
+        return FakePage()
+
+    async def storage_state(self):
+        return {'cookies': [{'name': 'li_at', 'value': 'token'}], 'origins': []}
+
+    async def close(self):
+        self.closed = True
+        if 'close' in self.handlers:
+            self.handlers['close'](self)
+
+
+class FakeRequestFilter:
+    def __init__(self):
+        self.attached = []
+
+    async def attach(self, context):
+        self.attached.append(context)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext()
+        context.options = options
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeBrowserPool(BrowserPool):
+    """Pool que lança navegadores simulados em vez do Chromium"""
+
+    async def _start_driver(self):
+        pass
+
+    async def _launch_browser(self):
+        return FakeBrowser()
+
+
+class TestBrowserPool(unittest.IsolatedAsyncioTestCase):
+    """Testes para o BrowserPool"""
+
+    async def asyncSetUp(self):
+        self.driver = PlaywrightDriverManager()
+        self.pool = FakeBrowserPool(size=2, max_contexts=2, idle_timeout=0, lease_timeout=0.2,
+                                    driver=self.driver)
+        await self.pool.start()
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_reuses_context_for_same_user(self):
+        """Testar que o segundo aluguel do mesmo usuário é um hit"""
+        first = await self.pool.acquire(1)
+        context = first.context
+        await self.pool.release(first)
+
+        second = await self.pool.acquire(1)
+        self.assertIs(second.context, context)
+        await self.pool.release(second)
+
+        stats = self.pool.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    async def test_spreads_contexts_across_browsers(self):
+        """Testar distribuição de contextos entre navegadores"""
+        first = await self.pool.acquire(1)
+        second = await self.pool.acquire(2)
+        self.assertNotEqual(first.browser_index, second.browser_index)
+
+    async def test_evicts_idle_context_at_capacity(self):
+        """Testar despejo do contexto ocioso quando o limite é atingido"""
+        first = await self.pool.acquire(1)
+        await self.pool.release(first)
+        second = await self.pool.acquire(2)
+
+        third = await self.pool.acquire(3)
+        self.assertNotIn(1, self.pool.contexts)
+        self.assertIsNone(first.context)
+        self.assertEqual(self.pool.get_stats()['evictions'], 1)
+
+        await self.pool.release(second)
+        await self.pool.release(third)
+
+    async def test_times_out_when_all_contexts_busy(self):
+        """Testar timeout quando todos os contextos estão em uso"""
+        await self.pool.acquire(1)
+        await self.pool.acquire(2)
+
+        with self.assertRaises(PoolTimeoutError):
+            await self.pool.acquire(3)
+        self.assertEqual(self.pool.get_stats()['lease_timeouts'], 1)
+
+    async def test_waiter_gets_context_after_release(self):
+        """Testar que um aluguel em espera é atendido após devolução"""
+        first = await self.pool.acquire(1)
+        await self.pool.acquire(2)
+
+        waiter = asyncio.create_task(self.pool.acquire(3, timeout=1))
+        await asyncio.sleep(0.01)
+        await self.pool.release(first)
+
+        third = await waiter
+        self.assertEqual(third.user_id, 3)
+
+    async def test_reap_idle_contexts(self):
+        """Testar reclamação de contextos ociosos"""
+        first = await self.pool.acquire(1)
+        await self.pool.release(first)
+
+        self.assertEqual(await self.pool.reap_idle(), 1)
+        self.assertEqual(self.pool.get_stats()['contexts_total'], 0)
+
+    async def test_state_loader_can_be_async(self):
+        """Testar que o storage_state pode ser lido sem bloquear o loop"""
+        async def loader(user_id):
+            await asyncio.sleep(0)
+            return {'cookies': [], 'origins': []}
+
+        pooled = await self.pool.acquire(1, state_loader=loader)
+        self.assertTrue(pooled.restored_state)
+
+    async def test_sync_state_loader_runs_off_the_loop(self):
+        """Testar que um loader síncrono roda fora da thread do loop"""
+        threads = []
+
+        def loader(user_id):
+            threads.append(threading.current_thread())
+            return {'cookies': [], 'origins': []}
+
+        pooled = await self.pool.acquire(1, state_loader=loader)
+        self.assertTrue(pooled.restored_state)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    async def test_recycle_keeps_storage_state_and_filter(self):
+        """Testar que o contexto reciclado herda cookies e o filtro de requisições"""
+        pooled = await self.pool.acquire(1)
+        old_context = pooled.context
+        request_filter = pooled.request_filter = FakeRequestFilter()
+
+        await self.pool.recycle(pooled)
+
+        self.assertTrue(old_context.closed)
+        self.assertIsNot(pooled.context, old_context)
+        self.assertEqual(pooled.context.options['storage_state']['cookies'][0]['name'], 'li_at')
+        self.assertIs(pooled.request_filter, request_filter)
+        self.assertEqual(request_filter.attached, [pooled.context])
+        self.assertTrue(pooled.in_use)
+        self.assertEqual(self.pool.get_stats()['contexts_recycled'], 1)
+
+    async def test_driver_accounts_live_contexts(self):
+        """Testar contagem de contextos vivos no driver compartilhado"""
+        first = await self.pool.acquire(1)
+        await self.pool.acquire(2)
+        self.assertEqual(self.driver.get_stats()['contexts_by_owner'], {'pool': 2})
+
+        await self.pool.release(first, discard=True)
+        stats = self.driver.get_stats()
+        self.assertEqual(stats['contexts_live'], 1)
+        self.assertEqual(stats['contexts_closed'], 1)
+
+
+class TestContextsPerBrowser(unittest.IsolatedAsyncioTestCase):
+    """Testes do limite de contextos por navegador"""
+
+    async def asyncSetUp(self):
+        self.pool = FakeBrowserPool(size=2, max_contexts=10, contexts_per_browser=2, idle_timeout=0,
+                                    lease_timeout=0.1, driver=PlaywrightDriverManager())
+        await self.pool.start()
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_many_contexts_share_one_browser(self):
+        """Testar vários contextos simultâneos no mesmo processo até o limite"""
+        leases = [await self.pool.acquire(user_id) for user_id in range(1, 5)]
+
+        stats = self.pool.get_stats()
+        self.assertEqual(stats['capacity'], 4)
+        self.assertEqual(stats['contexts_by_browser'], [2, 2])
+        self.assertEqual(stats['browser_launches'], 2)
+        self.assertEqual(len({id(p.browser) for p in leases}), 2)
+
+        with self.assertRaises(PoolTimeoutError):
+            await self.pool.acquire(5)
+
+    async def test_evicts_idle_context_when_browsers_are_full(self):
+        """Testar despejo quando o limite por navegador é atingido antes do global"""
+        leases = [await self.pool.acquire(user_id) for user_id in range(1, 5)]
+        await self.pool.release(leases[0])
+
+        fifth = await self.pool.acquire(5)
+
+        self.assertEqual(fifth.browser_index, leases[0].browser_index)
+        self.assertNotIn(1, self.pool.contexts)
+        self.assertEqual(self.pool.get_stats()['evictions'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Scanner de DOM
+Testes unitários da injeção única e das consultas em lote de alvos
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.dom_scanner import (
+    DomScanner, SCANNER_SCRIPT, NEXT_TARGETS_SCRIPT, TARGET_ATTRIBUTE
+)
+
+
+class FakePage:
+    """Página que simula o scanner injetado com uma lista fixa de alvos"""
+
+    def __init__(self, targets):
+        self.targets = targets
+        self.processed = set()
+        self.init_scripts = []
+        self.evaluations = []
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    async def evaluate(self, script, arg=None):
+        self.evaluations.append(script)
+        if script == NEXT_TARGETS_SCRIPT:
+            kind, limit, processed = arg
+            self.processed.update(processed)
+            pending = [t for t in self.targets.get(kind, []) if t['id'] not in self.processed]
+            return pending[:limit]
+        return None
+
+    def locator(self, selector):
+        return selector
+
+
+class TestDomScanner(unittest.IsolatedAsyncioTestCase):
+    """Testes para DomScanner"""
+
+    def setUp(self):
+        self.page = FakePage({
+            'like': [{'id': f'like-{i}', 'urn': f'urn:li:activity:{i}', 'top': i * 100} for i in range(5)]
+        })
+
+    async def test_installs_once_per_page(self):
+        """Testar que o script é injetado uma única vez por página"""
+        scanner = await DomScanner.for_page(self.page)
+        again = await DomScanner.for_page(self.page)
+
+        self.assertIs(scanner, again)
+        self.assertEqual(self.page.init_scripts, [SCANNER_SCRIPT])
+        self.assertEqual(self.page.evaluations.count(SCANNER_SCRIPT), 1)
+
+    async def test_next_targets_is_single_roundtrip(self):
+        """Testar uma chamada evaluate por consulta, com processados enviados junto"""
+        scanner = await DomScanner.for_page(self.page)
+        calls_before = len(self.page.evaluations)
+
+        first = await scanner.next_targets('like', limit=2)
+        self.assertEqual([t['id'] for t in first], ['like-0', 'like-1'])
+
+        scanner.mark_processed([first[0]['id']])
+        second = await scanner.next_targets('like', limit=2)
+
+        self.assertEqual([t['id'] for t in second], ['like-1', 'like-2'])
+        self.assertEqual(len(self.page.evaluations) - calls_before, 2)
+        self.assertEqual(scanner.evaluate_calls, 3)
+
+    async def test_locator_uses_stable_id(self):
+        """Testar localizador pelo atributo estável"""
+        scanner = await DomScanner.for_page(self.page)
+        self.assertEqual(scanner.locator('like-3'), f'[{TARGET_ATTRIBUTE}="like-3"]')
+
+
+if __name__ == '__main__':
+    unittest.main()
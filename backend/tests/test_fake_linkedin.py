@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Site Falso do LinkedIn
+Testes do DOM servido para o benchmark e das pausas desativáveis do serviço
+"""
+
+import asyncio
+import time
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_linkedin import FakeLinkedInSite, SESSION_COOKIE_NAME
+from services.linkedin_service import LinkedInAutomationService, LINKEDIN_FEED_URL, LINKEDIN_WEB_URL
+
+
+class FakeLinkedInSiteTestCase(unittest.TestCase):
+    """Testes das páginas do site falso"""
+
+    def setUp(self):
+        self.site = FakeLinkedInSite(posts_per_page=4, cards_per_page=3, max_pages=2)
+        self.client = self.site.app.test_client()
+
+    def login(self):
+        response = self.client.post('/login', data={'session_key': 'user@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.headers['Location'].endswith('/feed/'))
+
+    def test_feed_requires_session_cookie(self):
+        """Sem cookie de sessão, feed e rede redirecionam para o login"""
+        for path in ('/feed/', '/mynetwork/'):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response.headers['Location'].endswith('/login'))
+
+        self.login()
+        self.assertIsNotNone(self.client.get_cookie(SESSION_COOKIE_NAME))
+        self.assertEqual(self.client.get('/feed/').status_code, 200)
+
+    def test_login_page_has_form_fields(self):
+        """Página de login contém o campo aguardado pela prontidão"""
+        html = self.client.get('/login').get_data(as_text=True)
+        self.assertIn('name="session_key"', html)
+        self.assertIn('name="session_password"', html)
+
+    def test_feed_posts_match_service_selectors(self):
+        """Posts expõem URN, botão de curtir, de comentar e a caixa de comentário"""
+        self.login()
+        html = self.client.get('/feed/').get_data(as_text=True)
+
+        self.assertIn('data-test-id="feed-container"', html)
+        self.assertEqual(html.count('data-urn="urn:li:activity:'), 4)
+        self.assertEqual(html.count('aria-label="Reagir com curtir'), 4)
+        self.assertEqual(html.count('aria-label="comentar'), 4)
+        self.assertIn('aria-pressed="false"', html)
+        self.assertIn('contenteditable="true"', html)
+        self.assertIn('data-test-id="comment-submit"', html)
+
+    def test_infinite_scroll_pages_until_exhausted(self):
+        """Rolagem infinita entrega páginas novas e depois resposta vazia"""
+        self.login()
+        first = self.client.get('/feed/').get_data(as_text=True)
+        second = self.client.get('/feed/updates?page=1').get_data(as_text=True)
+
+        self.assertEqual(second.count('data-urn='), 4)
+        self.assertNotIn('urn:li:activity:7000000000000000004"', first)
+        self.assertIn('urn:li:activity:7000000000000000004"', second)
+        self.assertEqual(self.client.get('/feed/updates?page=2').get_data(as_text=True), '')
+
+    def test_network_cards_and_modals(self):
+        """Cartões têm perfil e botão Conectar; o modal e o aviso usam Enviar/Fechar"""
+        self.login()
+        html = self.client.get('/mynetwork/').get_data(as_text=True)
+
+        self.assertEqual(html.count('class="discover-entity-card"'), 3)
+        self.assertEqual(html.count('href="/in/fake-member-'), 3)
+        self.assertIn('para se Conectar"', html)
+        self.assertIn('aria-label="Enviar sem nota"', html)
+        self.assertIn('aria-label="Fechar aviso"', html)
+
+    def test_actions_are_counted(self):
+        """Ações recebidas são contadas, incluindo repetições no mesmo alvo"""
+        urn = 'urn:li:activity:7000000000000000000'
+        self.client.post('/_fake/like', json={'urn': urn})
+        self.client.post('/_fake/like', json={'urn': urn})
+        self.client.post('/_fake/invite', json={'profile': '/in/fake-member-1/'})
+
+        stats = self.site.get_stats()
+        self.assertEqual(stats['likes'], 2)
+        self.assertEqual(stats['likes_duplicates'], 1)
+        self.assertEqual(stats['invites'], 1)
+
+    def test_serves_over_http(self):
+        """Servidor em thread responde na URL base"""
+        from urllib.request import urlopen
+
+        base_url = self.site.start()
+        try:
+            with urlopen(f'{base_url}/login', timeout=5) as response:
+                self.assertEqual(response.status, 200)
+        finally:
+            self.site.stop()
+
+
+class AutomationDelayTestCase(unittest.TestCase):
+    """Testes das pausas humanas e da URL base configurável"""
+
+    def test_zero_delay_scale_skips_pauses(self):
+        """delay_scale=0 elimina as pausas entre ações"""
+        service = LinkedInAutomationService(delay_scale=0)
+        started = time.monotonic()
+        asyncio.run(service._pause(5, 10))
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_delay_scale_shrinks_pauses(self):
+        """delay_scale reduz proporcionalmente a pausa"""
+        service = LinkedInAutomationService(delay_scale=0.01)
+        started = time.monotonic()
+        asyncio.run(service._pause(5, 10))
+        elapsed = time.monotonic() - started
+        self.assertGreaterEqual(elapsed, 0.04)
+        self.assertLess(elapsed, 0.5)
+
+    def test_urls_derive_from_web_base(self):
+        """URLs da automação partem de LINKEDIN_WEB_URL"""
+        self.assertEqual(LINKEDIN_FEED_URL, f'{LINKEDIN_WEB_URL}/feed/')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes da API OAuth Falsa
+Testes do login OAuth contra a API falsa, injeção de erros e teste de carga
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_linkedin_api import FakeLinkedInApi
+from benchmarks.login_benchmark import parse_args, run_benchmark
+from config import Config
+from services.http_client import PooledHttpClient
+from services.linkedin_service import LinkedInOAuthService
+from services.profile_cache import ProfileCache
+
+
+class TestFakeLinkedInApi(unittest.TestCase):
+    """Testes do LinkedInOAuthService apontado para a API falsa"""
+
+    def setUp(self):
+        self.api = FakeLinkedInApi()
+        self.api.start()
+        self.http = PooledHttpClient(pool_size=4, retries=2, backoff=0, timeout=5)
+        self.service = LinkedInOAuthService(http=self.http, cache=ProfileCache(ttl=0),
+                                            base_url=self.api.oauth_url, api_url=self.api.api_url)
+
+    def tearDown(self):
+        self.http.close()
+        self.api.stop()
+
+    def test_default_urls_come_from_config(self):
+        """Testar que as URLs padrão vêm da configuração"""
+        service = LinkedInOAuthService(http=self.http)
+        self.assertEqual(service.base_url, Config.LINKEDIN_OAUTH_URL)
+        self.assertEqual(service.api_url, Config.LINKEDIN_API_URL)
+
+    def test_login_flow(self):
+        """Testar código -> token -> perfil e email contra a API falsa"""
+        token = self.service.exchange_code_for_token('authorization-code-000001')
+        profile = self.service.get_user_profile(token['access_token'])
+
+        self.assertEqual(profile['id'], 'member--code-000001')
+        self.assertEqual(profile['email'], 'member--code-000001@snaplinked.local')
+        stats = self.api.get_stats()
+        self.assertEqual(stats['codes_exchanged'], 1)
+        self.assertEqual(stats['profiles'], 1)
+        self.assertEqual(stats['emails'], 1)
+
+    def test_unknown_token_is_rejected(self):
+        """Testar que token não emitido pela API falsa não obtém perfil"""
+        self.assertIsNone(self.service.get_user_profile('not-a-real-token'))
+
+    def test_injected_errors_are_retried_on_reads_only(self):
+        """Testar erros injetados: leituras repetem, troca do código não"""
+        token = self.service.exchange_code_for_token('authorization-code-000002')
+        self.api.error_rate = 1.0
+
+        self.assertIsNone(self.service.get_user_profile(token['access_token']))
+        self.assertIsNone(self.service.exchange_code_for_token('authorization-code-000003'))
+
+        # Perfil e email: 1 + 2 retentativas cada; troca do código: 1
+        self.assertEqual(self.api.get_stats()['injected_errors'], 7)
+
+    def test_revoked_token_loses_access(self):
+        """Testar que o token revogado deixa de valer na API falsa"""
+        token = self.service.exchange_code_for_token('authorization-code-000004')['access_token']
+
+        self.assertTrue(self.service.revoke_token(token))
+        self.assertIsNone(self.service.get_user_profile(token))
+
+
+class TestLoginBenchmark(unittest.TestCase):
+    """Testes do teste de carga do login"""
+
+    def test_small_run_reports_throughput_and_reuses_connections(self):
+        """Testar relatório de uma rodada curta"""
+        report = run_benchmark(parse_args(['--logins', '12', '--concurrency', '3',
+                                           '--latency-ms', '0', '--jitter-ms', '0']))
+
+        self.assertEqual(report['succeeded'], 12)
+        self.assertEqual(report['failed'], {})
+        self.assertEqual(report['login_seconds']['count'], 12)
+        self.assertEqual(report['api']['requests'], 36)
+        self.assertLess(report['pool']['connections_opened'], report['pool']['requests'])
+        self.assertGreater(report['logins_per_second'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
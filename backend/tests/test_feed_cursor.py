@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Cursor do Feed
+Testes da rolagem adaptativa e da detecção de feed esgotado
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.feed_cursor import FeedCursor, MAX_SCROLL_DISTANCE, MIN_SCROLL_DISTANCE
+
+
+class FakeScanner:
+    """Página simulada: cada rolagem rende os candidatos da lista `gains`"""
+
+    def __init__(self, gains, height_growth=None):
+        self.gains = list(gains)
+        self.height_growth = height_growth
+        self.seq = 0
+        self.height = 1000
+        self.distances = []
+        self.waits = []
+
+    async def scroll(self, distance):
+        self.distances.append(distance)
+        return {'seq': self.seq, 'height': self.height, 'atBottom': False}
+
+    async def wait_for_growth(self, before, timeout_ms):
+        self.waits.append(timeout_ms)
+        gained = self.gains.pop(0) if self.gains else 0
+        self.seq += gained
+        if gained or self.height_growth:
+            self.height += self.height_growth or 500
+        return {'seq': self.seq, 'height': self.height, 'atBottom': not gained}
+
+
+class TestFeedCursor(unittest.IsolatedAsyncioTestCase):
+    """Testes para o FeedCursor"""
+
+    def create_cursor(self, scanner, sources=('feed', 'feed', 'recent')):
+        self.pauses = []
+        self.navigations = []
+
+        async def pause(min_val, max_val, timer=None):
+            self.pauses.append((min_val, max_val))
+
+        async def navigate(url):
+            self.navigations.append(url)
+
+        return FeedCursor(scanner, 'like', list(sources), pause, navigate,
+                          distance=800, patience=2, wait_ms=1000)
+
+    async def test_productive_scroll_pauses_and_keeps_going(self):
+        """Testar que rolagem com candidatos novos pausa e não conta como vazia"""
+        cursor = self.create_cursor(FakeScanner(gains=[4]))
+
+        self.assertTrue(await cursor.advance())
+        self.assertEqual(cursor.dry_scrolls, 0)
+        self.assertEqual(cursor.candidates_seen, 4)
+        self.assertEqual(self.pauses, [(1, 2)])
+
+    async def test_empty_scrolls_grow_distance_and_wait(self):
+        """Testar que rolagens vazias aumentam distância e espera, até o limite"""
+        scanner = FakeScanner(gains=[], height_growth=100)
+        cursor = self.create_cursor(scanner)
+
+        for _ in range(8):
+            await cursor.advance()
+
+        self.assertEqual(scanner.distances[:3], [800, 1200, 1800])
+        self.assertEqual(max(scanner.distances), MAX_SCROLL_DISTANCE)
+        self.assertEqual(scanner.waits[:2], [1000, 1500])
+        self.assertEqual(max(scanner.waits), 4000)
+        # Documento ainda crescendo: não é esgotamento
+        self.assertEqual(self.navigations, [])
+
+    async def test_rich_scrolls_shrink_distance(self):
+        """Testar que rolagens com muitos candidatos encurtam a distância"""
+        scanner = FakeScanner(gains=[10, 10, 10, 10, 10])
+        cursor = self.create_cursor(scanner)
+
+        for _ in range(5):
+            await cursor.advance()
+
+        self.assertEqual(min(scanner.distances), MIN_SCROLL_DISTANCE)
+
+    async def test_exhaustion_reloads_then_falls_back_then_stops(self):
+        """Testar recarga, fonte alternativa e esgotamento final"""
+        cursor = self.create_cursor(FakeScanner(gains=[]))
+
+        results = [await cursor.advance() for _ in range(6)]
+
+        self.assertEqual(results, [True, True, True, True, True, False])
+        self.assertEqual(self.navigations, ['feed', 'recent'])
+        self.assertTrue(cursor.exhausted)
+        self.assertFalse(await cursor.advance())
+        self.assertEqual(cursor.get_state()['reloads'], 2)
+
+    async def test_new_content_resets_exhaustion(self):
+        """Testar que conteúdo novo zera a contagem de rolagens vazias"""
+        cursor = self.create_cursor(FakeScanner(gains=[0, 3, 0]))
+
+        for _ in range(3):
+            self.assertTrue(await cursor.advance())
+
+        self.assertEqual(cursor.dry_scrolls, 1)
+        self.assertEqual(self.navigations, [])
+        self.assertEqual(cursor.wait_ms, 1500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Plano de Feed
+Testes unitários da passagem única pelo feed com várias ações por post
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import linkedin_service
+from services.dom_scanner import NEXT_POSTS_SCRIPT, PROGRESS_SCRIPT, SCROLL_SCRIPT
+from services.linkedin_service import LinkedInAutomationService, SecureRandomGenerator
+
+
+class FakeFeedPage:
+    """Feed com posts que oferecem botões de curtir e comentar"""
+
+    url = 'https://www.linkedin.com/feed/'
+
+    def __init__(self, post_count):
+        self.posts = [
+            {'urn': f'urn:li:activity:{i}', 'top': i * 100,
+             'targets': {'like': f'like-{i}', 'comment': f'comment-{i}'}}
+            for i in range(post_count)
+        ]
+        self.processed = set()
+        self.scrolls = 0
+
+    async def add_init_script(self, script):
+        pass
+
+    async def evaluate(self, script, arg=None):
+        if script == NEXT_POSTS_SCRIPT:
+            kinds, limit, processed = arg
+            self.processed.update(processed)
+            result = []
+            for post in self.posts:
+                targets = {k: t for k, t in post['targets'].items()
+                           if k in kinds and t not in self.processed}
+                if targets:
+                    result.append({**post, 'targets': targets})
+            return result[:limit]
+        if script == SCROLL_SCRIPT:
+            self.scrolls += 1
+        if script in (SCROLL_SCRIPT, PROGRESS_SCRIPT):
+            # Feed sem rolagem infinita: nada novo depois dos posts iniciais
+            return {'seq': len(self.posts) * 2, 'height': 1000, 'atBottom': True}
+        return None
+
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        pass
+
+    def locator(self, selector):
+        return selector
+
+
+class FakeLogWriter:
+    def __init__(self):
+        self.sessions = {}
+        self.logs = []
+        self.finished = {}
+
+    async def create_session(self, user_id, action_type, target_count):
+        session_id = len(self.sessions) + 1
+        self.sessions[session_id] = action_type
+        return session_id
+
+    def add(self, **kwargs):
+        self.logs.append(kwargs)
+        return kwargs
+
+    def update_log(self, row, details, execution_time_ms):
+        row.update(details=details, execution_time_ms=execution_time_ms)
+
+    async def finish_session(self, session_id, actual_count, error_message=None, metadata=None):
+        self.finished[session_id] = (actual_count, metadata)
+
+
+class FakeInteractionIndex:
+    def __init__(self, known=()):
+        self.known = set(known)
+        self.recorded = []
+
+    async def filter_known(self, user_id, action, target_urns):
+        return {urn for urn in target_urns if (action, urn) in self.known}
+
+    def record(self, user_id, action, target_urn):
+        self.recorded.append((action, target_urn))
+
+
+class FakeScheduler:
+    def __init__(self, limits=None):
+        self.limits = dict(limits or {})
+
+    async def ensure_user(self, user_id):
+        pass
+
+    def try_acquire(self, user_id, action, count=1):
+        if action not in self.limits:
+            return True
+        if self.limits[action] < count:
+            return False
+        self.limits[action] -= count
+        return True
+
+    def release(self, user_id, action, count=1):
+        if action in self.limits:
+            self.limits[action] += count
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.enqueued = []
+
+    def enqueue(self, user_id, action, target_count, **options):
+        self.enqueued.append((user_id, action, target_count, options))
+
+
+class NoDelayRandom(SecureRandomGenerator):
+    @staticmethod
+    def uniform(min_val, max_val):
+        return 0
+
+
+class FeedPlanService(LinkedInAutomationService):
+    """Serviço com ações registradas em memória no lugar dos cliques"""
+
+    def __init__(self, page):
+        super().__init__()
+        self.page = page
+        self.is_logged_in = True
+        self.secure_random = NoDelayRandom()
+        self.navigations = 0
+        self.actions = []
+
+    async def _prepare_page(self, url, action, force=False):
+        self.navigations += 1
+        return {'ready_seconds': 0.0}
+
+    async def _click_like(self, button, timer):
+        self.actions.append(('like', button))
+
+    async def _write_comment(self, button, timer):
+        self.actions.append(('comment', button))
+        return 'Ótima reflexão! 🎯'
+
+
+class PausingFeedPlanService(FeedPlanService):
+    """Serviço que registra quantos logs já existiam a cada pausa"""
+
+    def __init__(self, page, writer):
+        super().__init__(page)
+        self.writer = writer
+        self.logs_at_pause = []
+
+    async def _pause(self, min_val, max_val, timer=None):
+        self.logs_at_pause.append(len(self.writer.logs))
+        if timer is not None:
+            timer.add_delay(100)
+
+
+class TestFeedPlan(unittest.IsolatedAsyncioTestCase):
+    """Testes para run_feed_plan"""
+
+    def setUp(self):
+        self.writer = FakeLogWriter()
+        self.index = FakeInteractionIndex(known=[('like', 'urn:li:activity:0')])
+        self.scheduler = FakeScheduler()
+        self._originals = (
+            linkedin_service.automation_log_writer,
+            linkedin_service.interaction_index,
+            linkedin_service.automation_scheduler
+        )
+        linkedin_service.automation_log_writer = self.writer
+        linkedin_service.interaction_index = self.index
+        linkedin_service.automation_scheduler = self.scheduler
+
+    def tearDown(self):
+        (linkedin_service.automation_log_writer,
+         linkedin_service.interaction_index,
+         linkedin_service.automation_scheduler) = self._originals
+
+    async def test_single_pass_applies_actions_per_post(self):
+        """Testar uma navegação e curtida + comentário no mesmo post"""
+        # Todos os posts oferecem as duas ações, seja qual for o sorteado
+        self.index.known.clear()
+        service = FeedPlanService(FakeFeedPage(post_count=5))
+        result = await service.run_feed_plan(1, {'like': 3, 'comment': 1})
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['counts'], {'like': 3, 'comment': 1})
+        self.assertEqual(service.navigations, 1)
+
+        # O post comentado também foi curtido na mesma visita
+        commented = [b for a, b in service.actions if a == 'comment'][0]
+        post_index = commented.split('comment-')[1].rstrip('"]')
+        self.assertIn(('like', f'[data-snaplinked-id="like-{post_index}"]'), service.actions)
+
+    async def test_actions_are_logged_before_the_pause(self):
+        """Testar log gravado antes da pausa entre posts e tempo da pausa somado depois"""
+        self.index.known.clear()
+        service = PausingFeedPlanService(FakeFeedPage(post_count=5), self.writer)
+        await service.run_feed_plan(1, {'like': 2})
+
+        self.assertEqual(service.logs_at_pause, [1, 2])
+        for log in self.writer.logs:
+            self.assertEqual(log['details']['timing']['delay_ms'], 100)
+
+    async def test_one_session_per_action_type(self):
+        """Testar sessões separadas ligadas pelo metadata do plano"""
+        service = FeedPlanService(FakeFeedPage(post_count=5))
+        result = await service.run_feed_plan(1, {'like': 2, 'comment': 2})
+
+        self.assertEqual(sorted(self.writer.sessions.values()), ['comment', 'like'])
+        self.assertEqual(result['sessions'], {'like': 1, 'comment': 2})
+        for session_id, (count, metadata) in self.writer.finished.items():
+            self.assertEqual(count, 2)
+            self.assertEqual(metadata['feed_plan']['sessions'], result['sessions'])
+        self.assertEqual({log['session_id'] for log in self.writer.logs if log['action'] == 'like'}, {1})
+
+    async def test_skips_targets_already_worked(self):
+        """Testar que posts já curtidos em sessões anteriores não são clicados"""
+        service = FeedPlanService(FakeFeedPage(post_count=3))
+        result = await service.run_feed_plan(1, {'like': 2, 'comment': 1})
+
+        self.assertEqual(result['counts'], {'like': 2, 'comment': 1})
+        self.assertNotIn(('like', '[data-snaplinked-id="like-0"]'), service.actions)
+        self.assertEqual(len(self.index.recorded), 3)
+
+    async def test_daily_limit_stops_only_exhausted_action(self):
+        """Testar que o limite diário de uma ação não interrompe as demais"""
+        self.scheduler.limits = {'comment': 1}
+        service = FeedPlanService(FakeFeedPage(post_count=6))
+        result = await service.run_feed_plan(1, {'like': 3, 'comment': 3})
+
+        self.assertEqual(result['counts'], {'like': 3, 'comment': 1})
+        self.assertEqual(result['throttled'], ['comment'])
+        self.assertIn('limite diário atingido', result['message'])
+
+    async def test_transient_dom_error_does_not_abort_plan(self):
+        """Testar que uma falha ao procurar posts só consome uma tentativa"""
+        self.index.known.clear()
+        service = FeedPlanService(FakeFeedPage(post_count=5))
+        find_posts = service._next_fresh_posts
+        failures = [RuntimeError('Execution context was destroyed')]
+
+        async def flaky_find(*args, **kwargs):
+            if failures:
+                raise failures.pop()
+            return await find_posts(*args, **kwargs)
+
+        service._next_fresh_posts = flaky_find
+        result = await service.run_feed_plan(1, {'like': 2})
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['counts'], {'like': 2})
+
+    async def test_exhausted_feed_finishes_early(self):
+        """Testar que o feed esgotado encerra a passagem sem gastar as tentativas"""
+        self.index.known.clear()
+        page = FakeFeedPage(post_count=2)
+        service = FeedPlanService(page)
+        result = await service.run_feed_plan(1, {'like': 10})
+
+        self.assertTrue(result['exhausted'])
+        self.assertEqual(result['counts'], {'like': 2})
+        self.assertIn('feed esgotado', result['message'])
+
+        # Recarga e feed alternativo antes de desistir, bem abaixo de 30 tentativas
+        self.assertEqual(service.navigations, 3)
+        self.assertEqual(page.scrolls, 9)
+        metadata = self.writer.finished[1][1]
+        self.assertTrue(metadata['feed_plan']['feed_cursor']['exhausted'])
+
+    async def test_plan_is_kept_in_checkpoint_and_resumed_whole(self):
+        """Testar plano gravado no checkpoint e sessão órfã reenfileirada como plano"""
+        service = FeedPlanService(FakeFeedPage(post_count=5))
+        await service.run_feed_plan(1, {'like': 1, 'comment': 1})
+        state = linkedin_service.session_monitor._active[1]['state']
+        for session_id in (1, 2):
+            linkedin_service.session_monitor.untrack(session_id)
+
+        self.assertEqual(state['feed_plan'], {'plan': {'like': 1, 'comment': 1},
+                                              'sessions': {'like': 1, 'comment': 2}})
+
+        queue = FakeJobQueue()
+        original, linkedin_service.job_queue = linkedin_service.job_queue, queue
+        try:
+            claim = {'session_id': 1, 'user_id': 1, 'action': 'like', 'target_count': 1, 'done': 0,
+                     'feed_plan': state['feed_plan']}
+            self.assertTrue(linkedin_service.resume_automation_session(claim))
+        finally:
+            linkedin_service.job_queue = original
+
+        self.assertEqual(queue.enqueued, [(1, 'feed_plan', 2, {
+            'plan': {'like': 1, 'comment': 1}, 'resume_sessions': {'like': 1, 'comment': 2}
+        })])
+
+    async def test_invalid_plan(self):
+        """Testar plano sem ações de feed"""
+        service = FeedPlanService(FakeFeedPage(post_count=1))
+        result = await service.run_feed_plan(1, {'connect': 2})
+        self.assertFalse(result['success'])
+        self.assertEqual(self.writer.sessions, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
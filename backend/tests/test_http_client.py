@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Cliente HTTP
+Testes de keep-alive, retentativas e busca paralela do perfil OAuth
+"""
+
+import json
+import threading
+import time
+import unittest
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.http_client import PooledHttpClient
+from services.linkedin_service import LinkedInOAuthService
+from services.profile_cache import ProfileCache
+
+
+class FakeLinkedInApi(BaseHTTPRequestHandler):
+    """API simulada: falhas programadas por caminho e latência fixa"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    failures = {}
+    throttled = {}
+    delay = 0.0
+    hits = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.hits.append(('GET', path))
+        time.sleep(self.delay)
+        if self.throttled.get(path):
+            self.throttled[path] -= 1
+            return self._reply(429, {'message': 'throttled'}, {'Retry-After': '3600'})
+        if self.failures.get(path):
+            self.failures[path] -= 1
+            return self._reply(503, {'message': 'unavailable'})
+        if path.endswith('/people/~'):
+            return self._reply(200, {
+                'id': 'abc123',
+                'firstName': {'localized': {'en_US': 'Ana'}},
+                'lastName': {'localized': {'en_US': 'Souza'}}
+            })
+        if path.endswith('/emailAddress'):
+            return self._reply(200, {'elements': [{'handle~': {'emailAddress': 'ana@example.com'}}]})
+        return self._reply(404, {})
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.hits.append(('POST', path))
+        if self.failures.get(path):
+            self.failures[path] -= 1
+            return self._reply(503, {'message': 'unavailable'})
+        return self._reply(200, {'access_token': 'token-123', 'expires_in': 3600})
+
+
+class TestPooledHttpClient(unittest.TestCase):
+    """Testes para o PooledHttpClient e o LinkedInOAuthService"""
+
+    def setUp(self):
+        FakeLinkedInApi.failures = {}
+        FakeLinkedInApi.throttled = {}
+        FakeLinkedInApi.delay = 0.0
+        FakeLinkedInApi.hits = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeLinkedInApi)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+        self.client = PooledHttpClient(pool_size=4, retries=2, backoff=0, timeout=5, retry_after_max=0.2)
+        self.service = LinkedInOAuthService(http=self.client, cache=ProfileCache(ttl=0),
+                                            base_url=f'{self.base}/oauth/v2', api_url=f'{self.base}/v2')
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused(self):
+        """Testar que chamadas seguidas reaproveitam a mesma conexão"""
+        for _ in range(3):
+            self.client.get('profile', f'{self.base}/v2/people/~')
+
+        pool = self.client.get_stats()['pool']
+        self.assertEqual(pool['connections_opened'], 1)
+        self.assertEqual(pool['requests'], 3)
+
+    def test_retries_server_errors_on_idempotent_calls(self):
+        """Testar nova tentativa em 5xx e contagem de retentativas"""
+        FakeLinkedInApi.failures = {'/v2/people/~': 2}
+
+        response = self.client.get('profile', f'{self.base}/v2/people/~')
+
+        self.assertEqual(response.status_code, 200)
+        endpoint = self.client.get_stats()['endpoints']['profile']
+        self.assertEqual(endpoint['retries'], 2)
+        self.assertEqual(endpoint['status_200'], 1)
+
+    def test_long_retry_after_is_capped(self):
+        """Testar que um Retry-After de 1 hora espera só até retry_after_max"""
+        FakeLinkedInApi.throttled = {'/v2/people/~': 1}
+        started = time.monotonic()
+
+        response = self.client.get('profile', f'{self.base}/v2/people/~')
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get_stats()['endpoints']['profile']['retries'], 1)
+
+    def test_token_exchange_is_not_replayed_on_server_error(self):
+        """Testar que o código OAuth de uso único não é reenviado após 5xx"""
+        FakeLinkedInApi.failures = {'/oauth/v2/accessToken': 1}
+
+        self.assertIsNone(self.service.exchange_code_for_token('authorization-code'))
+        self.assertEqual(FakeLinkedInApi.hits.count(('POST', '/oauth/v2/accessToken')), 1)
+
+        self.assertEqual(self.service.exchange_code_for_token('authorization-code')['access_token'], 'token-123')
+
+    def test_profile_and_email_fetched_in_parallel(self):
+        """Testar perfil e email buscados ao mesmo tempo"""
+        FakeLinkedInApi.delay = 0.3
+        started = time.monotonic()
+
+        profile = self.service.get_user_profile('access-token-123')
+
+        self.assertLess(time.monotonic() - started, 0.55)
+        self.assertEqual(profile['name'], 'Ana Souza')
+        self.assertEqual(profile['email'], 'ana@example.com')
+        self.assertEqual(self.service.get_stats()['endpoints']['user_profile']['calls'], 1)
+
+    def test_profile_without_email_still_logs_in(self):
+        """Testar que falha persistente do email não impede o perfil"""
+        FakeLinkedInApi.failures = {'/v2/emailAddress': 5}
+
+        profile = self.service.get_user_profile('access-token-123')
+
+        self.assertEqual(profile['id'], 'abc123')
+        self.assertIsNone(profile['email'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Índice de Interações
+Testes do filtro de Bloom e da consulta de alvos já trabalhados
+"""
+
+import asyncio
+import threading
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, User, UserStats, InteractionRecord
+from services.interaction_index import BloomFilter, InteractionIndex
+from services.log_writer import automation_log_writer
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Testes para o BloomFilter"""
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Testar que chaves adicionadas sempre são encontradas"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'like:urn:li:activity:{i}')
+
+        self.assertTrue(all(f'like:urn:li:activity:{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'like:urn:li:activity:x{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertLess(bloom.memory_bytes, 2000)
+
+
+class TestInteractionIndex(unittest.TestCase):
+    """Testes para o InteractionIndex"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.user = User(email='test@example.com', name='Usuário Teste')
+        db.session.add(self.user)
+        db.session.flush()
+        db.session.add(UserStats(user_id=self.user.id))
+        db.session.commit()
+        self.user_id = self.user.id
+
+        self.index = InteractionIndex(capacity=1000)
+        self.index.init_app(self.app)
+
+    def tearDown(self):
+        automation_log_writer.shutdown()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_logged_interactions_are_persisted_and_known(self):
+        """Testar que a interação gravada no lote de logs é reconhecida depois"""
+        async def scenario():
+            session_id = await automation_log_writer.create_session(self.user_id, 'like', 2)
+            for urn in ('urn:li:activity:1', 'urn:li:activity:2'):
+                automation_log_writer.add(
+                    session_id=session_id, user_id=self.user_id, action='like',
+                    success=True, target_urn=urn
+                )
+            await automation_log_writer.finish_session(session_id, 2)
+
+            known_likes = await self.index.filter_known(
+                self.user_id, 'like', ['urn:li:activity:1', 'urn:li:activity:3']
+            )
+            known_comments = await self.index.filter_known(self.user_id, 'comment', ['urn:li:activity:1'])
+            return known_likes, known_comments
+
+        known_likes, known_comments = asyncio.run(scenario())
+
+        self.assertEqual(known_likes, {'urn:li:activity:1'})
+        self.assertEqual(known_comments, set())
+        self.assertEqual(InteractionRecord.query.filter_by(user_id=self.user_id).count(), 2)
+        self.assertEqual(self.index.get_stats()['filters_loaded'], 1)
+
+    def test_recorded_target_is_known_before_flush(self):
+        """Testar que a interação recém-registrada é pulada mesmo antes do flush"""
+        async def scenario():
+            await self.index.filter_known(self.user_id, 'connect', ['/in/fulano'])
+            self.index.record(self.user_id, 'connect', '/in/fulano')
+            return await self.index.filter_known(self.user_id, 'connect', ['/in/fulano', '/in/ciclano'])
+
+        self.assertEqual(asyncio.run(scenario()), {'/in/fulano'})
+
+    def test_filter_load_does_not_block_db_thread(self):
+        """Testar que a montagem do filtro não ocupa a thread de banco do escritor"""
+        release = threading.Event()
+
+        class SlowIndex(InteractionIndex):
+            def _load(self, user_id):
+                release.wait(5)
+                return super()._load(user_id)
+
+        index = SlowIndex(capacity=1000)
+        index.init_app(self.app)
+
+        async def scenario():
+            first = asyncio.ensure_future(index.filter_known(self.user_id, 'like', ['urn:li:activity:1']))
+            second = asyncio.ensure_future(index.filter_known(self.user_id, 'like', ['urn:li:activity:2']))
+            await asyncio.sleep(0.05)
+            # Carga em andamento: a thread de banco continua livre
+            answered = await asyncio.wait_for(automation_log_writer.run_in_db_thread(lambda: True), 1)
+            release.set()
+            return answered, await first, await second
+
+        answered, first, second = asyncio.run(scenario())
+
+        self.assertTrue(answered)
+        self.assertEqual((first, second), (set(), set()))
+        self.assertEqual(index.get_stats()['filters_loaded'], 1)
+        self.assertEqual(index.get_stats()['users_cached'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes da Fila de Jobs
+Testes unitários da fila assíncrona de automações
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.async_runtime import AsyncRuntime
+from services.job_queue import JobAlreadyActiveError, JobQueue, JobQueueFullError, SHUTDOWN_MESSAGE
+
+
+def wait_for(predicate, timeout=2.0):
+    """Aguardar condição ficar verdadeira"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestJobQueue(unittest.TestCase):
+    """Testes para a JobQueue"""
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_job_runs_off_request_thread(self):
+        """Testar execução do job na thread dos workers"""
+        threads = []
+
+        async def handler(job):
+            threads.append(threading.current_thread().name)
+            job.update_progress(1)
+            await asyncio.sleep(0)
+            return {'success': True, 'count': 1}
+
+        self.queue = JobQueue(handler, workers=2, max_queued=10, history_limit=10)
+        job = self.queue.enqueue(1, 'like', 1)
+
+        self.assertTrue(wait_for(lambda: job.is_finished))
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.to_dict()['progress']['percent'], 100)
+        self.assertEqual(threads, ['automation-loop'])
+
+        stats = self.queue.get_stats()
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['run_seconds']['count'], 1)
+
+    def test_on_stop_runs_on_worker_loop(self):
+        """Testar liberação de recursos no loop dos workers ao desligar"""
+        stopped = []
+
+        async def handler(job):
+            return {'success': True}
+
+        async def on_stop():
+            stopped.append(threading.current_thread().name)
+
+        self.queue = JobQueue(handler, workers=1, max_queued=10, history_limit=10, on_stop=on_stop)
+        self.queue.start()
+        self.queue.shutdown()
+
+        self.assertEqual(stopped, ['automation-loop'])
+
+    def test_failed_handler_marks_job_failed(self):
+        """Testar job marcado como falho quando o handler lança erro"""
+        async def handler(job):
+            raise RuntimeError('boom')
+
+        self.queue = JobQueue(handler, workers=1, max_queued=10, history_limit=10)
+        job = self.queue.enqueue(1, 'connect', 2)
+
+        self.assertTrue(wait_for(lambda: job.is_finished))
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error_message, 'boom')
+
+    def test_rejects_when_queue_full(self):
+        """Testar rejeição quando a fila está cheia"""
+        release = threading.Event()
+
+        async def handler(job):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            return {'success': True}
+
+        self.queue = JobQueue(handler, workers=1, max_queued=1, history_limit=10)
+        first = self.queue.enqueue(1, 'like', 1)
+        self.assertTrue(wait_for(lambda: first.status == 'running'))
+        self.queue.enqueue(2, 'like', 1)
+
+        with self.assertRaises(JobQueueFullError):
+            self.queue.enqueue(3, 'like', 1)
+
+        self.assertIsNotNone(self.queue.get_active_job(2))
+        release.set()
+
+    def test_sessions_overlap_delays_on_one_loop(self):
+        """Testar que pausas de sessões diferentes se sobrepõem no mesmo loop"""
+        async def handler(job):
+            await asyncio.sleep(0.2)  # pausa humana
+            return {'success': True, 'count': 1}
+
+        self.queue = JobQueue(handler, workers=8, max_queued=10, history_limit=10)
+        started = time.monotonic()
+        jobs = [self.queue.enqueue(user_id, 'like', 1) for user_id in range(8)]
+
+        self.assertTrue(wait_for(lambda: all(job.is_finished for job in jobs)))
+        self.assertLess(time.monotonic() - started, 0.2 * 4)
+
+
+    def test_shutdown_fails_running_and_queued_jobs(self):
+        """Testar que jobs interrompidos pelo desligamento não ficam ativos"""
+        async def handler(job):
+            while True:
+                await asyncio.sleep(0.01)
+
+        self.queue = JobQueue(handler, workers=1, max_queued=10, history_limit=10)
+        running = self.queue.enqueue(1, 'like', 1)
+        self.assertTrue(wait_for(lambda: running.status == 'running'))
+        queued = self.queue.enqueue(2, 'like', 1)
+        self.queue.shutdown()
+
+        for job in (running, queued):
+            self.assertEqual(job.status, 'failed')
+            self.assertEqual(job.error_message, SHUTDOWN_MESSAGE)
+            self.assertIsNotNone(job.finished_at)
+        self.assertIsNone(self.queue.get_active_job(1))
+        self.assertIsNone(self.queue.get_active_job(2))
+        self.assertEqual(self.queue.queue_depth, 0)
+
+    def test_runtime_restart_keeps_queued_jobs(self):
+        """Testar reenfileiramento dos jobs pendentes quando o runtime reinicia"""
+        release = threading.Event()
+
+        async def handler(job):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            return {'success': True}
+
+        runtime = AsyncRuntime(name='restart-test-loop')
+        self.addCleanup(runtime.shutdown)
+        self.queue = JobQueue(handler, workers=1, max_queued=10, history_limit=10, runtime=runtime)
+        running = self.queue.enqueue(1, 'like', 1)
+        self.assertTrue(wait_for(lambda: running.status == 'running'))
+        queued = self.queue.enqueue(2, 'like', 1)
+
+        runtime.shutdown()
+        self.assertEqual(running.status, 'failed')
+        self.assertEqual(queued.status, 'queued')
+
+        later = self.queue.enqueue(3, 'like', 1)
+        release.set()
+        self.assertTrue(wait_for(lambda: queued.is_finished and later.is_finished))
+        self.assertEqual(queued.status, 'completed')
+        self.assertEqual(later.status, 'completed')
+        self.assertEqual(self.queue.queue_depth, 0)
+
+    def test_exclusive_enqueue_is_atomic(self):
+        """Testar que requisições concorrentes do mesmo usuário enfileiram um único job"""
+        release = threading.Event()
+
+        async def handler(job):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            return {'success': True}
+
+        self.queue = JobQueue(handler, workers=1, max_queued=50, history_limit=50)
+        accepted, rejected = [], []
+        barrier = threading.Barrier(8)
+
+        def submit():
+            barrier.wait()
+            try:
+                accepted.append(self.queue.enqueue(1, 'like', 1, exclusive=True))
+            except JobAlreadyActiveError as e:
+                rejected.append(e.job)
+
+        threads = [threading.Thread(target=submit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(accepted), 1)
+        self.assertEqual(len(rejected), 7)
+        self.assertTrue(all(job is accepted[0] for job in rejected))
+        release.set()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Escritor de Logs
+Testes da gravação em lote de AutomationLog
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, User, UserStats, AutomationSession, AutomationLog
+from services.log_writer import AutomationLogWriter
+
+
+class TestAutomationLogWriter(unittest.TestCase):
+    """Testes para o AutomationLogWriter"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.user = User(email='test@example.com', name='Usuário Teste')
+        db.session.add(self.user)
+        db.session.flush()
+        db.session.add(UserStats(user_id=self.user.id))
+        db.session.commit()
+        self.user_id = self.user.id
+
+        self.writer = AutomationLogWriter(batch_size=50, flush_interval=60)
+        self.writer.init_app(self.app)
+
+    def tearDown(self):
+        self.writer.shutdown()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def run_session(self, count, error_message=None):
+        """Simular uma sessão de automação com `count` ações"""
+        async def scenario():
+            session_id = await self.writer.create_session(self.user_id, 'like', count)
+            for index in range(count):
+                self.writer.add(
+                    session_id=session_id,
+                    user_id=self.user_id,
+                    action='like',
+                    target_element='post',
+                    success=True,
+                    details={'post_index': index}
+                )
+            await self.writer.finish_session(session_id, count, error_message=error_message)
+            return session_id
+
+        return asyncio.run(scenario())
+
+    def test_logs_are_flushed_on_session_completion(self):
+        """Testar que os logs em buffer são gravados ao finalizar a sessão"""
+        session_id = self.run_session(3)
+        db.session.expire_all()
+
+        session = db.session.get(AutomationSession, session_id)
+        self.assertEqual(session.status, 'completed')
+        self.assertEqual(session.actual_count, 3)
+        self.assertEqual(AutomationLog.query.filter_by(session_id=session_id).count(), 3)
+        self.assertEqual(UserStats.query.filter_by(user_id=self.user_id).first().total_likes, 3)
+
+        stats = self.writer.get_stats()
+        self.assertEqual(stats['rows_flushed'], 3)
+        self.assertEqual(stats['batches'], 1)
+        self.assertEqual(stats['buffered'], 0)
+
+    def test_failed_session_keeps_logs(self):
+        """Testar que a falha da sessão não descarta logs já realizados"""
+        session_id = self.run_session(2, error_message='Timeout')
+        db.session.expire_all()
+
+        session = db.session.get(AutomationSession, session_id)
+        self.assertEqual(session.status, 'failed')
+        self.assertEqual(session.error_message, 'Timeout')
+        self.assertEqual(AutomationLog.query.filter_by(session_id=session_id).count(), 2)
+
+    def test_flushes_when_batch_is_full(self):
+        """Testar flush automático ao atingir o tamanho do lote"""
+        self.writer.batch_size = 2
+
+        async def scenario():
+            session_id = await self.writer.create_session(self.user_id, 'like', 2)
+            for index in range(2):
+                self.writer.add(session_id=session_id, user_id=self.user_id,
+                                action='like', success=True)
+            # Aguardar a thread de banco sem finalizar a sessão
+            for _ in range(100):
+                if self.writer.get_stats()['rows_flushed'] == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+        asyncio.run(scenario())
+        self.assertEqual(self.writer.get_stats()['rows_flushed'], 2)
+        self.assertEqual(AutomationLog.query.count(), 2)
+
+    def test_update_log_before_and_after_flush(self):
+        """Testar log completado no buffer e, já gravado, por UPDATE no próximo lote"""
+        async def scenario():
+            session_id = await self.writer.create_session(self.user_id, 'like', 2)
+            buffered = self.writer.add(session_id=session_id, user_id=self.user_id, action='like',
+                                       success=True, details={'timing': {}}, execution_time_ms=10)
+            self.writer.update_log(buffered, {'timing': {'delay_ms': 5}}, 15)
+
+            flushed = self.writer.add(session_id=session_id, user_id=self.user_id, action='like',
+                                      success=True, details={'timing': {}}, execution_time_ms=20)
+            await self.writer.flush()
+            self.writer.update_log(flushed, {'timing': {'delay_ms': 7}}, 27)
+            await self.writer.flush()
+
+        asyncio.run(scenario())
+        db.session.expire_all()
+
+        logs = AutomationLog.query.order_by(AutomationLog.id).all()
+        self.assertEqual([log.execution_time_ms for log in logs], [15, 27])
+        self.assertEqual([log.details['timing']['delay_ms'] for log in logs], [5, 7])
+        self.assertEqual(self.writer.get_stats()['rows_updated'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Watchdog de Memória
+Testes da amostragem via CDP e da reciclagem de páginas e contextos
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import linkedin_service
+from services.linkedin_service import LinkedInAutomationService
+from services.memory_watchdog import MemoryWatchdog, MIB
+
+
+class FakeCDPSession:
+    def __init__(self, page):
+        self.page = page
+        self.sent = []
+        self.detached = False
+
+    async def send(self, method, params=None):
+        self.sent.append(method)
+        if method == 'Performance.getMetrics':
+            return {'metrics': [
+                {'name': 'JSHeapUsedSize', 'value': self.page.heap_mb * MIB},
+                {'name': 'Nodes', 'value': self.page.nodes}
+            ]}
+        return {}
+
+    async def detach(self):
+        self.detached = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.sessions = []
+        self.pages = []
+
+    async def new_cdp_session(self, page):
+        session = FakeCDPSession(page)
+        self.sessions.append(session)
+        return session
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+
+class FakePage:
+    url = 'https://www.linkedin.com/feed/'
+
+    def __init__(self, context, heap_mb=10, nodes=1000):
+        self.context = context
+        self.heap_mb = heap_mb
+        self.nodes = nodes
+        self.closed = False
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def set_default_navigation_timeout(self, timeout):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FixedRssWatchdog(MemoryWatchdog):
+    """Watchdog com RSS do navegador controlado pelo teste"""
+
+    rss = None
+
+    def renderer_rss_mb(self):
+        return self.rss
+
+
+class TestMemoryWatchdog(unittest.IsolatedAsyncioTestCase):
+    """Testes para o MemoryWatchdog"""
+
+    def setUp(self):
+        self.watchdog = FixedRssWatchdog(interval=60, max_heap_mb=100, max_dom_nodes=5000,
+                                         max_rss_mb_per_context=500)
+        self.context = FakeContext()
+
+    async def test_healthy_page_is_kept(self):
+        """Testar que página dentro dos limites não é reciclada"""
+        page = FakePage(self.context)
+
+        self.assertIsNone(await self.watchdog.check(page))
+        stats = self.watchdog.get_stats()
+        self.assertEqual(stats['samples'], 1)
+        self.assertEqual(stats['last_sample']['dom_nodes'], 1000)
+
+    async def test_heap_or_dom_over_limit_recycles_page(self):
+        """Testar reciclagem da página por heap JS ou nós do DOM"""
+        self.assertEqual(await self.watchdog.check(FakePage(self.context, heap_mb=150)), 'page')
+        self.assertEqual(await self.watchdog.check(FakePage(self.context, nodes=8000)), 'page')
+
+    async def test_rss_over_limit_recycles_context(self):
+        """Testar reciclagem do contexto pelo RSS dos renderers"""
+        self.watchdog.rss = 900
+        self.assertEqual(await self.watchdog.check(FakePage(self.context)), 'context')
+
+    async def test_rss_recycles_only_the_largest_context(self):
+        """Testar que o RSS alto recicla o contexto de maior heap, não o primeiro amostrado"""
+        small_context, large_context = FakeContext(), FakeContext()
+        small, large = FakePage(small_context, heap_mb=20), FakePage(large_context, heap_mb=80)
+        self.watchdog.rss = 900
+        self.watchdog.max_rss_mb_per_context = 2000  # amostrar as duas abaixo do limite
+        await self.watchdog.check(large)
+        self.watchdog.max_rss_mb_per_context = 500
+        self.watchdog.interval = 0.000001
+
+        self.assertIsNone(await self.watchdog.check(small))
+        self.assertEqual(await self.watchdog.check(large), 'context')
+        self.assertEqual(self.watchdog.get_stats()['rss_not_largest'], 1)
+
+    async def test_cooldown_after_context_recycle(self):
+        """Testar que nenhum outro contexto é reciclado logo após uma reciclagem"""
+        self.watchdog.rss = 900
+        self.watchdog.interval = 0.000001
+        page = FakePage(self.context)
+        self.assertEqual(await self.watchdog.check(page), 'context')
+        await self.watchdog.forget(page)
+        self.watchdog.record_recycle('context')
+
+        self.assertIsNone(await self.watchdog.check(FakePage(FakeContext())))
+        self.assertEqual(self.watchdog.get_stats()['rss_cooldown_skips'], 1)
+
+        self.watchdog.recycle_cooldown = 0
+        self.assertEqual(await self.watchdog.check(FakePage(FakeContext(), heap_mb=50)), 'context')
+
+    async def test_closed_pages_do_not_compete_for_recycle(self):
+        """Testar que um contexto fechado sem forget() não bloqueia a reciclagem dos vivos"""
+        dead = FakePage(FakeContext(), heap_mb=90)
+        self.watchdog.max_rss_mb_per_context = 2000
+        await self.watchdog.check(dead)
+        dead.closed = True  # despejado pelo pool sem passar pelo serviço
+
+        self.watchdog.max_rss_mb_per_context = 500
+        self.watchdog.rss = 900
+        self.assertEqual(await self.watchdog.check(FakePage(self.context, heap_mb=20)), 'context')
+        self.assertEqual(self.watchdog.get_stats()['closed_pages_dropped'], 1)
+
+    async def test_samples_once_per_interval_with_one_session(self):
+        """Testar amostragem limitada por intervalo e sessão CDP reaproveitada"""
+        page = FakePage(self.context)
+        await self.watchdog.check(page)
+        page.heap_mb = 500
+
+        self.assertIsNone(await self.watchdog.check(page))
+        self.assertEqual(self.watchdog.get_stats()['samples'], 1)
+
+        self.watchdog.interval = 0.000001
+        self.assertEqual(await self.watchdog.check(page), 'page')
+        self.assertEqual(len(self.context.sessions), 1)
+        self.assertEqual(self.context.sessions[0].sent.count('Performance.enable'), 1)
+
+        await self.watchdog.forget(page)
+        self.assertTrue(self.context.sessions[0].detached)
+
+    async def test_sampling_error_is_ignored(self):
+        """Testar que falha no CDP não interrompe a automação"""
+        class BrokenContext:
+            async def new_cdp_session(self, page):
+                raise RuntimeError('Target closed')
+
+        self.assertIsNone(await self.watchdog.check(FakePage(BrokenContext())))
+        self.assertEqual(self.watchdog.get_stats()['sample_errors'], 1)
+
+
+class TestServiceRecycling(unittest.IsolatedAsyncioTestCase):
+    """Testes da reciclagem feita pelo serviço entre ações"""
+
+    def setUp(self):
+        self.watchdog = FixedRssWatchdog(interval=0.000001, max_heap_mb=100, max_dom_nodes=5000,
+                                         max_rss_mb_per_context=0)
+        self._original = linkedin_service.memory_watchdog
+        linkedin_service.memory_watchdog = self.watchdog
+
+    def tearDown(self):
+        linkedin_service.memory_watchdog = self._original
+
+    async def test_bloated_page_is_replaced_in_same_context(self):
+        """Testar troca da página inchada e volta à mesma URL"""
+        navigations = []
+
+        class Service(LinkedInAutomationService):
+            async def _prepare_page(self, url, action, force=False):
+                navigations.append((url, action, force))
+                return {}
+
+        context = FakeContext()
+        service = Service()
+        service.context = context
+        service.page = old_page = FakePage(context, heap_mb=400)
+
+        self.assertTrue(await service._watch_memory('like'))
+
+        self.assertTrue(old_page.closed)
+        self.assertIs(service.page, context.pages[0])
+        self.assertEqual(navigations, [(FakePage.url, 'like', True)])
+        self.assertEqual(self.watchdog.get_stats()['pages_recycled'], 1)
+        self.assertFalse(await service._watch_memory('like'))
+
+
+if __name__ == '__main__':
+    unittest.main()
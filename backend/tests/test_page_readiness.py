@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes de Prontidão de Página
+Testes unitários da navegação com domcontentloaded e das métricas por ação
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.page_readiness import PageReadiness, READY_SELECTORS
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state=None, timeout=None):
+        self.page.waited.append((self.selector, state))
+        if not self.page.ready:
+            raise TimeoutError('timeout')
+
+
+class FakePage:
+    def __init__(self, ready=True):
+        self.ready = ready
+        self.gotos = []
+        self.waited = []
+
+    async def goto(self, url, wait_until=None):
+        self.gotos.append((url, wait_until))
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+
+class TestPageReadiness(unittest.IsolatedAsyncioTestCase):
+    """Testes para PageReadiness"""
+
+    def setUp(self):
+        self.readiness = PageReadiness(timeout_ms=100)
+
+    async def test_navigate_uses_domcontentloaded(self):
+        """Testar navegação sem networkidle e espera pela condição da ação"""
+        page = FakePage()
+        timings = await self.readiness.navigate(page, 'https://www.linkedin.com/feed/', 'like')
+
+        self.assertEqual(page.gotos, [('https://www.linkedin.com/feed/', 'domcontentloaded')])
+        self.assertEqual(page.waited, [(READY_SELECTORS['like'], 'attached')])
+        self.assertIn('navigation_seconds', timings)
+        self.assertIn('ready_seconds', timings)
+
+        stats = self.readiness.get_stats()['like']
+        self.assertEqual(stats['navigations'], 1)
+        self.assertEqual(stats['ready'], 1)
+        self.assertEqual(stats['ready_seconds']['count'], 1)
+
+    async def test_timeout_is_counted(self):
+        """Testar contagem de timeouts por ação"""
+        with self.assertRaises(TimeoutError):
+            await self.readiness.wait_ready(FakePage(ready=False), 'connect')
+
+        self.assertEqual(self.readiness.get_stats()['connect']['timeouts'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Cache de Perfis
+Testes de expiração, limite de tamanho e invalidação por token
+"""
+
+import time
+import unittest
+import sys
+import os
+from concurrent.futures import Future
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from services.linkedin_service import LinkedInOAuthService
+from services.profile_cache import ProfileCache, MISSING
+
+TOKEN = 'access-token-123'
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class FakeHttp:
+    """Cliente HTTP simulado que registra as chamadas feitas ao LinkedIn"""
+
+    def __init__(self):
+        self.calls = []
+        self.email_error = False
+        self.token_response = FakeResponse(200, {'access_token': 'token-456', 'expires_in': 3600})
+
+    def mount(self, prefix, idempotent=True):
+        pass
+
+    def get(self, endpoint, url, **kwargs):
+        self.calls.append(endpoint)
+        if endpoint == 'email':
+            if self.email_error:
+                raise requests.ConnectionError('connection reset')
+            return FakeResponse(200, {'elements': [{'handle~': {'emailAddress': 'ana@example.com'}}]})
+        return FakeResponse(200, {
+            'id': 'abc123',
+            'firstName': {'localized': {'en_US': 'Ana'}},
+            'lastName': {'localized': {'en_US': 'Souza'}}
+        })
+
+    def post(self, endpoint, url, **kwargs):
+        self.calls.append(endpoint)
+        return self.token_response
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def record_latency(self, endpoint, seconds):
+        pass
+
+    def get_stats(self):
+        return {}
+
+
+class TestProfileCache(unittest.TestCase):
+    """Testes para o ProfileCache"""
+
+    def test_entries_expire_after_ttl(self):
+        """Testar expiração da entrada após o TTL"""
+        cache = ProfileCache(ttl=0.05, max_entries=10)
+        cache.put(TOKEN, 'profile', {'id': 'abc123'})
+
+        self.assertEqual(cache.get(TOKEN, 'profile'), {'id': 'abc123'})
+        time.sleep(0.06)
+        self.assertIs(cache.get(TOKEN, 'profile'), MISSING)
+        self.assertEqual(cache.get_stats()['expired'], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        """Testar descarte do token menos usado acima do limite"""
+        cache = ProfileCache(ttl=60, max_entries=2)
+        cache.put('token-a-0000', 'profile', 'a')
+        cache.put('token-b-0000', 'profile', 'b')
+        cache.get('token-a-0000', 'profile')
+        cache.put('token-c-0000', 'profile', 'c')
+
+        self.assertEqual(cache.get('token-a-0000', 'profile'), 'a')
+        self.assertIs(cache.get('token-b-0000', 'profile'), MISSING)
+        stats = cache.get_stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evicted'], 1)
+
+    def test_missing_email_is_cached_as_none(self):
+        """Testar que email ausente (None) é distinto de entrada inexistente"""
+        cache = ProfileCache(ttl=60, max_entries=10)
+        cache.put(TOKEN, 'email', None)
+
+        self.assertIsNone(cache.get(TOKEN, 'email'))
+        self.assertEqual(cache.get_stats()['email']['hits'], 1)
+
+    def test_raw_token_is_not_stored(self):
+        """Testar que o cache guarda apenas o hash do token"""
+        cache = ProfileCache(ttl=60, max_entries=10)
+        cache.put(TOKEN, 'profile', {})
+
+        self.assertNotIn(TOKEN, repr(list(cache._entries.keys())))
+
+
+class TestOAuthProfileCaching(unittest.TestCase):
+    """Testes do cache aplicado ao LinkedInOAuthService"""
+
+    def setUp(self):
+        self.http = FakeHttp()
+        self.cache = ProfileCache(ttl=60, max_entries=100)
+        self.service = LinkedInOAuthService(http=self.http, cache=self.cache)
+
+    def test_repeated_lookup_is_served_from_cache(self):
+        """Testar que a segunda consulta do mesmo token não chama a API"""
+        first = self.service.get_user_profile(TOKEN)
+        second = self.service.get_user_profile(TOKEN)
+
+        self.assertEqual(first, second)
+        self.assertEqual(second['email'], 'ana@example.com')
+        self.assertEqual(self.http.calls, ['email', 'profile'])
+        stats = self.service.get_stats()['profile_cache']
+        self.assertEqual(stats['profile']['hits'], 1)
+        self.assertEqual(stats['profile']['misses'], 1)
+
+    def test_failed_email_is_fetched_again_alone(self):
+        """Testar que falha do email não é guardada e o perfil vem do cache"""
+        self.http.email_error = True
+        self.assertIsNone(self.service.get_user_profile(TOKEN)['email'])
+
+        self.http.email_error = False
+        self.http.calls.clear()
+        self.assertEqual(self.service.get_user_profile(TOKEN)['email'], 'ana@example.com')
+        self.assertEqual(self.http.calls, ['email'])
+
+    def test_refresh_and_revoke_invalidate_token(self):
+        """Testar invalidação do cache ao renovar e ao revogar o token"""
+        self.service.get_user_profile(TOKEN)
+        self.service.refresh_access_token('refresh-token-123', access_token=TOKEN)
+        self.assertIs(self.cache.get(TOKEN, 'profile'), MISSING)
+
+        self.service.get_user_profile(TOKEN)
+        self.assertTrue(self.service.revoke_token(TOKEN))
+        self.assertIs(self.cache.get(TOKEN, 'profile'), MISSING)
+
+        invalidated = self.cache.get_stats()['invalidated']
+        self.assertEqual(invalidated, {'refreshed': 1, 'revoked': 1})
+        self.assertIn('refresh_token', self.http.calls)
+        self.assertIn('revoke_token', self.http.calls)
+
+    def test_failed_refresh_keeps_cached_profile(self):
+        """Testar que renovação recusada ou sem token novo não descarta o cache"""
+        self.service.get_user_profile(TOKEN)
+
+        for response in (FakeResponse(500, {'message': 'unavailable'}), FakeResponse(200, {'error': 'invalid'})):
+            self.http.token_response = response
+            self.assertIsNone(self.service.refresh_access_token('refresh-token-123', access_token=TOKEN))
+            self.assertIsNot(self.cache.get(TOKEN, 'profile'), MISSING)
+
+        self.assertEqual(self.cache.get_stats()['invalidated'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
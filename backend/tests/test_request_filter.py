@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes da Interceptação de Requisições
+Testes unitários do perfil de bloqueio e dos contadores de economia
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.request_filter import (
+    InterceptionProfile, RequestFilter, PROFILES, ESTIMATED_RESOURCE_BYTES
+)
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = 'continue'
+
+    async def abort(self, error_code=None):
+        self.outcome = 'abort'
+
+    async def fulfill(self, **kwargs):
+        self.outcome = ('fulfill', kwargs.get('status'))
+
+
+class TestRequestFilter(unittest.IsolatedAsyncioTestCase):
+    """Testes para InterceptionProfile e RequestFilter"""
+
+    def setUp(self):
+        self.profile = InterceptionProfile(**PROFILES['automation'])
+        self.filter = RequestFilter(self.profile)
+
+    def test_profile_decisions(self):
+        """Testar decisão por tipo de recurso e padrão de URL"""
+        self.assertEqual(self.profile.decide('https://media.licdn.com/dms/image/x', 'image'), 'abort')
+        self.assertEqual(self.profile.decide('https://www.linkedin.com/feed/', 'document'), 'continue')
+        self.assertEqual(self.profile.decide('https://px.ads.linkedin.com/collect', 'ping'), 'stub')
+
+    def test_off_profile_is_disabled(self):
+        """Testar que o perfil 'off' não instala rotas"""
+        self.assertFalse(InterceptionProfile(**PROFILES['off']).is_enabled)
+
+    async def test_counts_avoided_requests_per_session(self):
+        """Testar contadores de requisições e bytes evitados"""
+        start = self.filter.snapshot()
+
+        image = FakeRoute('https://media.licdn.com/dms/image/x', 'image')
+        tracker = FakeRoute('https://www.googletagmanager.com/gtm.js', 'script')
+        document = FakeRoute('https://www.linkedin.com/feed/', 'document')
+        for route in (image, tracker, document):
+            await self.filter._handle(route)
+
+        self.assertEqual(image.outcome, 'abort')
+        self.assertEqual(tracker.outcome, ('fulfill', 200))
+        self.assertEqual(document.outcome, 'continue')
+
+        usage = self.filter.usage_since(start)
+        self.assertEqual(usage['requests_seen'], 3)
+        self.assertEqual(usage['requests_blocked'], 1)
+        self.assertEqual(usage['requests_stubbed'], 1)
+        self.assertEqual(
+            usage['bytes_avoided'],
+            ESTIMATED_RESOURCE_BYTES['image'] + ESTIMATED_RESOURCE_BYTES['script']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Escalonador
+Testes unitários dos token buckets, da fila justa e do teto de contextos
+"""
+
+import asyncio
+import unittest
+from datetime import date, timedelta
+import sys
+import os
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from app import create_app
+from models import db, User
+from services.auth_cache import AuthCache
+from services.job_queue import AutomationJob
+from services import scheduler as scheduler_module
+from services.scheduler import AutomationScheduler, FairQueue, TokenBucket
+
+
+class FakeJob:
+    def __init__(self, user_id, name):
+        self.user_id = user_id
+        self.name = name
+
+
+class FakeUser:
+    def __init__(self, user_id, likes=3, usage=None):
+        self.id = user_id
+        self.automation_enabled = True
+        self.daily_limit_likes = likes
+        self.daily_limit_connections = 2
+        self.daily_limit_comments = 1
+        self.usage = usage or {}
+
+    def get_daily_usage(self, date=None):
+        return {'likes': 0, 'connections': 0, 'comments': 0, **self.usage}
+
+
+class FakeJobQueue:
+    """Fila que só registra os jobs (sem workers nem navegador)"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, user_id, action, target_count, plan=None, exclusive=False):
+        job = AutomationJob(user_id, action, target_count, plan=plan)
+        self.jobs.append(job)
+        return job
+
+
+class FrozenDayScheduler(AutomationScheduler):
+    """Escalonador com o dia corrente controlado pelo teste"""
+
+    day = date(2026, 10, 17)
+
+    def today(self):
+        return self.day
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Testes para o TokenBucket"""
+
+    def test_take_and_refill(self):
+        """Testar consumo e recarga contínua"""
+        bucket = TokenBucket(capacity=2, tokens=1, refill_per_second=0)
+        self.assertTrue(bucket.try_take())
+        self.assertFalse(bucket.try_take())
+
+        bucket.give_back()
+        self.assertEqual(bucket.available, 1)
+
+        bucket = TokenBucket(capacity=10, tokens=0, refill_per_second=1000)
+        bucket.updated_at -= 0.01
+        self.assertGreaterEqual(bucket.available, 9)
+
+
+class TestAutomationScheduler(unittest.IsolatedAsyncioTestCase):
+    """Testes para o AutomationScheduler"""
+
+    def setUp(self):
+        self.scheduler = AutomationScheduler(max_active_contexts=2)
+
+    def test_buckets_start_from_remaining_daily_limit(self):
+        """Testar que o uso de hoje é descontado do limite"""
+        self.scheduler.load_user(FakeUser(1, likes=3, usage={'likes': 2}))
+
+        self.assertTrue(self.scheduler.check(1, 'like'))
+        self.assertTrue(self.scheduler.try_acquire(1, 'like'))
+        self.assertFalse(self.scheduler.try_acquire(1, 'like'))
+
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats['tokens_granted'], 1)
+        self.assertEqual(stats['throttled_by_action'], {'like': 1})
+
+    def test_disabled_automation_has_no_tokens(self):
+        """Testar usuário com automação desativada"""
+        user = FakeUser(2)
+        user.automation_enabled = False
+        self.scheduler.load_user(user)
+        self.assertFalse(self.scheduler.check(2, 'comment'))
+
+    def test_spent_limit_does_not_refill_during_the_day(self):
+        """Testar que o saldo esgotado não recarrega antes da virada do dia"""
+        self.scheduler.load_user(FakeUser(1, likes=2))
+        self.assertTrue(self.scheduler.try_acquire(1, 'like', 2))
+
+        bucket = self.scheduler.buckets[1]['like']
+        bucket.updated_at -= 12 * 3600
+        self.assertEqual(self.scheduler.available(1, 'like'), 0)
+
+    def test_buckets_reset_when_the_day_rolls_over(self):
+        """Testar saldo refeito na virada do dia, inclusive durante um job"""
+        scheduler = FrozenDayScheduler(max_active_contexts=2)
+        scheduler.load_user(FakeUser(1, likes=2))
+        self.assertTrue(scheduler.try_acquire(1, 'like', 2))
+        self.assertFalse(scheduler.try_acquire(1, 'like'))
+
+        scheduler.day += timedelta(days=1)
+
+        self.assertTrue(scheduler.needs_load(1))
+        self.assertTrue(scheduler.try_acquire(1, 'like', 2))
+        self.assertEqual(scheduler.get_stats()['day_rollovers'], 1)
+
+    def test_reload_keeps_unpersisted_consumption(self):
+        """Testar recarga no mesmo dia: vale o maior entre uso persistido e consumo local"""
+        scheduler = AutomationScheduler(max_active_contexts=2, reload_interval=0)
+        scheduler.load_user(FakeUser(1, likes=5))
+        self.assertTrue(scheduler.try_acquire(1, 'like', 2))
+
+        scheduler.load_user(FakeUser(1, likes=5, usage={'likes': 1}))
+        self.assertEqual(scheduler.available(1, 'like'), 3)
+
+        scheduler.load_user(FakeUser(1, likes=5, usage={'likes': 4}))
+        self.assertEqual(scheduler.available(1, 'like'), 1)
+
+    async def test_fair_queue_interleaves_users(self):
+        """Testar que um usuário com muitos jobs não bloqueia os demais"""
+        queue = FairQueue()
+        for index in range(3):
+            queue.put_nowait(FakeJob(1, f'a{index}'))
+        queue.put_nowait(FakeJob(2, 'b0'))
+        queue.put_nowait(FakeJob(3, 'c0'))
+
+        order = [(await queue.get()).name for _ in range(5)]
+        self.assertEqual(order, ['a0', 'b0', 'c0', 'a1', 'a2'])
+        self.assertEqual(queue.qsize(), 0)
+
+    async def test_context_slots_cap_concurrency(self):
+        """Testar teto global de contextos ativos"""
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            async with self.scheduler.context_slot():
+                peak = max(peak, self.scheduler.get_stats()['active_contexts'])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(work() for _ in range(5)))
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(self.scheduler.get_stats()['slot_wait_seconds']['count'], 5)
+
+
+class TestAutomationRoute(unittest.TestCase):
+    """Testes da rota de automação: require_auth -> limites do escalonador -> fila"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self._originals = (app_module.auth_cache, app_module.automation_scheduler, app_module.job_queue)
+        self.scheduler = AutomationScheduler(max_active_contexts=2)
+        self.queue = FakeJobQueue()
+        app_module.auth_cache = AuthCache(ttl=60)
+        app_module.automation_scheduler = scheduler_module.automation_scheduler = self.scheduler
+        app_module.job_queue = self.queue
+
+        self.user = User(email='test@example.com', name='Usuário Teste', daily_limit_comments=0)
+        db.session.add(self.user)
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {self.user.generate_auth_token()}'}
+
+    def tearDown(self):
+        app_module.auth_cache, app_module.automation_scheduler, app_module.job_queue = self._originals
+        scheduler_module.automation_scheduler = self._originals[1]
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def post(self, action):
+        with self.app.test_request_context(f'/api/automation/{action}', method='POST',
+                                           headers=self.headers, json={'target_count': 2}):
+            response, status = app_module.execute_automation(action)
+            return status, response.get_json()
+
+    def test_authenticated_request_is_enqueued(self):
+        """Testar que o snapshot do cache de autenticação basta para checar limites"""
+        status, body = self.post('like')
+
+        self.assertEqual(status, 202, body)
+        self.assertEqual(len(self.queue.jobs), 1)
+        self.assertEqual(self.scheduler.available(self.user.id, 'like'), self.user.daily_limit_likes)
+
+    def test_exhausted_limit_is_rejected(self):
+        """Testar limite diário zerado carregado do banco pelo id"""
+        status, body = self.post('comment')
+
+        self.assertEqual(status, 429, body)
+        self.assertEqual(self.queue.jobs, [])
+
+    def test_limit_changes_apply_on_commit(self):
+        """Testar limites e automação desativada aplicados aos baldes já carregados"""
+        self.assertEqual(self.post('like')[0], 202)
+        self.assertTrue(self.scheduler.try_acquire(self.user.id, 'like', 10))
+
+        self.user.daily_limit_likes = 15
+        self.user.daily_limit_comments = 2
+        db.session.commit()
+        self.assertEqual(self.scheduler.available(self.user.id, 'like'), 5)
+        self.assertEqual(self.post('comment')[0], 202)
+
+        self.user.automation_enabled = False
+        db.session.commit()
+        self.assertEqual(self.scheduler.available(self.user.id, 'like'), 0)
+        self.assertEqual(self.scheduler.get_stats()['limits_updated'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
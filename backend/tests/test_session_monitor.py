@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes do Monitor de Sessões
+Testes de heartbeat, checkpoint e do reaper de sessões órfãs
+"""
+
+import asyncio
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, User, UserStats, AutomationSession
+from services.log_writer import automation_log_writer
+from services.session_monitor import SessionMonitor, REAPED_ERROR_MESSAGE
+
+
+class TestSessionMonitor(unittest.TestCase):
+    """Testes para o SessionMonitor"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        user = User(email='test@example.com', name='Usuário Teste')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(UserStats(user_id=user.id))
+        db.session.commit()
+        self.user_id = user.id
+
+        self.claims = []
+        self.monitor = SessionMonitor(heartbeat_interval=1, stale_after=60, max_resumes=2)
+        self.monitor.set_resume_handler(lambda claim: self.claims.append(claim) or True)
+
+    def tearDown(self):
+        automation_log_writer.shutdown()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def create_session(self, target_count=3, actual_count=0, checkpoint=None, minutes_ago=10, action='like'):
+        session = AutomationSession(user_id=self.user_id, action_type=action, target_count=target_count)
+        session.start_session()
+        session.actual_count = actual_count
+        session.checkpoint = checkpoint
+        session.heartbeat_at = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+        db.session.add(session)
+        db.session.commit()
+        return session.id
+
+    def assertRecent(self, value):
+        # SQLite devolve datetimes sem fuso (UTC)
+        self.assertGreater(value, datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=1))
+
+    def reload(self, session_id):
+        db.session.expire_all()
+        return db.session.get(AutomationSession, session_id)
+
+    def test_heartbeat_writes_progress_checkpoint(self):
+        """Testar que o heartbeat grava contagem e checkpoint das sessões ativas"""
+        async def scenario():
+            session_id = await automation_log_writer.create_session(self.user_id, 'like', 5)
+            self.monitor.track(session_id)
+            self.monitor.update(session_id, 2, last_target='urn:li:activity:9')
+            written = await self.monitor.beat()
+            return session_id, written
+
+        session_id, written = asyncio.run(scenario())
+        session = self.reload(session_id)
+
+        self.assertEqual(written, 1)
+        self.assertEqual(session.actual_count, 2)
+        self.assertEqual(session.checkpoint['count'], 2)
+        self.assertEqual(session.checkpoint['last_target'], 'urn:li:activity:9')
+        self.assertRecent(session.heartbeat_at)
+
+    def test_stale_session_is_claimed_and_resumed(self):
+        """Testar que sessão sem heartbeat é reenfileirada do checkpoint"""
+        session_id = self.create_session(target_count=3, actual_count=1, checkpoint={'count': 1})
+
+        summary = self.monitor.reap()
+        session = self.reload(session_id)
+
+        self.assertEqual(summary['resumed'], 1)
+        self.assertEqual(self.claims, [{
+            'session_id': session_id, 'user_id': self.user_id, 'action': 'like',
+            'target_count': 3, 'done': 1
+        }])
+        self.assertEqual(session.status, 'running')
+        self.assertEqual(session.checkpoint['resumes'], 1)
+
+        # Heartbeat renovado pela reivindicação: não é coletada de novo
+        self.assertEqual(self.monitor.reap()['resumed'], 0)
+        self.assertEqual(len(self.claims), 1)
+
+    def test_session_over_resume_limit_is_failed(self):
+        """Testar que sessão retomada demais é encerrada com o progresso do checkpoint"""
+        session_id = self.create_session(checkpoint={'count': 2, 'resumes': 2})
+
+        summary = self.monitor.reap()
+        session = self.reload(session_id)
+        stats = UserStats.query.filter_by(user_id=self.user_id).first()
+
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual(self.claims, [])
+        self.assertEqual(session.status, 'failed')
+        self.assertEqual(session.error_message, REAPED_ERROR_MESSAGE)
+        self.assertEqual(session.actual_count, 2)
+        self.assertEqual(stats.total_likes, 2)
+
+    def test_finished_checkpoint_completes_session(self):
+        """Testar que sessão que já atingiu a meta é concluída sem retomada"""
+        session_id = self.create_session(target_count=2, checkpoint={'count': 2})
+
+        summary = self.monitor.reap()
+
+        self.assertEqual(summary['completed'], 1)
+        self.assertEqual(self.reload(session_id).status, 'completed')
+        self.assertEqual(self.claims, [])
+
+    def test_live_sessions_are_not_reaped(self):
+        """Testar que sessões com heartbeat recente ou deste processo ficam intactas"""
+        fresh_id = self.create_session(minutes_ago=0)
+        local_id = self.create_session()
+        self.monitor.track(local_id)
+
+        summary = self.monitor.reap()
+
+        self.assertEqual(summary, {'resumed': 0, 'completed': 0, 'failed': 0})
+        self.assertEqual(self.reload(fresh_id).status, 'running')
+        self.assertEqual(self.reload(local_id).status, 'running')
+
+    def test_failed_resume_marks_session_failed(self):
+        """Testar que sessão é encerrada quando a fila não aceita a retomada"""
+        self.monitor.set_resume_handler(lambda claim: False)
+        session_id = self.create_session(checkpoint={'count': 1})
+
+        self.assertEqual(self.monitor.reap()['failed'], 1)
+        self.assertEqual(self.reload(session_id).status, 'failed')
+
+    def test_feed_plan_sessions_are_resumed_as_one_plan(self):
+        """Testar que as sessões de um plano de feed voltam num único job com o plano"""
+        like_id = self.create_session(target_count=3, checkpoint={'count': 3})
+        comment_id = self.create_session(target_count=2, checkpoint={'count': 1}, action='comment')
+        feed_plan = {'plan': {'like': 3, 'comment': 2}, 'sessions': {'like': like_id, 'comment': comment_id}}
+        for session_id in (like_id, comment_id):
+            session = db.session.get(AutomationSession, session_id)
+            session.checkpoint = {**session.checkpoint, 'feed_plan': feed_plan}
+        db.session.commit()
+
+        summary = self.monitor.reap()
+
+        self.assertEqual(summary, {'resumed': 1, 'completed': 0, 'failed': 0})
+        self.assertEqual(len(self.claims), 1)
+        self.assertEqual(self.claims[0]['session_id'], like_id)
+        self.assertEqual(self.claims[0]['feed_plan'], feed_plan)
+        self.assertEqual(self.reload(like_id).status, 'running')
+        self.assertEqual(self.reload(comment_id).status, 'running')
+
+    def test_failed_feed_plan_fails_all_its_sessions(self):
+        """Testar que o plano que não pode ser retomado encerra todas as suas sessões"""
+        self.monitor.set_resume_handler(lambda claim: False)
+        like_id = self.create_session(checkpoint={'count': 1})
+        comment_id = self.create_session(checkpoint={'count': 2}, action='comment')
+        feed_plan = {'plan': {'like': 3, 'comment': 3}, 'sessions': {'like': like_id, 'comment': comment_id}}
+        for session_id in (like_id, comment_id):
+            session = db.session.get(AutomationSession, session_id)
+            session.checkpoint = {**session.checkpoint, 'feed_plan': feed_plan}
+        db.session.commit()
+
+        self.assertEqual(self.monitor.reap()['failed'], 1)
+        self.assertEqual(self.reload(like_id).status, 'failed')
+        comment = self.reload(comment_id)
+        self.assertEqual(comment.status, 'failed')
+        self.assertEqual(comment.actual_count, 2)
+
+    def test_resume_session_returns_checkpoint(self):
+        """Testar que o serviço reassume a sessão com a contagem do checkpoint"""
+        session_id = self.create_session(checkpoint={'count': 2, 'resumes': 1})
+
+        checkpoint = asyncio.run(automation_log_writer.resume_session(session_id))
+
+        self.assertEqual(checkpoint['count'], 2)
+        self.assertEqual(checkpoint['resumes'], 1)
+        self.assertRecent(self.reload(session_id).heartbeat_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes de Sessões Persistidas
+Testes do armazenamento criptografado de storage_state
+"""
+
+import time
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, User, BrowserStorageState
+from services.storage_state import StorageStateStore
+
+
+def make_state(expires_in=3600):
+    """Criar storage_state com cookie de sessão"""
+    return {
+        'cookies': [{'name': 'li_at', 'value': 'secret-session', 'domain': '.linkedin.com',
+                     'path': '/', 'expires': time.time() + expires_in}],
+        'origins': [{'origin': 'https://www.linkedin.com',
+                     'localStorage': [{'name': 'voyager', 'value': '1'}]}]
+    }
+
+
+class TestStorageStateStore(unittest.TestCase):
+    """Testes para o StorageStateStore"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.user = User(email='test@example.com', name='Usuário Teste')
+        db.session.add(self.user)
+        db.session.commit()
+        self.store = StorageStateStore(key='test-key', max_age_hours=24)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_roundtrip_is_encrypted(self):
+        """Testar que o snapshot é criptografado e restaurado intacto"""
+        state = make_state()
+        self.store.save(self.user.id, state)
+
+        record = BrowserStorageState.query.filter_by(user_id=self.user.id).first()
+        self.assertNotIn('secret-session', record.encrypted_state)
+        self.assertEqual(self.store.load(self.user.id), state)
+
+    def test_expired_cookie_invalidates_snapshot(self):
+        """Testar invalidação quando o cookie de sessão expirou"""
+        self.store.save(self.user.id, make_state(expires_in=-60))
+
+        self.assertIsNone(self.store.load(self.user.id))
+        self.assertEqual(BrowserStorageState.query.count(), 0)
+
+    def test_old_snapshot_invalidated_by_max_age(self):
+        """Testar invalidação por idade máxima sem validação"""
+        record = self.store.save(self.user.id, make_state())
+        record.last_validated_at = datetime.now(timezone.utc) - timedelta(hours=48)
+        db.session.commit()
+
+        self.assertIsNone(self.store.load(self.user.id))
+
+    def test_wrong_key_invalidates_snapshot(self):
+        """Testar que snapshot ilegível com outra chave é descartado"""
+        self.store.save(self.user.id, make_state())
+
+        other = StorageStateStore(key='other-key', max_age_hours=24)
+        self.assertIsNone(other.load(self.user.id))
+        self.assertEqual(other.get_stats()['invalidated_undecryptable'], 1)
+
+    def test_state_without_session_cookie_is_not_saved(self):
+        """Testar que snapshot sem cookie de sessão não é persistido"""
+        self.assertIsNone(self.store.save(self.user.id, {'cookies': [], 'origins': []}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes das Janelas de Tempo
+Testes dos intervalos semiabertos por dia, semana e mês, do fuso das
+estatísticas e das consultas que os usam
+"""
+
+import unittest
+import sys
+import os
+from datetime import date, datetime, timedelta, timezone
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from benchmarks.query_benchmark import parse_args, run_benchmark
+from models import (db, User, AutomationSession, AutomationLog, backfill_daily_usage, cleanup_old_logs,
+                    get_daily_usage_counts, get_usage_stats, local_day, time_window)
+
+
+class TestTimeWindow(unittest.TestCase):
+    """Testes para time_window e local_day"""
+
+    def test_day_week_and_month_in_utc(self):
+        """Testar limites semiabertos em UTC"""
+        day = date(2026, 10, 17)  # sábado
+
+        self.assertEqual(time_window('day', day, 'UTC'),
+                         (datetime(2026, 10, 17), datetime(2026, 10, 18)))
+        self.assertEqual(time_window('week', day, 'UTC'),
+                         (datetime(2026, 10, 12), datetime(2026, 10, 19)))
+        self.assertEqual(time_window('month', date(2026, 12, 31), 'UTC'),
+                         (datetime(2026, 12, 1), datetime(2027, 1, 1)))
+
+    def test_local_midnight_is_converted_to_utc(self):
+        """Testar dia local de São Paulo (UTC-3) convertido para UTC"""
+        self.assertEqual(time_window('day', date(2026, 10, 17), 'America/Sao_Paulo'),
+                         (datetime(2026, 10, 17, 3), datetime(2026, 10, 18, 3)))
+
+    def test_daylight_saving_day_has_23_hours(self):
+        """Testar dia de início do horário de verão (meia-noite inexistente)"""
+        start, end = time_window('day', date(2018, 11, 4), 'America/Sao_Paulo')
+        self.assertEqual(end - start, timedelta(hours=23))
+
+    def test_instant_uses_local_calendar_day(self):
+        """Testar que um instante cai no dia do fuso, não no dia UTC"""
+        late_night = datetime(2026, 10, 18, 1, 30)  # UTC, ainda dia 17 em São Paulo
+
+        self.assertEqual(local_day(late_night, 'America/Sao_Paulo'), date(2026, 10, 17))
+        self.assertEqual(time_window('day', late_night, 'America/Sao_Paulo')[0], datetime(2026, 10, 17, 3))
+
+    def test_invalid_period(self):
+        """Testar período inválido"""
+        with self.assertRaises(ValueError):
+            time_window('year')
+
+
+class TestTimeWindowQueries(unittest.TestCase):
+    """Testes das consultas portadas para janelas de tempo"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.user = User(email='test@example.com', name='Usuário Teste')
+        db.session.add(self.user)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_session(self, action, count, created_at):
+        session = AutomationSession(user_id=self.user.id, action_type=action, target_count=count,
+                                    actual_count=count, status='completed', created_at=created_at)
+        db.session.add(session)
+        db.session.commit()
+        return session.id
+
+    def test_boundaries_are_half_open(self):
+        """Testar sessões no último instante do dia e na meia-noite seguinte"""
+        self.add_session('like', 2, datetime(2026, 10, 17, 23, 59, 59, 999999))
+        self.add_session('like', 3, datetime(2026, 10, 18))
+        self.add_session('comment', 1, datetime(2026, 10, 12))
+
+        day = get_usage_stats(self.user.id, 'day', date(2026, 10, 17), 'UTC')
+        week = get_usage_stats(self.user.id, 'week', date(2026, 10, 17), 'UTC')
+
+        self.assertEqual(day, {'likes': 2, 'connections': 0, 'comments': 0, 'sessions': 1})
+        self.assertEqual(week, {'likes': 5, 'connections': 0, 'comments': 1, 'sessions': 3})
+
+    def test_backfill_groups_by_local_day(self):
+        """Testar contadores preenchidos pelo dia do fuso das estatísticas"""
+        self.add_session('like', 4, datetime(2026, 10, 18, 1, 30))
+
+        backfill_daily_usage('America/Sao_Paulo')
+        db.session.commit()
+
+        self.assertEqual(get_daily_usage_counts(self.user.id, date(2026, 10, 17)),
+                         {'like': 4, 'connect': 0, 'comment': 0})
+
+    def test_cleanup_old_logs(self):
+        """Testar limpeza de logs antigos"""
+        session_id = self.add_session('like', 2, datetime(2026, 10, 17))
+        now = datetime.now(timezone.utc)
+        for created_at in (now - timedelta(days=40), now):
+            db.session.add(AutomationLog(session_id=session_id, user_id=self.user.id, action='like',
+                                         target_element='post', success=True, created_at=created_at))
+        db.session.commit()
+
+        self.assertEqual(cleanup_old_logs(30), 1)
+        self.assertEqual(AutomationLog.query.count(), 1)
+
+
+class TestQueryBenchmark(unittest.TestCase):
+    """Testes do benchmark das consultas por período"""
+
+    def test_window_queries_use_index_range(self):
+        """Testar plano com faixa no índice e resultados iguais ao filtro antigo"""
+        report = run_benchmark(parse_args(['--users', '3', '--sessions-per-user', '300',
+                                           '--days', '60', '--queries', '10']))
+
+        for period, result in report['periods'].items():
+            self.assertTrue(result['window_range_scan'], period)
+            self.assertFalse(result['legacy_range_scan'], period)
+            self.assertEqual(result['mismatches'], 0, period)
+
+
+if __name__ == '__main__':
+    unittest.main()
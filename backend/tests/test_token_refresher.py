@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes da Renovação de Tokens
+Testes da seleção pela janela de vencimento, lotes e falhas por usuário
+"""
+
+import random
+import threading
+import time
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, User
+from services.token_refresher import TokenRefresher
+
+
+class FakeOAuth:
+    """Renovação simulada: registra chamadas e falha para os tokens indicados"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.failing = set()
+        self.calls = []
+        self.started_at = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, refresh_token, access_token=None):
+        with self._lock:
+            self.calls.append(access_token)
+            self.started_at.append(time.monotonic())
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if access_token in self.failing:
+            return None
+        return {'access_token': f'new-{access_token}', 'expires_in': 3600}
+
+
+class TestTokenRefresher(unittest.TestCase):
+    """Testes para o TokenRefresher"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.oauth = FakeOAuth()
+        self.refresher = TokenRefresher(interval=60, window=600, batch_size=10, concurrency=2, jitter=0)
+        self.refresher.set_refresh_handler(self.oauth.refresh)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def create_user(self, name, expires_in_minutes, refresh_token='refresh-token-123', is_active=True):
+        user = User(
+            email=f'{name}@example.com',
+            name=name,
+            access_token=f'{name}-token',
+            refresh_token=refresh_token,
+            token_expires_at=datetime.now(timezone.utc) + timedelta(minutes=expires_in_minutes),
+            is_active=is_active
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+    def test_only_tokens_inside_window_are_refreshed(self):
+        """Testar renovação apenas dos tokens que vencem na janela"""
+        soon = self.create_user('soon', 5)
+        self.create_user('later', 60)
+        self.create_user('inactive', 5, is_active=False)
+        self.create_user('norefresh', 5, refresh_token=None)
+
+        self.assertEqual(self.refresher.run_once(), {'refreshed': 1, 'failed': 0})
+
+        user = db.session.get(User, soon)
+        self.assertEqual(user.access_token, 'new-soon-token')
+        self.assertEqual(user.refresh_token, 'refresh-token-123')
+        self.assertGreater(user.token_expires_at, datetime.now() + timedelta(minutes=50))
+        self.assertEqual(self.oauth.calls, ['soon-token'])
+
+    def test_batches_are_bounded_and_ordered_by_expiry(self):
+        """Testar limite do lote, ordem de vencimento e concorrência limitada"""
+        self.oauth.delay = 0.05
+        for minutes in (9, 1, 5, 3):
+            self.create_user(f'user{minutes}', minutes)
+        self.refresher.batch_size = 3
+
+        self.refresher.run_once()
+
+        self.assertEqual(sorted(self.oauth.calls), ['user1-token', 'user3-token', 'user5-token'])
+        self.assertEqual(self.oauth.max_active, 2)
+        self.assertEqual(self.refresher.run_once()['refreshed'], 1)
+
+    def test_jitter_spreads_refreshes(self):
+        """Testar que o jitter espalha o início das renovações do lote"""
+        for i in range(4):
+            self.create_user(f'user{i}', 5)
+        self.refresher.jitter = 0.3
+        self.refresher.concurrency = 4
+        random.seed(7)
+
+        started = time.monotonic()
+        self.refresher.run_once()
+
+        self.assertGreater(max(self.oauth.started_at) - min(self.oauth.started_at), 0.1)
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(self.refresher.get_stats()['refreshed'], 4)
+
+    def test_failures_are_tracked_per_user_with_backoff(self):
+        """Testar contagem de falhas por usuário e espera antes de nova tentativa"""
+        failing = self.create_user('failing', 5)
+        ok = self.create_user('ok', 5)
+        self.oauth.failing.add('failing-token')
+
+        self.assertEqual(self.refresher.run_once(), {'refreshed': 1, 'failed': 1})
+        self.assertEqual(self.refresher.get_failures(failing), 1)
+        self.assertEqual(self.refresher.get_failures(ok), 0)
+
+        # Em backoff: não volta no próximo ciclo
+        self.oauth.calls.clear()
+        self.assertEqual(self.refresher.run_once(), {'refreshed': 0, 'failed': 0})
+        self.assertEqual(self.oauth.calls, [])
+
+        stats = self.refresher.get_stats()
+        self.assertEqual(stats['failing_users'], 1)
+        self.assertEqual(stats['failures'][0]['user_id'], failing)
+
+    def test_login_during_refresh_is_not_overwritten(self):
+        """Testar que um token trocado durante a renovação é preservado"""
+        user_id = self.create_user('racy', 5)
+
+        original = self.oauth.refresh
+
+        def refresh_while_user_logs_in(refresh_token, access_token=None):
+            with self.app.app_context():
+                db.session.get(User, user_id).access_token = 'fresh-login-token'
+                db.session.commit()
+            return original(refresh_token, access_token)
+
+        self.refresher.set_refresh_handler(refresh_while_user_logs_in)
+        self.refresher.run_once()
+
+        self.assertEqual(db.session.get(User, user_id).access_token, 'fresh-login-token')
+
+
+    def test_user_without_access_token_is_stored(self):
+        """Testar gravação do token renovado quando o access_token antigo é NULL"""
+        user_id = self.create_user('nulltoken', 5)
+        db.session.get(User, user_id).access_token = None
+        db.session.commit()
+
+        self.assertEqual(self.refresher.run_once(), {'refreshed': 1, 'failed': 0})
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(User, user_id).access_token, 'new-None')
+        self.assertEqual(self.refresher.run_once(), {'refreshed': 0, 'failed': 0})
+
+    def test_loop_survives_batch_error(self):
+        """Testar que um erro em run_once não encerra a thread de renovação"""
+        calls = []
+
+        class FailingOnceRefresher(TokenRefresher):
+            def run_once(self, now=None):
+                calls.append(time.monotonic())
+                if len(calls) == 1:
+                    raise RuntimeError('database is locked')
+                return super().run_once(now)
+
+        refresher = FailingOnceRefresher(interval=0.05, window=600, jitter=0)
+        refresher.init_app(self.app)
+        refresher.start()
+        try:
+            for _ in range(100):
+                if len(calls) >= 2:
+                    break
+                time.sleep(0.02)
+            stats = refresher.get_stats()
+        finally:
+            refresher.shutdown()
+
+        self.assertGreaterEqual(len(calls), 2)
+        self.assertTrue(stats['running'])
+        self.assertEqual(stats['errors'], 1)
+
+    def test_public_stats_omit_user_failures(self):
+        """Testar métricas sem ids e erros por usuário"""
+        self.create_user('failing', 5)
+        self.oauth.failing.add('failing-token')
+        self.refresher.run_once()
+
+        stats = self.refresher.get_stats(include_failures=False)
+        self.assertEqual(stats['failing_users'], 1)
+        self.assertNotIn('failures', stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
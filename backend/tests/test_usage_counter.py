@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnapLinked v3.0 - Testes dos Contadores de Uso Diário
+Testes do incremento na conclusão da sessão, do cache de leitura usado nos
+limites diários e do preenchimento a partir do histórico
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Adicionar o diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db, User, AutomationSession, DailyUsage, backfill_daily_usage
+from services import log_writer as log_writer_module
+from services import usage_counter as usage_counter_module
+from services.log_writer import AutomationLogWriter
+from services.usage_counter import UsageCounter, today
+
+
+class TestUsageCounter(unittest.TestCase):
+    """Testes para o UsageCounter"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.counter = UsageCounter(ttl=60, max_entries=100)
+        self._original = usage_counter_module.usage_counter
+        usage_counter_module.usage_counter = log_writer_module.usage_counter = self.counter
+
+        self.user = User(email='test@example.com', name='Usuário Teste',
+                         daily_limit_likes=10, daily_limit_connections=5)
+        db.session.add(self.user)
+        db.session.commit()
+
+    def tearDown(self):
+        usage_counter_module.usage_counter = log_writer_module.usage_counter = self._original
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_session(self, action, count, status='running', created_at=None):
+        session = AutomationSession(user_id=self.user.id, action_type=action,
+                                    target_count=count, actual_count=0, status=status)
+        if created_at is not None:
+            session.created_at = created_at
+        db.session.add(session)
+        db.session.commit()
+        return session.id
+
+    def test_completed_session_increments_counter(self):
+        """Testar incremento na conclusão, uma única vez por sessão"""
+        session_id = self.add_session('like', 3)
+
+        AutomationLogWriter.finalize_session(session_id, 3)
+        AutomationLogWriter.finalize_session(session_id, 3)
+
+        row = DailyUsage.query.filter_by(user_id=self.user.id, action='like').one()
+        self.assertEqual(row.count, 3)
+        self.assertEqual(row.day, today())
+
+    def test_failed_session_is_not_counted(self):
+        """Testar que sessões com falha não consomem o limite"""
+        session_id = self.add_session('like', 3)
+
+        AutomationLogWriter.finalize_session(session_id, 2, error_message='Falha')
+
+        self.assertEqual(DailyUsage.query.count(), 0)
+
+    def test_limit_check_is_served_from_cache(self):
+        """Testar que verificações repetidas consultam o banco uma vez"""
+        for _ in range(3):
+            self.assertTrue(self.user.can_perform_action('like', 10))
+        self.assertFalse(self.user.can_perform_action('like', 11))
+
+        stats = self.counter.get_stats()
+        self.assertEqual(stats['loads'], 1)
+        self.assertEqual(stats['hits'], 3)
+
+    def test_completion_is_visible_to_next_check(self):
+        """Testar que a conclusão descarta o contador em cache"""
+        self.assertTrue(self.user.can_perform_action('connect', 5))
+
+        AutomationLogWriter.finalize_session(self.add_session('connect', 4), 4)
+
+        self.assertTrue(self.user.can_perform_action('connect', 1))
+        self.assertFalse(self.user.can_perform_action('connect', 2))
+        self.assertEqual(self.user.get_daily_usage(), {'likes': 0, 'connections': 4, 'comments': 0})
+
+    def test_disabled_user_and_unknown_action(self):
+        """Testar automação desativada e ação inexistente"""
+        self.assertFalse(self.user.can_perform_action('share'))
+        self.user.automation_enabled = False
+        self.assertFalse(self.user.can_perform_action('like'))
+
+    def test_backfill_is_idempotent(self):
+        """Testar preenchimento a partir das sessões concluídas"""
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        for count, created_at in ((2, yesterday), (3, yesterday), (4, None)):
+            session_id = self.add_session('like', count, created_at=created_at)
+            session = db.session.get(AutomationSession, session_id)
+            session.complete_session(count)
+        self.add_session('comment', 5, status='failed')
+        db.session.commit()
+
+        for _ in range(2):
+            self.assertEqual(backfill_daily_usage(), 2)
+            db.session.commit()
+
+        self.assertEqual(self.counter.get(self.user.id, 'like', yesterday.date()), 5)
+        self.assertEqual(self.counter.get(self.user.id, 'like'), 4)
+        self.assertEqual(self.counter.get(self.user.id, 'comment'), 0)
+
+    def test_disabled_cache_reads_database(self):
+        """Testar cache desativado com ttl=0"""
+        counter = UsageCounter(ttl=0)
+        counter.get(self.user.id, 'like')
+        counter.get(self.user.id, 'like')
+
+        stats = counter.get_stats()
+        self.assertEqual(stats['loads'], 2)
+        self.assertEqual(stats['size'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()